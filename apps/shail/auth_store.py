@@ -14,17 +14,25 @@ All functions are synchronous and thread-safe (SQLite WAL mode).
 
 from __future__ import annotations
 
+import atexit
+import copy
 import json
+import logging
 import secrets
 import sqlite3
+import threading
+import time
 import uuid
+from collections import OrderedDict
 from datetime import datetime, timezone
-from typing import List, Optional
+from typing import Any, List, Optional, Tuple
 
 import bcrypt as _bcrypt
 
 from apps.shail.settings import get_settings
 
+logger = logging.getLogger(__name__)
+
 # ── Password hashing ──────────────────────────────────────────────────────────
 
 
@@ -250,10 +258,67 @@ def get_user_by_id(user_id: str) -> Optional[dict]:
     return dict(row) if row else None
 
 
-def touch_user_last_seen(user_id: str) -> None:
+# ── Write-behind activity touches ─────────────────────────────────────────────
+# Every authenticated request marks its user and key as active. Writing that
+# synchronously would put an UPDATE on the request path and contend with
+# capture inserts for the WAL writer lock, so touches only record the latest
+# timestamp in memory; flush_auth_touches() writes them in one transaction
+# (periodically from the app lifespan, on shutdown, and at interpreter exit).
+
+_touch_lock = threading.Lock()
+_pending_last_seen: dict = {}   # user_id → ISO timestamp
+_pending_last_used: dict = {}   # api key → ISO timestamp
+_atexit_registered = False
+
+
+def _record_touch(pending: dict, ident: str) -> None:
+    global _atexit_registered
     now = datetime.now(timezone.utc).isoformat()
-    with _conn() as con:
-        con.execute("UPDATE users SET last_seen = ? WHERE id = ?", (now, user_id))
+    with _touch_lock:
+        pending[ident] = now
+        if not _atexit_registered:
+            # Processes without the app lifespan (CLI, tests) still persist.
+            atexit.register(flush_auth_touches)
+            _atexit_registered = True
+
+
+def touch_user_last_seen(user_id: str) -> None:
+    """Mark user_id as seen now. Buffered; see flush_auth_touches()."""
+    _record_touch(_pending_last_seen, user_id)
+
+
+def flush_auth_touches() -> int:
+    """Write buffered last_seen / last_used touches in one transaction.
+
+    Returns the number of rows written. On failure the touches are put back
+    (unless a newer one arrived meanwhile) for the next flush.
+    """
+    with _touch_lock:
+        seen = list(_pending_last_seen.items())
+        used = list(_pending_last_used.items())
+        _pending_last_seen.clear()
+        _pending_last_used.clear()
+    if not seen and not used:
+        return 0
+    try:
+        with _conn() as con:
+            con.executemany(
+                "UPDATE users SET last_seen = ? WHERE id = ?",
+                [(ts, user_id) for user_id, ts in seen],
+            )
+            con.executemany(
+                "UPDATE api_keys SET last_used = ? WHERE key = ?",
+                [(ts, key) for key, ts in used],
+            )
+    except Exception as exc:
+        logger.warning("auth touch flush failed (%d pending): %s", len(seen) + len(used), exc)
+        with _touch_lock:
+            for user_id, ts in seen:
+                _pending_last_seen.setdefault(user_id, ts)
+            for key, ts in used:
+                _pending_last_used.setdefault(key, ts)
+        return 0
+    return len(seen) + len(used)
 
 
 # ── API key CRUD ──────────────────────────────────────────────────────────────
@@ -267,43 +332,125 @@ def create_api_key(user_id: str, label: str = "") -> str:
             "INSERT INTO api_keys (key, user_id, label, created_at) VALUES (?, ?, ?, ?)",
             (key, user_id, label, now),
         )
+    _invalidate_api_key_cache(key)
     return key
 
 
-try:
-    from cachetools import TTLCache
-    _api_key_cache: "TTLCache[str, Optional[str]]" = TTLCache(maxsize=512, ttl=60)
-except Exception:
-    _api_key_cache = {}  # type: ignore[assignment]
+# ── Principal caches ──────────────────────────────────────────────────────────
+# Every authenticated request resolves its bearer key, and most then read the
+# user's settings (tier, provider keys — the latter decrypted on each read).
+# Both are cached in process: a few microseconds per hit instead of a SQLite
+# round trip plus decryption. Writes through this module invalidate
+# explicitly; the TTL bounds staleness for changes made by other processes.
+
+_API_KEY_TTL = 60.0
+# Unknown/revoked keys are remembered too, so a client retrying a bad key
+# does not hit SQLite every time. create_api_key drops any such entry.
+_API_KEY_NEGATIVE_TTL = 10.0
+_SETTINGS_TTL = 60.0
+
+
+class _TTLCache:
+    """Thread-safe LRU with per-entry expiry and hit/miss counters."""
+
+    _MISSING = object()
+
+    def __init__(self, name: str, maxsize: int) -> None:
+        self.name = name
+        self._maxsize = maxsize
+        self._lock = threading.Lock()
+        self._items: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Any:
+        """Cached value, or `_TTLCache._MISSING` (None is a valid value)."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._items.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._items[key]
+                self.misses += 1
+                hit = False
+            else:
+                self._items.move_to_end(key)
+                self.hits += 1
+                hit = True
+        _count_lookup(self.name, hit)
+        return entry[1] if hit else self._MISSING
+
+    def put(self, key: str, value: Any, ttl: float) -> None:
+        with self._lock:
+            self._items[key] = (time.monotonic() + ttl, value)
+            self._items.move_to_end(key)
+            while len(self._items) > self._maxsize:
+                self._items.popitem(last=False)
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            self._items.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._items),
+                "max_size": self._maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            }
+
+
+def _count_lookup(cache: str, hit: bool) -> None:
+    try:
+        from apps.shail import telemetry
+        telemetry.incr(telemetry.AUTH_CACHE_LOOKUP, cache=cache, result="hit" if hit else "miss")
+    except Exception:
+        pass
+
+
+_api_key_cache = _TTLCache("api_key", maxsize=512)
+_settings_cache = _TTLCache("user_settings", maxsize=256)
 
 
 def get_user_by_api_key(key: str) -> Optional[str]:
     """Return user_id for a valid (non-revoked) API key, or None.
 
-    Cached for 60s to avoid hitting SQLite on every browser-extension capture.
-    Cache is invalidated by revoke_api_key.
+    Cached (including misses) so request auth rarely touches SQLite.
+    Invalidated by create_api_key and revoke_api_key.
     """
-    if key in _api_key_cache:
-        return _api_key_cache[key]
+    cached = _api_key_cache.get(key)
+    if cached is not _TTLCache._MISSING:
+        return cached
     with _conn() as con:
         row = con.execute(
             "SELECT user_id FROM api_keys WHERE key = ? AND revoked = 0",
             (key,),
         ).fetchone()
     user_id = row["user_id"] if row else None
-    try:
-        _api_key_cache[key] = user_id
-    except Exception:
-        pass
+    _api_key_cache.put(key, user_id, _API_KEY_TTL if user_id else _API_KEY_NEGATIVE_TTL)
     return user_id
 
 
 def _invalidate_api_key_cache(key: str) -> None:
-    try:
-        if key in _api_key_cache:
-            del _api_key_cache[key]
-    except Exception:
-        pass
+    _api_key_cache.invalidate(key)
+
+
+def auth_cache_stats() -> dict:
+    return {"api_key": _api_key_cache.stats(), "user_settings": _settings_cache.stats()}
+
+
+def clear_auth_caches() -> None:
+    _api_key_cache.clear()
+    _settings_cache.clear()
 
 
 def list_api_keys(user_id: str) -> List[dict]:
@@ -313,12 +460,15 @@ def list_api_keys(user_id: str) -> List[dict]:
             "SELECT key, label, created_at, last_used FROM api_keys WHERE user_id = ? AND revoked = 0 ORDER BY created_at DESC",
             (user_id,),
         ).fetchall()
+    with _touch_lock:
+        pending = {row["key"]: _pending_last_used.get(row["key"]) for row in rows}
     return [
         {
             "key_prefix": row["key"][:14] + "…",  # "shail_xxxxxxxx…"
             "label": row["label"] or "",
             "created_at": row["created_at"],
-            "last_used": row["last_used"],
+            # An unflushed touch is newer than what is on disk.
+            "last_used": pending[row["key"]] or row["last_used"],
         }
         for row in rows
     ]
@@ -336,15 +486,26 @@ def revoke_api_key(key: str, user_id: str) -> bool:
 
 
 def touch_api_key_last_used(key: str) -> None:
-    now = datetime.now(timezone.utc).isoformat()
-    with _conn() as con:
-        con.execute("UPDATE api_keys SET last_used = ? WHERE key = ?", (now, key))
+    """Mark key as used now. Buffered; see flush_auth_touches()."""
+    _record_touch(_pending_last_used, key)
 
 
 # ── User settings CRUD ────────────────────────────────────────────────────────
 
 def get_user_settings(user_id: str) -> dict:
-    """Return settings for user_id, inserting defaults if the row doesn't exist."""
+    """Return settings for user_id, inserting defaults if the row doesn't exist.
+
+    Cached per user (decrypted); invalidated by update_user_settings.
+    """
+    cached = _settings_cache.get(user_id)
+    if cached is _TTLCache._MISSING:
+        cached = _load_user_settings(user_id)
+        _settings_cache.put(user_id, cached, _SETTINGS_TTL)
+    # Callers may mutate the result (e.g. blocked_domains); keep ours intact.
+    return copy.deepcopy(cached)
+
+
+def _load_user_settings(user_id: str) -> dict:
     with _conn() as con:
         row = con.execute(
             "SELECT * FROM user_settings WHERE user_id = ?", (user_id,)
@@ -383,6 +544,9 @@ def get_user_settings(user_id: str) -> dict:
 
 def get_user_tier(user_id: str) -> str:
     """Return 'free' or 'pro' for the given user."""
+    cached = _settings_cache.get(user_id)
+    if cached is not _TTLCache._MISSING:
+        return cached["tier"] or "free"
     with _conn() as con:
         row = con.execute(
             "SELECT tier FROM user_settings WHERE user_id = ?", (user_id,)
@@ -421,4 +585,5 @@ def update_user_settings(user_id: str, **kwargs) -> dict:
             f"UPDATE user_settings SET {set_clause}, updated_at = ? WHERE user_id = ?",
             (*values, now, user_id),
         )
+    _settings_cache.invalidate(user_id)
     return get_user_settings(user_id)
@@ -6,11 +6,15 @@ blueprint ever existed — sessions sat in `degraded` state forever.
 
 This module replaces that with a persistent queue:
 
-  - `enqueue()` writes a `blueprint_jobs` row (state=pending) and returns.
-  - A `worker_loop()` started at backend startup polls the table every 30s,
-    picks the oldest job whose `next_attempt_at <= now`, probes Ollama, and
-    either runs `generate_blueprint()` / `generate_session_blueprint()` or
-    backs off exponentially.
+  - `enqueue()` writes a `blueprint_jobs` row (state=pending), wakes the
+    workers, and returns.
+  - `start_worker()` runs a pool of `blueprint_queue_concurrency`
+    `worker_loop()`s. Each waits for an enqueue wakeup (or the 30s poll, for
+    backoff retries), probes Ollama, atomically claims the highest-priority
+    due job (`UPDATE ... RETURNING`), and either runs `generate_blueprint()`
+    / `generate_session_blueprint()` or backs off exponentially. With more
+    than one worker, the first is a live lane that never takes bulk
+    (priority < 0) jobs, so captures don't wait behind a backfill.
   - On success: state=done, `quality_score` populated. If the originating
     session has `auto_redact_on_blueprint=1` AND score >= threshold, the
     raw transcript is redacted via `redact_session_transcript()`.
@@ -21,7 +25,10 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import sqlite3
+import time
 import uuid
+from collections import deque
 from datetime import datetime, timedelta, timezone
 from typing import Any, Dict, List, Optional
 
@@ -30,6 +37,9 @@ logger = logging.getLogger(__name__)
 _POLL_INTERVAL_SECONDS = 30.0
 _MAX_BACKOFF_SECONDS = 3600  # 1h cap
 _MAX_ATTEMPTS_DEFAULT = 5
+# Completed-job timestamps kept for the throughput gauge.
+_THROUGHPUT_WINDOW_SECONDS = 300.0
+_RETURNING_SUPPORTED = sqlite3.sqlite_version_info >= (3, 35, 0)
 
 
 def _conn():
@@ -76,6 +86,11 @@ def _now() -> str:
 
 # ── Enqueue ──────────────────────────────────────────────────────────────────
 
+# Job types produced by backfills/imports rather than live captures; they
+# default to the bulk lane the live worker never claims.
+_BULK_CONTENT_TYPES = frozenset({"chat_session"})
+
+
 def enqueue(
     memory_id: str,
     *,
@@ -83,7 +98,7 @@ def enqueue(
     user_id: str,
     content_type: str,
     max_attempts: int = _MAX_ATTEMPTS_DEFAULT,
-    priority: int = 0,
+    priority: Optional[int] = None,
 ) -> str:
     """Add a pending blueprint job. Returns the new job id.
 
@@ -92,8 +107,12 @@ def enqueue(
     and for the capture-time + backfill-time call sites to both invoke it.
 
     `priority`: 0 = normal (live captures), -1 = low (bulk/retroactive),
-                1 = high (user-requested re-blueprint).
+                1 = high (user-requested re-blueprint). When omitted it
+                follows the job type: session backfills (`chat_session`)
+                go to the bulk lane, everything else is normal.
     """
+    if priority is None:
+        priority = -1 if content_type in _BULK_CONTENT_TYPES else 0
     init_blueprint_queue_schema()
     with _conn() as con:
         row = con.execute(
@@ -114,6 +133,7 @@ def enqueue(
             (job_id, memory_id, session_id, user_id, content_type,
              max_attempts, now, now, now, priority),
         )
+    _notify_workers()
     return job_id
 
 
@@ -195,39 +215,107 @@ def _mark_failure(job_id: str, error: str, attempts: int, max_attempts: int) ->
         )
 
 
-def _claim_next(now_iso: str) -> Optional[Dict[str, Any]]:
-    """Pop the oldest pending job whose next_attempt_at <= now.
-    Higher priority jobs are processed first."""
+_DUE_WHERE = (
+    "state = 'pending' AND (next_attempt_at IS NULL OR next_attempt_at <= ?) "
+    "AND COALESCE(priority, 0) >= ?"
+)
+_DUE_ORDER = "ORDER BY priority DESC, created_at LIMIT 1"
+# `min_priority` that admits every lane (bulk/backfill jobs are enqueued at -1).
+_ANY_PRIORITY = -(2 ** 31)
+
+
+def _has_due_job(now_iso: str, min_priority: int = _ANY_PRIORITY) -> bool:
     init_blueprint_queue_schema()
     with _conn() as con:
         row = con.execute(
-            "SELECT * FROM blueprint_jobs WHERE state = 'pending' "
-            "AND (next_attempt_at IS NULL OR next_attempt_at <= ?) "
-            "ORDER BY priority DESC, created_at LIMIT 1",
-            (now_iso,),
+            f"SELECT 1 FROM blueprint_jobs WHERE {_DUE_WHERE} LIMIT 1",
+            (now_iso, min_priority),
         ).fetchone()
-    return dict(row) if row else None
+    return row is not None
+
+
+def _claim_next(now_iso: str, min_priority: int = _ANY_PRIORITY) -> Optional[Dict[str, Any]]:
+    """Atomically claim the oldest due pending job (state → running).
+    Higher priority jobs are processed first; `min_priority` restricts the
+    lane. Two workers can never claim the same row."""
+    init_blueprint_queue_schema()
+    with _conn() as con:
+        if _RETURNING_SUPPORTED:
+            row = con.execute(
+                "UPDATE blueprint_jobs SET state = 'running', updated_at = ? "
+                f"WHERE id = (SELECT id FROM blueprint_jobs WHERE {_DUE_WHERE} {_DUE_ORDER}) "
+                "RETURNING *",
+                (_now(), now_iso, min_priority),
+            ).fetchone()
+            return dict(row) if row else None
+        # SQLite < 3.35: compare-and-set on state instead of RETURNING.
+        while True:
+            row = con.execute(
+                f"SELECT * FROM blueprint_jobs WHERE {_DUE_WHERE} {_DUE_ORDER}",
+                (now_iso, min_priority),
+            ).fetchone()
+            if row is None:
+                return None
+            cur = con.execute(
+                "UPDATE blueprint_jobs SET state = 'running', updated_at = ? "
+                "WHERE id = ? AND state = 'pending'",
+                (_now(), row["id"]),
+            )
+            if cur.rowcount == 1:
+                job = dict(row)
+                job["state"] = "running"
+                return job
+
+
+def _requeue_stale_running() -> int:
+    """Jobs left `running` by a process that died mid-job go back to pending."""
+    init_blueprint_queue_schema()
+    with _conn() as con:
+        cur = con.execute(
+            "UPDATE blueprint_jobs SET state = 'pending', updated_at = ? WHERE state = 'running'",
+            (_now(),),
+        )
+    return cur.rowcount
 
 
 def stats() -> Dict[str, Any]:
     """Blueprint queue health stats for monitoring / dashboard."""
     init_blueprint_queue_schema()
+    now_iso = _now()
     with _conn() as con:
-        total = con.execute("SELECT COUNT(*) FROM blueprint_jobs").fetchone()[0]
-        pending = con.execute("SELECT COUNT(*) FROM blueprint_jobs WHERE state = 'pending'").fetchone()[0]
-        running = con.execute("SELECT COUNT(*) FROM blueprint_jobs WHERE state = 'running'").fetchone()[0]
-        done = con.execute("SELECT COUNT(*) FROM blueprint_jobs WHERE state = 'done'").fetchone()[0]
-        failed = con.execute("SELECT COUNT(*) FROM blueprint_jobs WHERE state = 'failed'").fetchone()[0]
+        counts = dict(con.execute(
+            "SELECT state, COUNT(*) FROM blueprint_jobs GROUP BY state"
+        ).fetchall())
+        due, due_live, oldest = con.execute(
+            "SELECT COUNT(*), COALESCE(SUM(COALESCE(priority, 0) >= 0), 0), MIN(created_at) FROM blueprint_jobs "
+            "WHERE state = 'pending' AND (next_attempt_at IS NULL OR next_attempt_at <= ?)",
+            (now_iso,),
+        ).fetchone()
         avg_score = con.execute(
             "SELECT AVG(quality_score) FROM blueprint_jobs WHERE state = 'done' AND quality_score IS NOT NULL"
         ).fetchone()[0]
+    oldest_age = None
+    if oldest:
+        try:
+            oldest_age = round((datetime.now(timezone.utc) - datetime.fromisoformat(oldest)).total_seconds(), 1)
+        except ValueError:
+            pass
+    cutoff = time.monotonic() - _THROUGHPUT_WINDOW_SECONDS
+    finished = sum(1 for t in list(_finished_at) if t >= cutoff)
     return {
-        "total": total,
-        "pending": pending,
-        "running": running,
-        "done": done,
-        "failed": failed,
+        "total": sum(counts.values()),
+        "pending": counts.get("pending", 0),
+        "running": counts.get("running", 0),
+        "done": counts.get("done", 0),
+        "failed": counts.get("failed", 0),
         "avg_quality_score": round(avg_score, 3) if avg_score else None,
+        # Gauges for the in-process worker pool.
+        "queue_depth": due,
+        "queue_depth_live": due_live,
+        "oldest_due_age_sec": oldest_age,
+        "workers": len(_worker_tasks),
+        "workers_busy": _busy,
+        "throughput_per_min": round(finished * 60.0 / _THROUGHPUT_WINDOW_SECONDS, 2),
     }
 
 
@@ -268,8 +356,8 @@ def compute_quality_score(bp: Optional[dict]) -> float:
 async def _ollama_alive() -> bool:
     """Cheap probe: embed_query("ping") returns a non-zero vector when up."""
     try:
-        from shail.memory.embeddings import embed_query, is_zero_vector
-        vec = await asyncio.to_thread(embed_query, "ping")
+        from shail.memory.embeddings import aembed_query, is_zero_vector
+        vec = await aembed_query("ping")
         return not is_zero_vector(vec)
     except Exception as exc:
         logger.debug("ollama probe failed: %s", exc)
@@ -366,7 +454,10 @@ async def _try_auto_redact(job: Dict[str, Any], score: float) -> None:
 async def _process_job(job: Dict[str, Any]) -> None:
     """Run one job. On success: mark done + score + maybe redact. On failure:
     increment attempts + schedule backoff."""
+    from apps.shail import telemetry
+
     _mark_running(job["id"])
+    started = time.perf_counter()
     new_attempts = (job.get("attempts") or 0) + 1
     max_attempts = job.get("max_attempts") or _MAX_ATTEMPTS_DEFAULT
     try:
@@ -376,6 +467,9 @@ async def _process_job(job: Dict[str, Any]) -> None:
             bp = await _run_capture_job(job)
         score = compute_quality_score(bp)
         _mark_done(job["id"], score)
+        _finished_at.append(time.monotonic())
+        telemetry.observe(telemetry.BLUEPRINT_JOB_MS, (time.perf_counter() - started) * 1000,
+                          kind="session" if job.get("session_id") else "capture")
         logger.info(
             "blueprint job %s done (memory_id=%s session=%s score=%.2f)",
             job["id"][:8], job["memory_id"][:32], job.get("session_id"), score,
@@ -389,49 +483,126 @@ async def _process_job(job: Dict[str, Any]) -> None:
         _mark_failure(job["id"], str(exc), new_attempts, max_attempts)
 
 
-# ── Worker loop ──────────────────────────────────────────────────────────────
+# ── Worker pool ──────────────────────────────────────────────────────────────
 
 _worker_started = False
+_worker_tasks: List[asyncio.Task] = []
+_busy = 0
+_finished_at: deque = deque(maxlen=4096)
+# Enqueue wakeup. enqueue() may run on a request thread, so the event is set
+# through its owning loop.
+_wake_event: Optional[asyncio.Event] = None
+_wake_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _notify_workers() -> None:
+    event, loop = _wake_event, _wake_loop
+    if event is None or loop is None or loop.is_closed():
+        return
+    try:
+        if asyncio.get_running_loop() is loop:
+            event.set()
+            return
+    except RuntimeError:
+        pass
+    try:
+        loop.call_soon_threadsafe(event.set)
+    except RuntimeError:
+        pass  # loop shutting down
+
+
+async def _wait_for_work(timeout: float) -> None:
+    if _wake_event is None:
+        await asyncio.sleep(timeout)
+        return
+    try:
+        await asyncio.wait_for(_wake_event.wait(), timeout=timeout)
+    except asyncio.TimeoutError:
+        pass
 
 
-async def worker_loop(poll_interval_seconds: float = _POLL_INTERVAL_SECONDS) -> None:
-    """Forever-loop: probe Ollama, claim next pending job, process. Stops only
-    on CancelledError so the app shutdown can tear it down cleanly.
+async def worker_loop(
+    poll_interval_seconds: float = _POLL_INTERVAL_SECONDS,
+    *,
+    min_priority: int = _ANY_PRIORITY,
+    name: str = "worker",
+) -> None:
+    """Forever-loop: wait for work, probe Ollama, claim next due job, process.
+    Stops only on CancelledError so the app shutdown can tear it down cleanly.
     """
-    logger.info("blueprint queue worker started (poll=%.0fs)", poll_interval_seconds)
+    global _busy
+    logger.info("blueprint queue %s started (poll=%.0fs, min_priority=%s)",
+                name, poll_interval_seconds,
+                "any" if min_priority == _ANY_PRIORITY else min_priority)
     while True:
         try:
+            if _wake_event is not None:
+                _wake_event.clear()
             now_iso = _now()
+            if not _has_due_job(now_iso, min_priority):
+                if _busy == 0:
+                    await _maybe_stop_blueprint_ollama_when_idle()
+                await _wait_for_work(poll_interval_seconds)
+                continue
             if not await _ensure_ollama_for_blueprint_queue():
                 # Sleep without claiming — leaves rows pending for the next pass.
                 await asyncio.sleep(poll_interval_seconds)
                 continue
-            job = _claim_next(now_iso)
+            job = _claim_next(now_iso, min_priority)
             if not job:
-                await _maybe_stop_blueprint_ollama_when_idle()
-                await asyncio.sleep(poll_interval_seconds)
-                continue
-            await _process_job(job)
-            # Tight loop while there's pending work AND Ollama stays up.
-            await asyncio.sleep(0.5)
+                continue  # another worker got it first
+            _busy += 1
+            try:
+                await _process_job(job)
+            finally:
+                _busy -= 1
         except asyncio.CancelledError:
-            logger.info("blueprint queue worker stopping")
+            logger.info("blueprint queue %s stopping", name)
             raise
         except Exception as exc:
-            logger.exception("blueprint queue worker tick error: %s", exc)
+            logger.exception("blueprint queue %s tick error: %s", name, exc)
             await asyncio.sleep(poll_interval_seconds)
 
 
+async def _worker_pool(concurrency: int) -> None:
+    """Run `concurrency` workers; the first is live-only when there are two
+    or more, so bulk backfills can never occupy every slot."""
+    global _wake_event, _wake_loop
+    _wake_event = asyncio.Event()
+    _wake_loop = asyncio.get_running_loop()
+    concurrency = max(1, concurrency)
+    for idx in range(concurrency):
+        live_lane = concurrency > 1 and idx == 0
+        _worker_tasks.append(asyncio.create_task(worker_loop(
+            min_priority=0 if live_lane else _ANY_PRIORITY,
+            name="live worker" if live_lane else f"worker {idx}",
+        )))
+    try:
+        await asyncio.gather(*_worker_tasks)
+    finally:
+        for task in _worker_tasks:
+            task.cancel()
+        await asyncio.gather(*_worker_tasks, return_exceptions=True)
+        _worker_tasks.clear()
+        _wake_event = None
+        _wake_loop = None
+
+
 def start_worker() -> Optional[asyncio.Task]:
-    """Idempotent: start the worker as an asyncio.Task in the current loop.
+    """Idempotent: start the worker pool as an asyncio.Task in the current loop.
     Safe to call from FastAPI startup hook. Returns the Task or None if the
-    worker was already running.
+    pool was already running.
     """
     global _worker_started
     if _worker_started:
         return None
     _worker_started = True
     init_blueprint_queue_schema()
-    task = asyncio.create_task(worker_loop())
-    logger.info("blueprint queue worker task scheduled")
+    requeued = _requeue_stale_running()
+    if requeued:
+        logger.info("blueprint queue: requeued %d job(s) left running by a previous process", requeued)
+    from apps.shail.settings import get_settings
+    concurrency = get_settings().blueprint_queue_concurrency
+    task = asyncio.create_task(_worker_pool(concurrency))
+    logger.info("blueprint queue worker pool scheduled (concurrency=%d)", concurrency)
     return task
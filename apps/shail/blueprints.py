@@ -22,10 +22,12 @@ service, not data loss.
 
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
 import re
 import sqlite3
+import time
 from datetime import datetime, timezone
 from typing import Optional
 
@@ -741,8 +743,8 @@ async def generate_blueprint(
          response reserve.
       2. If content fits the budget, run a single LLM call.
       3. Otherwise split into overlapping windows, extract one partial
-         blueprint per window, and reduce-merge them. The prior blueprint
-         (if any) is folded in as the seed of the reduction.
+         blueprint per window (concurrently in map-reduce mode), and
+         reduce-merge them. The prior blueprint (if any) is folded in.
 
     On parse failure with a prior, the prior is preserved.
     """
@@ -831,6 +833,52 @@ async def _extract_single(
     )
 
 
+def _split_windows(content: str, window_size: int, overlap: int) -> list[str]:
+    """Overlapping windows covering all of `content`, in order."""
+    if overlap >= window_size:
+        overlap = window_size // 5
+    step = max(1, window_size - overlap)
+    windows: list[str] = []
+    pos = 0
+    while pos < len(content):
+        end = min(pos + window_size, len(content))
+        windows.append(content[pos:end])
+        if end == len(content):
+            break
+        pos += step
+    return windows
+
+
+async def gather_bounded(items: list, fn, limit: int) -> list:
+    """`await fn(idx, item)` for every item, at most `limit` at a time.
+
+    Results come back in input order; an exception is returned in place of
+    its result (gather `return_exceptions=True`) so one failure does not
+    cancel the rest.
+    """
+    sem = asyncio.Semaphore(max(1, limit))
+
+    async def _one(idx: int, item):
+        async with sem:
+            return await fn(idx, item)
+
+    return await asyncio.gather(*(_one(i, it) for i, it in enumerate(items)), return_exceptions=True)
+
+
+def _tree_merge(parts: list[dict]) -> Optional[dict]:
+    """Pairwise-merge partial blueprints, keeping window order.
+
+    `_merge_blueprints` unions list fields in first-seen order and takes
+    scalar fields from the right, so this equals a left-to-right fold.
+    """
+    while len(parts) > 1:
+        parts = [
+            _merge_blueprints(parts[i], parts[i + 1]) if i + 1 < len(parts) else parts[i]
+            for i in range(0, len(parts), 2)
+        ]
+    return parts[0] if parts else None
+
+
 async def _extract_chunked(
     *,
     memory_id: str,
@@ -842,26 +890,91 @@ async def _extract_chunked(
 ) -> Optional[dict]:
     """Split content into windows, extract each, reduce-merge.
 
-    The merge is initialized with `prior` (so durable cognition survives) and
-    each window's output is union-merged in. The result is the final blueprint
-    spanning the full content — no tail loss.
+    `blueprint_chunk_mode`:
+      map_reduce — windows are extracted independently (no prior in the
+        prompt, so windows can use the full budget) with up to
+        `blueprint_map_concurrency` calls in flight, then tree-merged and
+        folded onto `prior`. `blueprint_map_refine` adds one refinement
+        call over the transcript tail with the merged result as prior,
+        union-merged back so nothing the model drops is lost.
+      sequential — each window refines the running merge, one at a time.
+
+    Either way the result spans the full content — no tail loss — and
+    durable cognition from `prior` survives.
     """
+    s = get_settings()
+    if s.blueprint_chunk_mode == "sequential":
+        return await _extract_sequential(
+            memory_id=memory_id, content=content, content_type=content_type,
+            user_id=user_id, prior=prior, prior_payload_chars=prior_payload_chars,
+        )
+
+    window_size, overlap = compute_window_size(transcript_chars=len(content))
+    windows = _split_windows(content, window_size, overlap)
+    limit = s.blueprint_map_concurrency
+    logger.info(
+        "blueprint %s map-reduce: %d windows of %d chars (overlap=%d, concurrency=%d)",
+        memory_id, len(windows), window_size, overlap, limit,
+    )
+
+    started = time.perf_counter()
+
+    async def _map(idx: int, win: str) -> Optional[dict]:
+        return await extract_blueprint(content=win, content_type=content_type, user_id=user_id)
+
+    results = await gather_bounded(windows, _map, limit)
+    parts: list[dict] = []
+    for idx, res in enumerate(results):
+        if isinstance(res, BaseException):
+            logger.warning("blueprint window %d/%d failed for %s: %s",
+                           idx + 1, len(windows), memory_id, res)
+        elif res:
+            parts.append(res)
+
+    merged = _tree_merge(parts)
+    if merged is not None and prior:
+        merged = _merge_blueprints(prior, merged)
+    elif merged is None:
+        merged = prior
+    if merged is not None and parts and s.blueprint_map_refine:
+        # The merged blueprint rides in the prompt, so the refine window is
+        # sized against it rather than reusing the prior-free map window.
+        refine_size, _ = compute_window_size(
+            transcript_chars=len(content),
+            prior_blueprint_chars=len(json.dumps(merged, ensure_ascii=False)),
+        )
+        try:
+            refined = await extract_blueprint(
+                content=content[-refine_size:], content_type=content_type,
+                user_id=user_id, prior=merged,
+            )
+        except Exception as e:
+            logger.warning("blueprint refine pass failed for %s: %s", memory_id, e)
+            refined = None
+        if refined:
+            merged = _merge_blueprints(merged, refined)
+    logger.info(
+        "blueprint %s map-reduce: %d/%d windows extracted in %.1fs",
+        memory_id, len(parts), len(windows), time.perf_counter() - started,
+    )
+    return merged
+
+
+async def _extract_sequential(
+    *,
+    memory_id: str,
+    content: str,
+    content_type: str,
+    user_id: Optional[str],
+    prior: Optional[dict],
+    prior_payload_chars: int,
+) -> Optional[dict]:
+    """Each window refines the running merge, seeded with `prior`."""
     window_size, overlap = compute_window_size(
         transcript_chars=len(content),
         prior_blueprint_chars=prior_payload_chars,
     )
-    if overlap >= window_size:
-        overlap = window_size // 5
-
-    step = max(1, window_size - overlap)
-    windows: list[str] = []
-    pos = 0
-    while pos < len(content):
-        end = min(pos + window_size, len(content))
-        windows.append(content[pos:end])
-        if end == len(content):
-            break
-        pos += step
+    windows = _split_windows(content, window_size, overlap)
 
     logger.info(
         "blueprint %s chunked: %d windows of %d chars (overlap=%d)",
@@ -890,6 +1003,29 @@ async def _extract_chunked(
     return merged
 
 
+async def extract_sized_blueprint(
+    *,
+    content: str,
+    content_type: str,
+    user_id: Optional[str],
+    prior: Optional[dict] = None,
+    memory_id: str = "",
+) -> Optional[dict]:
+    """Extract without persisting, chunking when content exceeds the budget.
+
+    Same single-vs-chunked decision as `generate_blueprint`, for callers
+    that store the result themselves (capture materializations).
+    """
+    prior_payload_chars = len(json.dumps(prior, ensure_ascii=False)) if prior else 0
+    budget = compute_budget(prior_blueprint_chars=prior_payload_chars)
+    if len(content or "") <= budget.content_budget_chars:
+        return await _extract_single(content, content_type, user_id, prior)
+    return await _extract_chunked(
+        memory_id=memory_id, content=content, content_type=content_type,
+        user_id=user_id, prior=prior, prior_payload_chars=prior_payload_chars,
+    )
+
+
 async def extract_blueprint(
     *,
     content: str,
@@ -912,6 +1048,7 @@ async def extract_blueprint(
         messages=[{"role": "user", "content": user_msg}],
         user_id=user_id,
         system_prompt=system_prompt,
+        background=True,
     )
     bp = _parse_blueprint(raw)
     if not bp:
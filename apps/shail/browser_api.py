@@ -34,7 +34,7 @@ from fastapi.responses import Response
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from pydantic import BaseModel, Field
 
-from shail.memory.rag import _get_store, ingest, search as rag_search
+from shail.memory.rag import _get_store, aingest, search as rag_search
 from apps.shail.settings import get_settings
 from apps.shail.auth_store import (
     get_user_by_api_key, touch_api_key_last_used, touch_user_last_seen,
@@ -442,56 +442,37 @@ def _lexical_score_capture(query: str, terms: List[str], content: str, meta: Dic
 
 
 def _collect_user_capture_records(namespace: str) -> Dict[str, Dict[str, Any]]:
-    """Return one full-fidelity row per logical capture for dashboard metrics.
+    """Return one row per logical capture from the materialized catalog.
 
-    Raw transcript rows are preferred over vector chunks because they preserve
-    the full transcript text. Vector rows remain the fallback for older records
-    that do not have raw transcript materialization.
+    The first call for a namespace seeds `capture_index` from Chroma + raw
+    transcripts; afterwards capture/delete/patch paths keep it current and
+    this is a single SQLite read. Bodies are capped at
+    `capture_index.BODY_CAP_CHARS`.
     """
-    records: Dict[str, Dict[str, Any]] = {}
-    store = _get_store()
+    from apps.shail import capture_index
+    capture_index.ensure_seeded(namespace, _get_store())
+    return {
+        record_id: {"content": body, "metadata": meta}
+        for record_id, body, meta in capture_index.list_records(namespace)
+    }
 
-    if hasattr(store, "collection"):
-        try:
-            result = store.collection.get(
-                where={"namespace": namespace},
-                include=["documents", "metadatas"],
-                limit=5000,
-            )
-            for rid, doc, meta in zip(
-                result.get("ids", []),
-                result.get("documents", []) or [],
-                result.get("metadatas", []) or [],
-            ):
-                meta = meta or {}
-                if not is_browser_memory(meta, doc or ""):
-                    continue
-                meta = normalize_browser_metadata(meta, doc or "")
-                logical_id = _logical_record_id(rid, meta)
-                current = records.get(logical_id)
-                chunk_index = int(meta.get("chunk_index", 0) or 0)
-                if current is None or chunk_index == 0:
-                    records[logical_id] = {"content": doc or "", "metadata": meta}
-        except Exception as exc:
-            logger.warning("Altitude vector fetch failed for %s: %s", namespace, exc)
 
+def _lexical_candidates(namespace: str, query: str) -> Dict[str, Dict[str, Any]]:
+    """Records worth lexically scoring for `query` in `namespace`.
+
+    Served from the FTS5 capture index (top candidates per term); every
+    catalog row is a candidate only when the SQLite build lacks FTS5.
+    """
     try:
-        from apps.shail import raw_transcripts as _rt
-        for raw in _rt.list_recent(namespace=namespace, limit=5000):
-            raw_id = raw.get("memory_id")
-            if not raw_id:
-                continue
-            content = raw.get("content") or ""
-            meta = raw.get("metadata") or {}
-            if not is_browser_memory(meta, content):
-                continue
-            meta = normalize_browser_metadata(meta, content)
-            meta.setdefault("timestamp", raw.get("captured_at"))
-            records[raw_id] = {"content": content, "metadata": meta}
+        from apps.shail import capture_index
+        if capture_index.available():
+            capture_index.ensure_seeded(namespace, _get_store())
+            candidates = capture_index.search_candidates(namespace, query)
+            if candidates is not None:
+                return candidates
     except Exception as exc:
-        logger.warning("Altitude raw transcript merge failed for %s: %s", namespace, exc)
-
-    return records
+        logger.warning("capture_index lookup failed for %s, using full scan: %s", namespace, exc)
+    return _collect_user_capture_records(namespace)
 
 
 def _count_memories(store, namespace: str) -> int:
@@ -612,53 +593,33 @@ async def get_me(
     )
 
 
-def _bg_ingest_and_index(
-    memory_id: str,
-    content: str,
-    namespace: str,
-    metadata: dict,
-    log_user_id: Optional[str],
-    eventType: str,
-    sourceApp: str,
-):
-    """Run heavy vector embeddings creation and queuing tasks in the background."""
+def _record_capture_degraded(memory_id: str, title: str, log_user_id: Optional[str],
+                             eventType: str, sourceApp: str) -> None:
+    """Post-ingest bookkeeping when the embed failed (sync SQLite; run in a thread)."""
+    write_event("CAPTURE", f"{sourceApp}: {title[:80]} (degraded)",
+                user_id=log_user_id, ref_id=memory_id)
     try:
-        chunk_count = ingest(records=[{
-            "id": memory_id,
-            "content": content,
-            "namespace": namespace,
-            "metadata": metadata,
-        }])
+        from apps.shail.blueprint_queue import enqueue as _bq_enqueue
+        _bq_enqueue(
+            memory_id=memory_id,
+            session_id=None,
+            user_id=log_user_id or "local",
+            content_type=eventType,
+        )
     except Exception as exc:
-        logger.error("Background ingest failed for %s: %s", memory_id, exc)
-        chunk_count = 0
+        logger.warning("blueprint enqueue failed for %s: %s", memory_id, exc)
 
-    if chunk_count == 0:
-        logger.warning(
-            "embed failed for %s — raw transcript persisted, queued for retry",
-            memory_id,
-        )
-        write_event("CAPTURE", f"{sourceApp}: {metadata.get('title')[:80]} (degraded)",
-                    user_id=log_user_id, ref_id=memory_id)
-        try:
-            from apps.shail.blueprint_queue import enqueue as _bq_enqueue
-            _bq_enqueue(
-                memory_id=memory_id,
-                session_id=None,
-                user_id=log_user_id or "local",
-                content_type=eventType,
-            )
-        except Exception as exc:
-            logger.warning("blueprint enqueue failed for %s: %s", memory_id, exc)
-        return
 
+def _record_capture_indexed(memory_id: str, title: str, chunk_count: int,
+                            log_user_id: Optional[str], eventType: str, sourceApp: str) -> None:
+    """Post-ingest bookkeeping after a successful embed (sync SQLite; run in a thread)."""
     try:
         from apps.shail import raw_transcripts as _rt
         _rt.mark_embedded(memory_id, True)
     except Exception:
         pass
 
-    write_event("CAPTURE", f"{sourceApp}: {metadata.get('title')[:80]}",
+    write_event("CAPTURE", f"{sourceApp}: {title[:80]}",
                 user_id=log_user_id, ref_id=memory_id)
     write_event("INDEX", f"embedded {chunk_count} chunk(s) for {sourceApp}",
                 user_id=log_user_id, ref_id=memory_id)
@@ -677,8 +638,48 @@ def _bg_ingest_and_index(
     except Exception as exc:
         logger.warning("blueprint enqueue failed for %s: %s", memory_id, exc)
 
+
+async def _bg_ingest_and_index(
+    memory_id: str,
+    content: str,
+    namespace: str,
+    metadata: dict,
+    log_user_id: Optional[str],
+    eventType: str,
+    sourceApp: str,
+):
+    """Run heavy vector embeddings creation and queuing tasks in the background.
+
+    Runs on the event loop: the embed is awaited over the async Ollama client,
+    and the synchronous SQLite bookkeeping afterwards is pushed to a thread.
+    """
+    try:
+        chunk_count = await aingest(records=[{
+            "id": memory_id,
+            "content": content,
+            "namespace": namespace,
+            "metadata": metadata,
+        }])
+    except Exception as exc:
+        logger.error("Background ingest failed for %s: %s", memory_id, exc)
+        chunk_count = 0
+
+    title = metadata.get("title") or ""
+    if chunk_count == 0:
+        logger.warning(
+            "embed failed for %s — raw transcript persisted, queued for retry",
+            memory_id,
+        )
+        await asyncio.to_thread(
+            _record_capture_degraded, memory_id, title, log_user_id, eventType, sourceApp,
+        )
+        return
+
+    await asyncio.to_thread(
+        _record_capture_indexed, memory_id, title, chunk_count, log_user_id, eventType, sourceApp,
+    )
+
     from apps.shail.websocket_server import websocket_manager
-    import asyncio
     try:
         loop = asyncio.get_running_loop()
         loop.create_task(websocket_manager.broadcast_event("INVALIDATE_CACHE", {
@@ -825,72 +826,17 @@ async def search_memories(
     namespace = _get_namespace(credentials)
 
     if not req.query.strip():
-        # ── Browse mode: list all records visible to this user ────────────
-        # Signed-in users see their namespace AND the anonymous namespace
-        # (pre-login captures) until they claim them via /claim-anonymous.
-        # Anonymous users see only browser_memory.
+        # ── Browse mode: newest-first page of the user's capture catalog ──
+        # Single-namespace browse: only the authenticated user's namespace.
         try:
-            if hasattr(store, "collection"):  # ChromaVectorStore
-                # Single-namespace browse: only the authenticated user's namespace
-                items: list[MemoryItem] = []
-                seen_ids: set = set()
-                try:
-                    result = store.collection.get(
-                        where={"namespace": namespace},
-                        include=["documents", "metadatas"],
-                        limit=5000,
-                    )
-                except Exception as ns_exc:
-                    logger.warning("Browse namespace %s failed: %s", namespace, ns_exc)
-                    result = {"ids": [], "documents": [], "metadatas": []}
-
-                for rid, doc, meta in zip(
-                    result.get("ids", []),
-                    result.get("documents", []),
-                    result.get("metadatas", []),
-                ):
-                    meta = meta or {}
-                    if not is_browser_memory(meta, doc or ""):
-                        continue
-                    meta = normalize_browser_metadata(meta, doc or "")
-                    logical_id = _logical_record_id(rid, meta)
-                    if logical_id not in seen_ids:
-                        seen_ids.add(logical_id)
-                        items.append(_meta_to_item(logical_id, doc or "", 0.0, meta))
-
-                try:
-                    from apps.shail import raw_transcripts as _rt
-                    for raw in _rt.list_recent(namespace=namespace, limit=5000, after=req.after):
-                        raw_id = raw.get("memory_id")
-                        if not raw_id or raw_id in seen_ids:
-                            continue
-                        if not is_browser_memory(raw.get("metadata") or {}, raw.get("content") or ""):
-                            continue
-                        seen_ids.add(raw_id)
-                        items.append(_raw_transcript_to_item(raw))
-                except Exception as raw_exc:
-                    logger.warning("Raw transcript browse fallback failed: %s", raw_exc)
-
-                if req.after:
-                    items = [i for i in items if i.timestamp >= req.after]
-                if req.sourceApp:
-                    items = [i for i in items if i.sourceApp == req.sourceApp]
-                items.sort(key=lambda x: x.timestamp, reverse=True)
-                return SearchResponse(items=items[: req.k], total=len(items))
-            else:
-                try:
-                    from apps.shail import raw_transcripts as _rt
-                    raw_items = [
-                        _raw_transcript_to_item(raw)
-                        for raw in _rt.list_recent(namespace=namespace, limit=req.k, after=req.after)
-                        if is_browser_memory(raw.get("metadata") or {}, raw.get("content") or "")
-                    ]
-                    if req.sourceApp:
-                        raw_items = [i for i in raw_items if i.sourceApp == req.sourceApp]
-                    return SearchResponse(items=raw_items[: req.k], total=len(raw_items))
-                except Exception as raw_exc:
-                    logger.warning("Raw transcript browse fallback failed: %s", raw_exc)
-                    return SearchResponse(items=[], total=0)
+            from apps.shail import capture_index
+            capture_index.ensure_seeded(namespace, store)
+            rows = capture_index.list_records(
+                namespace, source_app=req.sourceApp, after=req.after, limit=req.k,
+            )
+            total = capture_index.count(namespace, source_app=req.sourceApp, after=req.after)
+            items = [_meta_to_item(rid, body, 0.0, meta) for rid, body, meta in rows]
+            return SearchResponse(items=items, total=total)
         except Exception as exc:
             logger.error("Browse failed: %s", exc)
             return SearchResponse(items=[], total=0)
@@ -906,7 +852,7 @@ async def search_memories(
     # even before embeddings finish or when the embedder is offline.
     for ns in namespaces:
         try:
-            for record_id, record in _collect_user_capture_records(ns).items():
+            for record_id, record in _lexical_candidates(ns, req.query).items():
                 content = record.get("content") or ""
                 metadata = normalize_browser_metadata(record.get("metadata") or {}, content)
                 lexical = _lexical_score_capture(req.query, terms, content, metadata)
@@ -1329,9 +1275,9 @@ async def capture_bulk(
     _cleanup_previous_conversation(req, namespace)
 
     # Wrap the background task logic so we can pass priority=-1 to enqueue
-    def _bg_bulk_ingest():
+    async def _bg_bulk_ingest():
         try:
-            chunk_count = ingest(records=[{
+            chunk_count = await aingest(records=[{
                 "id": req.customId,
                 "content": content,
                 "namespace": namespace,
@@ -1341,6 +1287,10 @@ async def capture_bulk(
             logger.error("Background bulk ingest failed for %s: %s", req.customId, exc)
             chunk_count = 0
             
+        await asyncio.to_thread(_after_bulk_ingest, chunk_count)
+
+    def _after_bulk_ingest(chunk_count: int) -> None:
+        # Sync SQLite bookkeeping — runs in a thread, off the event loop.
         if chunk_count > 0:
             try:
                 from apps.shail import raw_transcripts as _rt
@@ -1349,7 +1299,7 @@ async def capture_bulk(
                 pass
             write_event("CAPTURE", f"{req.sourceApp}: {getattr(req, 'title', '')[:80]} ({capture_mode})",
                         user_id=log_user_id, ref_id=req.customId)
-                        
+
         try:
             from apps.shail.blueprint_queue import enqueue as _bq_enqueue
             from apps.shail import pipeline_status as _ps
@@ -1364,7 +1314,7 @@ async def capture_bulk(
                            detail={"content_type": req.eventType, "priority": -1})
         except Exception as exc:
             logger.warning("blueprint enqueue failed for %s: %s", req.customId, exc)
-            
+
     background_tasks.add_task(_bg_bulk_ingest)
 
     return CaptureResponse(
@@ -1378,78 +1328,30 @@ async def capture_bulk(
 async def get_stats(
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(_bearer),
 ) -> StatsResponse:
-    """Compute stats for popup cards from local browser_memory records."""
+    """Compute stats for popup cards from the materialized capture catalog."""
     store = _get_store()
     namespace = _get_namespace(credentials)
     try:
-        if hasattr(store, "collection"):  # ChromaVectorStore
-            result = store.collection.get(
-                where={"namespace": namespace},
-                include=["documents", "metadatas"],
-                limit=5000,
-            )
-            metadatas: List[Dict[str, Any]] = []
-            seen_ids: set[str] = set()
-            for rid, doc, m in zip(
-                result.get("ids", []),
-                result.get("documents", []) or [],
-                result.get("metadatas", []) or [],
-            ):
-                m = m or {}
-                if not is_browser_memory(m, doc or ""):
-                    continue
-                m = normalize_browser_metadata(m, doc or "")
-                logical_id = _logical_record_id(rid, m)
-                if logical_id in seen_ids:
-                    continue
-                seen_ids.add(logical_id)
-                metadatas.append(m)
-
-            try:
-                from apps.shail import raw_transcripts as _rt
-                for raw in _rt.list_recent(namespace=namespace, limit=5000):
-                    raw_id = raw.get("memory_id")
-                    if not raw_id or raw_id in seen_ids:
-                        continue
-                    meta = raw.get("metadata") or {}
-                    content = raw.get("content") or ""
-                    if not is_browser_memory(meta, content):
-                        continue
-                    meta = normalize_browser_metadata(meta, content)
-                    meta.setdefault("timestamp", raw.get("captured_at"))
-                    seen_ids.add(raw_id)
-                    metadatas.append(meta)
-            except Exception as raw_exc:
-                logger.warning("Stats raw transcript merge failed: %s", raw_exc)
-
-            total = len(metadatas)
-
-            week_ago = (datetime.now(timezone.utc) - timedelta(days=7)).isoformat()
-            this_week = sum(
-                1 for m in metadatas if m.get("timestamp", "") >= week_ago
-            )
-
-            source_counts: Dict[str, int] = {}
-            latest_ts: Optional[str] = None
-            for m in metadatas:
-                src = normalize_browser_metadata(m).get("sourceApp", "web")
-                source_counts[src] = source_counts.get(src, 0) + 1
-                ts = m.get("timestamp")
-                if ts and (latest_ts is None or ts > latest_ts):
-                    latest_ts = ts
-
-            top_source = (
-                max(source_counts, key=lambda k: source_counts[k])
-                if source_counts
-                else None
-            )
-
-            return StatsResponse(
-                totalMemories=total,
-                memoriesThisWeek=this_week,
-                topSource=top_source,
-                lastCapturedAt=latest_ts,
-            )
+        from apps.shail import capture_index
+        capture_index.ensure_seeded(namespace, store)
+        now = datetime.now(timezone.utc)
+        agg = capture_index.summary_stats(
+            namespace,
+            week_ago=(now - timedelta(days=7)).isoformat(),
+            month_ago=(now - timedelta(days=30)).isoformat(),
+        )
+        source_counts = agg["by_source"]
+        top_source = (
+            max(source_counts, key=lambda k: source_counts[k])
+            if source_counts
+            else None
+        )
+        return StatsResponse(
+            totalMemories=agg["total"],
+            memoriesThisWeek=agg["this_week"],
+            topSource=top_source,
+            lastCapturedAt=agg["latest_ts"],
+        )
     except Exception as exc:
         logger.error("Stats failed: %s", exc)
 
@@ -1482,17 +1384,19 @@ async def get_altitude(
         for i in range(days)
     }
 
-    for row in _collect_user_capture_records(namespace).values():
-        meta = row.get("metadata") or {}
-        dt = _parse_capture_timestamp(meta.get("timestamp") or meta.get("captured_at"))
+    from apps.shail import capture_index
+    capture_index.ensure_seeded(namespace, _get_store())
+    # One day of slack so non-UTC offsets near the window edge still bucket.
+    since = (start_day - timedelta(days=1)).isoformat()
+    for timestamp, content_bytes in capture_index.volume_since(namespace, since):
+        dt = _parse_capture_timestamp(timestamp)
         if not dt:
             continue
         day = dt.date()
         if day < start_day or day > today:
             continue
         key = day.isoformat()
-        content = row.get("content") or ""
-        buckets[key]["bytes"] += len(content.encode("utf-8"))
+        buckets[key]["bytes"] += content_bytes
         buckets[key]["captures"] += 1
 
     if user_id:
@@ -1646,11 +1550,18 @@ async def import_memories(
 
     if records_to_ingest:
         try:
-            count = ingest(records=records_to_ingest)
+            count = await aingest(records=records_to_ingest)
             imported = count
         except Exception as exc:
             logger.error("Import ingest failed: %s", exc)
             raise HTTPException(status_code=500, detail=str(exc))
+        try:
+            from apps.shail import capture_index
+            capture_index.upsert_many(namespace, (
+                (r["id"], r["content"], r["metadata"]) for r in records_to_ingest
+            ))
+        except Exception as exc:
+            logger.warning("capture_index import sync failed: %s", exc)
 
     return ImportResponse(imported=imported, skipped=skipped)
 
@@ -1754,6 +1665,12 @@ async def claim_anonymous_memories(
         move_ids = [rid for rid, _ in to_move]
         new_metas = [{**m, "namespace": namespace} for _, m in to_move]
         _get_store().collection.update(ids=move_ids, metadatas=new_metas)
+        try:
+            from apps.shail import capture_index
+            capture_index.invalidate_seed(NS_BROWSER)
+            capture_index.invalidate_seed(namespace)
+        except Exception as exc:
+            logger.warning("capture_index reseed after claim failed: %s", exc)
         return {"claimed": len(move_ids)}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -1885,16 +1802,11 @@ async def get_routes(
     Read-only — the user can browse a cluster's memories, but the
     clustering is built by SHAIL, not the user.
     """
-    store = _get_store()
     namespace = _get_namespace(credentials)
-    if not hasattr(store, "collection"):
-        return {"routes": []}
-
     try:
-        result = store.collection.get(where={"namespace": namespace}, include=["metadatas"], limit=5000)
-        metadatas = [m or {} for m in result.get("metadatas", [])]
+        metadatas = [r["metadata"] for r in _collect_user_capture_records(namespace).values()]
     except Exception as e:
-        logger.warning("get_routes store fetch failed: %s", e)
+        logger.warning("get_routes catalog fetch failed: %s", e)
         return {"routes": []}
 
     buckets: Dict[str, Dict[str, Any]] = {}
@@ -0,0 +1,906 @@
+"""capture_index — materialized catalog + lexical index of browser captures.
+
+Dashboard, altitude, stats and search endpoints used to rebuild the same
+deduplicated capture list on every request: `collection.get(limit=5000)` on
+Chroma, merged with `raw_transcripts.list_recent(limit=5000)`, with
+`normalize_browser_metadata`/`is_browser_memory` applied to every row. This
+module keeps that list materialized in SQLite — one row per logical memory
+id — so endpoints page, filter and aggregate in SQL, and an FTS5 trigram
+index over title / summary / sourceApp / sourceUrl / body so a search query
+only rescores the records containing one of its terms.
+
+Sync points:
+  * `raw_transcripts.save` / `delete` / `mark_embedded` /
+    `redact_if_blueprinted` — every capture path (`/capture`,
+    `/capture/bulk`, patch, delete cascade) writes through raw_transcripts.
+  * `patch_metadata` — pin/tag edits on vector-only memories.
+  * Every writer forwards to `memory_graph` so persisted graph edges follow
+    the catalog; deletes also drop cached `related_memories` lists.
+  * `ensure_seeded(namespace, store)` — existing captures (including
+    vector-only legacy rows) are scanned into the catalog once per
+    namespace. The scan pages through Chroma, so it has no 5,000-row cap.
+
+Scoring stays in `browser_api._lexical_score_capture`; the index only
+narrows the candidate set. `available()` reports FTS5 support — the
+catalog itself works without it.
+"""
+from __future__ import annotations
+
+import base64
+import json
+import logging
+import re
+import sqlite3
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+from urllib.parse import urlparse
+
+from apps.shail.settings import get_settings
+from apps.shail.source_normalization import is_browser_memory, normalize_browser_metadata
+
+logger = logging.getLogger(__name__)
+
+# Matches the slice `_lexical_score_capture` reads, so scoring an indexed
+# body is identical to scoring the full record.
+BODY_CAP_CHARS = 20000
+DEFAULT_CANDIDATES = 200
+_SCAN_PAGE = 5000
+
+_schema_ready_for: Optional[str] = None
+_fts_ready = False
+
+# Columns added after the first release of the table (lexical-only shape).
+_CATALOG_COLUMNS = (
+    ("timestamp", "TEXT NOT NULL DEFAULT ''"),
+    ("event_type", "TEXT NOT NULL DEFAULT ''"),
+    ("source", "TEXT NOT NULL DEFAULT ''"),
+    ("tier", "TEXT NOT NULL DEFAULT ''"),
+    ("domain", "TEXT NOT NULL DEFAULT ''"),
+    ("conversation_id", "TEXT NOT NULL DEFAULT ''"),
+    ("tags", "TEXT NOT NULL DEFAULT '[]'"),
+    ("pinned", "INTEGER NOT NULL DEFAULT 0"),
+    ("content_bytes", "INTEGER NOT NULL DEFAULT 0"),
+    ("embedded", "INTEGER NOT NULL DEFAULT 0"),
+)
+
+
+def _conn():
+    from apps.shail.auth_store import _conn as auth_conn
+    return auth_conn()
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def init_capture_index_schema() -> None:
+    """Create the catalog + FTS tables once per SQLite path. Idempotent."""
+    global _schema_ready_for, _fts_ready
+    path = get_settings().sqlite_path
+    if _schema_ready_for == path:
+        return
+    with _conn() as con:
+        con.executescript("""
+            CREATE TABLE IF NOT EXISTS capture_index (
+                memory_id       TEXT PRIMARY KEY,
+                namespace       TEXT NOT NULL,
+                title           TEXT NOT NULL DEFAULT '',
+                summary         TEXT NOT NULL DEFAULT '',
+                source_app      TEXT NOT NULL DEFAULT '',
+                source_url      TEXT NOT NULL DEFAULT '',
+                body            TEXT NOT NULL DEFAULT '',
+                metadata        TEXT NOT NULL DEFAULT '{}',
+                updated_at      TEXT NOT NULL,
+                timestamp       TEXT NOT NULL DEFAULT '',
+                event_type      TEXT NOT NULL DEFAULT '',
+                source          TEXT NOT NULL DEFAULT '',
+                tier            TEXT NOT NULL DEFAULT '',
+                domain          TEXT NOT NULL DEFAULT '',
+                conversation_id TEXT NOT NULL DEFAULT '',
+                tags            TEXT NOT NULL DEFAULT '[]',
+                pinned          INTEGER NOT NULL DEFAULT 0,
+                content_bytes   INTEGER NOT NULL DEFAULT 0,
+                embedded        INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE TABLE IF NOT EXISTS capture_index_seeded (
+                namespace TEXT PRIMARY KEY,
+                seeded_at TEXT NOT NULL
+            );
+        """)
+        upgraded = False
+        for col, ddl in _CATALOG_COLUMNS:
+            try:
+                con.execute(f"ALTER TABLE capture_index ADD COLUMN {col} {ddl}")
+                upgraded = True
+            except sqlite3.OperationalError:
+                pass  # already exists
+        if upgraded:
+            # Rows written before the catalog columns existed carry defaults;
+            # rebuild every namespace on next read.
+            con.execute("DELETE FROM capture_index_seeded")
+        con.executescript("""
+            DROP INDEX IF EXISTS idx_capture_index_ns;
+            CREATE INDEX IF NOT EXISTS idx_capture_index_ns_ts
+                ON capture_index(namespace, timestamp DESC, memory_id DESC);
+            CREATE INDEX IF NOT EXISTS idx_capture_index_ns_app
+                ON capture_index(namespace, source_app);
+            CREATE INDEX IF NOT EXISTS idx_capture_index_ns_conv
+                ON capture_index(namespace, conversation_id);
+            CREATE INDEX IF NOT EXISTS idx_capture_index_ns_url
+                ON capture_index(namespace, source_url);
+        """)
+        fts = True
+        existing = con.execute(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'capture_index_fts'"
+        ).fetchone()
+        if existing is not None and "trigram" not in (existing[0] or "").lower():
+            # Word-tokenized index from an earlier release: prefix terms miss
+            # the infix hits the scorer credits. Rebuild as trigram.
+            con.executescript("""
+                DROP TRIGGER IF EXISTS capture_index_ai;
+                DROP TRIGGER IF EXISTS capture_index_ad;
+                DROP TRIGGER IF EXISTS capture_index_au;
+                DROP TABLE IF EXISTS capture_index_fts;
+            """)
+            existing = None
+        try:
+            con.executescript("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS capture_index_fts USING fts5(
+                    title, summary, source_app, source_url, body,
+                    content='capture_index', content_rowid='rowid',
+                    tokenize='trigram'
+                );
+                CREATE TRIGGER IF NOT EXISTS capture_index_ai
+                AFTER INSERT ON capture_index BEGIN
+                    INSERT INTO capture_index_fts(rowid, title, summary, source_app, source_url, body)
+                    VALUES (new.rowid, new.title, new.summary, new.source_app, new.source_url, new.body);
+                END;
+                CREATE TRIGGER IF NOT EXISTS capture_index_ad
+                AFTER DELETE ON capture_index BEGIN
+                    INSERT INTO capture_index_fts(capture_index_fts, rowid, title, summary, source_app, source_url, body)
+                    VALUES ('delete', old.rowid, old.title, old.summary, old.source_app, old.source_url, old.body);
+                END;
+                CREATE TRIGGER IF NOT EXISTS capture_index_au
+                AFTER UPDATE ON capture_index BEGIN
+                    INSERT INTO capture_index_fts(capture_index_fts, rowid, title, summary, source_app, source_url, body)
+                    VALUES ('delete', old.rowid, old.title, old.summary, old.source_app, old.source_url, old.body);
+                    INSERT INTO capture_index_fts(rowid, title, summary, source_app, source_url, body)
+                    VALUES (new.rowid, new.title, new.summary, new.source_app, new.source_url, new.body);
+                END;
+            """)
+            if existing is None:
+                con.execute("INSERT INTO capture_index_fts(capture_index_fts) VALUES ('rebuild')")
+        except sqlite3.OperationalError as exc:
+            # FTS5 missing, or SQLite < 3.34 without the trigram tokenizer.
+            fts = False
+            logger.warning("SQLite FTS5 trigram index not available; capture search uses full scan: %s", exc)
+    _fts_ready = fts
+    _schema_ready_for = path
+
+
+def available() -> bool:
+    """Whether lexical `search_candidates` can be served from FTS5."""
+    init_capture_index_schema()
+    return _fts_ready
+
+
+# ── Row shaping ───────────────────────────────────────────────────────────────
+
+def _domain(url: str) -> str:
+    try:
+        return urlparse(url).netloc.replace("www.", "") or url[:30]
+    except Exception:
+        return url[:30]
+
+
+def _parse_tags(raw: Any) -> List[str]:
+    if isinstance(raw, list):
+        return [str(t) for t in raw if t]
+    if isinstance(raw, str) and raw.strip():
+        stripped = raw.strip()
+        if stripped.startswith("["):
+            try:
+                parsed = json.loads(stripped)
+                if isinstance(parsed, list):
+                    return [str(t) for t in parsed if t]
+            except Exception:
+                pass
+        return [t.strip() for t in stripped.split(",") if t.strip()]
+    return []
+
+
+def _display_title(meta: Mapping[str, Any], content: str) -> str:
+    title = str(meta.get("title") or "")
+    if not title:
+        m = re.match(r"^\[(\w+)\]\s+([^\n]+)", content or "")
+        title = m.group(2).strip() if m else ""
+    return title
+
+
+def _display_summary(meta: Mapping[str, Any], content: str) -> str:
+    summary = str(meta.get("summary") or "")
+    if not summary:
+        body_start = (content or "").find("\n\n")
+        body = content[body_start + 2:] if body_start >= 0 else (content or "")
+        summary = body[:400]
+    return summary
+
+
+def _created_at(meta: Mapping[str, Any]) -> str:
+    """ISO time the store recorded for a capture without a `timestamp`."""
+    for key in ("captured_at", "created_at"):
+        if meta.get(key):
+            return str(meta[key])
+    try:
+        ts = float(meta.get("captured_ts") or 0)
+    except (TypeError, ValueError):
+        ts = 0.0
+    return datetime.fromtimestamp(ts, timezone.utc).isoformat() if ts > 0 else ""
+
+
+def _row_for(
+    memory_id: str,
+    namespace: str,
+    content: str,
+    metadata: Mapping[str, Any],
+    embedded: int,
+) -> Optional[tuple]:
+    content = content or ""
+    meta = dict(metadata or {})
+    if not is_browser_memory(meta, content):
+        return None
+    meta = normalize_browser_metadata(meta, content)
+    meta.setdefault("customId", memory_id)
+    meta.setdefault("id", memory_id)
+    if not meta.get("timestamp"):
+        # Legacy rows: fall back to when the capture was stored, never to
+        # now. Unknown stays "" and sorts after every dated row.
+        created = _created_at(meta)
+        if created:
+            meta["timestamp"] = created
+    source_url = str(meta.get("sourceUrl") or "")
+    tags = _parse_tags(meta.get("tags"))
+    return (
+        memory_id,
+        namespace,
+        _display_title(meta, content),
+        _display_summary(meta, content),
+        str(meta.get("sourceApp") or ""),
+        source_url,
+        content[:BODY_CAP_CHARS],
+        json.dumps(meta, default=str),
+        _now(),
+        str(meta.get("timestamp") or ""),
+        str(meta.get("eventType") or ""),
+        str(meta.get("source") or ""),
+        str(meta.get("tier") or ""),
+        _domain(source_url),
+        str(meta.get("conversationId") or meta.get("sessionId") or ""),
+        json.dumps(tags),
+        1 if str(meta.get("pinned", "false")).lower() == "true" else 0,
+        len(content.encode("utf-8")),
+        embedded,
+    )
+
+
+_INSERT_COLS = (
+    "memory_id, namespace, title, summary, source_app, source_url, body, metadata, "
+    "updated_at, timestamp, event_type, source, tier, domain, conversation_id, tags, "
+    "pinned, content_bytes, embedded"
+)
+
+_UPSERT_SQL = f"""
+    INSERT INTO capture_index ({_INSERT_COLS})
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(memory_id) DO UPDATE SET
+        namespace = excluded.namespace,
+        title = excluded.title,
+        summary = excluded.summary,
+        source_app = excluded.source_app,
+        source_url = excluded.source_url,
+        body = excluded.body,
+        metadata = excluded.metadata,
+        updated_at = excluded.updated_at,
+        timestamp = excluded.timestamp,
+        event_type = excluded.event_type,
+        source = excluded.source,
+        tier = excluded.tier,
+        domain = excluded.domain,
+        conversation_id = excluded.conversation_id,
+        tags = excluded.tags,
+        pinned = excluded.pinned,
+        content_bytes = excluded.content_bytes,
+        embedded = {{embedded}}
+"""
+
+# Capture writes keep whatever embed state the row already has; seeding
+# writes the state it observed.
+_UPSERT_KEEP_EMBEDDED = _UPSERT_SQL.format(embedded="capture_index.embedded")
+_UPSERT_SET_EMBEDDED = _UPSERT_SQL.format(embedded="excluded.embedded")
+
+
+# ── Writers ──────────────────────────────────────────────────────────────────
+
+def _graph_refresh(namespace: str, memory_ids: Iterable[str]) -> None:
+    try:
+        from apps.shail import memory_graph
+        memory_graph.refresh_nodes(namespace, memory_ids)
+    except Exception as exc:
+        logger.warning("memory graph refresh failed for %s: %s", namespace, exc)
+
+
+def _drop_derived(memory_id: str) -> None:
+    """Forget graph edges and related-memory lists that mention `memory_id`."""
+    try:
+        from apps.shail import memory_graph
+        memory_graph.drop_node(memory_id)
+    except Exception as exc:
+        logger.warning("memory graph drop failed for %s: %s", memory_id, exc)
+    try:
+        from apps.shail import related_memories
+        related_memories.invalidate(memory_id)
+    except Exception as exc:
+        logger.warning("related memory cache invalidate failed for %s: %s", memory_id, exc)
+
+
+def upsert(
+    memory_id: str,
+    namespace: str,
+    content: str,
+    metadata: Optional[Mapping[str, Any]] = None,
+    *,
+    embedded: Optional[bool] = None,
+) -> None:
+    """Index (or re-index) one logical capture. Non-browser rows are dropped.
+
+    `embedded=None` preserves the stored embed state (new rows start at 0).
+    """
+    if not memory_id:
+        return
+    init_capture_index_schema()
+    row = _row_for(memory_id, namespace, content, metadata or {}, 1 if embedded else 0)
+    with _conn() as con:
+        if row is None:
+            con.execute("DELETE FROM capture_index WHERE memory_id = ?", (memory_id,))
+        else:
+            con.execute(_UPSERT_KEEP_EMBEDDED if embedded is None else _UPSERT_SET_EMBEDDED, row)
+    if row is None:
+        _drop_derived(memory_id)
+    else:
+        _graph_refresh(namespace, [memory_id])
+
+
+def upsert_many(
+    namespace: str,
+    records: Iterable[Tuple[str, str, Mapping[str, Any]]],
+    *,
+    embedded: bool = True,
+) -> int:
+    """Bulk variant of `upsert` — one transaction for `(memory_id, content, metadata)` rows."""
+    init_capture_index_schema()
+    rows = [
+        row for row in (
+            _row_for(memory_id, namespace, content, metadata or {}, 1 if embedded else 0)
+            for memory_id, content, metadata in records if memory_id
+        )
+        if row is not None
+    ]
+    if not rows:
+        return 0
+    with _conn() as con:
+        con.executemany(_UPSERT_SET_EMBEDDED, rows)
+    _graph_refresh(namespace, [row[0] for row in rows])
+    return len(rows)
+
+
+def mark_embedded(memory_id: str, embedded: bool = True) -> None:
+    init_capture_index_schema()
+    with _conn() as con:
+        con.execute(
+            "UPDATE capture_index SET embedded = ? WHERE memory_id = ?",
+            (1 if embedded else 0, memory_id),
+        )
+
+
+def patch_metadata(memory_id: str, updates: Mapping[str, Any]) -> bool:
+    """Merge `updates` (pinned/tags edits) into a catalog row. False if absent."""
+    init_capture_index_schema()
+    with _conn() as con:
+        row = con.execute(
+            "SELECT namespace, metadata FROM capture_index WHERE memory_id = ?", (memory_id,),
+        ).fetchone()
+        if not row:
+            return False
+        try:
+            meta = json.loads(row["metadata"] or "{}")
+        except (json.JSONDecodeError, TypeError):
+            meta = {}
+        meta.update(updates)
+        con.execute(
+            """UPDATE capture_index
+               SET metadata = ?, tags = ?, pinned = ?, updated_at = ?
+               WHERE memory_id = ?""",
+            (
+                json.dumps(meta, default=str),
+                json.dumps(_parse_tags(meta.get("tags"))),
+                1 if str(meta.get("pinned", "false")).lower() == "true" else 0,
+                _now(),
+                memory_id,
+            ),
+        )
+    if "tags" in updates:
+        _graph_refresh(row["namespace"], [memory_id])
+    return True
+
+
+def delete(memory_id: str) -> None:
+    init_capture_index_schema()
+    with _conn() as con:
+        con.execute("DELETE FROM capture_index WHERE memory_id = ?", (memory_id,))
+    _drop_derived(memory_id)
+
+
+# ── Seeding ──────────────────────────────────────────────────────────────────
+
+def is_seeded(namespace: str) -> bool:
+    init_capture_index_schema()
+    with _conn() as con:
+        row = con.execute(
+            "SELECT 1 FROM capture_index_seeded WHERE namespace = ?", (namespace,),
+        ).fetchone()
+    return row is not None
+
+
+def invalidate_seed(namespace: str) -> None:
+    """Drop a namespace's rows so the next `ensure_seeded` rebuilds it.
+
+    Used after bulk moves (anonymous claim) that bypass raw_transcripts.
+    """
+    init_capture_index_schema()
+    with _conn() as con:
+        con.execute("DELETE FROM capture_index WHERE namespace = ?", (namespace,))
+        con.execute("DELETE FROM capture_index_seeded WHERE namespace = ?", (namespace,))
+    try:
+        from apps.shail import memory_graph
+        memory_graph.invalidate(namespace)
+    except Exception as exc:
+        logger.warning("memory graph invalidate failed for %s: %s", namespace, exc)
+
+
+def _logical_record_id(record_id: str, meta: Mapping[str, Any]) -> str:
+    return meta.get("customId") or meta.get("parent_memory_id") or meta.get("id") or record_id
+
+
+def scan_namespace(store, namespace: str) -> Dict[str, Dict[str, Any]]:
+    """Full scan: one row per logical capture from Chroma + raw transcripts.
+
+    Raw transcript rows win over vector chunks because they preserve the full
+    transcript text; vector chunk 0 is the fallback for records that predate
+    raw transcript materialization. Returns
+    `{memory_id: {"content", "metadata", "embedded"}}`.
+    """
+    records: Dict[str, Dict[str, Any]] = {}
+
+    if hasattr(store, "collection"):
+        offset = 0
+        while True:
+            try:
+                result = store.collection.get(
+                    where={"namespace": namespace},
+                    include=["documents", "metadatas"],
+                    limit=_SCAN_PAGE,
+                    offset=offset,
+                )
+            except Exception as exc:
+                logger.warning("capture_index vector scan failed for %s: %s", namespace, exc)
+                break
+            ids = result.get("ids", []) or []
+            for rid, doc, meta in zip(
+                ids,
+                result.get("documents", []) or [],
+                result.get("metadatas", []) or [],
+            ):
+                meta = meta or {}
+                if not is_browser_memory(meta, doc or ""):
+                    continue
+                meta = normalize_browser_metadata(meta, doc or "")
+                logical_id = _logical_record_id(rid, meta)
+                current = records.get(logical_id)
+                chunk_index = int(meta.get("chunk_index", 0) or 0)
+                if current is None or chunk_index == 0:
+                    records[logical_id] = {"content": doc or "", "metadata": meta, "embedded": True}
+            if len(ids) < _SCAN_PAGE:
+                break
+            offset += len(ids)
+
+    try:
+        from apps.shail import raw_transcripts as _rt
+        for raw in _rt.list_recent(namespace=namespace, limit=-1):
+            raw_id = raw.get("memory_id")
+            if not raw_id:
+                continue
+            content = raw.get("content") or ""
+            if raw.get("transcript_deleted_at"):
+                content = ""
+            meta = raw.get("metadata") or {}
+            if not is_browser_memory(meta, content):
+                continue
+            meta = normalize_browser_metadata(meta, content)
+            meta.setdefault("eventType", raw.get("content_type", "page_visit"))
+            if not meta.get("timestamp"):
+                meta["timestamp"] = raw.get("captured_at") or ""
+            embedded = bool(raw.get("embedded")) or raw_id in records
+            records[raw_id] = {"content": content, "metadata": meta, "embedded": embedded}
+    except Exception as exc:
+        logger.warning("capture_index raw transcript scan failed for %s: %s", namespace, exc)
+
+    return records
+
+
+def ensure_seeded(namespace: str, store) -> None:
+    """Scan `namespace` into the catalog once; later writes keep it current."""
+    if is_seeded(namespace):
+        return
+    records = scan_namespace(store, namespace)
+    for embedded in (True, False):
+        upsert_many(
+            namespace,
+            ((mid, r["content"], r["metadata"]) for mid, r in records.items() if r["embedded"] is embedded),
+            embedded=embedded,
+        )
+    with _conn() as con:
+        con.execute(
+            "INSERT OR REPLACE INTO capture_index_seeded(namespace, seeded_at) VALUES (?, ?)",
+            (namespace, _now()),
+        )
+
+
+# ── Readers ──────────────────────────────────────────────────────────────────
+
+def _meta_from_row(row) -> Dict[str, Any]:
+    try:
+        meta = json.loads(row["metadata"] or "{}")
+    except (json.JSONDecodeError, TypeError):
+        meta = {}
+    if not row["embedded"]:
+        meta.setdefault("state", "indexing")
+    return meta
+
+
+def _filters(
+    namespace: str,
+    *,
+    source_app: Optional[str] = None,
+    after: Optional[str] = None,
+    before: Optional[str] = None,
+    source: Optional[str] = None,
+    event_type: Optional[str] = None,
+    tier: Optional[str] = None,
+    tag: Optional[str] = None,
+    pinned: Optional[bool] = None,
+    q: Optional[str] = None,
+    conversation_id: Optional[str] = None,
+    source_url: Optional[str] = None,
+) -> Tuple[str, list]:
+    clauses = ["namespace = ?"]
+    args: list = [namespace]
+    if source_app:
+        clauses.append("source_app = ?")
+        args.append(source_app)
+    if source:
+        # Matches both the new `source` field and the legacy `sourceApp`.
+        values = list(dict.fromkeys((source, source.lower())))
+        marks = ", ".join("?" * len(values))
+        clauses.append(f"(source IN ({marks}) OR source_app IN ({marks}))")
+        args.extend(values + values)
+    if conversation_id:
+        clauses.append("conversation_id = ?")
+        args.append(conversation_id)
+    if source_url:
+        clauses.append("source_url = ?")
+        args.append(source_url)
+    if event_type:
+        clauses.append("event_type = ?")
+        args.append(event_type)
+    if tier:
+        clauses.append("tier = ?")
+        args.append(tier)
+    if tag:
+        clauses.append("EXISTS (SELECT 1 FROM json_each(capture_index.tags) WHERE value = ?)")
+        args.append(tag)
+    if pinned is not None:
+        clauses.append("pinned = ?")
+        args.append(1 if pinned else 0)
+    if q:
+        needle = q.lower()
+        clauses.append("(instr(lower(title), ?) > 0 OR instr(lower(summary), ?) > 0)")
+        args.extend([needle, needle])
+    if after:
+        clauses.append("timestamp >= ?")
+        args.append(after)
+    if before:
+        clauses.append("timestamp < ? AND timestamp != ''")
+        args.append(before)
+    return " AND ".join(clauses), args
+
+
+def encode_cursor(timestamp: str, memory_id: str) -> str:
+    """Opaque keyset cursor for the `(timestamp DESC, memory_id DESC)` order."""
+    raw = json.dumps([timestamp, memory_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Optional[Tuple[str, str]]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        ts, memory_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except Exception:
+        return None
+    if not isinstance(ts, str) or not isinstance(memory_id, str):
+        return None
+    return ts, memory_id
+
+
+def _select_records(
+    namespace: str,
+    limit: Optional[int],
+    offset: int,
+    cursor: Optional[Tuple[str, str]],
+    filters: Mapping[str, Any],
+) -> list:
+    init_capture_index_schema()
+    where, args = _filters(namespace, **filters)
+    if cursor is not None:
+        where += " AND (timestamp < ? OR (timestamp = ? AND memory_id < ?))"
+        args.extend([cursor[0], cursor[0], cursor[1]])
+    sql = (
+        f"SELECT memory_id, timestamp, body, metadata, embedded FROM capture_index WHERE {where} "
+        "ORDER BY timestamp DESC, memory_id DESC"
+    )
+    if limit is not None:
+        sql += " LIMIT ? OFFSET ?"
+        args.extend([int(limit), max(0, int(offset))])
+    with _conn() as con:
+        return con.execute(sql, args).fetchall()
+
+
+def list_records(
+    namespace: str,
+    *,
+    limit: Optional[int] = None,
+    offset: int = 0,
+    cursor: Optional[Tuple[str, str]] = None,
+    **filters: Any,
+) -> List[Tuple[str, str, Dict[str, Any]]]:
+    """`(memory_id, body, metadata)` rows, newest first; undated rows last.
+
+    `cursor` is a decoded `(timestamp, memory_id)` keyset position: rows
+    strictly after it in sort order are returned, so deep pages walk the
+    `idx_capture_index_ns_ts` index instead of skipping `offset` rows.
+    `filters` are the keyword arguments of `_filters`.
+
+    `body` is capped at `BODY_CAP_CHARS`; callers that need the full
+    transcript (export, detail view) read raw_transcripts / Chroma.
+    """
+    rows = _select_records(namespace, limit, offset, cursor, filters)
+    return [(row["memory_id"], row["body"] or "", _meta_from_row(row)) for row in rows]
+
+
+def list_page(
+    namespace: str,
+    *,
+    limit: int,
+    offset: int = 0,
+    cursor: Optional[Tuple[str, str]] = None,
+    **filters: Any,
+) -> Tuple[List[Tuple[str, str, Dict[str, Any]]], Optional[str]]:
+    """One `list_records` page plus the encoded cursor for the next, or None.
+
+    The cursor carries the stored `timestamp` column of the page's last row
+    ("" for undated rows), not a display value, so paging through undated
+    rows continues past them instead of restarting from the newest.
+    """
+    rows = _select_records(namespace, limit + 1, offset, cursor, filters)
+    page = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit and page:
+        next_cursor = encode_cursor(page[-1]["timestamp"] or "", page[-1]["memory_id"])
+    return [(row["memory_id"], row["body"] or "", _meta_from_row(row)) for row in page], next_cursor
+
+
+def get_records(namespace: str, memory_ids: List[str]) -> List[Tuple[str, str, Dict[str, Any]]]:
+    """Catalog rows for `memory_ids`, in the order given; unknown ids are skipped."""
+    ids = list(dict.fromkeys(m for m in memory_ids if m))
+    if not ids:
+        return []
+    init_capture_index_schema()
+    with _conn() as con:
+        rows = con.execute(
+            f"""SELECT memory_id, body, metadata, embedded FROM capture_index
+                WHERE namespace = ? AND memory_id IN ({', '.join('?' * len(ids))})""",
+            [namespace, *ids],
+        ).fetchall()
+    by_id = {row["memory_id"]: (row["memory_id"], row["body"] or "", _meta_from_row(row)) for row in rows}
+    return [by_id[m] for m in ids if m in by_id]
+
+
+def nearest_in_time(
+    namespace: str,
+    timestamp: str,
+    *,
+    source_app: Optional[str] = None,
+    exclude: Optional[str] = None,
+    limit: int = 10,
+) -> List[Tuple[str, str, Dict[str, Any]]]:
+    """Rows closest to `timestamp` (either side), nearest first; undated rows last."""
+    init_capture_index_schema()
+    where, args = _filters(namespace, source_app=source_app)
+    if exclude:
+        where += " AND memory_id != ?"
+        args.append(exclude)
+    sql = (
+        f"SELECT memory_id, body, metadata, embedded FROM capture_index WHERE {where} "
+        "ORDER BY timestamp = '', abs(julianday(timestamp) - julianday(?)), memory_id LIMIT ?"
+    )
+    with _conn() as con:
+        rows = con.execute(sql, [*args, timestamp, int(limit)]).fetchall()
+    return [(row["memory_id"], row["body"] or "", _meta_from_row(row)) for row in rows]
+
+
+def count(namespace: str, **filters: Any) -> int:
+    init_capture_index_schema()
+    where, args = _filters(namespace, **filters)
+    with _conn() as con:
+        return int(con.execute(f"SELECT COUNT(*) FROM capture_index WHERE {where}", args).fetchone()[0])
+
+
+def summary_stats(namespace: str, *, week_ago: str, month_ago: str) -> Dict[str, Any]:
+    """Aggregates shared by `/browser/stats` and `/api/v2/stats`."""
+    init_capture_index_schema()
+    with _conn() as con:
+        row = con.execute(
+            """SELECT COUNT(*) AS total,
+                      SUM(timestamp >= ?) AS this_week,
+                      SUM(timestamp >= ?) AS this_month,
+                      SUM(pinned) AS pinned,
+                      MAX(NULLIF(timestamp, '')) AS latest_ts
+               FROM capture_index WHERE namespace = ?""",
+            (week_ago, month_ago, namespace),
+        ).fetchone()
+        by_source = {
+            r["source_app"] or "web": int(r["n"])
+            for r in con.execute(
+                """SELECT source_app, COUNT(*) AS n FROM capture_index
+                   WHERE namespace = ? GROUP BY source_app""",
+                (namespace,),
+            ).fetchall()
+        }
+        by_day = {
+            r["day"]: int(r["n"])
+            for r in con.execute(
+                """SELECT substr(timestamp, 1, 10) AS day, COUNT(*) AS n FROM capture_index
+                   WHERE namespace = ? AND timestamp >= ? GROUP BY day""",
+                (namespace, month_ago),
+            ).fetchall()
+        }
+        top_domains = [
+            {"domain": r["domain"], "count": int(r["n"])}
+            for r in con.execute(
+                """SELECT domain, COUNT(*) AS n FROM capture_index
+                   WHERE namespace = ? AND domain != ''
+                   GROUP BY domain ORDER BY n DESC, domain LIMIT 5""",
+                (namespace,),
+            ).fetchall()
+        ]
+    return {
+        "total": int(row["total"] or 0),
+        "this_week": int(row["this_week"] or 0),
+        "this_month": int(row["this_month"] or 0),
+        "pinned": int(row["pinned"] or 0),
+        "latest_ts": row["latest_ts"],
+        "by_source": by_source,
+        "by_day": by_day,
+        "top_domains": top_domains,
+    }
+
+
+def volume_since(namespace: str, since: str) -> List[Tuple[str, int]]:
+    """`(timestamp, content_bytes)` for captures at or after `since` (ISO).
+
+    Undated rows ("") never match, so legacy captures don't inflate recent
+    volume.
+    """
+    init_capture_index_schema()
+    with _conn() as con:
+        rows = con.execute(
+            """SELECT timestamp, content_bytes FROM capture_index
+               WHERE namespace = ? AND timestamp >= ?""",
+            (namespace, since),
+        ).fetchall()
+    return [(r["timestamp"], int(r["content_bytes"] or 0)) for r in rows]
+
+
+# ── Lexical search ───────────────────────────────────────────────────────────
+
+def _search_terms(query: str) -> List[str]:
+    """Query terms as `browser_api._query_terms` splits them; the stripped
+    query itself when it has none (e.g. a single character)."""
+    terms = [t for t in re.findall(r"[a-z0-9][a-z0-9_-]*", (query or "").lower()) if len(t) > 1]
+    if not terms and (query or "").strip():
+        terms = [query.strip().lower()]
+    return list(dict.fromkeys(terms))
+
+
+def _fts_match(terms: List[str]) -> str:
+    """OR of quoted substring terms the trigram index can answer.
+
+    The scorer credits a term anywhere in the normalized text (`t in
+    title_norm`, so "port" scores on "support"), and the trigram index
+    matches substrings the same way. Trigrams need three characters, so
+    shorter terms are left to `_SHORT_TERM_SQL`.
+    """
+    return " OR ".join('"{}"'.format(t.replace('"', '""')) for t in terms if len(t) >= 3)
+
+
+_SHORT_TERM_SQL = (
+    "(instr(lower(title), ?) > 0 OR instr(lower(summary), ?) > 0 "
+    "OR instr(lower(source_app), ?) > 0 OR instr(lower(source_url), ?) > 0 "
+    "OR instr(lower(body), ?) > 0)"
+)
+
+
+def search_candidates(
+    namespace: str,
+    query: str,
+    limit: int = DEFAULT_CANDIDATES,
+) -> Optional[Dict[str, Dict[str, Any]]]:
+    """Records matching a query term, `{memory_id: {"content", "metadata"}}`.
+
+    Terms of three or more characters go through the trigram index, top
+    `limit` by BM25; shorter ones match by substring on the catalog
+    columns, newest `limit` first. `limit` over-fetches what callers
+    keep, and they rescore with `_lexical_score_capture`, so a very common
+    term costs `limit` rows rather than the corpus.
+
+    Returns None only when the index cannot answer (no FTS5 trigram
+    support, or the query fails) so the caller falls back to the scan.
+    """
+    if not available():
+        return None
+    terms = _search_terms(query)
+    match = _fts_match(terms)
+    short = [t for t in terms if len(t) < 3]
+    rows: list = []
+    with _conn() as con:
+        try:
+            if match:
+                rows.extend(con.execute(
+                    """
+                    SELECT ci.memory_id, ci.body, ci.metadata, ci.embedded
+                    FROM capture_index_fts
+                    JOIN capture_index AS ci ON ci.rowid = capture_index_fts.rowid
+                    WHERE capture_index_fts MATCH ? AND ci.namespace = ?
+                    ORDER BY bm25(capture_index_fts, 10.0, 4.0, 2.0, 2.0, 1.0)
+                    LIMIT ?
+                    """,
+                    (match, namespace, int(limit)),
+                ).fetchall())
+            if short:
+                where = " OR ".join([_SHORT_TERM_SQL] * len(short))
+                rows.extend(con.execute(
+                    f"""SELECT memory_id, body, metadata, embedded FROM capture_index
+                        WHERE namespace = ? AND ({where})
+                        ORDER BY timestamp DESC, memory_id DESC LIMIT ?""",
+                    [namespace, *(t for t in short for _ in range(5)), int(limit)],
+                ).fetchall())
+        except sqlite3.OperationalError as exc:
+            logger.warning("capture_index query failed for %r: %s", query, exc)
+            return None
+    picked: Dict[str, Any] = {}
+    for row in rows:
+        picked.setdefault(row["memory_id"], row)
+    rows = list(picked.values())
+    return {
+        row["memory_id"]: {"content": row["body"] or "", "metadata": _meta_from_row(row)}
+        for row in rows
+    }
@@ -812,14 +812,21 @@ def _extract_pdf_text(payload: dict) -> tuple[str, dict]:
     pdf_path = payload.get("pdf_path")
     if pdf_path and os.path.exists(pdf_path):
         try:
-            from pypdf import PdfReader  # type: ignore
+            from shail.memory.rag import iter_pdf_pages
 
-            reader = PdfReader(pdf_path)
+            # Pages are parsed lazily from an mmap; stop at the ingest budget.
+            max_chars = _settings().rag_ingest_max_chars
             page_blocks = []
-            for idx, page in enumerate(reader.pages, start=1):
-                text = (page.extract_text() or "").strip()
+            total = 0
+            pages = iter_pdf_pages(pdf_path)
+            for idx, page_text in enumerate(pages, start=1):
+                text = page_text.strip()
                 if text:
                     page_blocks.append({"page_number": idx, "text": text})
+                    total += len(text)
+                if max_chars and total >= max_chars:
+                    pages.close()
+                    break
             normalized_text = "\n\n".join(block["text"] for block in page_blocks)
             return normalized_text, {"page_blocks": page_blocks}
         except Exception:
@@ -837,7 +844,7 @@ async def create_materialization(
     extractor_bundle_version: Optional[str] = None,
     options: Optional[dict] = None,
 ) -> Optional[dict]:
-    from apps.shail.blueprints import extract_blueprint
+    from apps.shail.blueprints import extract_sized_blueprint
 
     init_capture_store()
     artifact = load_artifact(artifact_id)
@@ -867,10 +874,11 @@ async def create_materialization(
     if artifact["artifact_kind"] in {"pdf_document", "pdf_stub"}:
         normalized_text, pdf_struct = _extract_pdf_text(artifact.get("payload") or {})
         structured.update(pdf_struct)
-    blueprint = await extract_blueprint(
+    blueprint = await extract_sized_blueprint(
         content=normalized_text,
         content_type=artifact["event_type"],
         user_id=user_id,
+        memory_id=memory_id,
     )
     if blueprint:
         structured["blueprint"] = blueprint
@@ -59,7 +59,7 @@ from apps.shail.blueprints import (
     format_blueprint_for_context, get_blueprints_for_ids,
 )
 from apps.shail.capture_log import write_event
-from apps.shail import chat_store
+from apps.shail import chat_store, telemetry
 from apps.shail import session_backfill
 from apps.shail.llm import call_llm, get_user_llm_config, stream_llm
 from apps.shail.mcp import PROVIDERS, get_provider as get_mcp_provider
@@ -75,6 +75,7 @@ from shail.memory.embeddings import embed_query as emb_q
 # Sprint 3 PR3 — hybrid retrieval. Imported lazily to keep cold-start cost
 # tied to actual flag activation; settings flag default OFF preserves legacy.
 from shail.memory.hybrid import hybrid_search as _hybrid_search
+from apps.shail.retrieval.query_context import QueryContext
 from apps.shail.settings import get_settings
 
 logger = logging.getLogger(__name__)
@@ -164,6 +165,78 @@ DECAY_HALF_LIFE_DAYS = 30  # exponential decay half-life for memory recall ranki
 WEB_MAX_RESULTS = 3
 WEB_TIMEOUT     = 3.0
 PAST_CHAT_K     = 3
+# Share of the chat retrieval budget each source may use. External sources
+# are cut first, so once local retrieval is done a slow web search or MCP
+# provider can't hold the answer for the whole budget. Unlisted: 1.0.
+# With the default 800 ms budget that is 480 ms, well under WEB_TIMEOUT and
+# the 2 s MCP provider timeout, so a cold web search usually misses the
+# answer it was started for; see DETACH_ON_TIMEOUT.
+SOURCE_BUDGET_SHARE = {"web": 0.6, "mcp": 0.6}
+# Sources that are left running when cut instead of cancelled. They are
+# bounded by their own timeouts, and finishing fills the web search cache so
+# the next ask on the same query gets the results at cache-hit speed.
+DETACH_ON_TIMEOUT = frozenset({"web", "mcp"})
+_detached_tasks: set[asyncio.Task] = set()
+
+
+def _detach(task: asyncio.Task, name: str) -> None:
+    """Keep a cut task alive until it finishes on its own."""
+    def _done(t: asyncio.Task) -> None:
+        _detached_tasks.discard(t)
+        if not t.cancelled() and t.exception() is not None:
+            logger.debug("detached retrieval source %s failed: %s", name, t.exception())
+
+    _detached_tasks.add(task)
+    task.add_done_callback(_done)
+
+
+async def _await_within_budget(
+    tasks: dict[str, asyncio.Task], budget_s: float, qctx: QueryContext,
+) -> dict:
+    """Wait for retrieval tasks until each one's deadline
+    (`budget_s * SOURCE_BUDGET_SHARE`); cancel whatever is still running,
+    except `DETACH_ON_TIMEOUT` sources, which finish in the background.
+
+    Returns source -> result for the sources that finished. Late sources are
+    recorded in `qctx.timed_out` and telemetry; failures are logged. A
+    non-positive budget waits for everything.
+    """
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    names = {task: name for name, task in tasks.items()}
+    deadline = {
+        task: start + budget_s * SOURCE_BUDGET_SHARE.get(name, 1.0) if budget_s > 0 else math.inf
+        for task, name in names.items()
+    }
+    results: dict = {}
+    pending = set(names)
+    while pending:
+        now = loop.time()
+        for task in [t for t in pending if deadline[t] <= now]:
+            pending.discard(task)
+            if task.done():
+                continue  # finished on the boundary; collected below
+            if names[task] in DETACH_ON_TIMEOUT:
+                _detach(task, names[task])
+            else:
+                task.cancel()
+            qctx.timed_out.append(names[task])
+            telemetry.incr(telemetry.RETRIEVAL_SOURCE_TIMEOUT, source=names[task])
+        if not pending:
+            break
+        timeout = min(deadline[t] for t in pending) - now
+        _, pending = await asyncio.wait(
+            pending, timeout=None if math.isinf(timeout) else timeout,
+            return_when=asyncio.FIRST_COMPLETED,
+        )
+    for task, name in names.items():
+        if not task.done() or task.cancelled():
+            continue
+        if task.exception() is not None:
+            logger.warning("retrieval source %s failed: %s", name, task.exception())
+            continue
+        results[name] = task.result()
+    return results
 
 
 def _apply_time_decay(
@@ -224,7 +297,7 @@ def _browser_lexical_memory_hits(query: str, namespace: str, *, k: int = RAG_K)
     ranked: dict[str, tuple[str, float, dict]] = {}
     for ns in namespaces:
         try:
-            records = _browser._collect_user_capture_records(ns)
+            records = _browser._lexical_candidates(ns, query)
         except Exception as exc:
             logger.debug("browser lexical chat lookup skipped for %s: %s", ns, exc)
             continue
@@ -326,9 +399,15 @@ def _index_past_chat_turn(
         logger.warning("past-chat index failed (session=%s): %s", session_id, e)
 
 
-def _search_past_chats(user_id: str, query: str, k: int = PAST_CHAT_K) -> list:
+def _search_past_chats(
+    user_id: str, query: str, k: int = PAST_CHAT_K,
+    query_embedding: Optional[List[float]] = None,
+) -> list:
     """Hybrid past-chat search. Returns (content, score, meta) tuples.
 
+    `query_embedding` is the turn's shared embedding when the caller has
+    one; otherwise the query is embedded here.
+
     Strategy:
       1. Vector query over `chat_{user_id}` namespace.
       2. If embedder is unavailable (zero vector probe) OR vector returns no
@@ -344,7 +423,7 @@ def _search_past_chats(user_id: str, query: str, k: int = PAST_CHAT_K) -> list:
     embedder_failed = False
     try:
         store = _get_store()
-        emb = emb_q(query)
+        emb = query_embedding if query_embedding is not None else emb_q(query)
         if is_zero_vector(emb):
             embedder_failed = True
         else:
@@ -585,17 +664,32 @@ async def _fetch_mcp_sources(user_id: str, query: str) -> list[MCPCitation]:
 async def _build_context(
     user_id: str, query: str, *, is_first_in_session: bool,
     task_id: Optional[str] = None,
+    query_context: Optional[QueryContext] = None,
 ) -> tuple[str, list[MemoryCitation], list[PastChatCitation], list[WebSourceOut], list[MCPCitation], list[LocalFileCitation]]:
     """Run all retrieval sources in parallel; combine into a single context
     block plus structured citation lists.
 
     `task_id` (Sprint 2): if provided, retrieved memories are registered for
     usefulness feedback after the task completes.
+
+    `query_context`: the turn's `QueryContext` — every vector source shares
+    its single query embedding, and per-source timings land in its
+    `timings`. A private one is used when omitted.
     """
     namespace = f"user_{user_id}"
+    qctx = query_context or QueryContext(query)
+
+    async def _timed(source: str, coro):
+        async with qctx.timed(source):
+            return await coro
+
+    # Progressive fallback: the lexical memory hits are kept here as soon as
+    # they exist, so a memories source cut by the budget still contributes.
+    partial: dict[str, list] = {}
 
     async def _rag() -> list:
         lexical_hits = await asyncio.to_thread(_browser_lexical_memory_hits, query, namespace, k=RAG_K)
+        partial["memories"] = lexical_hits
         # Sprint 3 PR3 — flag-gated hybrid retrieval. Default OFF preserves
         # legacy semantic-only path bit-for-bit. Hybrid returns the same
         # `(content, score, metadata)` tuple shape so the rest of
@@ -606,14 +700,17 @@ async def _build_context(
                 hits = await _hybrid_search(
                     query, namespace=namespace,
                     k=RAG_K, overfetch_k=RAG_K_OVERFETCH,
-                    task_id=task_id,
+                    task_id=task_id, query_context=qctx,
                 )
                 semantic_hits = [h for h in hits if (h[2] or {}).get("source") != "local_file"]
             except Exception as e:
                 logger.warning("hybrid_search failed; falling back to legacy rag: %s", e)
         if not semantic_hits:
             try:
-                raw = rag_search(query, k=RAG_K_OVERFETCH, namespace=namespace)
+                vec = await qctx.embedding()
+                raw = await asyncio.to_thread(
+                    rag_search, query, k=RAG_K_OVERFETCH, namespace=namespace, query_embedding=vec,
+                )
                 raw = [h for h in raw if (h[2] or {}).get("source") != "local_file"]
                 semantic_hits = _apply_time_decay(raw, k=RAG_K)
             except Exception as e:
@@ -630,7 +727,12 @@ async def _build_context(
     async def _past() -> list:
         if not references_prior_chat(query, is_first_in_session=is_first_in_session):
             return []
-        return await asyncio.to_thread(_search_past_chats, user_id, query, PAST_CHAT_K)
+        try:
+            vec = await qctx.embedding()
+        except Exception as e:
+            logger.warning("query embedding failed for past chats: %s", e)
+            vec = []  # zero-length → keyword fallback in _search_past_chats
+        return await asyncio.to_thread(_search_past_chats, user_id, query, PAST_CHAT_K, vec)
 
     async def _mcp_rag() -> list[MCPCitation]:
         """Query the vector-indexed MCP namespaces for semantically relevant
@@ -640,30 +742,31 @@ async def _build_context(
         conns = list_mcp_connections(user_id)
         if not conns:
             return []
+        namespaces = {c["provider"]: f"mcp_{user_id}_{c['provider']}" for c in conns}
+        try:
+            # One shared embedding, one batched store call for every provider.
+            by_ns = await qctx.search_namespaces(list(namespaces.values()), k=2)
+        except Exception as _e:
+            logger.debug("mcp_rag failed for %s: %s", user_id, _e)
+            return []
         cites: list[MCPCitation] = []
-        for c in conns:
-            pname = c["provider"]
-            ns = f"mcp_{user_id}_{pname}"
-            try:
-                hits = await asyncio.to_thread(rag_search, query, k=2, namespace=ns)
-                for content, score, meta in hits:
-                    if float(score or 0.0) < 0.3:
-                        continue  # skip low-relevance indexed docs
-                    cites.append(MCPCitation(
-                        provider=pname,
-                        id=meta.get("provider_id") or meta.get("id") or "",
-                        title=meta.get("title") or "(untitled)",
-                        snippet=(content or "")[:200],
-                        url=meta.get("sourceUrl"),
-                    ))
-            except Exception as _e:
-                logger.debug("mcp_rag failed for %s/%s: %s", user_id, pname, _e)
+        for pname, ns in namespaces.items():
+            for content, score, meta in by_ns.get(ns, []):
+                if float(score or 0.0) < 0.3:
+                    continue  # skip low-relevance indexed docs
+                cites.append(MCPCitation(
+                    provider=pname,
+                    id=meta.get("provider_id") or meta.get("id") or "",
+                    title=meta.get("title") or "(untitled)",
+                    snippet=(content or "")[:200],
+                    url=meta.get("sourceUrl"),
+                ))
         return cites
 
-    rag_task     = asyncio.create_task(_rag())
-    past_task    = asyncio.create_task(_past())
-    mcp_task     = asyncio.create_task(_fetch_mcp_sources(user_id, query))
-    mcp_rag_task = asyncio.create_task(_mcp_rag())
+    rag_task     = asyncio.create_task(_timed("memories", _rag()))
+    past_task    = asyncio.create_task(_timed("past_chats", _past()))
+    mcp_task     = asyncio.create_task(_timed("mcp", _fetch_mcp_sources(user_id, query)))
+    mcp_rag_task = asyncio.create_task(_timed("mcp_index", _mcp_rag()))
     local_file_task = None
     _settings_lf = get_settings()
     if _settings_lf.shail_local_files_in_chat:
@@ -689,24 +792,34 @@ async def _build_context(
             except Exception as exc:
                 logger.debug("local file retrieval skipped: %s", exc)
                 return []
-        local_file_task = asyncio.create_task(_local_files())
+        local_file_task = asyncio.create_task(_timed("local_files", _local_files()))
     web_task = (
-        asyncio.create_task(web_search(query, max_results=WEB_MAX_RESULTS, timeout=WEB_TIMEOUT))
+        asyncio.create_task(_timed("web", web_search(query, max_results=WEB_MAX_RESULTS, timeout=WEB_TIMEOUT)))
         if needs_web_search(query) else None
     )
 
-    rag_hits     = await rag_task
-    past_hits    = await past_task
-    mcp_cites    = await mcp_task
-    mcp_rag_hits = await mcp_rag_task
-    local_files  = await local_file_task if local_file_task else []
+    tasks = {"memories": rag_task, "past_chats": past_task, "mcp": mcp_task, "mcp_index": mcp_rag_task}
+    if local_file_task:
+        tasks["local_files"] = local_file_task
+    if web_task:
+        tasks["web"] = web_task
+    # Deadline-bounded: time-to-first-token no longer waits on the slowest source.
+    done = await _await_within_budget(tasks, get_settings().chat_retrieval_budget_ms / 1000.0, qctx)
+    for source, ms in qctx.timings.items():
+        telemetry.observe(telemetry.RETRIEVAL_SOURCE_MS, ms, source=source)
+
+    rag_hits     = done.get("memories", partial.get("memories", []))
+    past_hits    = done.get("past_chats", [])
+    mcp_cites    = done.get("mcp", [])
+    mcp_rag_hits = done.get("mcp_index", [])
+    local_files  = done.get("local_files", [])
     # Merge live fetch + indexed vector results; deduplicate by (provider, id)
     seen_mcp = {(c.provider, c.id) for c in mcp_cites}
     for c in mcp_rag_hits:
         if (c.provider, c.id) not in seen_mcp:
             mcp_cites.append(c)
             seen_mcp.add((c.provider, c.id))
-    web_results  = await web_task if web_task else []
+    web_results  = done.get("web", [])
 
     parts: list[str] = []
     citations: list[MemoryCitation] = []
@@ -1032,7 +1145,11 @@ async def backfill_stats_endpoint(
 ) -> dict:
     """Sprint 7: aggregate backfill state across all of user's sessions."""
     user_id = _require_user(credentials)
-    return session_backfill.get_backfill_stats(user_id)
+    from apps.shail.importers import list_import_jobs
+    stats = session_backfill.get_backfill_stats(user_id)
+    # Chat-export imports feed backfill; surface their progress alongside.
+    stats["imports"] = list_import_jobs(user_id)
+    return stats
 
 
 # ── Phase C Sprint 4: external chat imports ─────────────────────────────────
@@ -1050,31 +1167,48 @@ async def import_chats_endpoint(
     `source` ∈ {chatgpt, claude, cursor, gemini, grok, perplexity}.
     The uploaded file is parsed into (user, assistant) pairs, sessions+messages
     are created, then a backfill job is enqueued per session (unless
-    `auto_backfill=false`).
+    `auto_backfill=false`). Large exports stream one conversation at a time;
+    progress is visible under `imports` in GET /backfill/stats.
     """
     user_id = _require_user(credentials)
-    from apps.shail.importers import PARSERS, import_conversation_payload
+    from apps.shail.importers import (
+        PARSERS, import_conversation_payload, iter_conversations,
+        start_import_job, update_import_job,
+    )
 
     if source not in PARSERS:
         raise HTTPException(
             status_code=400,
             detail=f"Unsupported source '{source}'. Supported: {sorted(PARSERS)}",
         )
-    raw = await file.read()
-    if not raw:
+    # Starlette spools the upload to a temp file; parse straight from it
+    # rather than reading a possibly multi-GB export into memory.
+    upload = file.file
+    upload.seek(0, 2)
+    total_bytes = upload.tell()
+    upload.seek(0)
+    if not total_bytes:
         raise HTTPException(status_code=400, detail="Empty file")
 
+    job_id = start_import_job(user_id, source, total_bytes)
+
+    def _progress(partial) -> None:
+        update_import_job(job_id, partial, bytes_read=upload.tell())
+
     try:
-        conversations = PARSERS[source](raw)
+        result = await asyncio.to_thread(
+            import_conversation_payload,
+            user_id=user_id, source=source,
+            conversations=iter_conversations(source, upload),
+            progress=_progress,
+        )
     except Exception as exc:
+        update_import_job(job_id, state="failed")
         raise HTTPException(
             status_code=400,
             detail=f"Failed to parse {source} export: {type(exc).__name__}: {exc}",
         )
-
-    result = import_conversation_payload(
-        user_id=user_id, source=source, conversations=conversations,
-    )
+    update_import_job(job_id, result, state="done", bytes_read=total_bytes)
 
     if auto_backfill and result.session_ids:
         async def _enqueue() -> None:
@@ -1087,7 +1221,7 @@ async def import_chats_endpoint(
                     logger.exception("post-import backfill failed sid=%s", sid)
         background_tasks.add_task(_enqueue)
 
-    return result.to_dict()
+    return {**result.to_dict(), "job_id": job_id}
 
 
 # ── Local file/folder ingestion ─────────────────────────────────────────────
@@ -1480,10 +1614,12 @@ async def chat(
 
     # Build the unified RAG context — pass session_id as task_id so retrieved
     # memories get registered for post-response usefulness feedback.
-    context, citations, past_chats, web_sources, mcp_sources, local_files = await _build_context(
-        user_id, req.message, is_first_in_session=is_first,
-        task_id=session_id,
-    )
+    qctx = QueryContext(req.message)
+    async with qctx.timed("total"):
+        context, citations, past_chats, web_sources, mcp_sources, local_files = await _build_context(
+            user_id, req.message, is_first_in_session=is_first,
+            task_id=session_id, query_context=qctx,
+        )
 
     # Reload prior thread for the LLM
     prior = chat_store.get_messages(session_id, user_id)
@@ -1543,6 +1679,9 @@ async def chat(
         yield _sse({"type": "source_status", "source": "web",        "count": len(web_sources)})
         yield _sse({"type": "source_status", "source": "mcp",        "count": len(mcp_sources)})
         yield _sse({"type": "source_status", "source": "local_files","count": len(local_files)})
+        # Retrieval time per source (ms) — where time-to-first-token went.
+        yield _sse({"type": "source_timing", "timings_ms": dict(qctx.timings),
+                    "timed_out": list(qctx.timed_out)})
         if citations:
             yield _sse({"type": "memories", "items": [c.model_dump() for c in citations]})
         if past_chats:
@@ -14,8 +14,8 @@ from __future__ import annotations
 import json
 import sqlite3
 import uuid
-from datetime import datetime, timezone
-from typing import Any, Optional
+from datetime import datetime, timedelta, timezone
+from typing import Any, Iterable, Optional
 
 from apps.shail.auth_store import _conn
 
@@ -184,6 +184,45 @@ def append_message(
     }
 
 
+def append_messages(
+    session_id: str,
+    user_id: str,
+    messages: Iterable[tuple[str, str]],
+    *,
+    provider: Optional[str] = None,
+    model: Optional[str] = None,
+) -> int:
+    """Bulk-append (role, content) messages in one transaction. Returns count.
+
+    For importers: one executemany plus a single updated_at bump instead of a
+    transaction per message. Timestamps step by 1µs so `created_at` ordering
+    matches input order.
+    """
+    base = datetime.now(timezone.utc)
+    rows = []
+    for i, (role, content) in enumerate(messages):
+        if role not in ("user", "assistant"):
+            raise ValueError(f"invalid role: {role}")
+        rows.append((
+            str(uuid.uuid4()), session_id, user_id, role, content, None,
+            provider, model, (base + timedelta(microseconds=i)).isoformat(),
+        ))
+    if not rows:
+        return 0
+    with _conn() as con:
+        con.executemany(
+            "INSERT INTO chat_messages "
+            "(id, session_id, user_id, role, content, citations, provider, model, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            rows,
+        )
+        con.execute(
+            "UPDATE chat_sessions SET updated_at = ? WHERE id = ?",
+            (rows[-1][-1], session_id),
+        )
+    return len(rows)
+
+
 def get_messages(session_id: str, user_id: str, limit: int = 500) -> list[dict]:
     """Full thread, oldest first. Returns empty list if session not owned by user."""
     with _conn() as con:
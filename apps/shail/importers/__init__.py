@@ -4,6 +4,10 @@ Each importer parses a provider-specific export format into a normalized list
 of (user_msg, assistant_msg) pairs, then funnels through `common.import_pairs`
 to create a chat_session + messages and enqueue a backfill job.
 
+`iter_conversations(source, fp)` streams an export file: providers with an
+`iter_parse` (chatgpt, claude, gemini) decode one conversation at a time;
+the rest are read whole and handed to their `parse`.
+
 Supported providers:
     chatgpt     — ChatGPT conversations.json export (current-branch resolved)
     claude      — Claude.ai conversation export JSON
@@ -13,7 +17,15 @@ Supported providers:
     perplexity  — Perplexity thread JSON (single or bulk)
 """
 
-from apps.shail.importers.common import ImportResult, import_conversation_payload
+from typing import IO, Iterator
+
+from apps.shail.importers.common import (
+    ImportResult,
+    import_conversation_payload,
+    list_import_jobs,
+    start_import_job,
+    update_import_job,
+)
 from apps.shail.importers import chatgpt, claude, cursor, gemini, grok, perplexity
 
 PARSERS = {
@@ -25,4 +37,29 @@ PARSERS = {
     "perplexity": perplexity.parse,
 }
 
-__all__ = ["PARSERS", "ImportResult", "import_conversation_payload"]
+# Exports that can reach hundreds of MB; parsed incrementally from a file.
+STREAM_PARSERS = {
+    "chatgpt": chatgpt.iter_parse,
+    "claude":  claude.iter_parse,
+    "gemini":  gemini.iter_parse,
+}
+
+
+def iter_conversations(source: str, fp: IO[bytes]) -> Iterator[dict]:
+    """Parsed conversations from an open export file, lazily where possible."""
+    if source in STREAM_PARSERS:
+        yield from STREAM_PARSERS[source](fp)
+    else:
+        yield from PARSERS[source](fp.read())
+
+
+__all__ = [
+    "PARSERS",
+    "STREAM_PARSERS",
+    "ImportResult",
+    "import_conversation_payload",
+    "iter_conversations",
+    "list_import_jobs",
+    "start_import_job",
+    "update_import_job",
+]
@@ -30,7 +30,9 @@ from __future__ import annotations
 
 import json
 from datetime import datetime, timezone
-from typing import Iterable, Optional
+from typing import IO, Any, Iterable, Iterator, Optional
+
+from apps.shail.importers.stream import iter_json_items
 
 
 def _walk_current_path(mapping: dict, current_node_id: str) -> list[dict]:
@@ -150,29 +152,39 @@ def parse(payload: bytes | str) -> list[dict]:
     if not isinstance(data, list):
         return []
 
-    conversations: list[dict] = []
-    for conv in data:
-        if not isinstance(conv, dict):
-            continue
-        title = conv.get("title") or "Untitled ChatGPT conversation"
-        mapping = conv.get("mapping") or {}
-        # `current_node` is the leaf of the active branch in the UI; ChatGPT
-        # exports include it. Walking parent links from there gives the
-        # actual conversation shown to the user, skipping regenerated
-        # alternate paths.
-        current_node = conv.get("current_node")
-        messages = _linearize_mapping(mapping, current_node=current_node)
-        pairs = _pair_messages(messages)
-        if not pairs:
-            continue
-        created = conv.get("create_time")
-        created_iso: Optional[str] = None
-        if isinstance(created, (int, float)) and created > 0:
-            created_iso = datetime.fromtimestamp(created, tz=timezone.utc).isoformat()
-        conversations.append({
-            "title": title,
-            "created_at": created_iso,
-            "source_id": str(conv.get("id") or title),
-            "pairs": pairs,
-        })
-    return conversations
+    conversations = (_parse_conversation(conv) for conv in data)
+    return [c for c in conversations if c is not None]
+
+
+def iter_parse(fp: IO) -> Iterator[dict]:
+    """Streaming `parse` over an open export file, one conversation at a time."""
+    for _shape, conv in iter_json_items(fp, key="conversations"):
+        parsed = _parse_conversation(conv)
+        if parsed is not None:
+            yield parsed
+
+
+def _parse_conversation(conv: Any) -> Optional[dict]:
+    if not isinstance(conv, dict):
+        return None
+    title = conv.get("title") or "Untitled ChatGPT conversation"
+    mapping = conv.get("mapping") or {}
+    # `current_node` is the leaf of the active branch in the UI; ChatGPT
+    # exports include it. Walking parent links from there gives the
+    # actual conversation shown to the user, skipping regenerated
+    # alternate paths.
+    current_node = conv.get("current_node")
+    messages = _linearize_mapping(mapping, current_node=current_node)
+    pairs = _pair_messages(messages)
+    if not pairs:
+        return None
+    created = conv.get("create_time")
+    created_iso: Optional[str] = None
+    if isinstance(created, (int, float)) and created > 0:
+        created_iso = datetime.fromtimestamp(created, tz=timezone.utc).isoformat()
+    return {
+        "title": title,
+        "created_at": created_iso,
+        "source_id": str(conv.get("id") or title),
+        "pairs": pairs,
+    }
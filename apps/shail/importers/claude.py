@@ -27,7 +27,9 @@ Claude.ai export format (as of 2025):
 from __future__ import annotations
 
 import json
-from typing import Optional
+from typing import IO, Any, Iterator, Optional
+
+from apps.shail.importers.stream import iter_json_items
 
 
 def _extract_text(msg: dict) -> str:
@@ -80,22 +82,32 @@ def parse(payload: bytes | str) -> list[dict]:
     if not isinstance(data, list):
         return []
 
-    out: list[dict] = []
-    for conv in data:
-        if not isinstance(conv, dict):
-            continue
-        messages = conv.get("chat_messages") or conv.get("messages") or []
-        if not isinstance(messages, list):
-            continue
-        # Sort by created_at if available
-        messages.sort(key=lambda m: m.get("created_at") or "")
-        pairs = _pair_messages(messages)
-        if not pairs:
-            continue
-        out.append({
-            "title": conv.get("name") or "Untitled Claude conversation",
-            "created_at": conv.get("created_at"),
-            "source_id": str(conv.get("uuid") or conv.get("id") or ""),
-            "pairs": pairs,
-        })
-    return out
+    conversations = (_parse_conversation(conv) for conv in data)
+    return [c for c in conversations if c is not None]
+
+
+def iter_parse(fp: IO) -> Iterator[dict]:
+    """Streaming `parse` over an open export file, one conversation at a time."""
+    for _shape, conv in iter_json_items(fp, key="conversations"):
+        parsed = _parse_conversation(conv)
+        if parsed is not None:
+            yield parsed
+
+
+def _parse_conversation(conv: Any) -> Optional[dict]:
+    if not isinstance(conv, dict):
+        return None
+    messages = conv.get("chat_messages") or conv.get("messages") or []
+    if not isinstance(messages, list):
+        return None
+    # Sort by created_at if available
+    messages.sort(key=lambda m: m.get("created_at") or "")
+    pairs = _pair_messages(messages)
+    if not pairs:
+        return None
+    return {
+        "title": conv.get("name") or "Untitled Claude conversation",
+        "created_at": conv.get("created_at"),
+        "source_id": str(conv.get("uuid") or conv.get("id") or ""),
+        "pairs": pairs,
+    }
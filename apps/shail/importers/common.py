@@ -12,12 +12,21 @@ A parser yields a list of `ParsedConversation` dicts:
 `import_conversation_payload` walks those, creates sessions + messages, and
 returns a summary. Backfill is enqueued by the caller (HTTP endpoint or CLI)
 so this module stays free of FastAPI / async-job coupling.
+
+`conversations` may be a generator (the providers' `iter_parse`), so a
+multi-GB export is imported one conversation at a time. Running imports are
+tracked in a small in-process registry that the backfill stats endpoint
+reports (`start_import_job` / `update_import_job` / `list_import_jobs`).
 """
 
 from __future__ import annotations
 
+import threading
+import uuid
+from collections import OrderedDict
 from dataclasses import dataclass, field
-from typing import Optional
+from datetime import datetime, timezone
+from typing import Callable, Iterable, Optional
 
 from apps.shail import chat_store
 
@@ -46,46 +55,134 @@ def import_conversation_payload(
     *,
     user_id: str,
     source: str,
-    conversations: list[dict],
+    conversations: Iterable[dict],
     provider_label: Optional[str] = None,
+    progress: Optional[Callable[[ImportResult], None]] = None,
 ) -> ImportResult:
     """Insert parsed conversations into chat_store. Backfill enqueued by caller.
 
     Each conversation dict shape: {title, created_at, source_id, pairs}.
     Skips empty conversations. Tags each session with `source` (in title prefix
     for now — proper `source` column would be a chat_sessions schema change).
+    Each conversation's messages are written in one transaction.
+
+    If reading `conversations` fails before the first one, the error is
+    raised (nothing was imported); later failures are recorded in `errors`
+    and the import stops there. `progress` is called after each conversation.
     """
     result = ImportResult(source=source)
     label = provider_label or source
 
-    for conv in conversations:
-        result.conversations_seen += 1
-        pairs = conv.get("pairs") or []
-        if not pairs:
-            continue
-        title = conv.get("title") or f"Imported {label} chat"
-        # Sprint 6: provenance stored on chat_sessions.source column.
-        # Title kept clean — UI consumes `session.source` for a badge.
+    it = iter(conversations)
+    while True:
         try:
-            sess = chat_store.create_session(user_id, title=title, source=label)
-            sid = sess["id"]
-            result.session_ids.append(sid)
-            result.sessions_created += 1
-            for user_text, asst_text in pairs:
-                if user_text:
-                    chat_store.append_message(
-                        sid, user_id, "user", user_text,
-                        provider=label, model=None,
-                    )
-                    result.messages_inserted += 1
-                if asst_text:
-                    chat_store.append_message(
-                        sid, user_id, "assistant", asst_text,
-                        provider=label, model=None,
-                    )
-                    result.messages_inserted += 1
+            conv = next(it)
+        except StopIteration:
+            break
         except Exception as exc:
+            if result.conversations_seen == 0:
+                raise
             result.errors.append(
-                f"conversation {conv.get('source_id', '?')}: {type(exc).__name__}: {exc}"
+                f"export truncated after {result.conversations_seen} conversations: "
+                f"{type(exc).__name__}: {exc}"
             )
+            break
+        result.conversations_seen += 1
+        _import_one(conv, user_id=user_id, label=label, result=result)
+        if progress is not None:
+            progress(result)
     return result
+
+
+def _import_one(conv: dict, *, user_id: str, label: str, result: ImportResult) -> None:
+    pairs = conv.get("pairs") or []
+    if not pairs:
+        return
+    title = conv.get("title") or f"Imported {label} chat"
+    # Sprint 6: provenance stored on chat_sessions.source column.
+    # Title kept clean — UI consumes `session.source` for a badge.
+    try:
+        sess = chat_store.create_session(user_id, title=title, source=label)
+        sid = sess["id"]
+        result.session_ids.append(sid)
+        result.sessions_created += 1
+        messages: list[tuple[str, str]] = []
+        for user_text, asst_text in pairs:
+            if user_text:
+                messages.append(("user", user_text))
+            if asst_text:
+                messages.append(("assistant", asst_text))
+        result.messages_inserted += chat_store.append_messages(
+            sid, user_id, messages, provider=label, model=None,
+        )
+    except Exception as exc:
+        result.errors.append(
+            f"conversation {conv.get('source_id', '?')}: {type(exc).__name__}: {exc}"
+        )
+
+
+# ── Import job registry ───────────────────────────────────────────────────────
+# Imports of large exports run for minutes; the UI polls progress through the
+# backfill stats endpoint. In-process only — finished jobs are kept briefly
+# so the last poll sees the final counts.
+
+_JOBS_KEPT = 20
+_jobs: "OrderedDict[str, dict]" = OrderedDict()
+_jobs_lock = threading.Lock()
+
+
+def start_import_job(user_id: str, source: str, total_bytes: int = 0) -> str:
+    job_id = f"imp_{uuid.uuid4().hex[:12]}"
+    with _jobs_lock:
+        _jobs[job_id] = {
+            "job_id": job_id,
+            "user_id": user_id,
+            "source": source,
+            "state": "running",
+            "bytes_read": 0,
+            "total_bytes": int(total_bytes),
+            "conversations_seen": 0,
+            "sessions_created": 0,
+            "messages_inserted": 0,
+            "errors": 0,
+            "started_at": datetime.now(timezone.utc).isoformat(),
+        }
+        while len(_jobs) > _JOBS_KEPT:
+            oldest = next(iter(_jobs))
+            if _jobs[oldest]["state"] == "running":
+                break
+            _jobs.popitem(last=False)
+    return job_id
+
+
+def update_import_job(
+    job_id: str,
+    result: Optional[ImportResult] = None,
+    *,
+    state: Optional[str] = None,
+    bytes_read: Optional[int] = None,
+) -> None:
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+        if job is None:
+            return
+        if result is not None:
+            job["conversations_seen"] = result.conversations_seen
+            job["sessions_created"] = result.sessions_created
+            job["messages_inserted"] = result.messages_inserted
+            job["errors"] = len(result.errors)
+        if state is not None:
+            job["state"] = state
+        if bytes_read is not None:
+            job["bytes_read"] = int(bytes_read)
+
+
+def list_import_jobs(user_id: str) -> list[dict]:
+    """Recent import jobs for user_id, newest first, with progress_pct."""
+    with _jobs_lock:
+        jobs = [dict(j) for j in reversed(_jobs.values()) if j["user_id"] == user_id]
+    for job in jobs:
+        job.pop("user_id")
+        total = job["total_bytes"]
+        job["progress_pct"] = round(min(job["bytes_read"], total) / total * 100.0, 1) if total else 0.0
+    return jobs
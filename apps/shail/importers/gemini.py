@@ -38,7 +38,9 @@ We detect format by looking at the top-level shape.
 from __future__ import annotations
 
 import json
-from typing import Optional
+from typing import IO, Any, Iterator, Optional
+
+from apps.shail.importers.stream import iter_json_items
 
 
 def _pair_messages(messages: list[dict]) -> list[tuple[str, str]]:
@@ -67,23 +69,25 @@ def _parse_native(data: dict) -> list[dict]:
     convs = data.get("conversations") or []
     if not isinstance(convs, list):
         return []
-    out: list[dict] = []
-    for conv in convs:
-        if not isinstance(conv, dict):
-            continue
-        messages = conv.get("messages") or []
-        if not isinstance(messages, list):
-            continue
-        pairs = _pair_messages(messages)
-        if not pairs:
-            continue
-        out.append({
-            "title": conv.get("name") or "Untitled Gemini conversation",
-            "created_at": conv.get("createTime") or conv.get("created_at"),
-            "source_id": str(conv.get("id") or ""),
-            "pairs": pairs,
-        })
-    return out
+    conversations = (_parse_native_conversation(conv) for conv in convs)
+    return [c for c in conversations if c is not None]
+
+
+def _parse_native_conversation(conv: Any) -> Optional[dict]:
+    if not isinstance(conv, dict):
+        return None
+    messages = conv.get("messages") or []
+    if not isinstance(messages, list):
+        return None
+    pairs = _pair_messages(messages)
+    if not pairs:
+        return None
+    return {
+        "title": conv.get("name") or "Untitled Gemini conversation",
+        "created_at": conv.get("createTime") or conv.get("created_at"),
+        "source_id": str(conv.get("id") or ""),
+        "pairs": pairs,
+    }
 
 
 def _parse_takeout(entries: list) -> list[dict]:
@@ -94,34 +98,41 @@ def _parse_takeout(entries: list) -> list[dict]:
     entries. The activity log doesn't preserve conversation IDs, so we group
     everything into a single synthetic "Gemini activity" session.
     """
-    relevant = []
-    for entry in entries:
-        if not isinstance(entry, dict):
-            continue
-        header = (entry.get("header") or "").lower()
-        if "gemini" not in header and "bard" not in header:
-            continue
-        title = entry.get("title") or ""
-        time = entry.get("time") or ""
-        # Heuristics: Takeout titles look like "Said "<text>"" (user) or
-        # "Asked: <text>" or just the model reply prefixed differently.
-        # We treat lines starting with Said/Asked as user; others as model.
-        is_user = title.startswith("Said ") or title.startswith("Asked ")
-        # Strip the prefix + quotes
-        text = title
-        for prefix in ("Said \"", "Asked \"", "Said '", "Asked '"):
-            if text.startswith(prefix):
-                text = text[len(prefix):]
-                if text.endswith("\"") or text.endswith("'"):
-                    text = text[:-1]
-                break
-        if not text.strip():
-            continue
-        relevant.append({
-            "time": time,
-            "text": text.strip(),
-            "role": "user" if is_user else "model",
-        })
+    rows = (_takeout_row(entry) for entry in entries)
+    return _takeout_sessions([r for r in rows if r is not None])
+
+
+def _takeout_row(entry: Any) -> Optional[dict]:
+    """One activity record → {time, text, role}, or None if not Gemini chat."""
+    if not isinstance(entry, dict):
+        return None
+    header = (entry.get("header") or "").lower()
+    if "gemini" not in header and "bard" not in header:
+        return None
+    title = entry.get("title") or ""
+    time = entry.get("time") or ""
+    # Heuristics: Takeout titles look like "Said "<text>"" (user) or
+    # "Asked: <text>" or just the model reply prefixed differently.
+    # We treat lines starting with Said/Asked as user; others as model.
+    is_user = title.startswith("Said ") or title.startswith("Asked ")
+    # Strip the prefix + quotes
+    text = title
+    for prefix in ("Said \"", "Asked \"", "Said '", "Asked '"):
+        if text.startswith(prefix):
+            text = text[len(prefix):]
+            if text.endswith("\"") or text.endswith("'"):
+                text = text[:-1]
+            break
+    if not text.strip():
+        return None
+    return {
+        "time": time,
+        "text": text.strip(),
+        "role": "user" if is_user else "model",
+    }
+
+
+def _takeout_sessions(relevant: list[dict]) -> list[dict]:
     if not relevant:
         return []
     relevant.sort(key=lambda r: r.get("time") or "")
@@ -149,3 +160,23 @@ def parse(payload: bytes | str) -> list[dict]:
     if isinstance(data, list):
         return _parse_takeout(data)
     return []
+
+
+def iter_parse(fp: IO) -> Iterator[dict]:
+    """Streaming `parse` over an open export file.
+
+    Native conversations are yielded as they are read. Takeout records only
+    keep the small {time, text, role} rows; they still form one session, so
+    it is yielded at the end.
+    """
+    rows: list[dict] = []
+    for shape, item in iter_json_items(fp, key="conversations"):
+        if shape == "keyed":
+            parsed = _parse_native_conversation(item)
+            if parsed is not None:
+                yield parsed
+        elif shape == "array":
+            row = _takeout_row(item)
+            if row is not None:
+                rows.append(row)
+    yield from _takeout_sessions(rows)
@@ -0,0 +1,157 @@
+"""Incremental JSON reader for large chat exports.
+
+ChatGPT `conversations.json` (and Claude's equivalent) can be hundreds of MB
+to GB. `json.loads` on that holds the raw bytes, the decoded str and the full
+object tree at once. `iter_json_items` instead decodes one array element at a
+time from a file object with `JSONDecoder.raw_decode`, so peak memory is
+bounded by the largest single conversation rather than the whole export.
+
+Shapes handled (what the provider parsers already accept):
+
+    [ item, item, ... ]                    → ("array", item) per element
+    { ..., "<key>": [ item, ... ], ... }   → ("keyed", item) per element
+    { ... } without an array under <key>   → ("object", whole_object) once
+
+Stdlib only; no ijson dependency.
+"""
+
+from __future__ import annotations
+
+import codecs
+import json
+from typing import IO, Any, Iterator, Optional, Tuple
+
+_READ_SIZE = 1 << 20  # 1 MiB
+# JSON whitespace, plus a BOM left on already-decoded text input.
+_WS = " \t\n\r\ufeff"
+# A decode error this close to the end of the window may just be a value cut
+# off mid-token; further back it is a genuine syntax error.
+_TAIL = 16
+
+_decoder = json.JSONDecoder()
+
+
+class _Reader:
+    """Buffered text window over a binary or text file object."""
+
+    def __init__(self, fp: IO) -> None:
+        self._fp = fp
+        # utf-8-sig strips a BOM some Windows tools prepend.
+        self._utf8 = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self, min_size: int = _READ_SIZE) -> bool:
+        if self.eof:
+            return False
+        chunk = self._fp.read(max(min_size, _READ_SIZE))
+        if isinstance(chunk, bytes):
+            text = self._utf8.decode(chunk, final=not chunk)
+        else:
+            text = chunk
+        if not chunk:
+            self.eof = True
+        # Drop consumed text so the window only holds what is still needed.
+        self.buf = self.buf[self.pos:] + text
+        self.pos = 0
+        return bool(text) or not self.eof
+
+    def peek(self) -> str:
+        """Next non-whitespace char (not consumed), or '' at EOF."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WS:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str) -> None:
+        got = self.peek()
+        if got != char:
+            raise json.JSONDecodeError(f"expected {char!r}, got {got!r}", self.buf, self.pos)
+        self.pos += 1
+
+    def value(self) -> Any:
+        """Decode the next complete JSON value, reading more as needed."""
+        self.peek()
+        want = _READ_SIZE
+        while True:
+            try:
+                obj, end = _decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError as exc:
+                truncated = exc.pos >= len(self.buf) - _TAIL or exc.msg.startswith("Unterminated string")
+                if self.eof or not truncated:
+                    raise
+                # Value spans past the window. Grow geometrically so a single
+                # huge element costs O(n) re-decodes, not O(n²).
+                self._fill(want)
+                want *= 2
+                continue
+            # A number at the window edge may be truncated ("12" of "123").
+            if end == len(self.buf) and not self.eof and not isinstance(obj, (dict, list, str)):
+                self._fill()
+                continue
+            self.pos = end
+            return obj
+
+
+def _iter_array(reader: _Reader) -> Iterator[Any]:
+    reader.expect("[")
+    if reader.peek() == "]":
+        reader.pos += 1
+        return
+    while True:
+        yield reader.value()
+        sep = reader.peek()
+        reader.pos += 1
+        if sep == "]":
+            return
+        if sep != ",":
+            raise json.JSONDecodeError(f"expected ',' or ']', got {sep!r}", reader.buf, reader.pos - 1)
+
+
+def iter_json_items(fp: IO, key: Optional[str] = None) -> Iterator[Tuple[str, Any]]:
+    """Yield `(shape, item)` pairs from a JSON export; see module docstring.
+
+    `fp` may be binary (UTF-8) or text. Raises `json.JSONDecodeError` on
+    malformed input — possibly after earlier items were already yielded.
+    """
+    reader = _Reader(fp)
+    first = reader.peek()
+    if first == "[":
+        for item in _iter_array(reader):
+            yield "array", item
+        return
+    if first != "{":
+        # Scalars / garbage: let the decoder produce the usual error.
+        yield "object", reader.value()
+        return
+
+    reader.expect("{")
+    members: dict = {}
+    streamed = False
+    if reader.peek() == "}":
+        reader.pos += 1
+    else:
+        while True:
+            name = reader.value()
+            reader.expect(":")
+            if name == key and not streamed and reader.peek() == "[":
+                streamed = True
+                for item in _iter_array(reader):
+                    yield "keyed", item
+            elif not streamed:
+                # Kept in case the object turns out to be a bare record.
+                members[name] = reader.value()
+            else:
+                reader.value()
+            sep = reader.peek()
+            reader.pos += 1
+            if sep == "}":
+                break
+            if sep != ",":
+                raise json.JSONDecodeError(f"expected ',' or '}}', got {sep!r}", reader.buf, reader.pos - 1)
+    if not streamed:
+        yield "object", members
@@ -11,11 +11,16 @@ Public:
     stream_llm(messages, *, user_id, context, system_prompt) -> AsyncIterator[str]
     test_provider(provider, api_key, model) -> tuple[bool, str]
     get_user_llm_config(user_id) -> dict
+    close_llm_clients() -> None   (app shutdown)
 
 Provider keys come from `user_settings`. v1 stores them as plaintext —
 encryption-at-rest is a v2 concern (flagged with a TODO so we don't
 forget). Each provider exposes a different streaming protocol; this
 module normalizes them so the caller sees identical str chunks.
+
+HTTP goes through one keep-alive client per provider (per event loop), so a
+chat turn or blueprint extraction reuses warm TCP/TLS connections instead of
+dialling the provider each time. Each provider also has a concurrency cap.
 """
 
 # TODO(v2): encrypt api keys at rest. Today they live as plaintext in
@@ -26,10 +31,16 @@ from __future__ import annotations
 import asyncio
 import json
 import logging
+import time
+import weakref
+from contextlib import asynccontextmanager, nullcontext
+from contextvars import ContextVar
 from typing import AsyncIterator, Dict, List, Optional, Tuple
 
 import httpx
 
+from apps.shail import telemetry
+
 from apps.shail.auth_store import get_user_settings
 from apps.shail.settings import get_settings
 
@@ -58,6 +69,97 @@ NONSTREAM_TIMEOUT = 90.0
 STREAM_TIMEOUT = 180.0
 
 
+# ── Pooled clients ──────────────────────────────────────────────────────────
+# One AsyncClient + Semaphore per provider, keyed by event loop: httpx pools
+# are bound to the loop that opened them, and the blueprint worker may run
+# its own. Idle connections are kept well past httpx's 5s default so turns a
+# minute apart still find a warm connection.
+
+_KEEPALIVE_EXPIRY = {PROVIDER_OLLAMA: 300.0, PROVIDER_OPENAI: 90.0, PROVIDER_ANTHROPIC: 90.0}
+
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, Tuple[httpx.AsyncClient, asyncio.Semaphore]]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+# Background calls (blueprint extraction) first take a slot from a smaller
+# per-provider gate, so `llm_interactive_reserve` provider slots stay free
+# for chat however many blueprint jobs and map windows are in flight.
+_background: ContextVar[bool] = ContextVar("llm_background", default=False)
+_background_gates: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Semaphore]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401 — optional; httpx negotiates HTTP/2 only with it
+        return True
+    except ImportError:
+        return False
+
+
+def _provider_concurrency(provider: str) -> int:
+    s = get_settings()
+    n = s.llm_concurrency_ollama if provider == PROVIDER_OLLAMA else s.llm_concurrency_remote
+    return max(1, int(n))
+
+
+def _new_client(provider: str) -> httpx.AsyncClient:
+    n = _provider_concurrency(provider)
+    return httpx.AsyncClient(
+        timeout=NONSTREAM_TIMEOUT,
+        limits=httpx.Limits(
+            max_connections=n,
+            max_keepalive_connections=n,
+            keepalive_expiry=_KEEPALIVE_EXPIRY.get(provider, 60.0),
+        ),
+        # Ollama is plain HTTP on localhost; HTTP/2 only helps over TLS.
+        http2=provider != PROVIDER_OLLAMA and _http2_available(),
+    )
+
+
+def _provider_state(provider: str) -> Tuple[httpx.AsyncClient, asyncio.Semaphore]:
+    per_loop = _clients.setdefault(asyncio.get_running_loop(), {})
+    state = per_loop.get(provider)
+    if state is None or state[0].is_closed:
+        state = per_loop[provider] = (_new_client(provider), asyncio.Semaphore(_provider_concurrency(provider)))
+    return state
+
+
+def _background_gate(provider: str) -> asyncio.Semaphore:
+    per_loop = _background_gates.setdefault(asyncio.get_running_loop(), {})
+    gate = per_loop.get(provider)
+    if gate is None:
+        reserve = max(0, int(get_settings().llm_interactive_reserve))
+        gate = per_loop[provider] = asyncio.Semaphore(max(1, _provider_concurrency(provider) - reserve))
+    return gate
+
+
+@asynccontextmanager
+async def _provider_client(provider: str):
+    """The provider's pooled client, holding one of its concurrency slots."""
+    client, slots = _provider_state(provider)
+    gate = _background_gate(provider) if _background.get() else nullcontext()
+    async with gate, slots:
+        yield client
+
+
+async def close_llm_clients() -> None:
+    """Graceful shutdown — call from FastAPI shutdown handler."""
+    try:
+        loop = asyncio.get_running_loop()
+        per_loop = _clients.pop(loop, None)
+        _background_gates.pop(loop, None)
+    except RuntimeError:
+        per_loop = None
+    for client, _ in (per_loop or {}).values():
+        try:
+            await client.aclose()
+        except Exception as exc:
+            logger.debug("LLM client close failed: %s", exc)
+
+
 # ── Per-user config ─────────────────────────────────────────────────────────
 
 def get_user_llm_config(user_id: Optional[str]) -> dict:
@@ -131,15 +233,15 @@ async def _ollama_call(
         },
     }
     if not stream:
-        async with httpx.AsyncClient(timeout=NONSTREAM_TIMEOUT) as client:
+        async with _provider_client(PROVIDER_OLLAMA) as client:
             resp = await client.post(f"{s.ollama_base_url}/api/chat", json=payload)
             resp.raise_for_status()
             return resp.json()["message"]["content"]
 
     async def gen() -> AsyncIterator[dict]:
-        async with httpx.AsyncClient(timeout=STREAM_TIMEOUT) as client:
+        async with _provider_client(PROVIDER_OLLAMA) as client:
             async with client.stream(
-                "POST", f"{s.ollama_base_url}/api/chat", json=payload
+                "POST", f"{s.ollama_base_url}/api/chat", json=payload, timeout=STREAM_TIMEOUT
             ) as resp:
                 resp.raise_for_status()
                 async for line in resp.aiter_lines():
@@ -172,16 +274,16 @@ async def _openai_call(
     }
 
     if not stream:
-        async with httpx.AsyncClient(timeout=NONSTREAM_TIMEOUT) as client:
+        async with _provider_client(PROVIDER_OPENAI) as client:
             resp = await client.post(OPENAI_API, json=payload, headers=headers)
             resp.raise_for_status()
             data = resp.json()
             return data["choices"][0]["message"]["content"]
 
     async def gen() -> AsyncIterator[dict]:
-        async with httpx.AsyncClient(timeout=STREAM_TIMEOUT) as client:
+        async with _provider_client(PROVIDER_OPENAI) as client:
             async with client.stream(
-                "POST", OPENAI_API, json=payload, headers=headers
+                "POST", OPENAI_API, json=payload, headers=headers, timeout=STREAM_TIMEOUT
             ) as resp:
                 resp.raise_for_status()
                 async for line in resp.aiter_lines():
@@ -227,7 +329,7 @@ async def _anthropic_call(
     }
 
     if not stream:
-        async with httpx.AsyncClient(timeout=NONSTREAM_TIMEOUT) as client:
+        async with _provider_client(PROVIDER_ANTHROPIC) as client:
             resp = await client.post(ANTHROPIC_API, json=payload, headers=headers)
             resp.raise_for_status()
             data = resp.json()
@@ -235,9 +337,9 @@ async def _anthropic_call(
             return "".join(b.get("text", "") for b in blocks if b.get("type") == "text")
 
     async def gen() -> AsyncIterator[dict]:
-        async with httpx.AsyncClient(timeout=STREAM_TIMEOUT) as client:
+        async with _provider_client(PROVIDER_ANTHROPIC) as client:
             async with client.stream(
-                "POST", ANTHROPIC_API, json=payload, headers=headers
+                "POST", ANTHROPIC_API, json=payload, headers=headers, timeout=STREAM_TIMEOUT
             ) as resp:
                 resp.raise_for_status()
                 async for line in resp.aiter_lines():
@@ -266,10 +368,28 @@ async def call_llm(
     user_id: Optional[str] = None,
     context: str = "",
     system_prompt: str = "",
+    background: bool = False,
 ) -> Tuple[str, dict]:
     """Non-streaming call. Returns (answer, meta) where meta includes the
     provider/model that actually answered (after any fallback).
+
+    `background=True` marks work nobody is waiting on (blueprints); it never
+    takes the provider slots reserved for interactive calls.
     """
+    token = _background.set(background)
+    try:
+        return await _call_llm(messages, user_id=user_id, context=context, system_prompt=system_prompt)
+    finally:
+        _background.reset(token)
+
+
+async def _call_llm(
+    messages: List[Dict[str, str]],
+    *,
+    user_id: Optional[str],
+    context: str,
+    system_prompt: str,
+) -> Tuple[str, dict]:
     cfg = get_user_llm_config(user_id)
     sys_content = _build_system_content(system_prompt, context)
     msgs = _ensure_messages(messages)
@@ -341,13 +461,36 @@ async def stream_llm(
 
 
 async def _dispatch(cfg: dict, msgs: list, system: str, *, stream: bool):
-    if cfg["provider"] == PROVIDER_OLLAMA:
-        return await _ollama_call(cfg["model"], msgs, system, stream=stream)
-    if cfg["provider"] == PROVIDER_OPENAI:
-        return await _openai_call(cfg["model"], msgs, system, cfg["api_key"], stream=stream)
-    if cfg["provider"] == PROVIDER_ANTHROPIC:
-        return await _anthropic_call(cfg["model"], msgs, system, cfg["api_key"], stream=stream)
-    raise ValueError(f"unknown provider: {cfg['provider']}")
+    provider = cfg["provider"]
+    start = time.perf_counter()
+    if provider == PROVIDER_OLLAMA:
+        result = await _ollama_call(cfg["model"], msgs, system, stream=stream)
+    elif provider == PROVIDER_OPENAI:
+        result = await _openai_call(cfg["model"], msgs, system, cfg["api_key"], stream=stream)
+    elif provider == PROVIDER_ANTHROPIC:
+        result = await _anthropic_call(cfg["model"], msgs, system, cfg["api_key"], stream=stream)
+    else:
+        raise ValueError(f"unknown provider: {provider}")
+    if stream:
+        return _timed_stream(provider, result)
+    _observe_ms(telemetry.LLM_LATENCY_MS, start, provider=provider, mode="call")
+    return result
+
+
+async def _timed_stream(provider: str, gen: AsyncIterator[dict]) -> AsyncIterator[dict]:
+    """Pass `gen` through, recording time to first token and total latency."""
+    start = time.perf_counter()
+    first = True
+    async for payload in gen:
+        if first and payload.get("text"):
+            first = False
+            _observe_ms(telemetry.LLM_TTFT_MS, start, provider=provider)
+        yield payload
+    _observe_ms(telemetry.LLM_LATENCY_MS, start, provider=provider, mode="stream")
+
+
+def _observe_ms(name: str, start: float, **labels) -> None:
+    telemetry.observe(name, (time.perf_counter() - start) * 1000.0, **labels)
 
 
 # ── Settings page "Test" button ─────────────────────────────────────────────
@@ -165,6 +165,7 @@ def _cleanup_ephemeral() -> int:
         embeddings = raw.get("embeddings") or [[] for _ in ids]
 
         to_delete: list[str] = []
+        expired: list[str] = []  # logical memory ids behind `to_delete`
         promoted = 0
         deleted  = 0
 
@@ -185,6 +186,7 @@ def _cleanup_ephemeral() -> int:
                     pass
             elif captured_ts < ttl_cutoff:
                 to_delete.append(rid)
+                expired.append(meta.get("customId") or meta.get("parent_memory_id") or rid)
 
         if to_delete:
             try:
@@ -193,6 +195,16 @@ def _cleanup_ephemeral() -> int:
             except Exception as e:
                 logger.warning("Ephemeral bulk delete failed: %s", e)
 
+        if deleted:
+            # Keep the capture catalog (and the graph / related lists it
+            # drops with each row) in step with the store.
+            from apps.shail import capture_index
+            for memory_id in dict.fromkeys(expired):
+                try:
+                    capture_index.delete(memory_id)
+                except Exception as e:
+                    logger.warning("capture_index delete failed for %s: %s", memory_id, e)
+
         if promoted or deleted:
             logger.info("Ephemeral GC: promoted=%d deleted=%d", promoted, deleted)
     except Exception as e:
@@ -568,9 +580,11 @@ async def path_index_diagnostics() -> Dict[str, Any]:
       - extractor_failures — per-extension failure counts seen this process
       - retrieval_stats — per-stage counters from local-file retrieval
       - recent_traces   — last N query traces (which hits dropped and why)
+      - last_scan       — counters and files/sec of the latest path scan
     """
     from apps.shail.retrieval.diagnostics import health_summary
-    return health_summary()
+    from shail.memory.path_index import last_scan_report
+    return {**health_summary(), "last_scan": last_scan_report()}
 
 
 @path_idx_router.get("/{record_id}/content", response_model=PathContentResponse)
@@ -169,10 +169,17 @@ async def lifespan(app: FastAPI):
     asyncio.create_task(_startup_index_run())
     asyncio.create_task(_start_blueprint_queue_worker_run())
     asyncio.create_task(_restart_filesystem_watchers_run())
+    auth_flush_task = asyncio.create_task(_auth_touch_flush_run())
 
     yield
 
     # --- SHUTDOWN ---
+    auth_flush_task.cancel()
+    try:
+        from apps.shail.auth_store import flush_auth_touches
+        await asyncio.to_thread(flush_auth_touches)
+    except Exception as exc:
+        logger.warning("auth touch flush failed: %s", exc)
     try:
         from shail.memory.ingest_queue import get_ingest_queue
         await get_ingest_queue().stop()
@@ -183,14 +190,39 @@ async def lifespan(app: FastAPI):
         await close_supermemory_client()
     except Exception as exc:
         logger.warning("SupermemoryClient close failed: %s", exc)
+    try:
+        from shail.memory.embeddings import close_embedding_clients
+        await close_embedding_clients()
+    except Exception as exc:
+        logger.warning("embedding client close failed: %s", exc)
+    try:
+        from apps.shail.llm import close_llm_clients
+        await close_llm_clients()
+    except Exception as exc:
+        logger.warning("LLM client close failed: %s", exc)
+    try:
+        await websocket_manager.close()
+    except Exception as exc:
+        logger.warning("WebSocket manager close failed: %s", exc)
     try:
         from shail.integrations.local.filesystem.adapter import get_adapter
-        get_adapter().stop_all()
+        watchers_ran = get_adapter().stop_all()
+        # Orderly stop with every scan root watched until now: the next
+        # startup may trust the scan journal instead of re-walking every root.
+        if watchers_ran and _scan_roots_watched:
+            from shail.memory.path_index import mark_clean_shutdown
+            mark_clean_shutdown(get_settings().path_index_db)
     except Exception:
         pass
 
 
+# Set once the startup scan's roots all have a watchdog observer; without it
+# changes made while this process ran are not in the scan journal.
+_scan_roots_watched = False
+
+
 async def _startup_index_run():
+    global _scan_roots_watched
     await asyncio.sleep(6)
     loop = asyncio.get_event_loop()
     try:
@@ -222,13 +254,34 @@ async def _startup_index_run():
             len(env_roots), len(persisted_roots), len(default_roots), len(roots), roots,
         )
 
-        # 1. Bulk scan in thread
+        # 1. Scan in thread — incremental after a clean shutdown: only
+        #    directories whose mtime moved since the journal are listed.
         file_count = await loop.run_in_executor(
-            None, lambda: scan(settings.path_index_db, roots=roots or None)
+            None, lambda: scan(settings.path_index_db, roots=roots or None, incremental=True)
         )
         logger.info("Startup path index walk complete: %d new/changed files", file_count)
 
-        # 1b. Backfill summary_snippet
+        # 2. Auto-attach watchdog observers — before the slow passes below,
+        #    since the watchers are the primary freshness mechanism.
+        try:
+            with _auth_conn() as con:
+                row = con.execute("SELECT id FROM users ORDER BY created_at LIMIT 1").fetchone()
+            resident_user = row["id"] if row else None
+        except Exception:
+            resident_user = None
+        if resident_user:
+            adapter = get_adapter()
+            attached = 0
+            for r in roots:
+                res = await loop.run_in_executor(None, lambda root=r: adapter.start_watch(resident_user, root))
+                if res.get("ok"):
+                    attached += 1
+            logger.info("Auto-attached %d watchdog observers for user=%s", attached, resident_user)
+            _scan_roots_watched = bool(roots) and attached == len(roots)
+        else:
+            logger.info("No registered user — skipping auto-watch attach")
+
+        # 3. Backfill summary_snippet
         try:
             sn = await loop.run_in_executor(
                 None, lambda: backfill_snippets(settings.path_index_db, max_files=2000)
@@ -238,7 +291,7 @@ async def _startup_index_run():
         except Exception as exc:
             logger.debug("snippet backfill skipped: %s", exc)
 
-        # 2. Spotlight (macOS)
+        # 4. Spotlight (macOS)
         try:
             sl = await loop.run_in_executor(
                 None, lambda: ingest_spotlight_recent(settings.path_index_db, days=30, max_files=1000)
@@ -247,24 +300,6 @@ async def _startup_index_run():
                 logger.info("Spotlight added %d recently-modified files", sl)
         except Exception as exc:
             logger.debug("Spotlight ingest skipped: %s", exc)
-
-        # 3. Auto-attach watchdog observers
-        try:
-            with _auth_conn() as con:
-                row = con.execute("SELECT id FROM users ORDER BY created_at LIMIT 1").fetchone()
-            resident_user = row["id"] if row else None
-        except Exception:
-            resident_user = None
-        if resident_user:
-            adapter = get_adapter()
-            attached = 0
-            for r in roots:
-                res = await loop.run_in_executor(None, lambda root=r: adapter.start_watch(resident_user, root))
-                if res.get("ok"):
-                    attached += 1
-            logger.info("Auto-attached %d watchdog observers for user=%s", attached, resident_user)
-        else:
-            logger.info("No registered user — skipping auto-watch attach")
     except Exception as e:
         logger.warning("Startup index failed: %s", e)
 
@@ -278,6 +313,18 @@ async def _start_blueprint_queue_worker_run():
         logger.warning("blueprint queue worker failed to start: %s", e)
 
 
+async def _auth_touch_flush_run():
+    """Persist buffered last_seen / last_used touches every few seconds."""
+    from apps.shail.auth_store import flush_auth_touches
+    interval = max(0.5, float(get_settings().auth_touch_flush_sec))
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await asyncio.to_thread(flush_auth_touches)
+        except Exception as e:
+            logger.warning("auth touch flush failed: %s", e)
+
+
 async def _restart_filesystem_watchers_run():
     await asyncio.sleep(3)
     try:
@@ -375,13 +422,17 @@ def prometheus_metrics(request: Request):
     client_host = request.client.host if request.client else ""
     if client_host not in ("127.0.0.1", "::1", "localhost"):
         raise HTTPException(status_code=403, detail="Access denied")
+    from apps.shail import telemetry
     try:
         from prometheus_client import generate_latest, CONTENT_TYPE_LATEST
         from fastapi.responses import Response
-        return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
+        body = generate_latest() + telemetry.prometheus_text().encode("utf-8")
+        return Response(content=body, media_type=CONTENT_TYPE_LATEST)
     except ImportError:
         from fastapi.responses import PlainTextResponse
-        return PlainTextResponse("# prometheus_client not installed\n", status_code=200)
+        return PlainTextResponse(
+            "# prometheus_client not installed\n" + telemetry.prometheus_text(), status_code=200,
+        )
     except Exception as exc:
         from fastapi.responses import PlainTextResponse
         return PlainTextResponse(f"# metrics error: {exc}\n", status_code=500)
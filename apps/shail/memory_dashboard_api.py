@@ -15,7 +15,6 @@ import json
 import logging
 import secrets
 import sqlite3
-from collections import Counter, defaultdict
 from datetime import datetime, timedelta, timezone
 from io import StringIO
 from pathlib import Path
@@ -67,6 +66,7 @@ class MemoryPage(BaseModel):
     page: int
     limit: int
     pages: int
+    next_cursor: Optional[str] = None
 
 
 class PatchRequest(BaseModel):
@@ -159,64 +159,29 @@ def _visible_namespaces(user_id: str) -> list[str]:
 
 def _get_all_user_records(user_id: str):
     """
-    Return all records from ChromaDB visible to this user.
-    Single-user mode: queries only the canonical user namespace.
-    Returns list of (id, document, metadata) tuples, deduplicated by id.
+    Return every browser memory visible to this user from the capture catalog.
+    Single-user mode: reads only the canonical user namespace.
+    Returns list of (id, document, metadata) tuples, newest first. `document`
+    is capped at `capture_index.BODY_CAP_CHARS`; use `_scan_user_records`
+    when full transcript text is required.
     """
-    store = _get_store()
-    if not hasattr(store, "collection"):
-        return []
+    from apps.shail import capture_index
 
     namespace = _namespace(user_id)
-    all_records: list = []
-    seen: set = set()
-
     try:
-        result = store.collection.get(
-            where={"namespace": namespace},
-            include=["documents", "metadatas"],
-            limit=5000,
-        )
+        capture_index.ensure_seeded(namespace, _get_store())
+        return capture_index.list_records(namespace)
     except Exception as exc:
-        logger.warning("Failed to fetch records for namespace %s: %s", namespace, exc)
+        logger.warning("Failed to read capture catalog for namespace %s: %s", namespace, exc)
         return []
 
-    ids   = result.get("ids", [])
-    docs  = result.get("documents", []) or [""] * len(ids)
-    metas = result.get("metadatas", []) or [{}] * len(ids)
-    for rid, doc, meta in zip(ids, docs, metas):
-        meta = meta or {}
-        if not is_browser_memory(meta, doc or ""):
-            continue
-        meta = normalize_browser_metadata(meta, doc or "")
-        logical_id = meta.get("customId") or meta.get("parent_memory_id") or meta.get("id") or rid
-        if logical_id not in seen:
-            seen.add(logical_id)
-            all_records.append((logical_id, doc, meta))
 
-    try:
-        from apps.shail import raw_transcripts as _rt
-        for raw in _rt.list_recent(namespace=namespace, limit=5000):
-            raw_id = raw.get("memory_id")
-            if not raw_id or raw_id in seen:
-                continue
-            content = raw.get("content") or ""
-            meta = raw.get("metadata") or {}
-            if not is_browser_memory(meta, content):
-                continue
-            meta = normalize_browser_metadata(meta, content)
-            meta.setdefault("customId", raw_id)
-            meta.setdefault("id", raw_id)
-            meta.setdefault("eventType", raw.get("content_type", "page_visit"))
-            meta.setdefault("timestamp", raw.get("captured_at"))
-            if raw.get("embedded") == 0:
-                meta.setdefault("state", "indexing")
-            seen.add(raw_id)
-            all_records.append((raw_id, content, meta))
-    except Exception as exc:
-        logger.warning("Failed to merge raw transcript records for dashboard: %s", exc)
+def _scan_user_records(user_id: str):
+    """Full-content variant of `_get_all_user_records` (export only)."""
+    from apps.shail import capture_index
 
-    return all_records
+    records = capture_index.scan_namespace(_get_store(), _namespace(user_id))
+    return [(rid, rec["content"], rec["metadata"]) for rid, rec in records.items()]
 
 
 def _record_to_item(rid: str, doc: str, meta: dict, include_content: bool = False) -> MemoryItem:
@@ -292,50 +257,67 @@ async def list_memories(
     source: str = "",
     tier: str = "",
     pinned: Optional[bool] = None,
+    event_type: str = "",
+    tag: str = "",
+    since: str = "",
+    until: str = "",
+    cursor: str = "",
     user_id: str = Depends(get_current_user),
 ) -> MemoryPage:
     """Browse / search user memories with pagination.
 
     `source` matches both the new `source` metadata (e.g. `macos_fs`,
     `browser_chatgpt`) and the legacy `sourceApp` field.
-    `tier` filters by ephemeral|important.
+    `tier` filters by ephemeral|important. `since` / `until` bound the
+    capture timestamp (ISO, `until` exclusive).
+
+    Filters run in SQL against the capture catalog. Pass the returned
+    `next_cursor` back as `cursor` to page by (timestamp, id) keyset, so a
+    deep page costs the same as the first; `page` is kept for offset
+    clients.
     """
-    records = _get_all_user_records(user_id)
-
-    # Apply tier + source filters at the metadata level before mapping.
-    if tier:
-        records = [(rid, doc, meta) for rid, doc, meta in records if (meta or {}).get("tier") == tier]
-    if source:
-        source_norm = source.lower()
-        records = [
-            (rid, doc, meta) for rid, doc, meta in records
-            if (meta or {}).get("source") == source_norm
-            or (meta or {}).get("sourceApp") == source_norm
-            or (meta or {}).get("source") == source
-            or (meta or {}).get("sourceApp") == source
-        ]
-
-    items = [_record_to_item(rid, doc, meta) for rid, doc, meta in records]
-
-    # Filter
-    if q:
-        q_lower = q.lower()
-        items = [
-            it for it in items
-            if q_lower in it.title.lower() or q_lower in it.summary.lower()
-        ]
-    if pinned is not None:
-        items = [it for it in items if it.pinned == pinned]
-
-    # Sort newest first
-    items.sort(key=lambda x: x.timestamp, reverse=True)
+    from apps.shail import capture_index
 
-    total = len(items)
-    pages = max(1, (total + limit - 1) // limit)
-    start = (page - 1) * limit
-    page_items = items[start : start + limit]
+    limit = max(1, min(limit, 500))
+    page = max(1, page)
+    namespace = _namespace(user_id)
+    filters: Dict[str, Any] = {
+        "q": q or None,
+        "source": source or None,
+        "tier": tier or None,
+        "pinned": pinned,
+        "event_type": event_type or None,
+        "tag": tag or None,
+        "after": since or None,
+        "before": until or None,
+    }
+    keyset = None
+    if cursor:
+        keyset = capture_index.decode_cursor(cursor)
+        if keyset is None:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
 
-    return MemoryPage(items=page_items, total=total, page=page, limit=limit, pages=pages)
+    try:
+        capture_index.ensure_seeded(namespace, _get_store())
+        total = capture_index.count(namespace, **filters)
+        records, next_cursor = capture_index.list_page(
+            namespace,
+            limit=limit,
+            offset=0 if keyset else (page - 1) * limit,
+            cursor=keyset,
+            **filters,
+        )
+    except Exception as exc:
+        logger.warning("Failed to read capture catalog for namespace %s: %s", namespace, exc)
+        total, records, next_cursor = 0, [], None
+
+    page_items = [_record_to_item(rid, doc, meta) for rid, doc, meta in records]
+
+    pages = max(1, (total + limit - 1) // limit)
+    return MemoryPage(
+        items=page_items, total=total, page=page, limit=limit, pages=pages,
+        next_cursor=next_cursor,
+    )
 
 
 @dashboard_router.get("/memories/{memory_id}", response_model=MemoryItem)
@@ -387,50 +369,28 @@ async def related_memories(
 ) -> List[MemoryItem]:
     """Return memories related to a given memory.
 
-    Cheap heuristic v1: same sourceUrl OR shared tag OR same conversationId.
-    Falls back to same sourceApp + closest-by-time if nothing else hits.
-    Excludes the source memory itself.
+    One kNN over the target's stored chunk embeddings, blended with the
+    metadata heuristics (conversationId, sourceUrl, tags, sourceApp); falls
+    back to same sourceApp + closest-by-time. Excludes the source memory
+    itself. Neighbour lists are cached (see `related_memories`).
     """
-    records = _get_all_user_records(user_id)
-    target = next(((rid, doc, meta) for rid, doc, meta in records if rid == memory_id), None)
+    from apps.shail import capture_index
+    from apps.shail import related_memories as _related
+
+    namespace = _namespace(user_id)
+    store = _get_store()
+    try:
+        capture_index.ensure_seeded(namespace, store)
+        target = next(iter(capture_index.get_records(namespace, [memory_id])), None)
+    except Exception as exc:
+        logger.warning("Failed to read capture catalog for namespace %s: %s", namespace, exc)
+        target = None
     if not target:
         raise HTTPException(status_code=404, detail="Memory not found")
 
-    _, _, t_meta = target
-    t_meta = t_meta or {}
-    t_url = t_meta.get("sourceUrl", "")
-    t_conv = t_meta.get("conversationId")
-    t_tags = set(_parse_tags(t_meta.get("tags")))
-    t_app = t_meta.get("sourceApp", "")
-    t_ts = t_meta.get("timestamp", "")
-
-    scored: list[tuple[float, str, str, dict]] = []
-    for rid, doc, meta in records:
-        if rid == memory_id:
-            continue
-        meta = meta or {}
-        score = 0.0
-        if t_conv and meta.get("conversationId") == t_conv:
-            score += 4.0
-        if t_url and meta.get("sourceUrl", "") == t_url:
-            score += 2.0
-        overlap = t_tags & set(_parse_tags(meta.get("tags")))
-        if overlap:
-            score += 1.0 + 0.25 * len(overlap)
-        if t_app and meta.get("sourceApp") == t_app:
-            score += 0.25
-        if score > 0:
-            scored.append((score, rid, doc, meta))
-
-    if not scored:
-        # Fallback: closest-by-time within same sourceApp.
-        same_app = [(rid, doc, meta) for rid, doc, meta in records
-                    if rid != memory_id and (meta or {}).get("sourceApp") == t_app]
-        same_app.sort(key=lambda r: abs(((r[2] or {}).get("timestamp", "") > t_ts) - 0))
-        scored = [(0.1, rid, doc, meta) for rid, doc, meta in same_app[:limit]]
-
-    scored.sort(key=lambda x: x[0], reverse=True)
-    return [_record_to_item(rid, doc, meta) for _, rid, doc, meta in scored[:limit]]
+    limit = max(1, min(limit, _related.MAX_RELATED))
+    records = _related.related(namespace, target, store, parse_tags=_parse_tags, limit=limit)
+    return [_record_to_item(rid, doc, meta) for rid, doc, meta in records]
 
 
 @dashboard_router.patch("/memories/{memory_id}", response_model=MemoryItem)
@@ -492,6 +452,11 @@ async def patch_memory(
 
     try:
         store.collection.update(ids=[memory_id], metadatas=[meta])
+        try:
+            from apps.shail import capture_index
+            capture_index.patch_metadata(memory_id, {"pinned": meta.get("pinned"), "tags": meta.get("tags")})
+        except Exception as idx_exc:
+            logger.warning("Capture catalog update failed for %s: %s", memory_id, idx_exc)
         try:
             from apps.shail import raw_transcripts as _rt
             raw = _rt.get(memory_id)
@@ -609,60 +574,31 @@ async def bulk_delete(
 async def get_stats(
     user_id: str = Depends(get_current_user),
 ) -> DashboardStats:
-    """Compute aggregate stats for the dashboard overview."""
-    records = _get_all_user_records(user_id)
-    total = len(records)
+    """Compute aggregate stats for the dashboard overview from the capture catalog."""
+    from apps.shail import capture_index
 
+    namespace = _namespace(user_id)
     now = datetime.now(timezone.utc)
     week_ago  = (now - timedelta(days=7)).isoformat()
     month_ago = (now - timedelta(days=30)).isoformat()
 
-    this_week  = 0
-    this_month = 0
-    source_counts: Counter = Counter()
-    domain_counts: Counter = Counter()
-    pinned_count = 0
-    day_counts: defaultdict = defaultdict(int)
-
-    for _, _, meta in records:
-        meta = meta or {}
-        ts = meta.get("timestamp", "")
-        if ts >= week_ago:
-            this_week += 1
-        if ts >= month_ago:
-            this_month += 1
-            # Bin by day for the 30-day chart
-            try:
-                day_key = ts[:10]  # "YYYY-MM-DD"
-                day_counts[day_key] += 1
-            except Exception:
-                pass
-        source_counts[meta.get("sourceApp", "web")] += 1
-        domain_counts[_extract_domain(meta.get("sourceUrl", ""))] += 1
-        if meta.get("pinned") == "true":
-            pinned_count += 1
+    capture_index.ensure_seeded(namespace, _get_store())
+    agg = capture_index.summary_stats(namespace, week_ago=week_ago, month_ago=month_ago)
 
     # Build 30-day series (fill in zeros for missing days)
     day_series = []
     for i in range(30, -1, -1):
         day = (now - timedelta(days=i)).strftime("%Y-%m-%d")
-        day_series.append({"date": day, "count": day_counts.get(day, 0)})
-
-    # Top 5 domains
-    top_domains = [
-        {"domain": d, "count": c}
-        for d, c in domain_counts.most_common(5)
-        if d
-    ]
+        day_series.append({"date": day, "count": agg["by_day"].get(day, 0)})
 
     return DashboardStats(
-        total=total,
-        this_week=this_week,
-        this_month=this_month,
-        by_source=dict(source_counts),
+        total=agg["total"],
+        this_week=agg["this_week"],
+        this_month=agg["this_month"],
+        by_source=agg["by_source"],
         by_day_last_30=day_series,
-        pinned_count=pinned_count,
-        top_domains=top_domains,
+        pinned_count=agg["pinned"],
+        top_domains=agg["top_domains"],
     )
 
 
@@ -672,7 +608,7 @@ async def export_memories(
     user_id: str = Depends(get_current_user),
 ) -> Response:
     """Export all user memories as JSON or Markdown."""
-    records = _get_all_user_records(user_id)
+    records = _scan_user_records(user_id)
     items = [_record_to_item(rid, doc, meta, include_content=True) for rid, doc, meta in records]
     items.sort(key=lambda x: x.timestamp, reverse=True)
 
@@ -732,10 +668,13 @@ class MemoryGraph(BaseModel):
 @dashboard_router.get("/graph", response_model=MemoryGraph)
 @dashboard_router.get("/memories/graph", response_model=MemoryGraph)
 async def memory_graph(
+    center: str = "",
+    depth: int = 1,
+    max_nodes: int = 0,
     user_id: str = Depends(get_current_user),
 ) -> MemoryGraph:
     """
-    Build a semantic knowledge graph from the user's memories.
+    Knowledge graph over the user's memories.
 
     Edge types (in priority order):
       1. conversation  — same conversationId / chat session
@@ -748,139 +687,34 @@ async def memory_graph(
     Each edge has a `type` and `weight` field so the dashboard can style edges
     differently. Multiple edge types between the same pair are collapsed into
     one edge (highest weight wins).
+
+    Edges are persisted and maintained per capture (see `memory_graph`).
+    `center` returns the ego-graph around one memory out to `depth` hops;
+    `max_nodes` caps the node count (newest first for the full graph,
+    strongest links first for an ego-graph).
     """
-    records = _get_all_user_records(user_id)
-
-    nodes: List[GraphNode] = []
-    edges: List[GraphEdge] = []
-
-    # Index structures for fast link discovery
-    conv_to_ids: dict[str, list[str]] = defaultdict(list)
-    url_to_ids: dict[str, list[str]] = defaultdict(list)
-    domain_to_ids: dict[str, list[str]] = defaultdict(list)
-    day_app_to_ids: dict[str, list[str]] = defaultdict(list)
-    tag_to_ids: dict[str, list[str]] = defaultdict(list)
-
-    # For token-overlap linkage
-    rid_tokens: dict[str, set[str]] = {}
-    STOP = {"the", "a", "an", "of", "to", "in", "is", "and", "for", "on",
-            "at", "it", "as", "be", "by", "or", "this", "that", "with",
-            "from", "was", "are", "has", "have", "had", "not", "but", "web"}
-
-    for rid, _doc, meta in records:
-        meta = meta or {}
-        ts    = meta.get("timestamp", datetime.now(timezone.utc).isoformat())
-        label = meta.get("title") or meta.get("sourceUrl", rid)[:60]
-        importance = float(meta.get("importance_score", 0.5))
-
-        nodes.append(GraphNode(
-            id=rid,
-            label=label,
-            type=meta.get("eventType", "page_visit"),
-            sourceApp=meta.get("sourceApp", "web"),
-            timestamp=ts,
-            importance=importance,
-        ))
-
-        conv = meta.get("conversationId") or meta.get("sessionId")
-        if conv:
-            conv_to_ids[conv].append(rid)
-
-        url = meta.get("sourceUrl", "")
-        if url and len(url) > 8:
-            url_to_ids[url].append(rid)
-            domain = _extract_domain(url)
-            if domain:
-                domain_to_ids[domain].append(rid)
-
-        day = ts[:10]
-        app = meta.get("sourceApp", "web")
-        if day and app:
-            day_app_to_ids[f"{day}::{app}"].append(rid)
-
-        raw_tags = _parse_tags(meta.get("tags"))
-        for tag in raw_tags:
-            t = tag.strip().lower()
-            if t:
-                tag_to_ids[t].append(rid)
-
-        # token set for overlap scoring
-        text = f"{label} {meta.get('summary', '')}".lower()
-        tokens = {w for w in text.split() if len(w) > 3 and w not in STOP}
-        if tokens:
-            rid_tokens[rid] = tokens
-
-    # Build edge set (deduplicated by pair, best weight wins)
-    edge_map: dict[tuple[str, str], dict] = {}
-
-    def _add_edge(a: str, b: str, etype: str, weight: float) -> None:
-        key = (min(a, b), max(a, b))
-        if key not in edge_map or edge_map[key]["weight"] < weight:
-            edge_map[key] = {"type": etype, "weight": weight}
-
-    # 1. Conversation edges (weight 1.0)
-    for ids in conv_to_ids.values():
-        for i in range(len(ids)):
-            for j in range(i + 1, min(i + 6, len(ids))):
-                _add_edge(ids[i], ids[j], "conversation", 1.0)
-
-    # 2. Same URL (weight 0.95)
-    for ids in url_to_ids.values():
-        for i in range(len(ids)):
-            for j in range(i + 1, min(i + 8, len(ids))):
-                _add_edge(ids[i], ids[j], "same_url", 0.95)
-
-    # 3. Shared domain (weight 0.5) — cap per domain to avoid explosion
-    for ids in domain_to_ids.values():
-        # only link adjacent (sorted by time), max 6 per domain
-        bucket = ids[:8]
-        for i in range(len(bucket) - 1):
-            _add_edge(bucket[i], bucket[i + 1], "shared_domain", 0.5)
-
-    # 4. Shared tags (weight 0.7)
-    for tag_ids in tag_to_ids.values():
-        bucket = tag_ids[:10]
-        for i in range(len(bucket)):
-            for j in range(i + 1, len(bucket)):
-                _add_edge(bucket[i], bucket[j], "shared_tags", 0.7)
-
-    # 5. Same app+day (weight 0.3, cap at 5 per bucket)
-    for ids in day_app_to_ids.values():
-        bucket = ids[:6]
-        for i in range(len(bucket) - 1):
-            _add_edge(bucket[i], bucket[i + 1], "same_app_day", 0.3)
-
-    # 6. Token overlap (weight proportional to Jaccard similarity)
-    # Only compute for nodes that aren't already heavily connected
-    id_list = [r for r, _, _ in records if r in rid_tokens]
-    # Limit O(n²) to manageable size — process at most 200 most-recent nodes
-    id_list = id_list[:200]
-    for i in range(len(id_list)):
-        for j in range(i + 1, len(id_list)):
-            a, b = id_list[i], id_list[j]
-            key = (min(a, b), max(a, b))
-            if key in edge_map:
-                continue  # already linked by stronger signal
-            ta, tb = rid_tokens.get(a, set()), rid_tokens.get(b, set())
-            if not ta or not tb:
-                continue
-            inter = len(ta & tb)
-            if inter < 2:
-                continue
-            jaccard = inter / len(ta | tb)
-            if jaccard >= 0.15:
-                _add_edge(a, b, "token_overlap", round(jaccard * 0.6, 3))
-
-    # Materialise edges
-    for (src, tgt), props in edge_map.items():
-        edges.append(GraphEdge(
-            source=src,
-            target=tgt,
-            type=props.get("type", "same_day"),
-            weight=props.get("weight", 0.3),
-        ))
-
-    return MemoryGraph(nodes=nodes, edges=edges)
+    from apps.shail import capture_index
+    from apps.shail import memory_graph as _graph
+
+    namespace = _namespace(user_id)
+    try:
+        capture_index.ensure_seeded(namespace, _get_store())
+        nodes, edges = _graph.load_graph(
+            namespace,
+            center=center or None,
+            depth=max(1, min(depth, 3)),
+            max_nodes=max_nodes if max_nodes > 0 else None,
+        )
+    except Exception as exc:
+        logger.warning("Failed to load memory graph for namespace %s: %s", namespace, exc)
+        nodes, edges = [], []
+    if center and not nodes:
+        raise HTTPException(status_code=404, detail="Memory not found")
+
+    return MemoryGraph(
+        nodes=[GraphNode(**n) for n in nodes],
+        edges=[GraphEdge(**e) for e in edges],
+    )
 
 
 
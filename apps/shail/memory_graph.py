@@ -0,0 +1,480 @@
+"""memory_graph — persisted edge set behind `/api/v2/graph`.
+
+The dashboard graph used to be rebuilt from every record on every request,
+including an O(n²) token-overlap pass capped at the 200 newest nodes. Edges
+now live in `memory_graph_edges` and are maintained per capture:
+
+  * Link terms (conversation, url, domain, tag, app+day, title/summary
+    tokens) are stored in `memory_graph_terms`, an inverted term → ids
+    index. A new capture links to the most recent holders of each term
+    (bounded fan-out per edge type), and token overlap only scores ids that
+    share a posting with it — no pairwise scan.
+  * `capture_index` calls `refresh_nodes` / `drop_node` from its writers,
+    so captures, patches and deletes keep the graph current. A namespace is
+    built once (`ensure_built`) by replaying its catalog oldest-first
+    through the same linking rules.
+
+`load_graph` returns the whole graph or, with `center`, a breadth-first
+ego-graph under a node budget.
+"""
+from __future__ import annotations
+
+import json
+import logging
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+from apps.shail.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+# (term kind, edge type, weight, fan-out): a capture links to at most
+# `fan-out` of the most recent earlier captures sharing each term.
+_LINK_RULES = (
+    ("conv", "conversation", 1.0, 5),
+    ("url", "same_url", 0.95, 7),
+    ("tag", "shared_tags", 0.7, 9),
+    ("domain", "shared_domain", 0.5, 1),
+    ("dayapp", "same_app_day", 0.3, 1),
+)
+_TOKEN_KIND = "tok"
+_TOKEN_FANOUT = 8
+_TOKEN_MIN_SHARED = 2
+_TOKEN_MIN_JACCARD = 0.15
+# Tokens held by more captures than this carry no linking signal and would
+# make the candidate stage scale with account size.
+_TOKEN_MAX_DF = 200
+DEFAULT_EGO_NODES = 150
+
+_STOP = {"the", "a", "an", "of", "to", "in", "is", "and", "for", "on",
+         "at", "it", "as", "be", "by", "or", "this", "that", "with",
+         "from", "was", "are", "has", "have", "had", "not", "but", "web"}
+
+_schema_ready_for: Optional[str] = None
+
+Links = Dict[str, Tuple[str, float]]
+
+
+def _conn():
+    from apps.shail.auth_store import _conn as auth_conn
+    return auth_conn()
+
+
+def init_memory_graph_schema() -> None:
+    global _schema_ready_for
+    path = get_settings().sqlite_path
+    if _schema_ready_for == path:
+        return
+    with _conn() as con:
+        con.executescript("""
+            CREATE TABLE IF NOT EXISTS memory_graph_nodes (
+                memory_id   TEXT PRIMARY KEY,
+                namespace   TEXT NOT NULL,
+                token_count INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE TABLE IF NOT EXISTS memory_graph_terms (
+                namespace TEXT NOT NULL,
+                kind      TEXT NOT NULL,
+                term      TEXT NOT NULL,
+                memory_id TEXT NOT NULL,
+                ts        TEXT NOT NULL DEFAULT '',
+                PRIMARY KEY (namespace, kind, term, memory_id)
+            );
+            CREATE INDEX IF NOT EXISTS idx_memory_graph_terms_recent
+                ON memory_graph_terms(namespace, kind, term, ts DESC);
+            CREATE INDEX IF NOT EXISTS idx_memory_graph_terms_mid
+                ON memory_graph_terms(memory_id);
+            CREATE TABLE IF NOT EXISTS memory_graph_edges (
+                namespace TEXT NOT NULL,
+                src       TEXT NOT NULL,
+                tgt       TEXT NOT NULL,
+                type      TEXT NOT NULL,
+                weight    REAL NOT NULL,
+                PRIMARY KEY (src, tgt)
+            );
+            CREATE INDEX IF NOT EXISTS idx_memory_graph_edges_ns
+                ON memory_graph_edges(namespace);
+            CREATE INDEX IF NOT EXISTS idx_memory_graph_edges_tgt
+                ON memory_graph_edges(tgt);
+            CREATE TABLE IF NOT EXISTS memory_graph_built (
+                namespace TEXT PRIMARY KEY,
+                built_at  TEXT NOT NULL
+            );
+        """)
+    _schema_ready_for = path
+
+
+# ── Link terms ───────────────────────────────────────────────────────────────
+
+def _meta(row) -> Dict[str, Any]:
+    try:
+        return json.loads(row["metadata"] or "{}")
+    except (json.JSONDecodeError, TypeError):
+        return {}
+
+
+def _label(row, meta: Mapping[str, Any]) -> str:
+    return meta.get("title") or row["title"] or (row["source_url"] or "")[:60] or row["memory_id"]
+
+
+def _terms_for(row) -> Tuple[Dict[str, List[str]], Set[str]]:
+    """`({kind: [term, ...]}, tokens)` for one catalog row."""
+    meta = _meta(row)
+    terms: Dict[str, List[str]] = defaultdict(list)
+    if row["conversation_id"]:
+        terms["conv"].append(row["conversation_id"])
+    url = row["source_url"] or ""
+    if len(url) > 8:
+        terms["url"].append(url)
+        domain = (row["domain"] or "").lower()
+        if domain.startswith("www."):
+            domain = domain[4:]
+        if domain:
+            terms["domain"].append(domain)
+    day = (row["timestamp"] or "")[:10]
+    if day:
+        terms["dayapp"].append(f"{day}::{row['source_app'] or 'web'}")
+    try:
+        tags = json.loads(row["tags"] or "[]")
+    except (json.JSONDecodeError, TypeError):
+        tags = []
+    terms["tag"].extend(dict.fromkeys(t for t in (str(x).strip().lower() for x in tags) if t))
+    text = f"{_label(row, meta)} {meta.get('summary', '')}".lower()
+    tokens = {w for w in text.split() if len(w) > 3 and w not in _STOP}
+    return terms, tokens
+
+
+def _node_links(
+    memory_id: str,
+    terms: Mapping[str, List[str]],
+    tokens: Set[str],
+    recent: Callable[[str, str, int], List[str]],
+    overlaps: Callable[[Set[str]], Dict[str, Tuple[int, int]]],
+) -> Links:
+    """Edges from `memory_id` to earlier captures; best weight per peer."""
+    links: Links = {}
+
+    def _add(other: str, etype: str, weight: float) -> None:
+        if other == memory_id:
+            return
+        current = links.get(other)
+        if current is None or current[1] < weight:
+            links[other] = (etype, weight)
+
+    for kind, etype, weight, fanout in _LINK_RULES:
+        for term in terms.get(kind, ()):
+            for other in recent(kind, term, fanout):
+                _add(other, etype, weight)
+
+    if tokens:
+        scored = []
+        for other, (shared, other_count) in overlaps(tokens).items():
+            if other == memory_id or shared < _TOKEN_MIN_SHARED:
+                continue
+            jaccard = shared / (len(tokens) + other_count - shared)
+            if jaccard >= _TOKEN_MIN_JACCARD:
+                scored.append((jaccard, other))
+        scored.sort(reverse=True)
+        for jaccard, other in scored[:_TOKEN_FANOUT]:
+            _add(other, "token_overlap", round(jaccard * 0.6, 3))
+    return links
+
+
+def _edge_rows(namespace: str, memory_id: str, links: Links) -> List[tuple]:
+    return [
+        (namespace, min(memory_id, other), max(memory_id, other), etype, weight)
+        for other, (etype, weight) in links.items()
+    ]
+
+
+_EDGE_UPSERT = """
+    INSERT INTO memory_graph_edges(namespace, src, tgt, type, weight)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT(src, tgt) DO UPDATE SET type = excluded.type, weight = excluded.weight
+    WHERE excluded.weight > memory_graph_edges.weight
+"""
+
+_CATALOG_SELECT = (
+    "SELECT memory_id, title, source_url, source_app, domain, conversation_id, "
+    "tags, timestamp, metadata FROM capture_index"
+)
+
+
+# ── Build / maintain ─────────────────────────────────────────────────────────
+
+def is_built(namespace: str) -> bool:
+    init_memory_graph_schema()
+    with _conn() as con:
+        return con.execute(
+            "SELECT 1 FROM memory_graph_built WHERE namespace = ?", (namespace,),
+        ).fetchone() is not None
+
+
+def _clear(con, namespace: str) -> None:
+    for table in ("memory_graph_edges", "memory_graph_terms", "memory_graph_nodes", "memory_graph_built"):
+        con.execute(f"DELETE FROM {table} WHERE namespace = ?", (namespace,))
+
+
+def rebuild(namespace: str) -> int:
+    """Replay the namespace catalog oldest-first through the linking rules."""
+    init_memory_graph_schema()
+    with _conn() as con:
+        rows = con.execute(
+            f"{_CATALOG_SELECT} WHERE namespace = ? ORDER BY timestamp ASC, memory_id ASC",
+            (namespace,),
+        ).fetchall()
+
+    holders: Dict[Tuple[str, str], List[str]] = defaultdict(list)
+    postings: Dict[str, List[str]] = defaultdict(list)
+    token_counts: Dict[str, int] = {}
+    node_rows: List[tuple] = []
+    term_rows: List[tuple] = []
+    edges: Dict[Tuple[str, str], Tuple[str, float]] = {}
+
+    def _recent(kind: str, term: str, limit: int) -> List[str]:
+        ids = holders.get((kind, term), [])
+        return ids[-limit:][::-1]
+
+    def _overlaps(tokens: Set[str]) -> Dict[str, Tuple[int, int]]:
+        shared: Dict[str, int] = defaultdict(int)
+        for token in tokens:
+            ids = postings.get(token, ())
+            if len(ids) > _TOKEN_MAX_DF:
+                continue
+            for other in ids:
+                shared[other] += 1
+        return {other: (n, token_counts[other]) for other, n in shared.items()}
+
+    for row in rows:
+        memory_id = row["memory_id"]
+        terms, tokens = _terms_for(row)
+        links = _node_links(memory_id, terms, tokens, _recent, _overlaps)
+        for _ns, src, tgt, etype, weight in _edge_rows(namespace, memory_id, links):
+            current = edges.get((src, tgt))
+            if current is None or current[1] < weight:
+                edges[(src, tgt)] = (etype, weight)
+        ts = row["timestamp"] or ""
+        for kind, values in terms.items():
+            for term in values:
+                holders[(kind, term)].append(memory_id)
+                term_rows.append((namespace, kind, term, memory_id, ts))
+        for token in tokens:
+            postings[token].append(memory_id)
+            term_rows.append((namespace, _TOKEN_KIND, token, memory_id, ts))
+        token_counts[memory_id] = len(tokens)
+        node_rows.append((memory_id, namespace, len(tokens)))
+
+    with _conn() as con:
+        _clear(con, namespace)
+        con.executemany(
+            "INSERT OR REPLACE INTO memory_graph_nodes(memory_id, namespace, token_count) VALUES (?, ?, ?)",
+            node_rows,
+        )
+        con.executemany(
+            "INSERT OR IGNORE INTO memory_graph_terms(namespace, kind, term, memory_id, ts) VALUES (?, ?, ?, ?, ?)",
+            term_rows,
+        )
+        con.executemany(
+            "INSERT INTO memory_graph_edges(namespace, src, tgt, type, weight) VALUES (?, ?, ?, ?, ?)",
+            [(namespace, src, tgt, etype, weight) for (src, tgt), (etype, weight) in edges.items()],
+        )
+        con.execute(
+            "INSERT OR REPLACE INTO memory_graph_built(namespace, built_at) VALUES (?, ?)",
+            (namespace, datetime.now(timezone.utc).isoformat()),
+        )
+    return len(node_rows)
+
+
+def ensure_built(namespace: str) -> None:
+    if not is_built(namespace):
+        rebuild(namespace)
+
+
+def _drop(con, memory_id: str) -> None:
+    con.execute("DELETE FROM memory_graph_edges WHERE src = ? OR tgt = ?", (memory_id, memory_id))
+    con.execute("DELETE FROM memory_graph_terms WHERE memory_id = ?", (memory_id,))
+    con.execute("DELETE FROM memory_graph_nodes WHERE memory_id = ?", (memory_id,))
+
+
+def drop_node(memory_id: str) -> None:
+    init_memory_graph_schema()
+    with _conn() as con:
+        _drop(con, memory_id)
+
+
+def invalidate(namespace: str) -> None:
+    """Forget a namespace's graph; the next read rebuilds it."""
+    init_memory_graph_schema()
+    with _conn() as con:
+        _clear(con, namespace)
+
+
+def refresh_nodes(namespace: str, memory_ids: Iterable[str]) -> None:
+    """Re-link the given catalog rows. No-op until the namespace is built."""
+    ids = list(dict.fromkeys(m for m in memory_ids if m))
+    if not ids or not is_built(namespace):
+        return
+    with _conn() as con:
+        for memory_id in ids:
+            _drop(con, memory_id)
+            row = con.execute(
+                f"{_CATALOG_SELECT} WHERE memory_id = ? AND namespace = ?", (memory_id, namespace),
+            ).fetchone()
+            if row is None:
+                continue
+            terms, tokens = _terms_for(row)
+
+            def _recent(kind: str, term: str, limit: int) -> List[str]:
+                return [
+                    r["memory_id"] for r in con.execute(
+                        """SELECT memory_id FROM memory_graph_terms
+                           WHERE namespace = ? AND kind = ? AND term = ?
+                           ORDER BY ts DESC LIMIT ?""",
+                        (namespace, kind, term, limit),
+                    ).fetchall()
+                ]
+
+            def _overlaps(tokens: Set[str]) -> Dict[str, Tuple[int, int]]:
+                wanted = sorted(tokens)
+                marks = ", ".join("?" * len(wanted))
+                usable = [
+                    r["term"] for r in con.execute(
+                        f"""SELECT term FROM memory_graph_terms
+                            WHERE namespace = ? AND kind = ? AND term IN ({marks})
+                            GROUP BY term HAVING COUNT(*) <= ?""",
+                        (namespace, _TOKEN_KIND, *wanted, _TOKEN_MAX_DF),
+                    ).fetchall()
+                ]
+                if not usable:
+                    return {}
+                marks = ", ".join("?" * len(usable))
+                return {
+                    r["memory_id"]: (int(r["shared"]), int(r["token_count"]))
+                    for r in con.execute(
+                        f"""SELECT t.memory_id, COUNT(*) AS shared, n.token_count
+                            FROM memory_graph_terms t
+                            JOIN memory_graph_nodes n ON n.memory_id = t.memory_id
+                            WHERE t.namespace = ? AND t.kind = ? AND t.term IN ({marks})
+                            GROUP BY t.memory_id""",
+                        (namespace, _TOKEN_KIND, *usable),
+                    ).fetchall()
+                }
+
+            links = _node_links(memory_id, terms, tokens, _recent, _overlaps)
+            con.executemany(_EDGE_UPSERT, _edge_rows(namespace, memory_id, links))
+            ts = row["timestamp"] or ""
+            con.executemany(
+                "INSERT OR IGNORE INTO memory_graph_terms(namespace, kind, term, memory_id, ts) VALUES (?, ?, ?, ?, ?)",
+                [(namespace, kind, term, memory_id, ts) for kind, values in terms.items() for term in values]
+                + [(namespace, _TOKEN_KIND, token, memory_id, ts) for token in tokens],
+            )
+            con.execute(
+                "INSERT OR REPLACE INTO memory_graph_nodes(memory_id, namespace, token_count) VALUES (?, ?, ?)",
+                (memory_id, namespace, len(tokens)),
+            )
+
+
+# ── Read ─────────────────────────────────────────────────────────────────────
+
+def _node_dict(row) -> Dict[str, Any]:
+    meta = _meta(row)
+    try:
+        importance = float(meta.get("importance_score", 0.5))
+    except (TypeError, ValueError):
+        importance = 0.5
+    return {
+        "id": row["memory_id"],
+        "label": _label(row, meta),
+        "type": meta.get("eventType", "page_visit"),
+        "sourceApp": meta.get("sourceApp", "web"),
+        "timestamp": meta.get("timestamp") or row["timestamp"],
+        "importance": importance,
+    }
+
+
+def _edge_dict(row) -> Dict[str, Any]:
+    return {"source": row["src"], "target": row["tgt"], "type": row["type"], "weight": row["weight"]}
+
+
+def _nodes(con, namespace: str, ids: Optional[List[str]] = None, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    sql = f"{_CATALOG_SELECT} WHERE namespace = ?"
+    args: list = [namespace]
+    if ids is not None:
+        if not ids:
+            return []
+        sql += f" AND memory_id IN ({', '.join('?' * len(ids))})"
+        args.extend(ids)
+    sql += " ORDER BY timestamp DESC, memory_id DESC"
+    if limit:
+        sql += " LIMIT ?"
+        args.append(int(limit))
+    return [_node_dict(r) for r in con.execute(sql, args).fetchall()]
+
+
+def _ego_ids(con, center: str, depth: int, budget: int) -> List[str]:
+    """Breadth-first from `center`, strongest edges first, until `budget`."""
+    seen = [center]
+    visited = {center}
+    frontier = [center]
+    for _ in range(max(1, depth)):
+        candidates: Dict[str, float] = {}
+        for node in frontier:
+            for r in con.execute(
+                """SELECT src, tgt, weight FROM memory_graph_edges
+                   WHERE src = ? OR tgt = ?""",
+                (node, node),
+            ).fetchall():
+                other = r["tgt"] if r["src"] == node else r["src"]
+                if other not in visited:
+                    candidates[other] = max(candidates.get(other, 0.0), float(r["weight"]))
+        frontier = []
+        for other, _w in sorted(candidates.items(), key=lambda kv: (-kv[1], kv[0])):
+            if len(seen) >= budget:
+                return seen
+            seen.append(other)
+            visited.add(other)
+            frontier.append(other)
+        if not frontier:
+            break
+    return seen
+
+
+def load_graph(
+    namespace: str,
+    *,
+    center: Optional[str] = None,
+    depth: int = 1,
+    max_nodes: Optional[int] = None,
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """`(nodes, edges)` for the whole namespace or an ego-graph around `center`.
+
+    Without `center`, `max_nodes` keeps the newest captures. Only edges whose
+    endpoints are both returned are included.
+    """
+    ensure_built(namespace)
+    with _conn() as con:
+        if center:
+            owned = con.execute(
+                "SELECT 1 FROM capture_index WHERE memory_id = ? AND namespace = ?", (center, namespace),
+            ).fetchone()
+            if owned is None:
+                return [], []
+            ids = _ego_ids(con, center, depth, max_nodes or DEFAULT_EGO_NODES)
+            nodes = _nodes(con, namespace, ids=ids)
+        else:
+            nodes = _nodes(con, namespace, limit=max_nodes)
+        keep = {n["id"] for n in nodes}
+        if center:
+            marks = ", ".join("?" * len(keep))
+            rows = con.execute(
+                f"""SELECT src, tgt, type, weight FROM memory_graph_edges
+                    WHERE src IN ({marks}) AND tgt IN ({marks})""",
+                (*keep, *keep),
+            ).fetchall()
+        else:
+            rows = con.execute(
+                "SELECT src, tgt, type, weight FROM memory_graph_edges WHERE namespace = ?", (namespace,),
+            ).fetchall()
+        edges = [_edge_dict(r) for r in rows if r["src"] in keep and r["tgt"] in keep]
+    return nodes, edges
@@ -140,6 +140,8 @@ def save(
              seg_blob, content_chars, seg_count, capture_mode),
         )
 
+    _sync_capture_index(memory_id, namespace, content, {"eventType": content_type, **(metadata or {})})
+
     _ps.mark_stage(memory_id, "captured", "done", size_bytes=content_chars,
                    detail={"content_type": content_type, "segments": seg_count})
     _ps.mark_stage(memory_id, "transcript_ready", "done", size_bytes=content_chars,
@@ -149,6 +151,15 @@ def save(
                        detail={"kinds": _kind_histogram(parsed)})
 
 
+def _sync_capture_index(memory_id: str, namespace: str, content: str, metadata: dict) -> None:
+    """Keep the lexical search index in step with this row. Best-effort."""
+    try:
+        from apps.shail import capture_index
+        capture_index.upsert(memory_id, namespace, content, metadata)
+    except Exception as exc:
+        logger.warning("capture_index sync failed for %s: %s", memory_id, exc)
+
+
 def _kind_histogram(segments: list) -> dict:
     out: dict = {}
     for s in segments:
@@ -178,6 +189,11 @@ def mark_embedded(memory_id: str, embedded: bool = True) -> None:
             "UPDATE raw_transcripts SET embedded = ? WHERE memory_id = ?",
             (1 if embedded else 0, memory_id),
         )
+    try:
+        from apps.shail import capture_index
+        capture_index.mark_embedded(memory_id, embedded)
+    except Exception as exc:
+        logger.warning("capture_index embed flag failed for %s: %s", memory_id, exc)
     _ps.mark_stage(memory_id, "embedded", "done" if embedded else "failed")
 
 
@@ -242,6 +258,10 @@ def redact_if_blueprinted(memory_id: str, *, reason: str = "manual") -> Dict[str
         if not row:
             return {"ok": False, "reason": "not_found", "memory_id": memory_id}
         previous_chars = int(row["content_chars"] or 0)
+        indexed = con.execute(
+            "SELECT namespace, metadata FROM raw_transcripts WHERE memory_id = ?",
+            (memory_id,),
+        ).fetchone()
         con.execute(
             """UPDATE raw_transcripts
                SET content = '',
@@ -254,6 +274,11 @@ def redact_if_blueprinted(memory_id: str, *, reason: str = "manual") -> Dict[str
                WHERE memory_id = ?""",
             (deleted_at, reason, memory_id),
         )
+    try:
+        redacted_meta = json.loads(indexed["metadata"] or "{}")
+    except (json.JSONDecodeError, TypeError):
+        redacted_meta = {}
+    _sync_capture_index(memory_id, indexed["namespace"], "", redacted_meta)
     _ps.mark_stage(
         memory_id,
         "transcript_ready",
@@ -410,6 +435,11 @@ def delete(memory_id: str) -> None:
     init_raw_transcripts_schema()
     with _conn() as con:
         con.execute("DELETE FROM raw_transcripts WHERE memory_id = ?", (memory_id,))
+    try:
+        from apps.shail import capture_index
+        capture_index.delete(memory_id)
+    except Exception as exc:
+        logger.warning("capture_index delete failed for %s: %s", memory_id, exc)
 
 
 def stats() -> Dict[str, int]:
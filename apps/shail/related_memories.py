@@ -0,0 +1,264 @@
+"""related_memories — neighbours for `/api/v2/memories/{id}/related`.
+
+Ranking blends one ANN query with the metadata heuristics the endpoint has
+always used:
+
+  * vector — the target's chunk embeddings are read back from the store and
+    averaged into a centroid; a single kNN over the namespace returns chunk
+    hits, folded to logical memory ids (best similarity wins).
+  * metadata — same conversationId (+4), same sourceUrl (+2), shared tags
+    (+1, +0.25 per tag), same sourceApp (+0.25). Conversation, URL and tag
+    peers are pulled from the capture catalog by index, so no corpus scan is
+    needed.
+
+If neither produces a hit the nearest captures in time from the same app are
+returned. Ranked lists are cached per memory in SQLite for
+`_CACHE_TTL_SECONDS`; a delete drops the memory's own list and every list
+that names it (`capture_index` calls `invalidate`).
+"""
+from __future__ import annotations
+
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from apps.shail.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+MAX_RELATED = 50
+_CACHE_TTL_SECONDS = 3600
+_VECTOR_WEIGHT = 4.0
+# Chunk hits fetched per requested neighbour; several chunks usually belong
+# to the same logical memory.
+_KNN_OVERFETCH = 4
+
+_schema_ready_for: Optional[str] = None
+
+Record = Tuple[str, str, Dict[str, Any]]
+
+
+def _conn():
+    from apps.shail.auth_store import _conn as auth_conn
+    return auth_conn()
+
+
+def init_related_cache_schema() -> None:
+    global _schema_ready_for
+    path = get_settings().sqlite_path
+    if _schema_ready_for == path:
+        return
+    with _conn() as con:
+        con.executescript("""
+            CREATE TABLE IF NOT EXISTS related_memories_computed (
+                memory_id   TEXT PRIMARY KEY,
+                namespace   TEXT NOT NULL,
+                computed_at TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS related_memories_cache (
+                memory_id   TEXT NOT NULL,
+                neighbor_id TEXT NOT NULL,
+                rank        INTEGER NOT NULL,
+                score       REAL NOT NULL,
+                PRIMARY KEY (memory_id, neighbor_id)
+            );
+            CREATE INDEX IF NOT EXISTS idx_related_memories_neighbor
+                ON related_memories_cache(neighbor_id);
+        """)
+    _schema_ready_for = path
+
+
+# ── Cache ────────────────────────────────────────────────────────────────────
+
+def _cached(namespace: str, memory_id: str) -> Optional[List[Tuple[str, float]]]:
+    init_related_cache_schema()
+    cutoff = (datetime.now(timezone.utc) - timedelta(seconds=_CACHE_TTL_SECONDS)).isoformat()
+    with _conn() as con:
+        row = con.execute(
+            """SELECT 1 FROM related_memories_computed
+               WHERE memory_id = ? AND namespace = ? AND computed_at >= ?""",
+            (memory_id, namespace, cutoff),
+        ).fetchone()
+        if row is None:
+            return None
+        rows = con.execute(
+            "SELECT neighbor_id, score FROM related_memories_cache WHERE memory_id = ? ORDER BY rank",
+            (memory_id,),
+        ).fetchall()
+    return [(r["neighbor_id"], float(r["score"])) for r in rows]
+
+
+def _store_cache(namespace: str, memory_id: str, ranked: List[Tuple[str, float]]) -> None:
+    init_related_cache_schema()
+    with _conn() as con:
+        con.execute("DELETE FROM related_memories_cache WHERE memory_id = ?", (memory_id,))
+        con.executemany(
+            "INSERT INTO related_memories_cache(memory_id, neighbor_id, rank, score) VALUES (?, ?, ?, ?)",
+            [(memory_id, nid, rank, score) for rank, (nid, score) in enumerate(ranked)],
+        )
+        con.execute(
+            "INSERT OR REPLACE INTO related_memories_computed(memory_id, namespace, computed_at) VALUES (?, ?, ?)",
+            (memory_id, namespace, datetime.now(timezone.utc).isoformat()),
+        )
+
+
+def invalidate(memory_id: str) -> None:
+    """Drop `memory_id`'s cached list and every list that contains it."""
+    init_related_cache_schema()
+    with _conn() as con:
+        owners = [
+            r["memory_id"] for r in con.execute(
+                "SELECT memory_id FROM related_memories_cache WHERE neighbor_id = ?", (memory_id,),
+            ).fetchall()
+        ]
+        stale = list(dict.fromkeys([memory_id, *owners]))
+        marks = ", ".join("?" * len(stale))
+        con.execute(f"DELETE FROM related_memories_cache WHERE memory_id IN ({marks})", stale)
+        con.execute(f"DELETE FROM related_memories_computed WHERE memory_id IN ({marks})", stale)
+
+
+# ── Ranking ──────────────────────────────────────────────────────────────────
+
+def _logical_id(record_id: str, meta: Mapping[str, Any]) -> str:
+    return meta.get("customId") or meta.get("parent_memory_id") or meta.get("id") or record_id
+
+
+def _target_centroid(store, namespace: str, memory_id: str) -> Optional[List[float]]:
+    """Mean of the stored chunk embeddings for one logical memory."""
+    collection = getattr(store, "collection", None)
+    if collection is None:
+        return None
+    vectors: Dict[str, List[float]] = {}
+    lookups = (
+        {"ids": [memory_id], "where": {"namespace": namespace}},
+        {"where": {"$and": [{"namespace": namespace}, {"customId": memory_id}]}},
+        {"where": {"$and": [{"namespace": namespace}, {"parent_memory_id": memory_id}]}},
+    )
+    for kwargs in lookups:
+        try:
+            result = collection.get(include=["embeddings"], **kwargs)
+        except Exception as exc:
+            logger.warning("related: embedding lookup failed for %s: %s", memory_id, exc)
+            continue
+        embeddings = result.get("embeddings")
+        if embeddings is None:
+            continue
+        for rid, emb in zip(result.get("ids", []) or [], embeddings):
+            if emb is not None and len(emb):
+                vectors[rid] = [float(x) for x in emb]
+    if not vectors:
+        return None
+    dim = len(next(iter(vectors.values())))
+    rows = [v for v in vectors.values() if len(v) == dim]
+    return [sum(col) / len(rows) for col in zip(*rows)]
+
+
+def _vector_neighbors(store, namespace: str, memory_id: str, k: int) -> Dict[str, float]:
+    centroid = _target_centroid(store, namespace, memory_id)
+    if centroid is None or not hasattr(store, "query"):
+        return {}
+    try:
+        hits = store.query(centroid, namespace, None, k * _KNN_OVERFETCH)
+    except Exception as exc:
+        logger.warning("related: kNN query failed for %s: %s", memory_id, exc)
+        return {}
+    sims: Dict[str, float] = {}
+    for hit in hits:
+        logical = _logical_id(hit.get("id", ""), hit.get("metadata") or {})
+        if not logical or logical == memory_id:
+            continue
+        try:
+            sim = 1.0 - float(hit.get("score", 1.0))
+        except (TypeError, ValueError):
+            continue
+        if sim > sims.get(logical, 0.0):
+            sims[logical] = sim
+    return sims
+
+
+def _metadata_score(target: Mapping[str, Any], meta: Mapping[str, Any], parse_tags) -> float:
+    score = 0.0
+    t_conv = target.get("conversationId")
+    if t_conv and meta.get("conversationId") == t_conv:
+        score += 4.0
+    t_url = target.get("sourceUrl", "")
+    if t_url and meta.get("sourceUrl", "") == t_url:
+        score += 2.0
+    overlap = set(parse_tags(target.get("tags"))) & set(parse_tags(meta.get("tags")))
+    if overlap:
+        score += 1.0 + 0.25 * len(overlap)
+    t_app = target.get("sourceApp", "")
+    if t_app and meta.get("sourceApp") == t_app:
+        score += 0.25
+    return score
+
+
+def rank(
+    namespace: str,
+    target: Record,
+    store,
+    *,
+    parse_tags,
+    k: int = MAX_RELATED,
+) -> List[Tuple[str, float]]:
+    """`[(memory_id, score)]` best first, uncached."""
+    from apps.shail import capture_index
+
+    memory_id, _doc, t_meta = target
+    sims = _vector_neighbors(store, namespace, memory_id, k)
+
+    candidates: Dict[str, Dict[str, Any]] = {}
+    if t_meta.get("conversationId"):
+        for rid, _d, meta in capture_index.list_records(
+            namespace, conversation_id=t_meta["conversationId"], limit=k,
+        ):
+            candidates[rid] = meta
+    if t_meta.get("sourceUrl"):
+        for rid, _d, meta in capture_index.list_records(namespace, source_url=t_meta["sourceUrl"], limit=k):
+            candidates[rid] = meta
+    for tag in dict.fromkeys(parse_tags(t_meta.get("tags"))):
+        for rid, _d, meta in capture_index.list_records(namespace, tag=tag, limit=k):
+            candidates.setdefault(rid, meta)
+    missing = [rid for rid in sims if rid not in candidates]
+    for rid, _d, meta in capture_index.get_records(namespace, missing):
+        candidates[rid] = meta
+
+    scored: List[Tuple[str, float]] = []
+    for rid, meta in candidates.items():
+        if rid == memory_id:
+            continue
+        score = _metadata_score(t_meta, meta, parse_tags) + _VECTOR_WEIGHT * sims.get(rid, 0.0)
+        if score > 0.25 or rid in sims:
+            scored.append((rid, round(score, 4)))
+    scored.sort(key=lambda x: (-x[1], x[0]))
+
+    if not scored:
+        # Fallback: closest-by-time within the same sourceApp.
+        nearest = capture_index.nearest_in_time(
+            namespace,
+            t_meta.get("timestamp", ""),
+            source_app=t_meta.get("sourceApp") or None,
+            exclude=memory_id,
+            limit=k,
+        )
+        scored = [(rid, 0.1) for rid, _d, _m in nearest]
+    return scored[:k]
+
+
+def related(namespace: str, target: Record, store, *, parse_tags, limit: int) -> List[Record]:
+    """Cached neighbours of `target` as catalog records, best first."""
+    from apps.shail import capture_index
+
+    memory_id = target[0]
+    ranked = None
+    try:
+        ranked = _cached(namespace, memory_id)
+    except Exception as exc:
+        logger.warning("related: cache read failed for %s: %s", memory_id, exc)
+    if ranked is None:
+        ranked = rank(namespace, target, store, parse_tags=parse_tags)
+        try:
+            _store_cache(namespace, memory_id, ranked)
+        except Exception as exc:
+            logger.warning("related: cache write failed for %s: %s", memory_id, exc)
+    return capture_index.get_records(namespace, [rid for rid, _score in ranked[:limit]])
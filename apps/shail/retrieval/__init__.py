@@ -5,4 +5,5 @@ Modules:
     fusion  — weighted rank fusion of exact + semantic hits.
     packet  — deterministic context packet builder (Sprint 4).
     validator — hallucinated-number detector (Sprint 4).
+    query_context — per-turn shared query embedding + per-source timings.
 """
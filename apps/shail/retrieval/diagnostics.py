@@ -19,9 +19,9 @@ from __future__ import annotations
 
 import importlib
 import threading
-from collections import Counter
+from collections import Counter, deque
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional
+from typing import Deque, Dict, List, Optional
 
 
 # Module-level — one registry per process.
@@ -29,6 +29,8 @@ _LOCK = threading.Lock()
 _RETRIEVAL_STATS: Counter = Counter()
 _LAST_QUERY_TRACE: List[Dict] = []
 _TRACE_LIMIT = 32
+_LATENCY: Dict[str, Deque[float]] = {}
+_LATENCY_SAMPLES = 256
 
 
 def record(event: str, *, value: int = 1) -> None:
@@ -45,6 +47,30 @@ def push_trace(entry: Dict) -> None:
             del _LAST_QUERY_TRACE[: len(_LAST_QUERY_TRACE) - _TRACE_LIMIT]
 
 
+def record_latency(name: str, ms: float) -> None:
+    """Record a timing sample. The last _LATENCY_SAMPLES are kept per name."""
+    with _LOCK:
+        samples = _LATENCY.get(name)
+        if samples is None:
+            samples = _LATENCY[name] = deque(maxlen=_LATENCY_SAMPLES)
+        samples.append(ms)
+
+
+def latency_summary() -> Dict[str, Dict[str, float]]:
+    """count / p50 / p95 / max (ms) per recorded name."""
+    with _LOCK:
+        snapshot = {name: sorted(samples) for name, samples in _LATENCY.items() if samples}
+    return {
+        name: {
+            "count": len(s),
+            "p50_ms": round(s[len(s) // 2], 2),
+            "p95_ms": round(s[min(len(s) - 1, int(len(s) * 0.95))], 2),
+            "max_ms": round(s[-1], 2),
+        }
+        for name, s in snapshot.items()
+    }
+
+
 def stats() -> Dict[str, int]:
     with _LOCK:
         return dict(_RETRIEVAL_STATS)
@@ -59,6 +85,7 @@ def reset() -> None:
     with _LOCK:
         _RETRIEVAL_STATS.clear()
         _LAST_QUERY_TRACE.clear()
+        _LATENCY.clear()
 
 
 # ── Extractor dependency probe ──────────────────────────────────────────────
@@ -116,6 +143,9 @@ def health_summary() -> Dict:
         ],
         "retrieval_stats": stats(),
         "extractor_failures": _extractor_failures_snapshot(),
+        # cold = parsed on this call, warm = served by the extraction cache.
+        "extraction_latency": latency_summary(),
+        "extraction_cache": _extraction_cache_snapshot(),
         "recent_traces": recent_traces(),
     }
 
@@ -127,3 +157,11 @@ def _extractor_failures_snapshot() -> Dict[str, int]:
         return extractor_failure_summary()
     except Exception:
         return {}
+
+
+def _extraction_cache_snapshot() -> Dict:
+    try:
+        from shail.memory.extraction_cache import extraction_cache_stats
+        return extraction_cache_stats()
+    except Exception:
+        return {}
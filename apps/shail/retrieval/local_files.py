@@ -21,6 +21,7 @@ from __future__ import annotations
 import logging
 import os
 import re
+import time
 from dataclasses import dataclass
 from typing import List, Optional
 
@@ -201,8 +202,9 @@ def retrieve_local_file_context(
     Read flow per hit:
       1. path_index FTS5 candidate row (already in hand)
       2. size guard — skip if file > read_cap_bytes (default 25MB)
-      3. content extractor (rag._extract_text_from_file) — handles
-         pdf/docx/xlsx/csv/html and falls back to text read
+      3. content extractor (rag.extract_document) — handles
+         pdf/docx/xlsx/csv/html and falls back to text read; parsed formats
+         are served from the extraction cache when unchanged on disk
       4. _best_snippet — windowed around query terms
       5. citation emitted with bm25-derived normalised score
 
@@ -218,7 +220,7 @@ def retrieve_local_file_context(
         return []
 
     try:
-        from shail.memory.rag import _extract_text_from_file
+        from shail.memory.rag import extract_document
     except Exception as exc:
         logger.warning("local file extractor unavailable: %s", exc)
         _diag.record("extractor_module_unavailable")
@@ -247,7 +249,10 @@ def retrieve_local_file_context(
         extractor_used: Optional[str] = None
         text: Optional[str] = None
         try:
-            text = _extract_text_from_file(file_path)
+            started = time.perf_counter()
+            doc = extract_document(file_path)
+            _record_extract_latency(doc, time.perf_counter() - started)
+            text = doc.text if doc else None
             extractor_used = "rag" if text else None
         except Exception as exc:
             logger.debug("local file read failed for %s: %s", file_path, exc)
@@ -287,6 +292,15 @@ def retrieve_local_file_context(
     return hits
 
 
+def _record_extract_latency(doc, seconds: float) -> None:
+    """Cold (parsed now) vs warm (extraction cache) timings for diagnostics."""
+    if doc is None or doc.source == "direct":
+        return
+    phase = "cold" if doc.source == "parsed" else "warm"
+    _diag.record(f"extract_{phase}")
+    _diag.record_latency(f"extract_{phase}", seconds * 1000)
+
+
 async def lazy_embed_for_query(query: str, *, user_id: str, k: int = 3) -> int:
     """Compatibility shim for older callers.
 
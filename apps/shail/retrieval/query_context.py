@@ -0,0 +1,55 @@
+"""Per-turn retrieval context.
+
+One chat turn fans out to several retrieval sources — hybrid / legacy memory
+search, past chats, and every connected MCP namespace — and each used to
+embed the query on its own, one Ollama round-trip apiece. A `QueryContext`
+embeds it at most once, lazily on first use (a source that never needs a
+vector, e.g. a retrieval-cache hit, costs nothing), and shares the vector
+with every source. It also records how long each source took so the chat
+stream can report where time-to-first-token went.
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+
+class QueryContext:
+    def __init__(self, query: str) -> None:
+        self.query = query
+        self.timings: Dict[str, float] = {}  # source -> ms
+        self.timed_out: List[str] = []       # sources cut by the retrieval budget
+        self._embedding: Optional[asyncio.Future] = None
+
+    async def embedding(self) -> List[float]:
+        """The query embedding, computed once and shared by all callers."""
+        if self._embedding is None:
+            self._embedding = asyncio.ensure_future(self._embed())
+        # Shielded: one source timing out must not cancel the embed for the rest.
+        return await asyncio.shield(self._embedding)
+
+    async def _embed(self) -> List[float]:
+        from shail.memory.embeddings import aembed_query
+
+        async with self.timed("embed"):
+            return await aembed_query(self.query)
+
+    @asynccontextmanager
+    async def timed(self, source: str) -> AsyncIterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[source] = round((time.perf_counter() - started) * 1000, 1)
+
+    async def search_namespaces(
+        self, namespaces: List[str], *, k: int,
+    ) -> Dict[str, List[Tuple[str, float, dict]]]:
+        """Vector search over several namespaces with the shared embedding,
+        batched into one store call where the backend allows it."""
+        from shail.memory.rag import asearch_namespaces
+
+        vec = await self.embedding()
+        return await asearch_namespaces(self.query, namespaces, k=k, query_embedding=vec)
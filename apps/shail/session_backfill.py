@@ -30,7 +30,8 @@ from typing import Any, Optional
 
 from apps.shail import chat_store
 from apps.shail.blueprints import (
-    _merge_blueprints,
+    _tree_merge,
+    gather_bounded,
     generate_blueprint,
     get_blueprint,
     save_blueprint,
@@ -513,21 +514,18 @@ async def generate_session_blueprint(
                 user_id=user_id, namespace=namespace,
             )
         else:
-            window_bps: list[dict] = []
-            for idx, win in enumerate(windows):
-                win_memory_id = f"{memory_id}_w{idx}"
-                wbp = await generate_blueprint(
-                    win_memory_id, content=win,
+            async def _window(idx: int, win: str) -> Optional[dict]:
+                return await generate_blueprint(
+                    f"{memory_id}_w{idx}", content=win,
                     content_type="ai_conversation",
                     user_id=user_id, namespace=namespace,
                 )
-                if wbp:
-                    window_bps.append(wbp)
+
+            results = await gather_bounded(windows, _window, get_settings().blueprint_map_concurrency)
+            window_bps = [r for r in results if r and not isinstance(r, BaseException)]
             if not window_bps:
                 return None
-            merged = window_bps[0]
-            for wbp in window_bps[1:]:
-                merged = _merge_blueprints(merged, wbp)
+            merged = _tree_merge(window_bps)
             save_blueprint(
                 memory_id, merged,
                 user_id=user_id, namespace=namespace,
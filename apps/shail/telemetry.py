@@ -1,45 +1,184 @@
 """Lightweight in-process counters for retrieval-evolution rollout.
 
-Local-first: no external sinks. Thread-safe via Lock. Read with snapshot()
-for tests / debugging endpoints. Add sinks (Prometheus, OpenTelemetry) later
-without touching call sites.
+Local-first: no external sinks. Thread-safe via striped locks. Read with
+snapshot() for tests / debugging endpoints; `prometheus_text()` renders the
+same state for the `/metrics` scrape. Add sinks (Prometheus, OpenTelemetry)
+later without touching call sites.
+
+Histograms are fixed-memory sketches: samples land in exponential buckets
+(~4% relative error), so p50/p90/p99 stay answerable for the life of the
+process without keeping the samples. Each series also keeps a rolling
+window of `WINDOW_SLOTS` × `WINDOW_SLOT_SECONDS` sub-sketches for recent
+percentiles.
 """
 from __future__ import annotations
 
+import math
+import re
 import threading
-from collections import defaultdict
-from typing import Dict
+import time
+from typing import Dict, List, Optional, Tuple
+
+
+# Bucket i covers (GROWTH**(i-1), GROWTH**i]; 2**(1/16) ≈ 1.044.
+GROWTH = 2 ** (1 / 16)
+_LOG_GROWTH = math.log(GROWTH)
+QUANTILES = (0.5, 0.9, 0.99)
+WINDOW_SLOTS = 5
+WINDOW_SLOT_SECONDS = 60.0
+_STRIPES = 16
+
+
+class _Sketch:
+    """Exponential-bucket histogram. Memory is bounded by the value range."""
+
+    __slots__ = ("count", "total", "min", "max", "zeros", "buckets")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.zeros = 0          # samples <= 0 (sizes/latencies are non-negative)
+        self.buckets: Dict[int, int] = {}
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        if value <= 0:
+            self.zeros += 1
+            return
+        idx = math.ceil(math.log(value) / _LOG_GROWTH)
+        self.buckets[idx] = self.buckets.get(idx, 0) + 1
+
+    def merge(self, other: "_Sketch") -> None:
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.zeros += other.zeros
+        for idx, n in other.buckets.items():
+            self.buckets[idx] = self.buckets.get(idx, 0) + n
+
+    def quantile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = q * (self.count - 1)
+        seen = self.zeros
+        if rank < seen:
+            return min(self.min, 0.0)
+        for idx in sorted(self.buckets):
+            seen += self.buckets[idx]
+            if rank < seen:
+                # Geometric midpoint of the bucket, clamped to observed range.
+                estimate = GROWTH ** (idx - 0.5)
+                return min(max(estimate, self.min), self.max)
+        return self.max
+
+    def summary(self) -> Dict[str, float]:
+        if not self.count:
+            return {"count": 0, "sum": 0.0, "min": 0.0, "max": 0.0, "p50": 0.0, "p90": 0.0, "p99": 0.0}
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "min": self.min,
+            "max": self.max,
+            **{f"p{round(q * 100)}": self.quantile(q) for q in QUANTILES},
+        }
+
+
+class _Histogram:
+    """Cumulative sketch plus a ring of per-slot sketches for the window."""
+
+    __slots__ = ("total", "slots", "slot_ids")
+
+    def __init__(self) -> None:
+        self.total = _Sketch()
+        self.slots: List[Optional[_Sketch]] = [None] * WINDOW_SLOTS
+        self.slot_ids: List[int] = [-1] * WINDOW_SLOTS
+
+    def add(self, value: float, now: float) -> None:
+        self.total.add(value)
+        slot_id = int(now // WINDOW_SLOT_SECONDS)
+        pos = slot_id % WINDOW_SLOTS
+        if self.slot_ids[pos] != slot_id or self.slots[pos] is None:
+            self.slots[pos] = _Sketch()
+            self.slot_ids[pos] = slot_id
+        self.slots[pos].add(value)
+
+    def window(self, now: float) -> _Sketch:
+        current = int(now // WINDOW_SLOT_SECONDS)
+        merged = _Sketch()
+        for slot_id, sketch in zip(self.slot_ids, self.slots):
+            if sketch is not None and current - slot_id < WINDOW_SLOTS:
+                merged.merge(sketch)
+        return merged
 
 
-_lock = threading.Lock()
-_counters: Dict[str, float] = defaultdict(float)
-_histograms: Dict[str, list] = defaultdict(list)
+_locks = [threading.Lock() for _ in range(_STRIPES)]
+_counters: Dict[str, float] = {}
+_histograms: Dict[str, _Histogram] = {}
+# Series key -> (metric name, labels) for exposition.
+_series: Dict[str, Tuple[str, Tuple[Tuple[str, str], ...]]] = {}
+
+
+def _lock_for(key: str) -> threading.Lock:
+    return _locks[hash(key) % _STRIPES]
 
 
 def incr(name: str, value: float = 1.0, **labels) -> None:
     key = _key(name, labels)
-    with _lock:
-        _counters[key] += value
+    with _lock_for(key):
+        if key not in _counters:
+            _series.setdefault(key, _series_for(name, labels))
+        _counters[key] = _counters.get(key, 0.0) + value
 
 
 def observe(name: str, value: float, **labels) -> None:
     key = _key(name, labels)
-    with _lock:
-        _histograms[key].append(value)
+    now = time.monotonic()
+    with _lock_for(key):
+        hist = _histograms.get(key)
+        if hist is None:
+            hist = _histograms[key] = _Histogram()
+            _series.setdefault(key, _series_for(name, labels))
+        hist.add(float(value), now)
 
 
 def snapshot() -> Dict[str, object]:
-    with _lock:
-        return {
-            "counters": dict(_counters),
-            "histograms": {k: list(v) for k, v in _histograms.items()},
-        }
+    """Counters plus, per histogram series, count/sum/min/max/p50/p90/p99.
+
+    Each histogram summary carries a `window` entry with the same fields over
+    the last `WINDOW_SLOTS * WINDOW_SLOT_SECONDS` seconds.
+    """
+    now = time.monotonic()
+    counters: Dict[str, float] = {}
+    histograms: Dict[str, Dict[str, object]] = {}
+    for lock in _locks:
+        with lock:
+            for key, value in list(_counters.items()):
+                if _lock_for(key) is lock:
+                    counters[key] = value
+            for key, hist in list(_histograms.items()):
+                if _lock_for(key) is lock:
+                    histograms[key] = {**hist.total.summary(), "window": hist.window(now).summary()}
+    return {"counters": counters, "histograms": histograms}
 
 
 def reset() -> None:
-    with _lock:
+    for lock in _locks:
+        lock.acquire()
+    try:
         _counters.clear()
         _histograms.clear()
+        _series.clear()
+    finally:
+        for lock in reversed(_locks):
+            lock.release()
 
 
 def _key(name: str, labels: Dict[str, object]) -> str:
@@ -49,6 +188,58 @@ def _key(name: str, labels: Dict[str, object]) -> str:
     return f"{name}{{{parts}}}"
 
 
+def _series_for(name: str, labels: Dict[str, object]) -> Tuple[str, Tuple[Tuple[str, str], ...]]:
+    return name, tuple((str(k), str(v)) for k, v in sorted(labels.items()))
+
+
+# ── Prometheus text exposition ───────────────────────────────────────────────
+
+_PROM_PREFIX = "shail_telemetry_"
+
+
+def _prom_name(name: str) -> str:
+    return _PROM_PREFIX + re.sub(r"[^a-zA-Z0-9_]", "_", name)
+
+
+def _prom_labels(labels: Tuple[Tuple[str, str], ...], extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+    pairs = [
+        (re.sub(r"[^a-zA-Z0-9_]", "_", k), v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for k, v in (*labels, *extra)
+    ]
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in pairs) + "}"
+
+
+def prometheus_text() -> str:
+    """Counters as `counter` and histograms as `summary` families."""
+    snap = snapshot()
+    series = dict(_series)
+    lines: List[str] = []
+    typed: set = set()
+
+    for key, value in sorted(snap["counters"].items()):
+        name, labels = series.get(key, (key, ()))
+        metric = _prom_name(name) + "_total"
+        if metric not in typed:
+            lines.append(f"# TYPE {metric} counter")
+            typed.add(metric)
+        lines.append(f"{metric}{_prom_labels(labels)} {value}")
+
+    for key, summary in sorted(snap["histograms"].items()):
+        name, labels = series.get(key, (key, ()))
+        metric = _prom_name(name)
+        if metric not in typed:
+            lines.append(f"# TYPE {metric} summary")
+            typed.add(metric)
+        for q in QUANTILES:
+            value = summary[f"p{round(q * 100)}"]
+            lines.append(f"{metric}{_prom_labels(labels, (('quantile', str(q)),))} {value}")
+        lines.append(f"{metric}_sum{_prom_labels(labels)} {summary['sum']}")
+        lines.append(f"{metric}_count{_prom_labels(labels)} {summary['count']}")
+    return "\n".join(lines) + ("\n" if lines else "")
+
+
 # Canonical counter names (string constants prevent typos at call sites).
 RETRIEVAL_PATH = "retrieval.path"                       # labels: path={exact,semantic,fused}
 RETRIEVAL_THRESHOLD_DROPS = "retrieval.threshold_drops"  # labels: surface={exact,semantic}
@@ -59,3 +250,12 @@ INGEST_CHUNKS_PER_CAPTURE = "ingest.chunks_per_capture"  # histogram
 BLUEPRINT_VERSIONS_PER_FACT = "blueprint.versions_per_fact"  # histogram
 RETRIEVAL_LATENCY_MS = "retrieval.latency_ms"            # histogram, labels: path
 CAPTURE_INDEX_FAIL = "capture.index_fail"               # counter: live-turn indexing failure
+RETRIEVAL_SOURCE_MS = "retrieval.source_ms"              # histogram, labels: source
+RETRIEVAL_SOURCE_TIMEOUT = "retrieval.source_timeout"    # counter, labels: source (cut by chat budget)
+AUTH_CACHE_LOOKUP = "auth.cache_lookup"                 # counter, labels: cache, result={hit,miss}
+LLM_LATENCY_MS = "llm.latency_ms"                       # histogram, labels: provider, mode={call,stream}
+LLM_TTFT_MS = "llm.ttft_ms"                             # histogram, labels: provider (first streamed token)
+WS_BROADCAST_MS = "ws.broadcast_ms"                     # histogram, labels: kind (serialize + enqueue, caller cost)
+WS_FANOUT_MS = "ws.fanout_ms"                           # histogram, labels: kind (enqueue → sent, per client)
+WS_SEND_DROPPED = "ws.send_dropped"                     # counter, labels: kind, reason={overflow,coalesced}
+BLUEPRINT_JOB_MS = "blueprint.job_ms"                   # histogram, labels: kind={session,capture}
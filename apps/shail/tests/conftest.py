@@ -45,6 +45,11 @@ def isolated_db(tmp_path: Path, monkeypatch):
     fake = s.Settings(sqlite_path=str(db))
     monkeypatch.setattr(s, "_settings", fake)
     yield db
+    # Buffered auth touches and cached principals belong to this DB; keep
+    # them from leaking into the next test.
+    from apps.shail import auth_store
+    auth_store.flush_auth_touches()
+    auth_store.clear_auth_caches()
     monkeypatch.setattr(s, "_settings", None)
 
 
@@ -92,6 +97,23 @@ def reset_telemetry():
     telemetry.reset()
 
 
+@pytest.fixture(autouse=True)
+def isolated_embedding_cache(tmp_path: Path, monkeypatch):
+    """Keep the persistent embedding cache tier out of the user's data dir."""
+    from shail.memory import embeddings
+    monkeypatch.setattr(embeddings, "_disk_cache_path", lambda: str(tmp_path / "embedding_cache.db"))
+    yield
+
+
+@pytest.fixture(autouse=True)
+def isolated_extraction_cache(tmp_path: Path, monkeypatch):
+    """Same for parsed-document text; the memory tier is process-wide."""
+    from shail.memory import extraction_cache
+    monkeypatch.setattr(extraction_cache, "_disk_cache_path", lambda: str(tmp_path / "extract_cache.db"))
+    extraction_cache._memory.clear()
+    yield
+
+
 @pytest.fixture(autouse=True)
 def clean_db_pool():
     """Reset the global database connection pool between tests to avoid stale tmp paths."""
@@ -0,0 +1,68 @@
+"""auth_store principal caches: API-key resolution and user settings."""
+from __future__ import annotations
+
+import pytest
+
+from apps.shail import auth_store
+from apps.shail.db import close_db_pool
+
+
+@pytest.fixture
+def account(isolated_db):
+    close_db_pool()
+    auth_store.init_auth_db()
+    auth_store.clear_auth_caches()
+    user = auth_store.create_user("cache@x.com", "pass12345")
+    key = auth_store.create_api_key(user["id"], label="dev")
+    yield user["id"], key
+    close_db_pool()
+
+
+def test_key_resolution_is_cached_and_revocation_invalidates(account, monkeypatch) -> None:
+    user_id, key = account
+    assert auth_store.get_user_by_api_key(key) == user_id
+    with monkeypatch.context() as m:
+        m.setattr(auth_store, "_conn", lambda: pytest.fail("cache hit must not query SQLite"))
+        assert auth_store.get_user_by_api_key(key) == user_id
+    stats = auth_store.auth_cache_stats()["api_key"]
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+
+    assert auth_store.revoke_api_key(key, user_id)
+    assert auth_store.get_user_by_api_key(key) is None
+
+
+def test_unknown_keys_are_negatively_cached(account, monkeypatch) -> None:
+    assert auth_store.get_user_by_api_key("shail_bogus") is None
+    with monkeypatch.context() as m:
+        m.setattr(auth_store, "_conn", lambda: pytest.fail("negative hit must not query SQLite"))
+        assert auth_store.get_user_by_api_key("shail_bogus") is None
+
+    monkeypatch.setattr(auth_store, "_API_KEY_NEGATIVE_TTL", 0.0)
+    assert auth_store.get_user_by_api_key("shail_other") is None
+    assert auth_store.auth_cache_stats()["api_key"]["size"] == 2
+    assert auth_store.get_user_by_api_key("shail_other") is None, "expired entry is re-resolved"
+    assert auth_store.auth_cache_stats()["api_key"]["misses"] == 3
+
+
+def test_settings_are_cached_copies_invalidated_on_update(account, monkeypatch) -> None:
+    user_id, _ = account
+    first = auth_store.get_user_settings(user_id)
+    first["blocked_domains"].append("mutated.example")
+    with monkeypatch.context() as m:
+        m.setattr(auth_store, "_conn", lambda: pytest.fail("cache hit must not query SQLite"))
+        assert auth_store.get_user_settings(user_id)["blocked_domains"] == []
+        assert auth_store.get_user_tier(user_id) == "free"
+
+    auth_store.update_user_settings(user_id, tier="pro", blocked_domains=["x.com"])
+    assert auth_store.get_user_tier(user_id) == "pro"
+    assert auth_store.get_user_settings(user_id)["blocked_domains"] == ["x.com"]
+
+
+def test_lru_bound_evicts_oldest() -> None:
+    cache = auth_store._TTLCache("t", maxsize=2)
+    for k in ("a", "b"):
+        cache.put(k, k, ttl=60)
+    cache.get("a")
+    cache.put("c", "c", ttl=60)
+    assert cache.get("b") is auth_store._TTLCache._MISSING
+    assert cache.get("a") == "a" and cache.get("c") == "c"
@@ -0,0 +1,54 @@
+"""Write-behind last_seen / last_used touches in auth_store."""
+from __future__ import annotations
+
+import pytest
+
+from apps.shail import auth_store
+from apps.shail.db import close_db_pool
+
+
+@pytest.fixture
+def account(isolated_db):
+    close_db_pool()
+    auth_store.init_auth_db()
+    user = auth_store.create_user("touch@x.com", "pass12345")
+    key = auth_store.create_api_key(user["id"], label="dev")
+    yield user["id"], key
+    close_db_pool()
+
+
+def _row(sql: str, arg: str):
+    with auth_store._conn() as con:
+        return con.execute(sql, (arg,)).fetchone()[0]
+
+
+def test_touches_are_buffered_until_flush(account) -> None:
+    user_id, key = account
+    for _ in range(5):
+        auth_store.touch_user_last_seen(user_id)
+        auth_store.touch_api_key_last_used(key)
+
+    assert _row("SELECT last_seen FROM users WHERE id = ?", user_id) is None
+    assert _row("SELECT last_used FROM api_keys WHERE key = ?", key) is None
+    # Listing already reflects the pending touch.
+    assert auth_store.list_api_keys(user_id)[0]["last_used"] is not None
+
+    assert auth_store.flush_auth_touches() == 2, "touches coalesce per user/key"
+    assert _row("SELECT last_seen FROM users WHERE id = ?", user_id) is not None
+    assert _row("SELECT last_used FROM api_keys WHERE key = ?", key) is not None
+    assert auth_store.flush_auth_touches() == 0
+
+
+def test_failed_flush_keeps_touches_for_retry(account, monkeypatch) -> None:
+    user_id, key = account
+    auth_store.touch_api_key_last_used(key)
+
+    def broken():
+        raise RuntimeError("db locked")
+
+    with monkeypatch.context() as m:
+        m.setattr(auth_store, "_conn", broken)
+        assert auth_store.flush_auth_touches() == 0
+
+    assert auth_store.flush_auth_touches() == 1
+    assert _row("SELECT last_used FROM api_keys WHERE key = ?", key) is not None
@@ -0,0 +1,136 @@
+"""Chunked blueprint extraction: concurrent map, tree reduce, sequential fallback."""
+from __future__ import annotations
+
+import asyncio
+import json
+
+import pytest
+
+from apps.shail import blueprints
+from apps.shail.settings import get_settings
+
+
+def _bp(entities: list[str], summary: str = "") -> dict:
+    return {
+        "summary": summary, "decisions": [], "questions_answered": [], "open_questions": [],
+        "next_actions": [], "key_entities": entities, "reasoning_chains": [],
+        "failed_attempts": [], "facts": [], "metrics": [], "tables": [], "extensions": {},
+    }
+
+
+def _content(windows: int = 6) -> str:
+    # Each marker lands in a distinct region of a ~40k-char transcript.
+    return "".join(f"MARK{i:02d} " + "x" * 6_800 for i in range(windows))
+
+
+@pytest.fixture
+def small_budget(monkeypatch):
+    s = get_settings()
+    monkeypatch.setattr(s, "blueprint_context_tokens", 2048)
+    monkeypatch.setattr(s, "blueprint_chunk_mode", "map_reduce")
+    monkeypatch.setattr(s, "blueprint_map_concurrency", 3)
+    monkeypatch.setattr(s, "blueprint_map_refine", False)
+    return s
+
+
+@pytest.fixture
+def fake_extract(monkeypatch):
+    state = {"calls": [], "in_flight": 0, "peak": 0, "fail": set()}
+
+    async def _extract(*, content, content_type, user_id, prior=None, **kwargs):
+        state["calls"].append({"content": content, "prior": prior})
+        state["in_flight"] += 1
+        state["peak"] = max(state["peak"], state["in_flight"])
+        try:
+            await asyncio.sleep(0.01)
+            marks = sorted({content[i:i + 6] for i in range(len(content)) if content.startswith("MARK", i)})
+            if any(m in state["fail"] for m in marks):
+                raise RuntimeError("llm down")
+            bp = _bp(marks, summary=marks[-1] if marks else "")
+            return blueprints._merge_blueprints(prior, bp) if prior else bp
+        finally:
+            state["in_flight"] -= 1
+
+    monkeypatch.setattr(blueprints, "extract_blueprint", _extract)
+    return state
+
+
+def _run(**kw):
+    return asyncio.run(blueprints._extract_chunked(
+        memory_id="m", content=kw.pop("content", _content()), content_type="ai_conversation",
+        user_id=None, prior=kw.pop("prior", None), prior_payload_chars=0,
+    ))
+
+
+def test_map_reduce_runs_windows_concurrently_without_prior(small_budget, fake_extract) -> None:
+    bp = _run()
+    assert len(fake_extract["calls"]) >= 5
+    assert fake_extract["peak"] == 3
+    assert all(c["prior"] is None for c in fake_extract["calls"])
+    assert bp["key_entities"] == [f"MARK{i:02d}" for i in range(6)]
+    assert bp["summary"] == "MARK05"  # scalar fields come from the last window
+
+
+def test_map_reduce_folds_prior_first_and_skips_failed_windows(small_budget, fake_extract) -> None:
+    fake_extract["fail"] = {"MARK02"}
+    bp = _run(prior=_bp(["durable"]))
+    assert bp["key_entities"][0] == "durable"
+    assert "MARK05" in bp["key_entities"]
+    assert "MARK00" in bp["key_entities"]
+
+
+def test_refine_pass_sees_merged_result(small_budget, fake_extract, monkeypatch) -> None:
+    monkeypatch.setattr(small_budget, "blueprint_map_refine", True)
+    monkeypatch.setattr(small_budget, "blueprint_min_content_chars", 1000)
+    _run()
+    last = fake_extract["calls"][-1]
+    assert last["prior"] is not None
+    assert "MARK00" in last["prior"]["key_entities"]
+    assert "MARK05" in last["prior"]["key_entities"]
+    map_window, _ = blueprints.compute_window_size(transcript_chars=len(_content()))
+    refine_window, _ = blueprints.compute_window_size(
+        transcript_chars=len(_content()), prior_blueprint_chars=len(json.dumps(last["prior"])),
+    )
+    assert refine_window < map_window
+    assert last["content"] == _content()[-refine_window:]
+
+
+def test_refine_result_is_union_merged(small_budget, fake_extract, monkeypatch) -> None:
+    monkeypatch.setattr(small_budget, "blueprint_map_refine", True)
+    mapped = blueprints.extract_blueprint
+
+    async def _forgetful(*, prior=None, **kwargs):
+        if prior is not None:
+            return _bp(["REFINED"], summary="refined")  # drops the merged entities
+        return await mapped(prior=prior, **kwargs)
+
+    monkeypatch.setattr(blueprints, "extract_blueprint", _forgetful)
+    bp = _run()
+    assert bp["key_entities"] == [f"MARK{i:02d}" for i in range(6)] + ["REFINED"]
+    assert bp["summary"] == "refined"
+
+
+def test_sequential_mode_threads_running_merge(small_budget, fake_extract, monkeypatch) -> None:
+    monkeypatch.setattr(small_budget, "blueprint_chunk_mode", "sequential")
+    bp = _run()
+    assert fake_extract["peak"] == 1
+    assert fake_extract["calls"][0]["prior"] is None
+    assert "MARK00" in fake_extract["calls"][-1]["prior"]["key_entities"]
+    assert bp["key_entities"] == [f"MARK{i:02d}" for i in range(6)]
+
+
+def test_tree_merge_matches_left_fold() -> None:
+    parts = [_bp([f"e{i}", f"e{i + 1}"], summary=str(i)) for i in range(7)]
+    folded = parts[0]
+    for p in parts[1:]:
+        folded = blueprints._merge_blueprints(folded, p)
+    assert blueprints._tree_merge(parts) == folded
+    assert blueprints._tree_merge([]) is None
+
+
+def test_sized_extraction_uses_single_call_when_content_fits(small_budget, fake_extract) -> None:
+    bp = asyncio.run(blueprints.extract_sized_blueprint(
+        content="MARK00 " + "y" * 500, content_type="ai_conversation", user_id=None,
+    ))
+    assert len(fake_extract["calls"]) == 1
+    assert bp["key_entities"] == ["MARK00"]
@@ -211,6 +211,91 @@ class TestQueueWorker:
         assert final["attempts"] == 2
 
 
+class TestWorkerPool:
+    def test_claim_is_atomic_and_marks_running(self, isolated_db):
+        from apps.shail.blueprint_queue import enqueue, _claim_next, _now
+        a = enqueue(memory_id="a", session_id=None, user_id="u", content_type="x")
+        b = enqueue(memory_id="b", session_id=None, user_id="u", content_type="x")
+        first = _claim_next(_now())
+        second = _claim_next(_now())
+        assert {first["id"], second["id"]} == {a, b}
+        assert first["state"] == second["state"] == "running"
+        assert _claim_next(_now()) is None
+
+    @pytest.mark.parametrize("returning", [True, False])
+    def test_live_lane_skips_bulk_jobs(self, isolated_db, monkeypatch, returning):
+        from apps.shail import blueprint_queue as bq
+        monkeypatch.setattr(bq, "_RETURNING_SUPPORTED", returning)
+        bulk = bq.enqueue(memory_id="bulk", session_id=None, user_id="u",
+                          content_type="x", priority=-1)
+        live = bq.enqueue(memory_id="live", session_id=None, user_id="u", content_type="x")
+        assert bq._claim_next(bq._now(), min_priority=0)["id"] == live
+        assert bq._claim_next(bq._now(), min_priority=0) is None
+        assert bq._claim_next(bq._now())["id"] == bulk
+
+    def test_live_capture_beats_earlier_session_backfills(self, isolated_db):
+        from apps.shail import blueprint_queue as bq
+        for i in range(20):
+            bq.enqueue(memory_id=f"session_bp_{i}", session_id=f"s{i}", user_id="u",
+                       content_type="chat_session")
+        live = bq.enqueue(memory_id="live", session_id=None, user_id="u",
+                          content_type="ai_conversation")
+        assert bq._claim_next(bq._now(), min_priority=0)["id"] == live
+        assert bq._claim_next(bq._now(), min_priority=0) is None
+        assert bq._claim_next(bq._now())["memory_id"] == "session_bp_0"
+
+    def test_stale_running_jobs_are_requeued(self, isolated_db):
+        from apps.shail.blueprint_queue import enqueue, _claim_next, _requeue_stale_running, get_job, _now
+        job_id = enqueue(memory_id="a", session_id=None, user_id="u", content_type="x")
+        _claim_next(_now())
+        assert _requeue_stale_running() == 1
+        assert get_job(job_id)["state"] == "pending"
+
+    def test_pool_wakes_on_enqueue_and_runs_jobs_concurrently(self, isolated_db, monkeypatch):
+        from apps.shail import blueprint_queue as bq
+        from apps.shail.settings import get_settings
+
+        monkeypatch.setattr(get_settings(), "blueprint_queue_concurrency", 3)
+        monkeypatch.setattr(bq, "_worker_started", False)
+        monkeypatch.setattr(bq, "_ensure_ollama_for_blueprint_queue", AsyncMock(return_value=True))
+        monkeypatch.setattr(bq, "_maybe_stop_blueprint_ollama_when_idle", AsyncMock())
+        running = {"now": 0, "peak": 0}
+
+        async def _fake_capture_job(job):
+            running["now"] += 1
+            running["peak"] = max(running["peak"], running["now"])
+            await asyncio.sleep(0.05)
+            running["now"] -= 1
+            return {"decisions": ["x"]}
+        monkeypatch.setattr(bq, "_run_capture_job", _fake_capture_job)
+
+        async def scenario():
+            task = bq.start_worker()
+            await asyncio.sleep(0.05)  # workers idle, waiting on the 30s poll
+            # Enqueue from a request thread, as the capture endpoints do.
+            ids = await asyncio.to_thread(lambda: [
+                bq.enqueue(memory_id=f"m{i}", session_id=None, user_id="u",
+                           content_type="x", priority=-1 if i else 0)
+                for i in range(5)
+            ])
+            deadline = time.monotonic() + 5
+            while time.monotonic() < deadline:
+                if all(bq.get_job(j)["state"] == "done" for j in ids):
+                    break
+                await asyncio.sleep(0.02)
+            snapshot = bq.stats()
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            return ids, snapshot
+
+        ids, snapshot = _run(scenario())
+        assert all(bq.get_job(j)["state"] == "done" for j in ids)
+        assert running["peak"] >= 2
+        assert snapshot["workers"] == 3
+        assert snapshot["queue_depth"] == 0
+        assert snapshot["throughput_per_min"] > 0
+
+
 # ── Auto-redact gate (B7) ────────────────────────────────────────────────────
 
 class TestAutoRedact:
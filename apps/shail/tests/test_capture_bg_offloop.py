@@ -0,0 +1,75 @@
+"""Capture background tasks run on the event loop; their SQLite writes must not."""
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from unittest.mock import AsyncMock
+
+import pytest
+
+
+def _blocking_recorder(calls: list):
+    def _fn(*args, **kwargs):
+        calls.append(threading.current_thread())
+        time.sleep(0.1)  # stand-in for a SQLite write waiting on a lock
+    return _fn
+
+
+async def _max_loop_stall(coro) -> float:
+    """Run `coro` while a heartbeat measures the longest gap between ticks."""
+    gaps = [0.0]
+    done = asyncio.Event()
+
+    async def heartbeat():
+        last = time.perf_counter()
+        while not done.is_set():
+            await asyncio.sleep(0.005)
+            now = time.perf_counter()
+            gaps.append(now - last)
+            last = now
+
+    hb = asyncio.create_task(heartbeat())
+    try:
+        await coro
+    finally:
+        done.set()
+        await hb
+    return max(gaps)
+
+
+@pytest.mark.parametrize("chunk_count", [0, 3])
+def test_bg_ingest_bookkeeping_runs_off_the_loop(monkeypatch, chunk_count) -> None:
+    from apps.shail import browser_api
+
+    calls: list = []
+    rec = _blocking_recorder(calls)
+    monkeypatch.setattr(browser_api, "aingest", AsyncMock(return_value=chunk_count))
+    monkeypatch.setattr(browser_api, "write_event", rec)
+    monkeypatch.setattr("apps.shail.raw_transcripts.mark_embedded", rec)
+    monkeypatch.setattr("apps.shail.blueprint_queue.enqueue", rec)
+    monkeypatch.setattr("apps.shail.pipeline_status.mark_stage", rec)
+
+    stall = asyncio.run(_max_loop_stall(browser_api._bg_ingest_and_index(
+        "m1", "content", "user_u", {"title": "t"}, "u", "ai_conversation", "chatgpt",
+    )))
+
+    assert calls, "bookkeeping did not run"
+    assert all(t is not threading.main_thread() for t in calls)
+    assert stall < 0.08
+
+
+def test_aembed_texts_cache_io_runs_off_the_loop(monkeypatch) -> None:
+    from shail.memory import embeddings
+
+    threads: list = []
+
+    def _from_cache(texts, model):
+        threads.append(threading.current_thread())
+        time.sleep(0.1)
+        return [[1.0, 0.0]] * len(texts), []
+
+    monkeypatch.setattr(embeddings, "_from_cache", _from_cache)
+    stall = asyncio.run(_max_loop_stall(embeddings.aembed_texts(["a", "b"])))
+    assert threads and threads[0] is not threading.main_thread()
+    assert stall < 0.08
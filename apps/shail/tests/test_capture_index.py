@@ -0,0 +1,385 @@
+"""FTS5 capture index backing `/browser/search` lexical ranking."""
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+class EmptyVectorCollection:
+    def get(self, *args, **kwargs):
+        return {"ids": [], "documents": [], "metadatas": []}
+
+
+class EmptyVectorStore:
+    collection = EmptyVectorCollection()
+
+
+class LegacyVectorCollection:
+    """Vector-only capture with no raw transcript row (pre-B5 data)."""
+
+    def get(self, *args, **kwargs):
+        where = kwargs.get("where") or {}
+        if where.get("namespace") != "user_u1":
+            return {"ids": [], "documents": [], "metadatas": []}
+        return {
+            "ids": ["legacy_vec_1#000"],
+            "documents": ["[chatgpt] Quarterly churn model\n\nCohort churn dropped to 3.1% after onboarding fixes."],
+            "metadatas": [{
+                "customId": "legacy_vec_1",
+                "parent_memory_id": "legacy_vec_1",
+                "chunk_index": 0,
+                "eventType": "ai_conversation",
+                "sourceApp": "chatgpt",
+                "sourceUrl": "https://chatgpt.com/c/legacy",
+                "title": "Quarterly churn model",
+                "timestamp": "2026-06-20T00:00:00+00:00",
+                "namespace": "user_u1",
+            }],
+        }
+
+
+class LegacyVectorStore:
+    collection = LegacyVectorCollection()
+
+
+def _save(memory_id: str, title: str, body: str) -> None:
+    from apps.shail import raw_transcripts as rt
+
+    rt.save(
+        memory_id=memory_id,
+        user_id="u1",
+        namespace="user_u1",
+        content_type="ai_conversation",
+        content=f"[claude] {title}\n\n{body}",
+        metadata={
+            "customId": memory_id,
+            "eventType": "ai_conversation",
+            "sourceApp": "claude",
+            "sourceUrl": f"https://claude.ai/chat/{memory_id}",
+            "title": title,
+            "timestamp": "2026-06-22T05:00:00+00:00",
+        },
+    )
+
+
+def test_index_follows_raw_transcript_save_and_delete(isolated_db):
+    from apps.shail import capture_index
+    from apps.shail import raw_transcripts as rt
+
+    _save("idx_1", "Pricing experiment", "Assistant: annual plan conversion rose 12%")
+    hits = capture_index.search_candidates("user_u1", "conversion")
+    assert hits is not None and set(hits) == {"idx_1"}
+    assert "conversion rose" in hits["idx_1"]["content"]
+    assert hits["idx_1"]["metadata"]["title"] == "Pricing experiment"
+
+    assert capture_index.search_candidates("user_other", "conversion") == {}
+
+    rt.delete("idx_1")
+    assert capture_index.search_candidates("user_u1", "conversion") == {}
+
+
+def test_index_matches_infix_terms_like_the_scorer(isolated_db):
+    from apps.shail import capture_index
+
+    _save("idx_infix", "Customer Support rota", "Assistant: who is on call this week")
+    hits = capture_index.search_candidates("user_u1", "port")
+    assert hits is not None and set(hits) == {"idx_infix"}
+
+
+def test_word_tokenized_index_is_rebuilt_as_trigram(isolated_db):
+    from apps.shail import capture_index
+
+    _save("idx_migrate", "Customer Support rota", "Assistant: who is on call")
+    with capture_index._conn() as con:
+        con.executescript("""
+            DROP TRIGGER capture_index_ai;
+            DROP TRIGGER capture_index_ad;
+            DROP TRIGGER capture_index_au;
+            DROP TABLE capture_index_fts;
+            CREATE VIRTUAL TABLE capture_index_fts USING fts5(
+                title, summary, source_app, source_url, body,
+                content='capture_index', content_rowid='rowid'
+            );
+        """)
+    capture_index._schema_ready_for = None
+    capture_index.init_capture_index_schema()
+    assert set(capture_index.search_candidates("user_u1", "port")) == {"idx_migrate"}
+
+
+def test_index_answers_short_and_common_terms_without_scan(isolated_db, monkeypatch):
+    from apps.shail import browser_api, capture_index
+
+    _save("idx_short_1", "UI review", "Assistant: tighten the sidebar")
+    _save("idx_short_2", "UI polish", "Assistant: tighten the header")
+    _save("idx_short_3", "Recipes", "Assistant: knead the dough")
+    assert set(capture_index.search_candidates("user_u1", "ui")) == {"idx_short_1", "idx_short_2"}
+    assert set(capture_index.search_candidates("user_u1", "ui sidebar")) == {"idx_short_1", "idx_short_2"}
+    # Over the candidate cap: the best BM25 matches, not a fallback.
+    assert len(capture_index.search_candidates("user_u1", "tighten", limit=1)) == 1
+
+    monkeypatch.setattr(browser_api, "_get_store", lambda: EmptyVectorStore())
+    monkeypatch.setattr(
+        browser_api, "_collect_user_capture_records",
+        lambda namespace: pytest.fail("full catalog scan"),
+    )
+    assert set(browser_api._lexical_candidates("user_u1", "ui")) == {"idx_short_1", "idx_short_2"}
+
+
+def test_index_skips_local_file_rows(isolated_db):
+    from apps.shail import capture_index
+
+    capture_index.upsert(
+        "file:/tmp/notes.txt", "user_u1", "local notes about conversion",
+        {"source": "local_file", "sourceApp": "local_file"},
+    )
+    assert capture_index.search_candidates("user_u1", "conversion") == {}
+
+
+def test_browser_search_uses_index_after_seed(isolated_db, monkeypatch):
+    from apps.shail import browser_api
+
+    _save("idx_search_1", "Shail launch checklist", "Assistant: ship the sidepanel first")
+    _save("idx_search_2", "Unrelated recipe", "Assistant: bake for 40 minutes")
+    monkeypatch.setattr(browser_api, "_get_namespace", lambda _credentials: "user_u1")
+    monkeypatch.setattr(browser_api, "_get_store", lambda: EmptyVectorStore())
+    monkeypatch.setattr(browser_api, "rag_search", lambda *a, **k: [])
+
+    first = _run(browser_api.search_memories(
+        browser_api.SearchRequest(query="launch checklist", k=10), credentials=None,
+    ))
+    assert [i.id for i in first.items] == ["idx_search_1"]
+
+    from apps.shail import capture_index
+
+    def _no_full_scan(*_args):
+        raise AssertionError("seeded namespaces must not rescan the corpus")
+
+    monkeypatch.setattr(capture_index, "scan_namespace", _no_full_scan)
+    _save("idx_search_3", "Launch retro", "Assistant: the launch checklist slipped a week")
+
+    second = _run(browser_api.search_memories(
+        browser_api.SearchRequest(query="launch checklist", k=10), credentials=None,
+    ))
+    ids = [i.id for i in second.items]
+    assert set(ids) == {"idx_search_1", "idx_search_3"}
+    assert ids[0] == "idx_search_1", "exact title match keeps its scoring bonus"
+
+
+def test_vector_only_legacy_capture_is_seeded(isolated_db, monkeypatch):
+    from apps.shail import browser_api
+
+    monkeypatch.setattr(browser_api, "_get_namespace", lambda _credentials: "user_u1")
+    monkeypatch.setattr(browser_api, "_get_store", lambda: LegacyVectorStore())
+    monkeypatch.setattr(browser_api, "rag_search", lambda *a, **k: [])
+
+    result = _run(browser_api.search_memories(
+        browser_api.SearchRequest(query="churn 3.1%", k=10), credentials=None,
+    ))
+    assert [i.id for i in result.items] == ["legacy_vec_1"]
+
+
+class PagedVectorCollection:
+    """Honors limit/offset like Chroma so the seed scan must page."""
+
+    def __init__(self, n: int):
+        self.rows = [
+            (
+                f"vec_{i}",
+                f"[web] Page {i}\n\nbody {i}",
+                {
+                    "customId": f"vec_{i}",
+                    "eventType": "page_visit",
+                    "sourceApp": "web",
+                    "sourceUrl": f"https://example.com/{i}",
+                    "title": f"Page {i}",
+                    "timestamp": f"2026-06-{10 + i % 10:02d}T00:00:00+00:00",
+                    "pinned": "true" if i % 5 == 0 else "false",
+                    "namespace": "user_u1",
+                },
+            )
+            for i in range(n)
+        ]
+        self.calls = 0
+
+    def get(self, *args, limit=None, offset=0, **kwargs):
+        self.calls += 1
+        page = self.rows[offset: offset + limit] if limit else self.rows[offset:]
+        return {
+            "ids": [r[0] for r in page],
+            "documents": [r[1] for r in page],
+            "metadatas": [r[2] for r in page],
+        }
+
+
+class PagedVectorStore:
+    def __init__(self, n: int):
+        self.collection = PagedVectorCollection(n)
+
+
+def test_catalog_seed_pages_past_scan_limit_and_serves_dashboard(isolated_db, monkeypatch):
+    from apps.shail import capture_index, memory_dashboard_api
+
+    store = PagedVectorStore(25)
+    monkeypatch.setattr(capture_index, "_SCAN_PAGE", 10)
+    monkeypatch.setattr(memory_dashboard_api, "_get_store", lambda: store)
+
+    stats = _run(memory_dashboard_api.get_stats(user_id="u1"))
+    assert stats.total == 25
+    assert stats.pinned_count == 5
+    assert stats.by_source == {"web": 25}
+    assert stats.top_domains == [{"domain": "example.com", "count": 25}]
+
+    calls_after_seed = store.collection.calls
+    page = _run(memory_dashboard_api.list_memories(user_id="u1", limit=5))
+    assert page.total == 25
+    assert store.collection.calls == calls_after_seed, "catalog reads must not touch Chroma"
+
+
+def test_catalog_tracks_capture_patch_and_delete(isolated_db, monkeypatch):
+    from apps.shail import browser_api, capture_index
+    from apps.shail import raw_transcripts as rt
+
+    monkeypatch.setattr(browser_api, "_get_namespace", lambda _credentials: "user_u1")
+    monkeypatch.setattr(browser_api, "_get_store", lambda: EmptyVectorStore())
+    _save("cat_1", "First", "Assistant: one")
+    _save("cat_2", "Second", "Assistant: two")
+
+    stats = _run(browser_api.get_stats(credentials=None))
+    assert stats.totalMemories == 2
+    assert stats.topSource == "claude"
+
+    rt.mark_embedded("cat_1", True)
+    rows = {rid: meta for rid, _body, meta in capture_index.list_records("user_u1")}
+    assert "state" not in rows["cat_1"]
+    assert rows["cat_2"]["state"] == "indexing"
+
+    assert capture_index.patch_metadata("cat_1", {"pinned": "true", "tags": '["alpha"]'})
+    rows = {rid: meta for rid, _body, meta in capture_index.list_records("user_u1")}
+    assert rows["cat_1"]["pinned"] == "true"
+
+    rt.delete("cat_2")
+    browse = _run(browser_api.search_memories(browser_api.SearchRequest(query="", k=10), credentials=None))
+    assert [i.id for i in browse.items] == ["cat_1"]
+    assert browse.total == 1
+
+
+def test_dashboard_list_keyset_pages_and_pushes_filters(isolated_db, monkeypatch):
+    from apps.shail import capture_index, memory_dashboard_api
+    from fastapi import HTTPException
+
+    store = PagedVectorStore(12)
+    monkeypatch.setattr(memory_dashboard_api, "_get_store", lambda: store)
+    seen = []
+    cursor = ""
+    while True:
+        page = _run(memory_dashboard_api.list_memories(user_id="u1", limit=5, cursor=cursor))
+        assert page.total == 12
+        seen.extend((item.timestamp, item.id) for item in page.items)
+        if not page.next_cursor:
+            break
+        cursor = page.next_cursor
+    assert len(set(seen)) == 12
+    assert seen == sorted(seen, reverse=True)
+
+    offset_page = _run(memory_dashboard_api.list_memories(user_id="u1", limit=5, page=2))
+    assert [i.id for i in offset_page.items] == [rid for _ts, rid in seen[5:10]]
+
+    capture_index.patch_metadata("vec_3", {"tags": '["alpha"]'})
+    tagged = _run(memory_dashboard_api.list_memories(user_id="u1", tag="alpha"))
+    assert [i.id for i in tagged.items] == ["vec_3"]
+    pinned = _run(memory_dashboard_api.list_memories(user_id="u1", pinned=True))
+    assert {i.id for i in pinned.items} == {"vec_0", "vec_5", "vec_10"}
+    window = _run(memory_dashboard_api.list_memories(
+        user_id="u1", since="2026-06-18", until="2026-06-20", source="WEB",
+    ))
+    assert {i.id for i in window.items} == {"vec_8", "vec_9"}
+
+    try:
+        _run(memory_dashboard_api.list_memories(user_id="u1", cursor="not-a-cursor"))
+    except HTTPException as exc:
+        assert exc.status_code == 400
+    else:
+        raise AssertionError("malformed cursor must be rejected")
+
+
+def _upsert(memory_id: str, **meta):
+    from apps.shail import capture_index
+
+    capture_index.upsert(memory_id, "user_u1", f"Assistant: notes for {memory_id}", {
+        "eventType": "ai_conversation",
+        "sourceApp": "claude",
+        "sourceUrl": f"https://claude.ai/chat/{memory_id}",
+        "title": memory_id,
+        **meta,
+    })
+
+
+def test_undated_legacy_rows_keep_stored_time_or_sort_last(isolated_db):
+    from apps.shail import capture_index
+
+    _upsert("dated", timestamp="2026-06-22T05:00:00+00:00")
+    _upsert("legacy_ts", captured_ts="1767225600")  # 2026-01-01, Chroma epoch field
+    _upsert("legacy")
+
+    rows = {rid: meta for rid, _b, meta in capture_index.list_records("user_u1")}
+    assert rows["legacy_ts"]["timestamp"].startswith("2026-01-01")
+    assert not rows["legacy"].get("timestamp")
+    assert [rid for rid, _b, _m in capture_index.list_records("user_u1")] == ["dated", "legacy_ts", "legacy"]
+    assert [rid for rid, _b, _m in capture_index.list_records("user_u1", before="2026-07-01")] == [
+        "dated", "legacy_ts",
+    ]
+    assert len(capture_index.volume_since("user_u1", "2000-01-01")) == 2
+    nearest = capture_index.nearest_in_time("user_u1", "2026-06-22T00:00:00+00:00", exclude="dated")
+    assert [rid for rid, _b, _m in nearest] == ["legacy_ts", "legacy"]
+
+
+def test_ephemeral_gc_drops_catalog_rows(isolated_db, monkeypatch):
+    import time
+
+    from apps.shail import capture_index, macos_memory_api
+
+    old = str(time.time() - 7 * 86400)
+    meta = {"tier": "ephemeral", "customId": "eph_old", "captured_ts": old, "importance_score": "0.2"}
+
+    class _Collection:
+        deleted: list = []
+
+        def get(self, **kwargs):
+            return {"ids": ["eph_old"], "documents": ["doc"], "metadatas": [meta], "embeddings": [[0.1]]}
+
+        def delete(self, ids):
+            self.deleted.extend(ids)
+
+    class _Store:
+        collection = _Collection()
+
+    _upsert("eph_old", captured_ts=old)
+    assert capture_index.get_records("user_u1", ["eph_old"])
+    monkeypatch.setattr(macos_memory_api, "_get_store", lambda: _Store())
+    macos_memory_api._cleanup_ephemeral()
+    assert _Store.collection.deleted == ["eph_old"]
+    assert capture_index.get_records("user_u1", ["eph_old"]) == []
+
+
+def test_dashboard_keyset_pages_past_undated_rows(isolated_db, monkeypatch):
+    from apps.shail import memory_dashboard_api
+
+    for i in range(3):
+        _upsert(f"dated_{i}", timestamp=f"2026-06-2{i}T00:00:00+00:00")
+        _upsert(f"undated_{i}")
+    monkeypatch.setattr(memory_dashboard_api, "_get_store", lambda: EmptyVectorStore())
+    monkeypatch.setattr(memory_dashboard_api, "_namespace", lambda _uid: "user_u1")
+
+    seen, cursor = [], ""
+    for _ in range(10):
+        page = _run(memory_dashboard_api.list_memories(user_id="u1", limit=2, cursor=cursor))
+        seen.extend(item.id for item in page.items)
+        if not page.next_cursor:
+            break
+        cursor = page.next_cursor
+    assert seen == ["dated_2", "dated_1", "dated_0", "undated_2", "undated_1", "undated_0"]
@@ -112,7 +112,8 @@ def test_telemetry_histogram_records_chunk_count() -> None:
         req=req, content=("Para. " * 600), summary="s", namespace="ns", chunked=True,
     )
     snap = telemetry.snapshot()["histograms"]
-    assert snap[telemetry.INGEST_CHUNKS_PER_CAPTURE] == [len(out)]
+    hist = snap[telemetry.INGEST_CHUNKS_PER_CAPTURE]
+    assert hist["count"] == 1 and hist["max"] == len(out)
 
 
 # ── conversationId still threads ────────────────────────────────────────────
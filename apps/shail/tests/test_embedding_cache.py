@@ -0,0 +1,84 @@
+"""Tiered embedding cache: float32 LRU in memory + persistent SQLite tier."""
+from __future__ import annotations
+
+from array import array
+from types import SimpleNamespace
+
+
+class _FakeResp:
+    def __init__(self, n: int, value: float) -> None:
+        self._n = n
+        self._value = value
+
+    def raise_for_status(self) -> None:
+        pass
+
+    def json(self):
+        return {"embeddings": [[self._value] * 4 for _ in range(self._n)]}
+
+
+def _fake_ollama(monkeypatch, embeddings, value: float = 0.1):
+    calls: list[list[str]] = []
+
+    def _post(*args, **kwargs):
+        calls.append(list(kwargs["json"]["input"]))
+        return _FakeResp(len(kwargs["json"]["input"]), value)
+
+    monkeypatch.setattr(embeddings, "_http_client", lambda: SimpleNamespace(post=_post))
+    return calls
+
+
+def test_disk_tier_survives_process_restart(monkeypatch) -> None:
+    from shail.memory import embeddings
+
+    embeddings.clear_embedding_cache()
+    calls = _fake_ollama(monkeypatch, embeddings)
+    first = embeddings.embed_texts(["alpha", "beta"])
+    assert calls == [["alpha", "beta"]]
+
+    # A restart (or the worker process) starts with an empty memory tier.
+    monkeypatch.setattr(embeddings, "_embed_cache", embeddings._LRUEmbedCache())
+    monkeypatch.setattr(embeddings, "_disk_cache", None)
+    again = embeddings.embed_texts(["alpha", "beta", "gamma"])
+    assert calls == [["alpha", "beta"], ["gamma"]]
+    assert again[:2] == first
+
+    stats = embeddings.embedding_cache_stats()
+    assert stats["disk"]["hits"] == 2 and stats["disk"]["size"] == 3
+    assert stats["bytes"] == 3 * 4 * 4  # float32 storage in memory
+
+
+def test_cache_is_keyed_by_model(monkeypatch) -> None:
+    from shail.memory import embeddings
+
+    embeddings.clear_embedding_cache()
+    calls = _fake_ollama(monkeypatch, embeddings)
+    embeddings.embed_texts(["alpha"])
+
+    settings = embeddings._settings()
+    monkeypatch.setattr(settings, "ollama_embed_model", "other-embed-model")
+    embeddings.embed_texts(["alpha"])
+    assert calls == [["alpha"], ["alpha"]]
+
+
+def test_disk_tier_evicts_least_recently_used(tmp_path, monkeypatch) -> None:
+    from shail.memory import embeddings
+
+    monkeypatch.setattr(embeddings, "_DISK_EVICT_EVERY", 1)
+    disk = embeddings._DiskEmbedCache(str(tmp_path / "evict.db"), max_bytes=3 * 16)
+    for i in range(5):
+        disk.put_many("m", {f"h{i}": array("f", [float(i + 1)] * 4)})
+    stats = disk.stats()
+    assert stats["bytes"] <= 3 * 16
+    assert disk.get_many("m", ["h4"])  # newest kept
+    assert not disk.get_many("m", ["h0"])  # oldest evicted
+
+
+def test_disk_tier_disabled_with_empty_path(monkeypatch) -> None:
+    from shail.memory import embeddings
+
+    monkeypatch.setattr(embeddings, "_disk_cache_path", lambda: "")
+    embeddings.clear_embedding_cache()
+    _fake_ollama(monkeypatch, embeddings)
+    embeddings.embed_texts(["alpha"])
+    assert embeddings.embedding_cache_stats()["disk"] is None
@@ -0,0 +1,145 @@
+"""Ollama embedding client: token-sized batches, bounded concurrency,
+retry/bisect on failure, and the async `aembed_texts` variant."""
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+
+class _Resp:
+    def __init__(self, texts, status: int = 200) -> None:
+        self._texts = texts
+        self.status_code = status
+
+    def raise_for_status(self) -> None:
+        if self.status_code >= 400:
+            request = httpx.Request("POST", "http://ollama/api/embed")
+            raise httpx.HTTPStatusError("boom", request=request, response=httpx.Response(self.status_code))
+
+    def json(self):
+        return {"embeddings": [[float(len(t)), 1.0, 0.0, 0.0] for t in self._texts]}
+
+
+@pytest.fixture
+def embeddings(monkeypatch):
+    from shail.memory import embeddings
+
+    embeddings.clear_embedding_cache()
+    monkeypatch.setattr(embeddings, "_RETRY_BACKOFF_SEC", 0.0)
+    settings = embeddings._settings()
+    monkeypatch.setattr(settings, "ollama_embed_dim", 4)
+    return embeddings
+
+
+def _texts(n: int, width: int = 40):
+    return [f"{i:03d}".ljust(width, "x") for i in range(n)]
+
+
+def test_plan_batches_splits_by_estimated_tokens(embeddings) -> None:
+    texts = ["a" * 40] * 5 + ["b" * 400]  # 11 tokens each, then one oversized
+    assert embeddings._plan_batches(texts, 25) == [(0, 2), (2, 4), (4, 5), (5, 6)]
+    assert embeddings._plan_batches(texts[:2], 10_000) == [(0, 2)]
+
+
+def test_misses_are_batched_and_merged_in_order(embeddings, monkeypatch) -> None:
+    monkeypatch.setattr(embeddings._settings(), "ollama_embed_batch_tokens", 25)
+    sent = []
+    lock = threading.Lock()
+
+    def _post(url, json, timeout):
+        with lock:
+            sent.append(list(json["input"]))
+        return _Resp(json["input"])
+
+    monkeypatch.setattr(embeddings, "_http_client", lambda: SimpleNamespace(post=_post))
+    texts = _texts(5)
+    out = embeddings.embed_texts(texts + [texts[0]])
+    assert sorted(sent) == [texts[0:2], texts[2:4], texts[4:5]], "duplicates sent once"
+    assert [v[0] for v in out] == [40.0] * 6
+
+
+def test_failing_batch_is_bisected_to_the_bad_input(embeddings, monkeypatch) -> None:
+    calls = []
+
+    def _post(url, json, timeout):
+        calls.append(list(json["input"]))
+        return _Resp(json["input"], status=500 if "poison" in json["input"] else 200)
+
+    monkeypatch.setattr(embeddings, "_http_client", lambda: SimpleNamespace(post=_post))
+    out = embeddings.embed_texts(["a", "b", "poison", "c"])
+    assert [v[0] for v in out] == [1.0, 1.0, 0.0, 1.0]
+    assert embeddings.is_zero_vector(out[2])
+    assert ["a", "b"] in calls and ["c"] in calls
+    assert calls.count(["poison"]) == embeddings._BATCH_ATTEMPTS
+    assert embeddings.embedding_cache_stats()["size"] == 3, "failed input not cached"
+
+
+def test_transient_failure_is_retried_not_split(embeddings, monkeypatch) -> None:
+    calls = []
+
+    def _post(url, json, timeout):
+        calls.append(list(json["input"]))
+        if len(calls) == 1:
+            raise httpx.ReadTimeout("slow")
+        return _Resp(json["input"])
+
+    monkeypatch.setattr(embeddings, "_http_client", lambda: SimpleNamespace(post=_post))
+    out = embeddings.embed_texts(["a", "b"])
+    assert calls == [["a", "b"], ["a", "b"]]
+    assert not any(embeddings.is_zero_vector(v) for v in out)
+
+
+def test_in_flight_batches_respect_concurrency_limit(embeddings, monkeypatch) -> None:
+    settings = embeddings._settings()
+    monkeypatch.setattr(settings, "ollama_embed_batch_tokens", 11)
+    monkeypatch.setattr(settings, "ollama_embed_concurrency", 2)
+    state = {"now": 0, "peak": 0}
+    lock = threading.Lock()
+
+    def _post(url, json, timeout):
+        with lock:
+            state["now"] += 1
+            state["peak"] = max(state["peak"], state["now"])
+        time.sleep(0.02)
+        with lock:
+            state["now"] -= 1
+        return _Resp(json["input"])
+
+    monkeypatch.setattr(embeddings, "_http_client", lambda: SimpleNamespace(post=_post))
+    embeddings.embed_texts(_texts(6))
+    assert state["peak"] == 2
+
+
+def test_aembed_texts_shares_the_cache_with_the_sync_path(embeddings, monkeypatch) -> None:
+    monkeypatch.setattr(embeddings._settings(), "ollama_embed_batch_tokens", 25)
+    sent = []
+
+    async def _apost(url, json, timeout):
+        sent.append(list(json["input"]))
+        await asyncio.sleep(0)
+        return _Resp(json["input"])
+
+    monkeypatch.setattr(embeddings, "_async_http_client", lambda: SimpleNamespace(post=_apost))
+    monkeypatch.setattr(
+        embeddings, "_http_client",
+        lambda: pytest.fail("cached texts must not reach Ollama"),
+    )
+    texts = _texts(3)
+    out = asyncio.run(embeddings.aembed_texts(texts))
+    assert sorted(sent) == [texts[0:2], texts[2:3]]
+    assert embeddings.embed_texts(texts) == out
+
+
+def test_aembed_texts_returns_zero_vectors_when_ollama_is_down(embeddings, monkeypatch) -> None:
+    async def _apost(url, json, timeout):
+        raise httpx.ConnectError("down")
+
+    monkeypatch.setattr(embeddings, "_async_http_client", lambda: SimpleNamespace(post=_apost))
+    out = asyncio.run(embeddings.aembed_texts(["alpha"]))
+    assert embeddings.is_zero_vector(out[0]) and len(out[0]) == 4
+    assert embeddings.embedding_cache_stats()["size"] == 0
@@ -0,0 +1,103 @@
+"""Extracted-text cache: (path, size, mtime) keys, memory + disk tiers,
+PDF page offsets, and cold/warm latency in retrieval diagnostics."""
+from __future__ import annotations
+
+import os
+
+from shail.memory import extraction_cache
+
+
+def _counting_parser(text: str = "parsed body", offsets=(0,)):
+    calls = []
+
+    def _parse(path):
+        calls.append(path)
+        return text, offsets
+
+    return _parse, calls
+
+
+def test_repeat_extraction_is_served_from_memory_then_disk(tmp_path) -> None:
+    pdf = tmp_path / "resume.pdf"
+    pdf.write_bytes(b"%PDF-1")
+    parse, calls = _counting_parser()
+
+    assert extraction_cache.extract(str(pdf), parse).source == "parsed"
+    assert extraction_cache.extract(str(pdf), parse).source == "memory"
+    extraction_cache._memory.clear()  # as after a restart
+    doc = extraction_cache.extract(str(pdf), parse)
+    assert (doc.source, doc.text, doc.page_offsets) == ("disk", "parsed body", (0,))
+    assert len(calls) == 1
+
+
+def test_changed_file_is_reparsed(tmp_path) -> None:
+    doc = tmp_path / "report.docx"
+    doc.write_bytes(b"v1")
+    parse, calls = _counting_parser()
+    extraction_cache.extract(str(doc), parse)
+    os.utime(doc, ns=(1, 1_000_000_000))
+    assert extraction_cache.extract(str(doc), parse).source == "parsed"
+    doc.write_bytes(b"v2 longer")
+    extraction_cache.extract(str(doc), parse)
+    assert len(calls) == 3
+    assert extraction_cache.extraction_cache_stats()["disk"]["size"] == 1, "one row per path"
+
+
+def test_plain_text_and_failures_are_not_cached(tmp_path) -> None:
+    md = tmp_path / "notes.md"
+    md.write_text("hi")
+    parse, calls = _counting_parser()
+    assert extraction_cache.extract(str(md), parse).source == "direct"
+    assert extraction_cache.extract(str(md), parse).source == "direct"
+
+    pdf = tmp_path / "broken.pdf"
+    pdf.write_bytes(b"%PDF-x")
+    assert extraction_cache.extract(str(pdf), lambda p: (None, ())) is None
+    assert extraction_cache.extract(str(pdf), parse).source == "parsed"
+    assert len(calls) == 3
+
+
+def test_disk_tier_evicts_least_recently_used(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(extraction_cache, "_DISK_EVICT_EVERY", 1)
+    disk = extraction_cache._DiskTier(str(tmp_path / "evict.db"), max_bytes=400)
+    for i in range(10):
+        body = os.urandom(60).hex()  # incompressible
+        disk.put((f"/d/{i}.pdf", 1, 1), extraction_cache.ExtractedText(body))
+    assert disk.stats()["bytes"] <= 400
+    assert disk.get(("/d/9.pdf", 1, 1)) is not None
+    assert disk.get(("/d/0.pdf", 1, 1)) is None
+
+
+def test_pdf_page_offsets_map_back_to_pages() -> None:
+    from shail.memory.rag import _join_pages
+
+    text, offsets = _join_pages(["page one", "", "page three"])
+    assert text == "page one\n\npage three"
+    doc = extraction_cache.ExtractedText(text, offsets)
+    assert doc.page_at(0) == 1 and doc.page_at(text.index("three")) == 3
+    assert extraction_cache.ExtractedText("x").page_at(0) is None
+
+
+def test_retrieval_reports_cold_and_warm_extraction_latency(tmp_path, monkeypatch) -> None:
+    from apps.shail.retrieval import diagnostics as DIAG
+    from apps.shail.retrieval import local_files as LF
+    from shail.memory import path_index as PI
+    from shail.memory import rag
+
+    db_path = str(tmp_path / "pi.db")
+    pdf = tmp_path / "resume.pdf"
+    pdf.write_bytes(b"%PDF-fake")
+    parse, calls = _counting_parser("Resume: Mira, staff engineer, Globex.")
+    monkeypatch.setattr(rag, "_parse_document", parse)
+    PI.upsert_file(db_path, str(pdf))
+    extraction_cache.clear_extraction_cache()
+    monkeypatch.setattr(LF.get_settings(), "path_index_db", db_path, raising=False)
+
+    DIAG.reset()
+    for _ in range(3):
+        hits = LF.retrieve_local_file_context("Globex resume", k=3)
+        assert hits and "Mira" in hits[0].snippet
+    latency = DIAG.health_summary()["extraction_latency"]
+    assert latency["extract_cold"]["count"] == 1
+    assert latency["extract_warm"]["count"] == 2
+    assert len(calls) == 2, "one parse at index time, one cold retrieval"
@@ -1,6 +1,6 @@
 """Sprint 3 PR2: hybrid_search orchestrator.
 
-Mocks the semantic path (`rag.search`) and `_apply_time_decay` so tests
+Mocks the semantic path (`rag.asearch`) and `_apply_time_decay` so tests
 do not need Ollama or Chroma. The exact path runs against the real
 seeded SQLite memory_facts (via the `isolated_db` fixture).
 """
@@ -30,8 +30,10 @@ def _seed_facts() -> None:
 
 
 def _mock_rag_search(monkeypatch, results):
-    """Make rag_search return a fixed list. Bypass time-decay by identity."""
-    monkeypatch.setattr(hybrid_mod, "rag_search", lambda q, **kw: results)
+    """Make rag_asearch return a fixed list. Bypass time-decay by identity."""
+    async def _fake(q, **kw):
+        return results
+    monkeypatch.setattr(hybrid_mod, "rag_asearch", _fake)
     # Patch the local `_apply_time_decay` import inside _run_semantic.
     import apps.shail.chat_api as chat_api
     monkeypatch.setattr(chat_api, "_apply_time_decay",
@@ -120,10 +122,10 @@ def test_semantic_always_runs_even_for_exact_intent(
     if not exact_index.has_fts5():
         pytest.skip("FTS5 not compiled")
     called = []
-    def _fake_rag(q, **kw):
+    async def _fake_rag(q, **kw):
         called.append(q)
         return []
-    monkeypatch.setattr(hybrid_mod, "rag_search", _fake_rag)
+    monkeypatch.setattr(hybrid_mod, "rag_asearch", _fake_rag)
     import apps.shail.chat_api as chat_api
     monkeypatch.setattr(chat_api, "_apply_time_decay", lambda hits, k=12: hits[:k])
 
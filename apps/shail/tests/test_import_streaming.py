@@ -0,0 +1,143 @@
+"""Streaming chat-export import: incremental JSON reader, iter_parse, bulk writer."""
+from __future__ import annotations
+
+import io
+import json
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from apps.shail.importers import chatgpt, claude, gemini, stream
+from apps.shail.importers import common as importers_common
+
+
+def _chatgpt_conv(i: int) -> dict:
+    return {
+        "title": f"Topic {i}",
+        "id": f"c{i}",
+        "create_time": 1700000000.0 + i,
+        "current_node": "a",
+        "mapping": {
+            "r": {"message": None, "parent": None, "children": ["u"]},
+            "u": {"message": {"author": {"role": "user"}, "content": {"parts": [f"q{i} ü"]}},
+                  "parent": "r", "children": ["a"]},
+            "a": {"message": {"author": {"role": "assistant"}, "content": {"parts": [f"a{i}"]}},
+                  "parent": "u", "children": []},
+        },
+    }
+
+
+@pytest.fixture
+def small_reads(monkeypatch):
+    """Force values to straddle read windows."""
+    monkeypatch.setattr(stream, "_READ_SIZE", 5)
+
+
+@pytest.mark.parametrize("doc, shapes", [
+    ([1, {"a": [2, 3]}, "x"], ["array"] * 3),
+    ({"meta": {"v": 1}, "conversations": [10, 20], "tail": True}, ["keyed"] * 2),
+    ({"title": "single", "mapping": {}}, ["object"]),
+    ([], []),
+])
+def test_iter_json_items_matches_json_loads(small_reads, doc, shapes) -> None:
+    raw = json.dumps(doc)
+    for fp in (io.BytesIO(("﻿" + raw).encode("utf-8")), io.StringIO(raw)):
+        items = list(stream.iter_json_items(fp, key="conversations"))
+        assert [shape for shape, _ in items] == shapes
+        expected = doc if isinstance(doc, list) else doc.get("conversations", [doc])
+        assert [item for _, item in items] == expected
+
+
+def test_iter_json_items_rejects_malformed_input(small_reads) -> None:
+    with pytest.raises(json.JSONDecodeError):
+        list(stream.iter_json_items(io.BytesIO(b'[{"a": 1} {"b": 2}]')))
+    items = stream.iter_json_items(io.BytesIO(b'[{"a": 1}, {"b": tru}]'))
+    assert next(items) == ("array", {"a": 1})
+    with pytest.raises(json.JSONDecodeError):
+        next(items)
+
+
+def test_iter_parse_matches_parse_for_each_provider(small_reads) -> None:
+    chatgpt_export = [_chatgpt_conv(i) for i in range(3)]
+    claude_export = {"conversations": [{
+        "uuid": "c1", "name": "Claude chat",
+        "chat_messages": [{"sender": "human", "text": "hi"}, {"sender": "assistant", "text": "hello"}],
+    }]}
+    gemini_native = {"conversations": [{"id": "g1", "messages": [
+        {"role": "user", "text": "q"}, {"role": "model", "text": "a"}]}]}
+    gemini_takeout = [
+        {"header": "Gemini Apps", "title": 'Asked "why?"', "time": "2025-01-01T00:00:00Z"},
+        {"header": "YouTube", "title": "Watched", "time": "2025-01-01T00:00:01Z"},
+        {"header": "Gemini Apps", "title": "Because.", "time": "2025-01-01T00:00:02Z"},
+    ]
+    for module, export in [(chatgpt, chatgpt_export), (claude, claude_export),
+                           (gemini, gemini_native), (gemini, gemini_takeout)]:
+        raw = json.dumps(export).encode("utf-8")
+        assert list(module.iter_parse(io.BytesIO(raw))) == module.parse(raw)
+
+
+@pytest.fixture
+def import_db(isolated_db: Path):
+    from apps.shail.auth_store import init_auth_db
+    from apps.shail.db import close_db_pool
+    from apps.shail.session_backfill import ensure_phase_c_schema
+
+    close_db_pool()
+    init_auth_db()
+    ensure_phase_c_schema()
+    with sqlite3.connect(str(isolated_db)) as con:
+        con.execute(
+            "INSERT INTO users (id, email, password_hash, created_at) VALUES (?, ?, ?, ?)",
+            ("u_test", "test@example.com", "fake_hash", "2026-01-01T00:00:00+00:00"),
+        )
+    yield isolated_db
+    close_db_pool()
+
+
+def test_streamed_import_writes_each_conversation_in_bulk(import_db, monkeypatch) -> None:
+    from apps.shail import chat_store
+
+    monkeypatch.setattr(chat_store, "append_message",
+                        lambda *a, **k: pytest.fail("import must use the bulk writer"))
+    export = [_chatgpt_conv(i) for i in range(4)]
+    export[1]["mapping"]["a"]["message"]["content"]["parts"] = [""]  # orphan user turn
+    seen = []
+    result = importers_common.import_conversation_payload(
+        user_id="u_test", source="chatgpt",
+        conversations=chatgpt.iter_parse(io.BytesIO(json.dumps(export).encode())),
+        progress=lambda r: seen.append(r.conversations_seen),
+    )
+    assert (result.conversations_seen, result.sessions_created, result.messages_inserted) == (4, 4, 7)
+    assert seen == [1, 2, 3, 4] and not result.errors
+    msgs = chat_store.get_messages(result.session_ids[0], "u_test")
+    assert [(m["role"], m["content"]) for m in msgs] == [("user", "q0 ü"), ("assistant", "a0")]
+    assert msgs[0]["created_at"] < msgs[1]["created_at"]
+
+
+def test_truncated_export_keeps_what_was_imported(import_db) -> None:
+    raw = json.dumps([_chatgpt_conv(0), _chatgpt_conv(1)]).encode()
+    result = importers_common.import_conversation_payload(
+        user_id="u_test", source="chatgpt",
+        conversations=chatgpt.iter_parse(io.BytesIO(raw[:-40])),
+    )
+    assert result.sessions_created == 1
+    assert result.errors and "truncated after 1" in result.errors[0]
+
+    with pytest.raises(json.JSONDecodeError):
+        importers_common.import_conversation_payload(
+            user_id="u_test", source="chatgpt",
+            conversations=chatgpt.iter_parse(io.BytesIO(b"not json")),
+        )
+
+
+def test_import_job_registry_reports_progress() -> None:
+    job_id = importers_common.start_import_job("u_jobs", "claude", total_bytes=200)
+    partial = importers_common.ImportResult(source="claude", conversations_seen=3, sessions_created=2)
+    importers_common.update_import_job(job_id, partial, bytes_read=50)
+    job = importers_common.list_import_jobs("u_jobs")[0]
+    assert (job["job_id"], job["state"], job["progress_pct"], job["sessions_created"]) == \
+        (job_id, "running", 25.0, 2)
+    importers_common.update_import_job(job_id, state="done", bytes_read=200)
+    assert importers_common.list_import_jobs("u_jobs")[0]["progress_pct"] == 100.0
+    assert importers_common.list_import_jobs("someone-else") == []
@@ -0,0 +1,114 @@
+"""apps.shail.llm: pooled per-provider clients, concurrency caps, latency metrics."""
+from __future__ import annotations
+
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from apps.shail import llm, telemetry
+
+
+@pytest.fixture
+def mock_providers(monkeypatch):
+    """Route every provider client through a MockTransport; count clients built."""
+    built = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        if request.url.host == "api.openai.com":
+            if body["stream"]:
+                lines = 'data: {"choices":[{"delta":{"content":"hi"}}]}\n\ndata: [DONE]\n\n'
+                return httpx.Response(200, text=lines)
+            return httpx.Response(200, json={"choices": [{"message": {"content": "openai ok"}}]})
+        if body["stream"]:
+            lines = "\n".join(json.dumps({"message": {"content": t}, "done": t == ""}) for t in ("a", "b", ""))
+            return httpx.Response(200, text=lines)
+        return httpx.Response(200, json={"message": {"content": "ollama ok"}})
+
+    def new_client(provider):
+        built.append(provider)
+        return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    monkeypatch.setattr(llm, "_new_client", new_client)
+    telemetry.reset()
+    yield built
+    telemetry.reset()
+
+
+def _ollama():
+    return {"provider": llm.PROVIDER_OLLAMA, "model": "m", "api_key": ""}
+
+
+def test_clients_are_reused_per_provider_and_closed(mock_providers) -> None:
+    openai = {"provider": llm.PROVIDER_OPENAI, "model": "m", "api_key": "k"}
+    msgs = [{"role": "user", "content": "q"}]
+
+    async def run():
+        for _ in range(3):
+            assert await llm._dispatch(_ollama(), msgs, "sys", stream=False) == "ollama ok"
+        assert await llm._dispatch(openai, msgs, "sys", stream=False) == "openai ok"
+        chunks = [p async for p in await llm._dispatch(openai, msgs, "sys", stream=True)]
+        assert chunks[0] == {"text": "hi", "done": False}
+        clients = [c for c, _ in llm._clients[asyncio.get_running_loop()].values()]
+        await llm.close_llm_clients()
+        assert all(c.is_closed for c in clients)
+
+    asyncio.run(run())
+    assert mock_providers == [llm.PROVIDER_OLLAMA, llm.PROVIDER_OPENAI]
+
+    hists = telemetry.snapshot()["histograms"]
+    assert hists["llm.latency_ms{mode=call,provider=ollama}"]["count"] == 3
+    assert hists["llm.latency_ms{mode=stream,provider=openai}"]["count"] == 1
+    assert hists["llm.ttft_ms{provider=openai}"]["count"] == 1
+
+
+def test_stream_holds_a_provider_slot_until_finished(mock_providers, monkeypatch) -> None:
+    monkeypatch.setattr(llm, "_provider_concurrency", lambda provider: 1)
+    msgs = [{"role": "user", "content": "q"}]
+
+    async def run():
+        stream = await llm._dispatch(_ollama(), msgs, "sys", stream=True)
+        assert (await stream.__anext__())["text"] == "a"
+        call = asyncio.ensure_future(llm._dispatch(_ollama(), msgs, "sys", stream=False))
+        await asyncio.sleep(0.05)
+        assert not call.done(), "the single slot is held by the open stream"
+        assert [p["text"] async for p in stream] == ["b", ""]
+        assert await asyncio.wait_for(call, 1.0) == "ollama ok"
+        await llm.close_llm_clients()
+
+    asyncio.run(run())
+    assert telemetry.snapshot()["histograms"]["llm.ttft_ms{provider=ollama}"]["count"] == 1
+
+
+def test_background_calls_leave_interactive_slots_free(monkeypatch) -> None:
+    monkeypatch.setattr(llm, "_provider_concurrency", lambda provider: 2)
+    monkeypatch.setattr(llm.get_settings(), "llm_interactive_reserve", 1)
+    monkeypatch.setattr(llm, "get_user_llm_config", lambda user_id: _ollama())
+
+    async def run():
+        release = asyncio.Event()
+        in_flight = []
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            body = json.loads(request.content)
+            in_flight.append(body["messages"][-1]["content"])
+            if body["messages"][-1]["content"] != "chat":
+                await release.wait()
+            return httpx.Response(200, json={"message": {"content": "ok"}})
+
+        monkeypatch.setattr(llm, "_new_client", lambda provider: httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+        jobs = [
+            asyncio.ensure_future(llm.call_llm([{"role": "user", "content": f"bp{i}"}], background=True))
+            for i in range(3)
+        ]
+        await asyncio.sleep(0.05)
+        assert in_flight == ["bp0"], "background calls are capped below the provider limit"
+        chat = await asyncio.wait_for(llm.call_llm([{"role": "user", "content": "chat"}]), 1.0)
+        assert chat[0] == "ok"
+        release.set()
+        assert [r[0] for r in await asyncio.gather(*jobs)] == ["ok"] * 3
+        await llm.close_llm_clients()
+
+    asyncio.run(run())
@@ -0,0 +1,123 @@
+"""Persisted memory graph behind `/api/v2/graph`."""
+from __future__ import annotations
+
+import asyncio
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+class EmptyVectorCollection:
+    def get(self, *args, **kwargs):
+        return {"ids": [], "documents": [], "metadatas": []}
+
+
+class EmptyVectorStore:
+    collection = EmptyVectorCollection()
+
+
+def _save(memory_id: str, title: str, *, url: str, ts: str, conversation: str = "") -> None:
+    from apps.shail import raw_transcripts as rt
+
+    metadata = {
+        "customId": memory_id,
+        "eventType": "ai_conversation",
+        "sourceApp": "claude",
+        "sourceUrl": url,
+        "title": title,
+        "timestamp": ts,
+    }
+    if conversation:
+        metadata["conversationId"] = conversation
+    rt.save(
+        memory_id=memory_id,
+        user_id="u1",
+        namespace="user_u1",
+        content_type="ai_conversation",
+        content=f"[claude] {title}\n\nAssistant: {title}",
+        metadata=metadata,
+    )
+
+
+def _edges(graph):
+    return {(e.source, e.target): e.type for e in graph.edges}
+
+
+def test_graph_edges_are_persisted_and_follow_captures(isolated_db, monkeypatch):
+    from apps.shail import memory_dashboard_api, memory_graph
+    from apps.shail import raw_transcripts as rt
+
+    monkeypatch.setattr(memory_dashboard_api, "_get_store", lambda: EmptyVectorStore())
+    _save("g_1", "Pricing experiment annual plans", url="https://claude.ai/chat/a", ts="2026-06-01T00:00:00+00:00", conversation="c1")
+    _save("g_2", "Pricing experiment follow up", url="https://claude.ai/chat/a", ts="2026-06-02T00:00:00+00:00", conversation="c1")
+    _save("g_3", "Sourdough starter notes", url="https://example.org/bread", ts="2026-06-03T00:00:00+00:00")
+
+    graph = _run(memory_dashboard_api.memory_graph(user_id="u1"))
+    assert {n.id for n in graph.nodes} == {"g_1", "g_2", "g_3"}
+    edges = _edges(graph)
+    assert edges[("g_1", "g_2")] == "conversation"
+    assert memory_graph.is_built("user_u1")
+
+    # New capture is linked incrementally, without a rebuild.
+    def _no_rebuild(_namespace):
+        raise AssertionError("built namespaces must update incrementally")
+
+    monkeypatch.setattr(memory_graph, "rebuild", _no_rebuild)
+    _save("g_4", "Sourdough starter feeding schedule", url="https://example.org/bread2", ts="2026-06-04T00:00:00+00:00")
+    edges = _edges(_run(memory_dashboard_api.memory_graph(user_id="u1")))
+    assert edges[("g_3", "g_4")] == "shared_domain"
+
+    rt.delete("g_3")
+    edges = _edges(_run(memory_dashboard_api.memory_graph(user_id="u1")))
+    assert not any("g_3" in pair for pair in edges)
+
+
+def test_incremental_links_match_full_rebuild(isolated_db, monkeypatch):
+    from apps.shail import memory_dashboard_api, memory_graph
+
+    monkeypatch.setattr(memory_dashboard_api, "_get_store", lambda: EmptyVectorStore())
+    _save("r_0", "seed", url="https://seed.example/0", ts="2026-05-01T00:00:00+00:00")
+    _run(memory_dashboard_api.memory_graph(user_id="u1"))
+
+    titles = [
+        "quarterly churn model cohort analysis",
+        "churn model retention cohort review",
+        "onboarding funnel cohort retention",
+        "database migration rollback plan",
+        "migration rollback checklist database",
+    ]
+    for i, title in enumerate(titles, start=1):
+        _save(f"r_{i}", title, url=f"https://site{i}.example/p", ts=f"2026-06-0{i}T00:00:00+00:00")
+
+    incremental = _edges(_run(memory_dashboard_api.memory_graph(user_id="u1")))
+    memory_graph.rebuild("user_u1")
+    rebuilt = _edges(_run(memory_dashboard_api.memory_graph(user_id="u1")))
+    assert incremental == rebuilt
+    assert rebuilt[("r_4", "r_5")] == "token_overlap"
+    assert rebuilt[("r_1", "r_2")] == "token_overlap"
+
+
+def test_ego_graph_respects_node_budget(isolated_db, monkeypatch):
+    from apps.shail import memory_dashboard_api
+    from fastapi import HTTPException
+
+    monkeypatch.setattr(memory_dashboard_api, "_get_store", lambda: EmptyVectorStore())
+    for i in range(6):
+        _save(f"e_{i}", f"Thread message {i}", url=f"https://claude.ai/chat/{i}", ts=f"2026-06-0{i + 1}T00:00:00+00:00", conversation="c1")
+    _save("e_other", "Unrelated", url="https://other.example/x", ts="2026-07-01T00:00:00+00:00")
+
+    ego = _run(memory_dashboard_api.memory_graph(center="e_0", max_nodes=3, user_id="u1"))
+    ids = {n.id for n in ego.nodes}
+    assert "e_0" in ids and len(ids) == 3 and "e_other" not in ids
+    assert all(e.source in ids and e.target in ids for e in ego.edges)
+
+    newest = _run(memory_dashboard_api.memory_graph(max_nodes=2, user_id="u1"))
+    assert [n.id for n in newest.nodes] == ["e_other", "e_5"]
+
+    try:
+        _run(memory_dashboard_api.memory_graph(center="missing", user_id="u1"))
+    except HTTPException as exc:
+        assert exc.status_code == 404
+    else:
+        raise AssertionError("unknown center must 404")
@@ -51,6 +51,34 @@ class TestSchemaMigration:
         from shail.memory.path_index import fts_available
         assert fts_available(fresh_db)
 
+    def test_migration_runs_once_and_connection_is_reused(self, fresh_db, monkeypatch):
+        from shail.memory import path_index
+        runs = []
+        real_migrate = path_index._migrate
+        monkeypatch.setattr(path_index, "_migrate", lambda con: (runs.append(1), real_migrate(con)))
+        with path_index._conn(fresh_db) as first:
+            assert first.execute("PRAGMA user_version").fetchone()[0] == path_index._SCHEMA_VERSION
+        path_index.search(fresh_db, "anything")
+        path_index.stats(fresh_db)
+        with path_index._conn(fresh_db) as again:
+            assert again is first
+        assert runs == [1]
+
+    def test_legacy_database_is_upgraded(self, fresh_db):
+        import sqlite3
+        from shail.memory import path_index
+        legacy = sqlite3.connect(fresh_db)
+        legacy.executescript(path_index._DDL)
+        legacy.execute(
+            "INSERT INTO path_index (id, path, file_type, title, indexed_at) "
+            "VALUES ('x', '/tmp/old/report.md', 'md', 'report', 0)"
+        )
+        legacy.commit()
+        legacy.close()
+        hits = path_index.search(fresh_db, "report")
+        assert [h["id"] for h in hits] == ["x"], "FTS mirror seeded on upgrade"
+        assert path_index.get_by_id(fresh_db, "x")["embedded"] == 0
+
 
 class TestKindClassification:
     def test_code_kind(self):
@@ -128,6 +156,134 @@ class TestScanAndTree:
         assert "a" in names and "b" in names
 
 
+class TestScanEngine:
+    def test_scan_uses_one_connection_and_reports_throughput(self, fresh_db, tmp_path, monkeypatch):
+        from shail.memory import path_index
+        root = _seed_dir(tmp_path)
+        opened = []
+        real_conn = path_index._conn
+
+        def _counting_conn(db_path):
+            opened.append(db_path)
+            return real_conn(db_path)
+
+        monkeypatch.setattr(path_index, "_conn", _counting_conn)
+        assert path_index.scan(fresh_db, roots=[str(root)]) == 3
+        assert len(opened) == 1
+        report = path_index.last_scan_report()
+        assert report["files_seen"] == 3 and report["indexed"] == 3
+        assert report["dirs"] == 2 and report["files_per_sec"] > 0
+
+    def test_rescan_skips_unchanged_and_keeps_ids(self, fresh_db, tmp_path):
+        from shail.memory.path_index import get_by_path, scan
+        root = _seed_dir(tmp_path)
+        scan(fresh_db, roots=[str(root)])
+        before = get_by_path(fresh_db, str(root / "notes.md"))["id"]
+        assert scan(fresh_db, roots=[str(root)]) == 0
+        (root / "notes.md").write_text("# Widget beta")
+        os.utime(root / "notes.md", (1, 1))
+        assert scan(fresh_db, roots=[str(root)]) == 1
+        row = get_by_path(fresh_db, str(root / "notes.md"))
+        assert row["id"] == before and "beta" in row["summary_snippet"]
+
+    def test_scan_prunes_deleted_files_and_folders(self, fresh_db, tmp_path):
+        from shail.memory.path_index import get_by_path, last_scan_report, scan, upsert_file
+        root = _seed_dir(tmp_path)
+        outside = tmp_path / "outside.md"
+        outside.write_text("not under the root")
+        upsert_file(fresh_db, str(outside))
+        scan(fresh_db, roots=[str(root)])
+
+        (root / "subdir" / "nested.txt").unlink()
+        (root / "subdir").rmdir()
+        outside.unlink()
+        scan(fresh_db, roots=[str(root)])
+        assert last_scan_report()["pruned"] == 2
+        assert get_by_path(fresh_db, str(root / "subdir")) is None
+        assert get_by_path(fresh_db, str(root / "subdir" / "nested.txt")) is None
+        assert get_by_path(fresh_db, str(root / "notes.md")) is not None
+        assert get_by_path(fresh_db, str(outside)) is not None, "rows outside walked roots stay"
+
+
+
+class TestStartupJournal:
+    def test_incremental_scan_lists_only_changed_dirs(self, fresh_db, tmp_path):
+        from shail.memory.path_index import get_by_path, last_scan_report, mark_clean_shutdown, scan
+        root = _seed_dir(tmp_path)
+        scan(fresh_db, roots=[str(root)])
+        mark_clean_shutdown(fresh_db)
+
+        (root / "subdir" / "added.md").write_text("# added while down")
+        os.utime(root / "subdir", (5, 5))
+        assert scan(fresh_db, roots=[str(root)], incremental=True) == 1
+        report = last_scan_report()
+        assert report["incremental"] and report["dirs"] == 1 and report["dirs_skipped"] == 1
+        assert get_by_path(fresh_db, str(root / "subdir" / "added.md")) is not None
+        assert get_by_path(fresh_db, str(root / "notes.md")) is not None, "skipped dir keeps its rows"
+
+    def test_incremental_scan_prunes_removed_subtree(self, fresh_db, tmp_path):
+        from shail.memory.path_index import get_by_path, last_scan_report, mark_clean_shutdown, scan
+        root = _seed_dir(tmp_path)
+        scan(fresh_db, roots=[str(root)])
+        mark_clean_shutdown(fresh_db)
+
+        (root / "subdir" / "nested.txt").unlink()
+        (root / "subdir").rmdir()
+        scan(fresh_db, roots=[str(root)], incremental=True)
+        assert last_scan_report()["pruned"] == 2
+        assert get_by_path(fresh_db, str(root / "subdir")) is None
+
+    def test_missing_clean_shutdown_marker_forces_full_walk(self, fresh_db, tmp_path):
+        from shail.memory.path_index import last_scan_report, mark_clean_shutdown, scan
+        root = _seed_dir(tmp_path)
+        scan(fresh_db, roots=[str(root)])
+        scan(fresh_db, roots=[str(root)], incremental=True)
+        assert not last_scan_report()["incremental"] and last_scan_report()["dirs"] == 2
+
+        mark_clean_shutdown(fresh_db)
+        scan(fresh_db, roots=[str(root)], incremental=True)
+        assert last_scan_report()["dirs_skipped"] == 2
+        scan(fresh_db, roots=[str(root)], incremental=True)
+        assert last_scan_report()["dirs"] == 2, "marker is consumed by the scan that used it"
+
+    @pytest.mark.parametrize("observers_ran, roots_watched, marked", [
+        (True, True, True),
+        (False, False, False),  # no resident user: nothing was attached
+        (True, False, False),   # some scan roots had no observer
+        (False, True, False),   # an observer died before shutdown
+    ])
+    def test_lifespan_marks_clean_shutdown_only_when_watched(
+        self, isolated_db, fresh_db, monkeypatch, observers_ran, roots_watched, marked,
+    ):
+        import asyncio
+
+        from apps.shail import main
+        from apps.shail.settings import get_settings
+        from shail.integrations.local.filesystem import adapter as fs_adapter
+        from shail.memory.path_index import _consume_clean_shutdown, _conn
+
+        class _Adapter:
+            def stop_all(self):
+                return observers_ran
+
+        async def _noop():
+            return None
+
+        monkeypatch.setattr(get_settings(), "path_index_db", fresh_db)
+        for name in ("_startup_index_run", "_start_blueprint_queue_worker_run",
+                     "_restart_filesystem_watchers_run"):
+            monkeypatch.setattr(main, name, _noop)
+        monkeypatch.setattr(main, "_scan_roots_watched", roots_watched)
+        monkeypatch.setattr(fs_adapter, "get_adapter", lambda: _Adapter())
+
+        async def _cycle():
+            async with main.lifespan(main.app):
+                pass
+
+        asyncio.run(_cycle())
+        with _conn(fresh_db) as con:
+            assert _consume_clean_shutdown(con) is marked
+
 class TestFTS5Search:
     def test_search_finds_by_filename(self, fresh_db, tmp_path):
         from shail.memory.path_index import scan, search
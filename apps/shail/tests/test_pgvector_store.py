@@ -0,0 +1,204 @@
+"""PgVectorStore pooling, binary COPY upserts and ANN index option.
+
+psycopg2 is replaced by an in-memory fake that records SQL; no Postgres.
+"""
+from __future__ import annotations
+
+import struct
+import sys
+import threading
+import time
+import types
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+
+class FakeCursor:
+    def __init__(self, log):
+        self.log = log
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        self.log.append(("execute", " ".join(sql.split()), params))
+
+    def copy_expert(self, sql, stream):
+        self.log.append(("copy", " ".join(sql.split()), stream.read()))
+
+    def fetchall(self):
+        return []
+
+
+class FakeConnection:
+    closed = 0
+
+    def __init__(self, log):
+        self.log = log
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def cursor(self):
+        return FakeCursor(self.log)
+
+
+class FakePool:
+    """Raises like psycopg2's pool once `maxconn` connections are out."""
+
+    instances: list = []
+
+    def __init__(self, minconn, maxconn, dsn):
+        self.maxconn = maxconn
+        self.log: list = []
+        self.conn = FakeConnection(self.log)
+        self.checkouts = 0
+        self.out = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+        FakePool.instances.append(self)
+
+    def getconn(self):
+        with self.lock:
+            if self.out >= self.maxconn:
+                raise RuntimeError("connection pool exhausted")
+            self.checkouts += 1
+            self.out += 1
+            self.peak = max(self.peak, self.out)
+        return self.conn
+
+    def putconn(self, conn, close=False):
+        assert conn is self.conn
+        with self.lock:
+            self.out -= 1
+
+    def closeall(self):
+        pass
+
+
+@pytest.fixture
+def fake_psycopg2(monkeypatch):
+    module = types.ModuleType("psycopg2")
+    module.InterfaceError = type("InterfaceError", (Exception,), {})
+    module.OperationalError = type("OperationalError", (Exception,), {})
+    module.connect = lambda dsn: pytest.fail("PgVectorStore must not open ad-hoc connections")
+    pool = types.ModuleType("psycopg2.pool")
+    pool.ThreadedConnectionPool = FakePool
+    module.pool = pool
+    monkeypatch.setitem(sys.modules, "psycopg2", module)
+    monkeypatch.setitem(sys.modules, "psycopg2.pool", pool)
+    FakePool.instances = []
+    return module
+
+
+def _decode_copy(payload: bytes):
+    assert payload.startswith(b"PGCOPY\n\xff\r\n\x00")
+    pos = 11 + 8
+    rows = []
+    while True:
+        (nfields,) = struct.unpack_from(">h", payload, pos)
+        pos += 2
+        if nfields == -1:
+            break
+        fields = []
+        for _ in range(nfields):
+            (size,) = struct.unpack_from(">i", payload, pos)
+            pos += 4
+            fields.append(payload[pos:pos + size])
+            pos += size
+        rows.append(fields)
+    assert pos == len(payload)
+    return rows
+
+
+def test_upsert_is_one_binary_copy_on_a_pooled_connection(fake_psycopg2):
+    from shail.memory.vector_store import EmbeddingRecord, PgVectorStore
+
+    store = PgVectorStore("postgresql://fake", dim=3, pool_size=2)
+    pool = FakePool.instances[0]
+    assert pool.maxconn == 2
+    pool.log.clear()
+
+    ids = store.upsert([
+        EmbeddingRecord("a", "ns", "first", {}, [0.5, -1.0, 2.0]),
+        EmbeddingRecord("b", "ns", "second", {"k": 1}, [1.0, 0.0, 0.0]),
+        EmbeddingRecord("a", "ns", "first again", {}, [0.25, 0.25, 0.25]),
+    ])
+    assert ids == ["a", "b", "a"]
+
+    copies = [entry for entry in pool.log if entry[0] == "copy"]
+    merges = [entry for entry in pool.log if entry[0] == "execute" and "ON CONFLICT" in entry[1]]
+    assert len(copies) == 1 and len(merges) == 1
+    assert "FORMAT binary" in copies[0][1]
+
+    rows = _decode_copy(copies[0][2])
+    assert [r[0] for r in rows] == [b"b", b"a"], "duplicate ids collapse to the last record"
+    b_row, a_row = rows
+    assert a_row[2] == b"first again"
+    assert b_row[3][:1] == b"\x01" and b'"k": 1' in b_row[3]
+    dim, unused, *values = struct.unpack(">hh3f", a_row[4])
+    assert (dim, unused, values) == (3, 0, [0.25, 0.25, 0.25])
+
+    store.query([1.0, 0.0, 0.0], "ns", None, 5)
+    store.delete_ids(["a"])
+    assert pool.checkouts == 4  # schema, upsert, query, delete — all pooled
+
+
+@pytest.mark.parametrize("index, fragment", [
+    ("hnsw", "USING hnsw (embedding vector_cosine_ops)"),
+    ("ivfflat", "USING ivfflat (embedding vector_cosine_ops) WITH (lists = 100)"),
+])
+def test_init_schema_creates_requested_ann_index(fake_psycopg2, index, fragment):
+    from shail.memory.vector_store import PgVectorStore
+
+    PgVectorStore("postgresql://fake", dim=3, index=index)
+    statements = [entry[1] for entry in FakePool.instances[0].log]
+    assert any(fragment in sql for sql in statements)
+
+
+def test_default_schema_has_no_ann_index(fake_psycopg2):
+    from shail.memory.vector_store import PgVectorStore
+
+    PgVectorStore("postgresql://fake", dim=3)
+    statements = [entry[1] for entry in FakePool.instances[0].log]
+    assert not any("hnsw" in sql or "ivfflat" in sql for sql in statements)
+
+
+def test_query_namespaces_is_one_lateral_statement(fake_psycopg2):
+    from shail.memory.vector_store import PgVectorStore
+
+    store = PgVectorStore("postgresql://fake", dim=3)
+    pool = FakePool.instances[0]
+    pool.log.clear()
+    out = store.query_namespaces([1.0, 0.0, 0.0], ["mcp_a", "mcp_b"], {"kind": "doc"}, 2)
+
+    assert out == {"mcp_a": [], "mcp_b": []}
+    assert len(pool.log) == 1
+    _, sql, params = pool.log[0]
+    assert "CROSS JOIN LATERAL" in sql and "unnest(%s::text[])" in sql
+    assert params[0] == ["mcp_a", "mcp_b"] and params[-1] == 2 and "kind" in params
+
+
+def test_callers_beyond_pool_size_wait_for_a_connection(fake_psycopg2, monkeypatch):
+    from shail.memory.vector_store import PgVectorStore
+
+    store = PgVectorStore("postgresql://fake", dim=3, pool_size=2)
+    pool = FakePool.instances[0]
+
+    def slow_fetchall(self):
+        time.sleep(0.02)
+        return []
+
+    monkeypatch.setattr(FakeCursor, "fetchall", slow_fetchall)
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(lambda _: store.query([1.0, 0.0, 0.0], "ns", None, 5), range(8)))
+
+    assert results == [[]] * 8
+    assert pool.peak == 2
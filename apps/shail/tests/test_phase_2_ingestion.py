@@ -1,6 +1,6 @@
 import pytest
 from fastapi.testclient import TestClient
-from unittest.mock import patch, MagicMock
+from unittest.mock import AsyncMock, patch, MagicMock
 
 # Assuming the app factory or instance is imported
 # from apps.shail.main import app
@@ -60,12 +60,12 @@ def test_bulk_capture_priority(mock_get_ns, mock_enqueue, mock_save):
     bg_func = bg_tasks.tasks[0].func
     
     # We patch ingest and pipeline_status inside the background task execution
-    with patch("apps.shail.browser_api.ingest") as mock_ingest, \
+    with patch("apps.shail.browser_api.aingest", new_callable=AsyncMock) as mock_ingest, \
          patch("apps.shail.pipeline_status.mark_stage") as mock_mark_stage:
         
         mock_ingest.return_value = 1
         
-        bg_func()
+        asyncio.run(bg_func())
         
         # Verify enqueue was called with priority=-1
         mock_enqueue.assert_called_once_with(
@@ -0,0 +1,150 @@
+"""Per-turn QueryContext: `_build_context` embeds the query once, batches
+MCP namespaces into one store call, and records per-source timings."""
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+
+
+class _FakeStore:
+    def __init__(self) -> None:
+        self.queries: list = []
+        self.batched: list = []
+
+    def query(self, query_embedding, namespace=None, filters=None, k=5):
+        self.queries.append((namespace, list(query_embedding)))
+        return []
+
+    def query_namespaces(self, query_embedding, namespaces, filters, k):
+        self.batched.append((list(namespaces), k))
+        return {
+            ns: [{"content": f"doc from {ns}", "score": 0.9,
+                  "metadata": {"id": f"{ns}-1", "title": "Roadmap"}}]
+            for ns in namespaces
+        }
+
+
+def test_build_context_embeds_once_and_batches_mcp_namespaces(isolated_db: Path, monkeypatch) -> None:
+    import apps.shail.chat_api as chat_api
+    from apps.shail.retrieval.query_context import QueryContext
+    from shail.memory import embeddings, rag
+
+    calls = []
+
+    async def _aembed(query):
+        calls.append(query)
+        await asyncio.sleep(0.01)
+        return [0.5] * 8
+
+    store = _FakeStore()
+    monkeypatch.setattr(embeddings, "aembed_query", _aembed)
+    monkeypatch.setattr(chat_api, "emb_q", lambda q: calls.append(q) or [0.5] * 8)
+    monkeypatch.setattr(chat_api, "_get_store", lambda: store)
+    monkeypatch.setattr(rag, "_get_store", lambda: store)
+    monkeypatch.setattr(chat_api, "_browser_lexical_memory_hits", lambda *a, **k: [])
+    monkeypatch.setattr(chat_api, "list_mcp_connections",
+                        lambda uid: [{"provider": "notion"}, {"provider": "gmail"}])
+
+    async def _no_live_fetch(user_id, query):
+        return []
+
+    monkeypatch.setattr(chat_api, "_fetch_mcp_sources", _no_live_fetch)
+    monkeypatch.setattr(chat_api, "needs_web_search", lambda q: False)
+    monkeypatch.setattr(chat_api.get_settings(), "shail_local_files_in_chat", False)
+
+    qctx = QueryContext("what did we say last time about the roadmap")
+    _, _, _, _, mcp_cites, _ = asyncio.run(chat_api._build_context(
+        "u1", qctx.query, is_first_in_session=True, query_context=qctx,
+    ))
+
+    assert calls == [qctx.query], "memories, past chats and MCP share one embed"
+    assert sorted(ns for ns, _ in store.queries) == ["chat_u1", "user_u1"]
+    assert store.batched == [(["mcp_u1_notion", "mcp_u1_gmail"], 2)]
+    assert {c.provider for c in mcp_cites} == {"notion", "gmail"}
+    assert {"embed", "memories", "past_chats", "mcp", "mcp_index"} <= set(qctx.timings)
+
+
+def test_embedding_survives_a_cancelled_consumer(monkeypatch) -> None:
+    from apps.shail.retrieval.query_context import QueryContext
+    from shail.memory import embeddings
+
+    calls = []
+
+    async def _aembed(query):
+        calls.append(query)
+        await asyncio.sleep(0.02)
+        return [1.0, 0.0]
+
+    monkeypatch.setattr(embeddings, "aembed_query", _aembed)
+
+    async def _run():
+        qctx = QueryContext("q")
+        impatient = asyncio.ensure_future(qctx.embedding())
+        await asyncio.sleep(0)
+        impatient.cancel()
+        return await qctx.embedding()
+
+    assert asyncio.run(_run()) == [1.0, 0.0]
+    assert calls == ["q"]
+
+
+def test_budget_cancels_late_sources_and_records_timeouts() -> None:
+    import time
+
+    from apps.shail import telemetry
+    from apps.shail.chat_api import _await_within_budget
+    from apps.shail.retrieval.query_context import QueryContext
+
+    async def _after(delay, value):
+        await asyncio.sleep(delay)
+        return value
+
+    async def _run():
+        qctx = QueryContext("q")
+        tasks = {
+            "memories": asyncio.create_task(_after(0.01, "mem")),
+            "web": asyncio.create_task(_after(0.4, "web")),       # cut at 0.6 * budget
+            "past_chats": asyncio.create_task(_after(5.0, "past")),  # cut at the budget
+        }
+        started = time.perf_counter()
+        done = await _await_within_budget(tasks, 0.2, qctx)
+        elapsed = time.perf_counter() - started
+        # The cut web search keeps running so it can fill its cache.
+        late_web = await asyncio.wait_for(tasks["web"], timeout=1.0)
+        assert tasks["past_chats"].cancelled()
+        return done, qctx, elapsed, late_web
+
+    done, qctx, elapsed, late_web = asyncio.run(_run())
+    assert done == {"memories": "mem"}
+    assert qctx.timed_out == ["web", "past_chats"]
+    assert elapsed < 0.35
+    assert late_web == "web"
+    counters = telemetry.snapshot()["counters"]
+    assert sum(v for key, v in counters.items() if key.startswith("retrieval.source_timeout")) == 2
+
+
+def test_late_memories_fall_back_to_lexical_hits(isolated_db: Path, monkeypatch) -> None:
+    import apps.shail.chat_api as chat_api
+    from apps.shail.retrieval.query_context import QueryContext
+    from shail.memory import embeddings
+
+    async def _hung_embed(query):
+        await asyncio.sleep(5.0)
+        return [0.5] * 8
+
+    lexical = [("lexical body", 0.7, {"id": "lex-1", "title": "Lexical"})]
+    monkeypatch.setattr(embeddings, "aembed_query", _hung_embed)
+    monkeypatch.setattr(chat_api, "_browser_lexical_memory_hits", lambda *a, **k: lexical)
+    monkeypatch.setattr(chat_api, "list_mcp_connections", lambda uid: [])
+    monkeypatch.setattr(chat_api, "needs_web_search", lambda q: False)
+    monkeypatch.setattr(chat_api, "get_blueprints_for_ids", lambda ids: {})
+    settings = chat_api.get_settings()
+    monkeypatch.setattr(settings, "shail_local_files_in_chat", False)
+    monkeypatch.setattr(settings, "chat_retrieval_budget_ms", 100)
+
+    qctx = QueryContext("roadmap")
+    _, citations, *_ = asyncio.run(chat_api._build_context(
+        "u1", "roadmap", is_first_in_session=False, query_context=qctx,
+    ))
+    assert [c.id for c in citations] == ["lex-1"]
+    assert qctx.timed_out == ["memories"]
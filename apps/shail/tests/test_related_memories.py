@@ -0,0 +1,128 @@
+"""Embedding-backed `/api/v2/memories/{id}/related`."""
+from __future__ import annotations
+
+import asyncio
+import math
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+class FakeVectorCollection:
+    """Chunk rows with embeddings; honours the `get` shapes the engine uses."""
+
+    def __init__(self, rows):
+        self.rows = rows  # id -> (embedding, metadata)
+
+    def _match(self, meta, where):
+        if not where:
+            return True
+        if "$and" in where:
+            return all(self._match(meta, clause) for clause in where["$and"])
+        return all(meta.get(k) == v for k, v in where.items())
+
+    def get(self, ids=None, where=None, include=None, limit=None, offset=0, **kwargs):
+        picked = [
+            (rid, emb, meta) for rid, (emb, meta) in self.rows.items()
+            if (ids is None or rid in ids) and self._match(meta, where)
+        ]
+        picked = picked[offset: offset + limit] if limit else picked[offset:]
+        return {
+            "ids": [p[0] for p in picked],
+            "documents": [f"[claude] {p[2].get('title', '')}\n\nbody" for p in picked],
+            "metadatas": [p[2] for p in picked],
+            "embeddings": [p[1] for p in picked],
+        }
+
+
+class FakeVectorStore:
+    def __init__(self, rows):
+        self.collection = FakeVectorCollection(rows)
+        self.queries = 0
+
+    def query(self, query_embedding, namespace, filters, k):
+        self.queries += 1
+
+        def _cos(a, b):
+            dot = sum(x * y for x, y in zip(a, b))
+            return dot / (math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b)))
+
+        hits = [
+            {"id": rid, "content": "", "metadata": meta, "score": 1.0 - _cos(query_embedding, emb)}
+            for rid, (emb, meta) in self.collection.rows.items()
+            if meta.get("namespace") == namespace
+        ]
+        hits.sort(key=lambda h: h["score"])
+        return hits[:k]
+
+
+def _meta(memory_id: str, title: str, **extra):
+    meta = {
+        "customId": memory_id,
+        "eventType": "ai_conversation",
+        "sourceApp": "claude",
+        "sourceUrl": f"https://claude.ai/chat/{memory_id}",
+        "title": title,
+        "timestamp": "2026-06-01T00:00:00+00:00",
+        "namespace": "user_u1",
+    }
+    meta.update(extra)
+    return meta
+
+
+def _store():
+    return FakeVectorStore({
+        "target#000": ([1.0, 0.0, 0.0], _meta("target", "Churn model", parent_memory_id="target")),
+        "target#001": ([0.8, 0.2, 0.0], _meta("target", "Churn model", parent_memory_id="target")),
+        "near": ([0.9, 0.1, 0.0], _meta("near", "Retention cohorts")),
+        "far": ([0.0, 0.0, 1.0], _meta("far", "Sourdough")),
+        "thread": ([0.0, 1.0, 0.0], _meta("thread", "Same chat", conversationId="c1")),
+    })
+
+
+def test_related_blends_vector_neighbors_with_metadata(isolated_db, monkeypatch):
+    from apps.shail import memory_dashboard_api
+
+    store = _store()
+    store.collection.rows["target#000"][1]["conversationId"] = "c1"
+    store.collection.rows["target#001"][1]["conversationId"] = "c1"
+    monkeypatch.setattr(memory_dashboard_api, "_get_store", lambda: store)
+
+    items = _run(memory_dashboard_api.related_memories("target", limit=3, user_id="u1"))
+    ids = [i.id for i in items]
+    assert ids == ["thread", "near"], "orthogonal same-app capture is not related"
+    assert store.queries == 1
+
+
+def test_related_lists_are_cached_and_invalidated_on_delete(isolated_db, monkeypatch):
+    from apps.shail import capture_index, memory_dashboard_api
+
+    store = _store()
+    monkeypatch.setattr(memory_dashboard_api, "_get_store", lambda: store)
+
+    first = _run(memory_dashboard_api.related_memories("target", limit=2, user_id="u1"))
+    assert first[0].id == "near"
+    _run(memory_dashboard_api.related_memories("target", limit=2, user_id="u1"))
+    assert store.queries == 1, "second call is served from the cache"
+
+    del store.collection.rows["near"]
+    capture_index.delete("near")
+    after = _run(memory_dashboard_api.related_memories("target", limit=2, user_id="u1"))
+    assert "near" not in [i.id for i in after]
+    assert store.queries == 2, "delete of a cached neighbour forces a recompute"
+
+
+def test_related_includes_tag_only_peers(isolated_db, monkeypatch):
+    from apps.shail import memory_dashboard_api
+
+    store = _store()
+    for rid in ("target#000", "target#001"):
+        store.collection.rows[rid][1]["tags"] = "retention,q3"
+    store.collection.rows["tagged"] = ([0.0, 0.0, 1.0], _meta("tagged", "Board notes", tags="q3"))
+    monkeypatch.setattr(memory_dashboard_api, "_get_store", lambda: store)
+
+    items = _run(memory_dashboard_api.related_memories("target", limit=5, user_id="u1"))
+    ids = [i.id for i in items]
+    assert "tagged" in ids, "orthogonal capture sharing a tag is related"
+    assert "far" not in ids
@@ -0,0 +1,87 @@
+"""SemanticDedup: per-namespace float32 ring, batch checks, LSH pre-filter."""
+from __future__ import annotations
+
+import random
+
+from shail.memory import semantic_dedup
+
+
+def _vec(seed: int, dim: int = 32):
+    rng = random.Random(seed)
+    return [rng.uniform(-1, 1) for _ in range(dim)]
+
+
+def _near(vec, eps: float = 0.01):
+    return [x + eps * ((i % 3) - 1) for i, x in enumerate(vec)]
+
+
+def _dedup(tmp_path, **kwargs):
+    return semantic_dedup.SemanticDedup(db_path=str(tmp_path / "dedup.db"), **kwargs)
+
+
+def test_exact_and_near_duplicates_are_detected(tmp_path) -> None:
+    dedup = _dedup(tmp_path)
+    base = _vec(1)
+    dedup.record("alpha", "ns", base)
+
+    assert dedup.is_duplicate("alpha", "ns", _vec(99)) == (True, 1.0, semantic_dedup.content_hash("alpha"))
+    is_dup, sim, matched = dedup.is_duplicate("alpha, reworded", "ns", _near(base))
+    assert is_dup and sim > 0.99 and matched == semantic_dedup.content_hash("alpha")
+    assert not dedup.is_duplicate("beta", "ns", _vec(2))[0]
+    assert not dedup.is_duplicate("alpha, reworded", "other-ns", _near(base))[0]
+
+
+def test_ring_evicts_oldest_and_reloads_from_sqlite(tmp_path) -> None:
+    dedup = _dedup(tmp_path, window_size=2)
+    for i in range(3):
+        dedup.record(f"t{i}", "ns", _vec(i))
+    assert not dedup.is_duplicate("x", "ns", _vec(0))[0], "oldest row was overwritten"
+    assert dedup.is_duplicate("x", "ns", _vec(2))[0]
+
+    restarted = _dedup(tmp_path, window_size=2)
+    assert [restarted.is_duplicate("x", "ns", _vec(i))[0] for i in range(3)] == [False, True, True]
+
+
+def test_dimension_change_resets_the_window(tmp_path) -> None:
+    dedup = _dedup(tmp_path)
+    dedup.record("old", "ns", _vec(1, dim=16))
+    assert dedup.is_duplicate("q", "ns", _vec(1, dim=32)) == (False, 0.0, None)
+    dedup.record("new", "ns", _vec(1, dim=32))
+    assert dedup.is_duplicate("q", "ns", _vec(1, dim=32))[0]
+
+
+def test_is_duplicate_many_matches_single_checks_and_the_batch_itself(tmp_path) -> None:
+    dedup = _dedup(tmp_path)
+    for i in range(5):
+        dedup.record(f"seen{i}", "ns", _vec(i))
+
+    contents = ["seen3", "fresh-a", "near-seen1", "fresh-b", "fresh-a copy", ""]
+    embeddings = [_vec(50), _vec(10), _near(_vec(1)), _vec(11), _near(_vec(10)), []]
+    batch = dedup.is_duplicate_many(contents, "ns", embeddings)
+
+    for i in range(4):
+        single = dedup.is_duplicate(contents[i], "ns", embeddings[i])
+        assert batch[i][0] == single[0] and batch[i][2] == single[2]
+    assert [r[0] for r in batch] == [True, False, True, False, True, False]
+    assert batch[4][2] == semantic_dedup.content_hash("fresh-a"), "matched earlier batch item"
+
+
+def test_is_duplicate_many_handles_mixed_dimensions(tmp_path) -> None:
+    dedup = _dedup(tmp_path)
+    dedup.record("seed", "ns", [1, 0, 0])
+    batch = dedup.is_duplicate_many(["a", "b"], "ns", [[1, 0, 0], [1, 0]])
+    assert batch[0] == (True, batch[0][1], semantic_dedup.content_hash("seed"))
+    assert batch[0][1] > 0.99
+    assert batch[1] == (False, 0.0, None)
+
+
+def test_lsh_prefilter_finds_near_duplicates(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(semantic_dedup, "_LSH_MIN_ROWS", 1)
+    dedup = _dedup(tmp_path, window_size=64, lsh_bits=16)
+    for i in range(64):
+        dedup.record(f"t{i}", "ns", _vec(i))
+
+    is_dup, sim, matched = dedup.is_duplicate("q", "ns", _near(_vec(40)))
+    assert is_dup and matched == semantic_dedup.content_hash("t40")
+    assert not dedup.is_duplicate("q", "ns", _vec(1000))[0]
+    assert dedup.is_duplicate_many(["q"], "ns", [_near(_vec(7))])[0][2] == semantic_dedup.content_hash("t7")
@@ -5,6 +5,7 @@ import asyncio
 import json
 import sqlite3
 from pathlib import Path
+from types import SimpleNamespace
 from unittest.mock import AsyncMock, patch
 
 import pytest
@@ -1154,7 +1155,7 @@ class TestEmbeddingCache:
             resp = _FakeResp()
             resp._n = len(kwargs["json"]["input"])
             return resp
-        monkeypatch.setattr(embeddings.httpx, "post", _fake_post)
+        monkeypatch.setattr(embeddings, "_http_client", lambda: SimpleNamespace(post=_fake_post))
 
         # First call: all misses
         v1 = embeddings.embed_texts(["alpha", "beta", "gamma"])
@@ -1178,7 +1179,7 @@ class TestEmbeddingCache:
             resp = _FakeResp()
             resp._n = len(kwargs["json"]["input"])
             return resp
-        monkeypatch.setattr(embeddings.httpx, "post", _fake_post)
+        monkeypatch.setattr(embeddings, "_http_client", lambda: SimpleNamespace(post=_fake_post))
 
         embeddings.embed_texts(["a", "b"])
         embeddings.embed_texts(["a", "b", "c"])  # only 'c' should hit Ollama
@@ -1192,7 +1193,7 @@ class TestEmbeddingCache:
         import httpx as _httpx
         def _connect_err(*a, **k):
             raise _httpx.ConnectError("down")
-        monkeypatch.setattr(embeddings.httpx, "post", _connect_err)
+        monkeypatch.setattr(embeddings, "_http_client", lambda: SimpleNamespace(post=_connect_err))
 
         v1 = embeddings.embed_texts(["text1"])
         assert embeddings.is_zero_vector(v1[0])
@@ -1213,7 +1214,7 @@ class TestEmbeddingCache:
             resp = _FakeResp()
             resp._n = len(kwargs["json"]["input"])
             return resp
-        monkeypatch.setattr(embeddings.httpx, "post", _fake_post)
+        monkeypatch.setattr(embeddings, "_http_client", lambda: SimpleNamespace(post=_fake_post))
 
         for t in ["a", "b", "c", "d"]:
             embeddings.embed_texts([t])
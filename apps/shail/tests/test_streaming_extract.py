@@ -0,0 +1,75 @@
+"""Page-incremental document extraction: the streaming chunker matches the
+eager one, and the ingest budget stops PDF parsing early."""
+from __future__ import annotations
+
+import random
+
+from shail.memory import rag
+
+
+def _fake_pages(n: int, pulled: list, closed: list):
+    def _iter(path):
+        try:
+            for i in range(n):
+                pulled.append(i)
+                yield f"page {i} " + "lorem ipsum " * 40
+        finally:
+            closed.append(path)
+
+    return _iter
+
+
+def test_chunk_stream_matches_chunk_text() -> None:
+    rng = random.Random(7)
+    for _ in range(300):
+        pieces = ["".join(rng.choice("ab \n") for _ in range(rng.randint(0, 60)))
+                  for _ in range(rng.randint(0, 6))]
+        size = rng.randint(2, 40)
+        overlap = rng.randint(0, size - 1)
+        joined = "\n\n".join(p for p in pieces if p.strip())
+        assert list(rag._chunk_stream(pieces, size, overlap)) == rag._chunk_text(joined, size, overlap)
+
+
+def test_ingest_budget_stops_parsing_pdf_pages(tmp_path, monkeypatch) -> None:
+    pdf = tmp_path / "big.pdf"
+    pdf.write_bytes(b"%PDF-fake")
+    pulled, closed = [], []
+    monkeypatch.setattr(rag, "iter_pdf_pages", _fake_pages(500, pulled, closed))
+    settings = rag.get_settings()
+    monkeypatch.setattr(settings, "rag_ingest_max_chars", 5000)
+
+    records = rag._build_records([str(pdf)], None)
+    assert len(pulled) < 20, "pages past the budget are never parsed"
+    assert closed == [str(pdf)], "extractor (and its mmap) released early"
+    assert records and all(r.metadata["truncated"] for r in records)
+    assert records[0].metadata["chunk_count"] == len(records)
+
+
+def test_unbudgeted_pdf_ingest_equals_eager_extraction(tmp_path, monkeypatch) -> None:
+    pdf = tmp_path / "doc.pdf"
+    pdf.write_bytes(b"%PDF-fake")
+    monkeypatch.setattr(rag, "iter_pdf_pages", _fake_pages(12, [], []))
+    monkeypatch.setattr(rag.get_settings(), "rag_ingest_max_chars", 0)
+
+    records = rag._build_records([str(pdf)], None)
+    settings = rag.get_settings()
+    expected = rag._chunk_text(rag._extract_text_from_file(str(pdf)), settings.rag_chunk_size,
+                               settings.rag_chunk_overlap)
+    assert [r.content for r in records] == expected
+    assert "truncated" not in records[0].metadata
+
+
+def test_capture_pdf_extraction_keeps_page_numbers_within_budget(tmp_path, monkeypatch) -> None:
+    from apps.shail import capture_store
+
+    pdf = tmp_path / "capture.pdf"
+    pdf.write_bytes(b"%PDF-fake")
+    pulled, closed = [], []
+    monkeypatch.setattr(rag, "iter_pdf_pages", _fake_pages(200, pulled, closed))
+    monkeypatch.setattr(capture_store._settings(), "rag_ingest_max_chars", 2000)
+
+    text, struct = capture_store._extract_pdf_text({"pdf_path": str(pdf)})
+    blocks = struct["page_blocks"]
+    assert [b["page_number"] for b in blocks] == list(range(1, len(blocks) + 1))
+    assert len(pulled) == len(blocks) < 10 and closed
+    assert text.startswith("page 0")
@@ -24,11 +24,47 @@ def test_counter_labels_keyed_separately() -> None:
     assert snap[f"{telemetry.RETRIEVAL_PATH}{{path=semantic}}"] == 1.0
 
 
-def test_histogram_appends() -> None:
+def test_histogram_summarizes() -> None:
     telemetry.observe(telemetry.INGEST_CHUNKS_PER_CAPTURE, 5)
     telemetry.observe(telemetry.INGEST_CHUNKS_PER_CAPTURE, 8)
-    snap = telemetry.snapshot()["histograms"]
-    assert snap[telemetry.INGEST_CHUNKS_PER_CAPTURE] == [5, 8]
+    hist = telemetry.snapshot()["histograms"][telemetry.INGEST_CHUNKS_PER_CAPTURE]
+    assert hist["count"] == 2
+    assert hist["sum"] == 13
+    assert hist["max"] == 8
+    assert hist["window"]["count"] == 2
+
+
+def test_histogram_memory_is_bounded_and_quantiles_close() -> None:
+    for i in range(1, 100_001):
+        telemetry.observe(telemetry.RETRIEVAL_LATENCY_MS, float(i), path="fused")
+    key = f"{telemetry.RETRIEVAL_LATENCY_MS}{{path=fused}}"
+    hist = telemetry.snapshot()["histograms"][key]
+    assert hist["count"] == 100_000
+    for q, exact in (("p50", 50_000), ("p90", 90_000), ("p99", 99_000)):
+        assert abs(hist[q] - exact) / exact < 0.05
+    assert len(telemetry._histograms[key].total.buckets) < 300
+
+
+def test_histogram_window_drops_old_slots(monkeypatch) -> None:
+    clock = [1_000.0]
+    monkeypatch.setattr(telemetry.time, "monotonic", lambda: clock[0])
+    telemetry.observe("latency", 100.0)
+    clock[0] += telemetry.WINDOW_SLOTS * telemetry.WINDOW_SLOT_SECONDS + 1
+    telemetry.observe("latency", 1.0)
+    hist = telemetry.snapshot()["histograms"]["latency"]
+    assert hist["count"] == 2 and hist["max"] == 100.0
+    assert hist["window"]["count"] == 1 and hist["window"]["max"] == 1.0
+
+
+def test_prometheus_text_exports_summaries() -> None:
+    telemetry.incr(telemetry.RETRIEVAL_PATH, path="exact")
+    telemetry.observe(telemetry.RETRIEVAL_LATENCY_MS, 12.0, path="exact")
+    text = telemetry.prometheus_text()
+    assert "# TYPE shail_telemetry_retrieval_path_total counter" in text
+    assert 'shail_telemetry_retrieval_path_total{path="exact"} 1.0' in text
+    assert "# TYPE shail_telemetry_retrieval_latency_ms summary" in text
+    assert 'shail_telemetry_retrieval_latency_ms{path="exact",quantile="0.99"} 12.0' in text
+    assert 'shail_telemetry_retrieval_latency_ms_count{path="exact"} 1' in text
 
 
 def test_reset_clears_all() -> None:
@@ -0,0 +1,159 @@
+"""apps.shail.websocket_server: queued fan-out, coalescing, batched debug log."""
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+
+import pytest
+
+from apps.shail import telemetry, websocket_server
+from apps.shail.websocket_server import BrainWebSocketManager
+
+
+class FakeSocket:
+    def __init__(self, gate: asyncio.Event | None = None) -> None:
+        self.client = None
+        self.sent: list = []
+        self.gate = gate
+
+    async def accept(self) -> None:
+        pass
+
+    async def send_text(self, text: str) -> None:
+        if self.gate is not None:
+            await self.gate.wait()
+        self.sent.append(json.loads(text))
+
+    async def send_json(self, data) -> None:
+        await self.send_text(json.dumps(data))
+
+
+@pytest.fixture(autouse=True)
+def _debug_log(tmp_path, monkeypatch):
+    path = tmp_path / "debug.log"
+    monkeypatch.setattr(websocket_server, "ensure_log_dir", lambda: str(path))
+    telemetry.reset()
+    yield path
+    websocket_server.flush_debug_log()
+    telemetry.reset()
+
+
+async def _settle() -> None:
+    await asyncio.sleep(0.05)
+
+
+def test_slow_client_does_not_block_broadcast_or_others(monkeypatch) -> None:
+    encoded = []
+    real_encode = websocket_server._encode
+    monkeypatch.setattr(websocket_server, "_encode", lambda m: encoded.append(m) or real_encode(m))
+
+    async def run():
+        mgr = BrainWebSocketManager(queue_max=16, send_timeout=5)
+        slow, fast = FakeSocket(gate=asyncio.Event()), FakeSocket()
+        await mgr.connect(slow)
+        await mgr.connect(fast)
+        for i in range(3):
+            await asyncio.wait_for(mgr.broadcast_event("node_update", {"i": i}), timeout=0.5)
+        await _settle()
+        assert [m["data"]["i"] for m in fast.sent] == [0, 1, 2]
+        assert slow.sent == []
+        slow.gate.set()
+        await _settle()
+        assert [m["data"]["i"] for m in slow.sent] == [0, 1, 2]
+        await mgr.close()
+
+    asyncio.run(run())
+    assert len(encoded) == 3  # once per message, not per client
+    fanout = telemetry.snapshot()["histograms"]
+    assert any(k.startswith(telemetry.WS_FANOUT_MS) for k in fanout)
+
+
+def test_pending_states_coalesce_to_latest_and_events_keep_order() -> None:
+    async def run():
+        mgr = BrainWebSocketManager(queue_max=16, send_timeout=5)
+        ws = FakeSocket(gate=asyncio.Event())
+        await mgr.connect(ws)
+        await mgr.broadcast_state({"n": 0})
+        await _settle()  # n=0 is now in flight, blocked on the gate
+        await mgr.broadcast_state({"n": 1})
+        await mgr.broadcast_event("e", {"i": 1})
+        await mgr.broadcast_state({"n": 2})
+        await mgr.broadcast_state({"n": 3})
+        ws.gate.set()
+        await _settle()
+        await mgr.close()
+        return ws.sent
+
+    sent = asyncio.run(run())
+    assert [(m["type"], m.get("state") or m.get("data")) for m in sent] == [
+        ("state_update", {"n": 0}),
+        ("event", {"i": 1}),
+        ("state_update", {"n": 3}),
+    ]
+    counters = telemetry.snapshot()["counters"]
+    assert sum(v for k, v in counters.items() if "coalesced" in k) == 2
+
+
+def test_full_queue_drops_oldest_events() -> None:
+    async def run():
+        mgr = BrainWebSocketManager(queue_max=3, send_timeout=5)
+        ws = FakeSocket(gate=asyncio.Event())
+        await mgr.connect(ws)
+        await mgr.broadcast_event("e", {"i": 0})
+        await _settle()  # i=0 in flight
+        for i in range(1, 7):
+            await mgr.broadcast_event("e", {"i": i})
+        assert mgr.stats()["queued"] == [3]
+        ws.gate.set()
+        await _settle()
+        await mgr.close()
+        return [m["data"]["i"] for m in ws.sent]
+
+    assert asyncio.run(run()) == [0, 4, 5, 6]
+    counters = telemetry.snapshot()["counters"]
+    assert sum(v for k, v in counters.items() if "overflow" in k) == 3
+
+
+def test_broadcast_from_worker_thread_loop_is_delivered() -> None:
+    async def run():
+        mgr = BrainWebSocketManager(queue_max=16, send_timeout=5)
+        ws = FakeSocket()
+        await mgr.connect(ws)
+        # LangGraphExecutor streams on a worker thread with its own loop.
+        t = threading.Thread(target=lambda: asyncio.run(mgr.broadcast_event("node_update", {"x": 1})))
+        t.start()
+        await asyncio.to_thread(t.join)
+        await _settle()
+        await mgr.close()
+        return ws.sent
+
+    assert [m["data"] for m in asyncio.run(run())] == [{"x": 1}]
+
+
+def test_failed_send_disconnects_only_that_client() -> None:
+    class Broken(FakeSocket):
+        async def send_text(self, text: str) -> None:
+            raise RuntimeError("closed")
+
+    async def run():
+        mgr = BrainWebSocketManager(queue_max=16, send_timeout=5)
+        good, bad = FakeSocket(), Broken()
+        await mgr.connect(good)
+        await mgr.connect(bad)
+        await mgr.broadcast_event("e", {})
+        await _settle()
+        assert mgr.active_connections == {good}
+        await mgr.close()
+        return good.sent
+
+    assert len(asyncio.run(run())) == 1
+
+
+def test_debug_log_is_buffered_then_flushed_in_one_batch(_debug_log) -> None:
+    for i in range(5):
+        websocket_server.safe_log_write({"i": i})
+    assert websocket_server.flush_debug_log() == 5
+    lines = _debug_log.read_text().splitlines()
+    assert [json.loads(line)["i"] for line in lines] == [0, 1, 2, 3, 4]
+    assert websocket_server.flush_debug_log() == 0
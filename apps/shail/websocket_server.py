@@ -1,9 +1,12 @@
 import asyncio
+import atexit
 import json
 import logging
 import os
+import threading
 import time
-from typing import Dict, Set, Any, Optional
+from collections import deque
+from typing import Dict, Set, Any, Optional, Tuple
 from fastapi import WebSocket, WebSocketDisconnect
 
 logger = logging.getLogger(__name__)
@@ -16,27 +19,173 @@ def ensure_log_dir():
     return os.path.join(log_dir, "debug.log")
 
 
+# Debug log entries are buffered in memory and appended to the file in batches
+# by a daemon thread, so callers on the event loop never touch the disk.
+_DEBUG_LOG_MAX = 10_000
+_DEBUG_FLUSH_SEC = 1.0
+_debug_lines: deque = deque(maxlen=_DEBUG_LOG_MAX)
+_debug_flush_lock = threading.Lock()
+_debug_writer: Optional[threading.Thread] = None
+
+
 def safe_log_write(log_entry: dict):
-    """Safely write log entry without raising exceptions"""
+    """Queue a debug log entry without raising; written by the flush thread."""
     try:
-        log_path = ensure_log_dir()
-        with open(log_path, 'a') as f:
-            f.write(json.dumps(log_entry) + '\n')
-            f.flush()
+        _debug_lines.append(json.dumps(log_entry, default=str))
     except Exception as e:
-        logger.debug(f"Failed to write debug log: {e}")
-        # Don't raise - logging failures shouldn't break functionality
+        logger.debug(f"Failed to queue debug log: {e}")
+        return
+    if _debug_writer is None:
+        _start_debug_writer()
+
+
+def _start_debug_writer() -> None:
+    global _debug_writer
+    with _debug_flush_lock:
+        if _debug_writer is not None:
+            return
+        _debug_writer = threading.Thread(target=_debug_writer_loop, name="ws-debug-log", daemon=True)
+        _debug_writer.start()
+        atexit.register(flush_debug_log)
+
+
+def _debug_writer_loop() -> None:
+    while True:
+        time.sleep(_DEBUG_FLUSH_SEC)
+        flush_debug_log()
+
+
+def flush_debug_log() -> int:
+    """Append buffered debug entries to the log file. Returns lines written."""
+    with _debug_flush_lock:
+        lines = []
+        while _debug_lines:
+            lines.append(_debug_lines.popleft())
+        if not lines:
+            return 0
+        try:
+            with open(ensure_log_dir(), 'a') as f:
+                f.write('\n'.join(lines) + '\n')
+        except Exception as e:
+            logger.debug(f"Failed to write debug log: {e}")
+            # Don't raise - logging failures shouldn't break functionality
+        return len(lines)
+
+
+def _encode(message: Dict[str, Any]) -> str:
+    """Serialize once per broadcast; same wire format as `send_json`."""
+    return json.dumps(message, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+class _Client:
+    """One connection's bounded send queue, drained by its own sender task.
+
+    Broadcasters only enqueue, so a slow client delays nothing but itself.
+    Entries are (kind, text, enqueued_at). Queued "state" entries are full
+    snapshots: a newer one replaces any still waiting. When the queue is full
+    the oldest entry is dropped.
+    """
+
+    __slots__ = ("ws", "loop", "maxsize", "queue", "states", "lock", "wake", "task", "closed")
+
+    def __init__(self, ws: WebSocket, loop: asyncio.AbstractEventLoop, maxsize: int) -> None:
+        self.ws = ws
+        self.loop = loop
+        self.maxsize = max(1, maxsize)
+        self.queue: deque = deque()
+        self.states = 0  # queued "state" entries (0 or 1)
+        # Broadcasts may come from graph worker threads with their own loop.
+        self.lock = threading.Lock()
+        self.wake = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+        self.closed = False
+
+    def offer(self, kind: str, text: str, enqueued_at: float) -> None:
+        from apps.shail import telemetry
+
+        with self.lock:
+            if kind == "state" and self.states:
+                self.queue = deque(m for m in self.queue if m[0] != "state")
+                self.states = 0
+                telemetry.incr(telemetry.WS_SEND_DROPPED, kind=kind, reason="coalesced")
+            if len(self.queue) >= self.maxsize:
+                dropped = self.queue.popleft()
+                if dropped[0] == "state":
+                    self.states -= 1
+                telemetry.incr(telemetry.WS_SEND_DROPPED, kind=dropped[0], reason="overflow")
+            self.queue.append((kind, text, enqueued_at))
+            if kind == "state":
+                self.states += 1
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        self._wake(running)
+
+    def _wake(self, running: Optional[asyncio.AbstractEventLoop]) -> None:
+        if running is self.loop:
+            self.wake.set()
+        else:
+            try:
+                self.loop.call_soon_threadsafe(self.wake.set)
+            except RuntimeError:
+                pass  # owning loop already closed; the client is gone
+
+    def stop(self) -> None:
+        """Make the sender task exit. Cancel alone is not enough: on 3.11
+        `wait_for` can swallow a cancel that races a completed send."""
+        self.closed = True
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        self._wake(running)
+        if self.task is not None and self.task is not _current_task():
+            if running is self.loop:
+                self.task.cancel()
+            else:
+                try:
+                    self.loop.call_soon_threadsafe(self.task.cancel)
+                except RuntimeError:
+                    pass  # loop closed; the task died with it
+
+    def pop(self) -> Optional[Tuple[str, str, float]]:
+        with self.lock:
+            if not self.queue:
+                return None
+            item = self.queue.popleft()
+            if item[0] == "state":
+                self.states -= 1
+            return item
 
 
 class BrainWebSocketManager:
     """
     Manages WebSocket connections for LangGraph state broadcasting.
+
+    `broadcast_state` / `broadcast_event` serialize the message once and hand
+    it to every client's queue; per-client sender tasks do the actual sends.
     """
     
-    def __init__(self):
-        self.active_connections: Set[WebSocket] = set()
+    def __init__(self, queue_max: Optional[int] = None, send_timeout: Optional[float] = None):
+        self._clients: Dict[WebSocket, _Client] = {}
         self.state_history: list = []  # Keep last N states for new connections
         self.max_history = 100
+        self._queue_max = queue_max
+        self._send_timeout = send_timeout
+
+    @property
+    def active_connections(self) -> Set[WebSocket]:
+        return set(self._clients)
+
+    def _limits(self) -> Tuple[int, float]:
+        queue_max, send_timeout = self._queue_max, self._send_timeout
+        if queue_max is None or send_timeout is None:
+            from apps.shail.settings import get_settings
+            s = get_settings()
+            queue_max = s.ws_client_queue_max if queue_max is None else queue_max
+            send_timeout = s.ws_send_timeout_sec if send_timeout is None else send_timeout
+        return queue_max, send_timeout
     
     async def connect(self, websocket: WebSocket):
         """Accept a new WebSocket connection"""
@@ -53,21 +202,24 @@ class BrainWebSocketManager:
             # Accept the WebSocket handshake
             await websocket.accept()
             
-            # Add to active connections
-            self.active_connections.add(websocket)
+            # Add to active connections with its own sender task
+            queue_max, _ = self._limits()
+            client = _Client(websocket, asyncio.get_running_loop(), queue_max)
+            client.task = asyncio.create_task(self._pump(client), name="ws-brain-send")
+            self._clients[websocket] = client
             
-            logger.info(f"WebSocket client connected from {client_host}:{client_port}. Total: {len(self.active_connections)}")
+            logger.info(f"WebSocket client connected from {client_host}:{client_port}. Total: {len(self._clients)}")
             
             # #region agent log
-            safe_log_write({"sessionId":"debug-session","runId":"test-permission-ws","hypothesisId":"A","location":"websocket_server.py:connect","message":"WebSocket client connected","data":{"total_connections":len(self.active_connections),"client_host":client_host,"client_port":client_port},"timestamp":time.time()})
+            safe_log_write({"sessionId":"debug-session","runId":"test-permission-ws","hypothesisId":"A","location":"websocket_server.py:connect","message":"WebSocket client connected","data":{"total_connections":len(self._clients),"client_host":client_host,"client_port":client_port},"timestamp":time.time()})
             # #endregion
             
             # Send current state history to new client
             if self.state_history:
-                await websocket.send_json({
+                client.offer("history", _encode({
                     "type": "state_history",
                     "states": self.state_history[-10:]  # Last 10 states
-                })
+                }), time.perf_counter())
                 
         except Exception as e:
             # Log handshake failure
@@ -81,13 +233,69 @@ class BrainWebSocketManager:
             raise
     
     def disconnect(self, websocket: WebSocket):
-        """Remove a disconnected WebSocket"""
-        self.active_connections.discard(websocket)
-        logger.info(f"WebSocket client disconnected. Total: {len(self.active_connections)}")
+        """Remove a disconnected WebSocket and stop its sender task"""
+        client = self._clients.pop(websocket, None)
+        if client is None:
+            return
+        client.stop()
+        logger.info(f"WebSocket client disconnected. Total: {len(self._clients)}")
+
+    async def _pump(self, client: _Client) -> None:
+        """Drain one client's queue in order until it disconnects."""
+        from apps.shail import telemetry
+
+        _, send_timeout = self._limits()
+        try:
+            while not client.closed:
+                await client.wake.wait()
+                client.wake.clear()
+                while not client.closed:
+                    item = client.pop()
+                    if item is None:
+                        break
+                    kind, text, enqueued_at = item
+                    await asyncio.wait_for(client.ws.send_text(text), timeout=send_timeout)
+                    telemetry.observe(telemetry.WS_FANOUT_MS, (time.perf_counter() - enqueued_at) * 1000, kind=kind)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Failed to send to client: {e}")
+            # #region agent log
+            safe_log_write({"sessionId":"debug-session","runId":"test-permission-ws","hypothesisId":"C","location":"websocket_server.py:_pump","message":"Failed to send to client","data":{"error":str(e)},"timestamp":time.time()})
+            # #endregion
+            self.disconnect(client.ws)
+
+    def _fan_out(self, kind: str, message: Dict[str, Any]) -> int:
+        from apps.shail import telemetry
+
+        start = time.perf_counter()
+        clients = list(self._clients.values())
+        if not clients:
+            return 0
+        try:
+            text = _encode(message)
+        except Exception as e:
+            logger.warning(f"Failed to serialize {kind} broadcast: {e}")
+            return 0
+        for client in clients:
+            client.offer(kind, text, start)
+        telemetry.observe(telemetry.WS_BROADCAST_MS, (time.perf_counter() - start) * 1000, kind=kind)
+        return len(clients)
+
+    async def send(self, websocket: WebSocket, message: Dict[str, Any]):
+        """Queue a message for one client (replies share its sender task)."""
+        client = self._clients.get(websocket)
+        if client is None:
+            await websocket.send_json(message)
+        else:
+            client.offer("reply", _encode(message), time.perf_counter())
     
     async def broadcast_state(self, state: Dict[str, Any]):
         """
         Broadcast LangGraph state to all connected clients.
+
+        Only enqueues; a client that falls behind receives the latest state
+        in place of any it has not been sent yet.
         
         Args:
             state: LangGraph state dictionary with nodes, edges, current_node, etc.
@@ -97,66 +305,57 @@ class BrainWebSocketManager:
         if len(self.state_history) > self.max_history:
             self.state_history.pop(0)
         
-        # Prepare message
-        message = {
+        self._fan_out("state", {
             "type": "state_update",
             "timestamp": time.time(),
             "state": state
-        }
-        
-        # Broadcast to all connections
-        disconnected = set()
-        for connection in self.active_connections:
-            try:
-                await connection.send_json(message)
-            except Exception as e:
-                logger.warning(f"Failed to send to client: {e}")
-                disconnected.add(connection)
-        
-        # Remove disconnected connections
-        for conn in disconnected:
-            self.disconnect(conn)
+        })
     
     async def broadcast_event(self, event_type: str, data: Dict[str, Any]):
         """
         Broadcast a custom event to all connected clients.
         
+        Only enqueues; events are delivered in order, dropping the oldest
+        once a client's queue is full.
+
         Args:
             event_type: Type of event (e.g., "node_started", "node_completed", "error")
             data: Event data
         """
-        # #region agent log
-        safe_log_write({"sessionId":"debug-session","runId":"test-permission-ws","hypothesisId":"C","location":"websocket_server.py:broadcast_event","message":"Broadcasting event","data":{"event_type":event_type,"connections":len(self.active_connections)},"timestamp":time.time()})
-        # #endregion
-        message = {
+        queued = self._fan_out("event", {
             "type": "event",
             "event_type": event_type,
             "timestamp": time.time(),
             "data": data
+        })
+        # #region agent log
+        safe_log_write({"sessionId":"debug-session","runId":"test-permission-ws","hypothesisId":"C","location":"websocket_server.py:broadcast_event","message":"Broadcast queued","data":{"event_type":event_type,"connections":queued},"timestamp":time.time()})
+        # #endregion
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-client queue depth, for debugging slow consumers."""
+        return {
+            "connections": len(self._clients),
+            "queued": [len(c.queue) for c in list(self._clients.values())],
         }
         
-        disconnected = set()
-        sent_count = 0
-        for connection in self.active_connections:
-            try:
-                await connection.send_json(message)
-                sent_count += 1
-                # #region agent log
-                safe_log_write({"sessionId":"debug-session","runId":"test-permission-ws","hypothesisId":"C","location":"websocket_server.py:broadcast_event","message":"Event sent to client","data":{"event_type":event_type},"timestamp":time.time()})
-                # #endregion
-            except Exception as e:
-                logger.warning(f"Failed to send event to client: {e}")
-                # #region agent log
-                safe_log_write({"sessionId":"debug-session","runId":"test-permission-ws","hypothesisId":"C","location":"websocket_server.py:broadcast_event","message":"Failed to send event","data":{"error":str(e)},"timestamp":time.time()})
-                # #endregion
-                disconnected.add(connection)
+    async def close(self):
+        """Stop every sender task and flush the debug log (app shutdown)."""
+        clients = list(self._clients.values())
+        self._clients.clear()
+        for client in clients:
+            client.stop()
+        tasks = [c.task for c in clients if c.task is not None]
+        if tasks:
+            await asyncio.wait(tasks, timeout=1.0)
+        await asyncio.to_thread(flush_debug_log)
         
-        # #region agent log
-        safe_log_write({"sessionId":"debug-session","runId":"test-permission-ws","hypothesisId":"C","location":"websocket_server.py:broadcast_event","message":"Broadcast complete","data":{"sent":sent_count,"disconnected":len(disconnected)},"timestamp":time.time()})
-        # #endregion
         
-        for conn in disconnected:
-            self.disconnect(conn)
+def _current_task() -> Optional[asyncio.Task]:
+    try:
+        return asyncio.current_task()
+    except RuntimeError:
+        return None
 
 
 # Global WebSocket manager instance
@@ -191,11 +390,11 @@ async def websocket_endpoint(websocket: WebSocket):
                 
                 if message_type == "ping":
                     # Respond to ping
-                    await websocket.send_json({"type": "pong"})
+                    await websocket_manager.send(websocket, {"type": "pong"})
                 elif message_type == "subscribe":
                     # Client wants to subscribe to specific state updates
                     # For now, all clients receive all updates
-                    await websocket.send_json({
+                    await websocket_manager.send(websocket, {
                         "type": "subscribed",
                         "message": "Subscribed to all state updates"
                     })
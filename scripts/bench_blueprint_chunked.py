@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Benchmark wall time of chunked blueprint extraction on long transcripts.
+
+Compares, per transcript size:
+1. sequential — each window refines the running merge (prior JSON in every
+   prompt, one call at a time).
+2. map_reduce — windows extracted independently, `--concurrency` in flight,
+   then tree-merged.
+
+The LLM is simulated: each call sleeps `--base-ms` plus `--ms-per-kchar`
+per 1000 prompt chars (window + prior JSON), so prompt growth is charged.
+
+Usage:
+    python scripts/bench_blueprint_chunked.py --sizes 50000 200000 --concurrency 4 --context-tokens 8192
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+
+def _transcript(chars: int) -> str:
+    parts, n = [], 0
+    while n < chars:
+        turn = f"user: question about topic{n // 4000} and Entity{n // 2500}\nassistant: " + "detail " * 80 + "\n"
+        parts.append(turn)
+        n += len(turn)
+    return "".join(parts)[:chars]
+
+
+def _fake_extract(base_ms: float, ms_per_kchar: float, calls: list):
+    from apps.shail import blueprints
+
+    async def extract(*, content, content_type, user_id, prior=None, **kwargs):
+        prompt_chars = len(content) + (len(json.dumps(prior)) if prior else 0)
+        calls.append(prompt_chars)
+        await asyncio.sleep((base_ms + ms_per_kchar * prompt_chars / 1000) / 1000)
+        entities = sorted({w for w in content.split() if w.startswith("Entity")})[:8]
+        bp = {
+            "summary": f"{len(content)} chars", "decisions": [], "questions_answered": [],
+            "open_questions": [], "next_actions": [], "key_entities": entities,
+            "reasoning_chains": [], "failed_attempts": [], "extensions": {},
+            "facts": [{"entity": e, "attribute": "seen", "value": e} for e in entities],
+            "metrics": [], "tables": [],
+        }
+        return blueprints._merge_blueprints(prior, bp) if prior else bp
+
+    return extract
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50_000, 200_000])
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--base-ms", type=float, default=200.0)
+    parser.add_argument("--ms-per-kchar", type=float, default=20.0)
+    parser.add_argument("--context-tokens", type=int, default=8192, help="blueprint_context_tokens")
+    args = parser.parse_args()
+
+    from apps.shail import blueprints
+    from apps.shail.settings import get_settings
+
+    s = get_settings()
+    s.blueprint_map_concurrency = args.concurrency
+    s.blueprint_context_tokens = args.context_tokens
+    print(f"{'chars':>8} {'mode':>11} {'calls':>6} {'prompt kchars':>14} {'seconds':>8}")
+    for size in args.sizes:
+        content = _transcript(size)
+        for mode in ("sequential", "map_reduce"):
+            s.blueprint_chunk_mode = mode
+            calls: list = []
+            blueprints.extract_blueprint = _fake_extract(args.base_ms, args.ms_per_kchar, calls)
+            start = time.perf_counter()
+            asyncio.run(blueprints._extract_chunked(
+                memory_id="bench", content=content, content_type="ai_conversation",
+                user_id=None, prior=None, prior_payload_chars=0,
+            ))
+            elapsed = time.perf_counter() - start
+            print(f"{size:>8} {mode:>11} {len(calls):>6} {sum(calls) / 1000:>14.0f} {elapsed:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Benchmark ChatGPT export import: wall time and peak RSS.
+
+Compares, each in a fresh subprocess so peak RSS is per mode:
+1. legacy — `json.loads` of the whole export, then `append_message` per
+   message (one transaction each, plus an UPDATE chat_sessions).
+2. stream — `iter_conversations` over the file plus the bulk writer (one
+   executemany transaction per conversation).
+
+Usage:
+    python scripts/bench_chat_import.py --conversations 2000 4000 8000 --turns 20
+Writes the synthetic export and a scratch SQLite DB in a temp directory.
+"""
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+
+def _write_export(path: Path, conversations: int, turns: int) -> None:
+    filler = "lorem ipsum dolor sit amet " * 20
+    with open(path, "w", encoding="utf-8") as fh:
+        fh.write("[")
+        for c in range(conversations):
+            mapping = {"root": {"message": None, "parent": None, "children": ["n0"]}}
+            parent = "root"
+            for t in range(turns * 2):
+                nid = f"n{t}"
+                role = "user" if t % 2 == 0 else "assistant"
+                mapping[nid] = {
+                    "message": {"author": {"role": role},
+                                "content": {"parts": [f"{role} {c}/{t} {filler}"]}},
+                    "parent": parent, "children": [f"n{t + 1}"],
+                }
+                parent = nid
+            conv = {"title": f"conv {c}", "id": f"c{c}", "create_time": 1.7e9 + c,
+                    "current_node": parent, "mapping": mapping}
+            fh.write(("," if c else "") + json.dumps(conv))
+        fh.write("]")
+
+
+def _setup_db(db_path: str) -> None:
+    import sqlite3
+
+    import apps.shail.settings as s
+    s._settings = s.Settings(sqlite_path=db_path)
+    from apps.shail.auth_store import init_auth_db
+    from apps.shail.session_backfill import ensure_phase_c_schema
+    init_auth_db()
+    ensure_phase_c_schema()
+    with sqlite3.connect(db_path) as con:
+        con.execute("INSERT OR IGNORE INTO users (id, email, password_hash, created_at) "
+                    "VALUES ('u_bench', 'bench@x', 'x', '2026-01-01')")
+
+
+def _run_mode(mode: str, export: str, db_path: str) -> None:
+    _setup_db(db_path)
+    from apps.shail import chat_store
+    from apps.shail.importers import chatgpt, import_conversation_payload, iter_conversations
+
+    start = time.perf_counter()
+    if mode == "legacy":
+        with open(export, "rb") as fh:
+            convs = chatgpt.parse(fh.read())
+        messages = 0
+        for conv in convs:
+            sid = chat_store.create_session("u_bench", title=conv["title"], source="chatgpt")["id"]
+            for user_text, asst_text in conv["pairs"]:
+                for role, text in (("user", user_text), ("assistant", asst_text)):
+                    if text:
+                        chat_store.append_message(sid, "u_bench", role, text, provider="chatgpt")
+                        messages += 1
+    else:
+        with open(export, "rb") as fh:
+            result = import_conversation_payload(
+                user_id="u_bench", source="chatgpt", conversations=iter_conversations("chatgpt", fh),
+            )
+        messages = result.messages_inserted
+    elapsed = time.perf_counter() - start
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        peak_kb //= 1024
+    print(json.dumps({"seconds": elapsed, "peak_mb": peak_kb / 1024, "messages": messages}))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--conversations", type=int, nargs="+", default=[2000, 4000, 8000])
+    parser.add_argument("--turns", type=int, default=20)
+    parser.add_argument("--_mode", help=argparse.SUPPRESS)
+    parser.add_argument("--_export", help=argparse.SUPPRESS)
+    parser.add_argument("--_db", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args._mode:
+        _run_mode(args._mode, args._export, args._db)
+        return
+
+    print(f"{'convs':>7} {'export MB':>10} {'mode':>7} {'seconds':>9} {'msgs/s':>9} {'peak RSS MB':>12}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in args.conversations:
+            export = Path(tmp) / f"conversations_{n}.json"
+            _write_export(export, n, args.turns)
+            size_mb = export.stat().st_size / 1e6
+            for mode in ("legacy", "stream"):
+                db = Path(tmp) / f"{mode}_{n}.db"
+                out = subprocess.run(
+                    [sys.executable, __file__, "--_mode", mode, "--_export", str(export), "--_db", str(db)],
+                    check=True, capture_output=True, text=True,
+                ).stdout.strip().splitlines()[-1]
+                r = json.loads(out)
+                print(f"{n:>7} {size_mb:>10.1f} {mode:>7} {r['seconds']:>9.2f} "
+                      f"{r['messages'] / r['seconds']:>9.0f} {r['peak_mb']:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Benchmark GroundingBuffer under a sustained accessibility-event rate.
+
+Compares:
+1. legacy — sorted lists with bisect.insort, pop(0) expiry, and a
+   timestamp list rebuilt plus every event re-stringified per query
+   (the pre-ring implementation, reproduced here).
+2. ring   — `GroundingBuffer` with parallel timestamp arrays, head-index
+   expiry and the incremental token index.
+
+Simulates --rate events/sec for --seconds of wall time (timestamps are
+synthetic, so the run itself is fast) with a --window retention, issuing
+a temporal and a semantic query every --query-every events.
+
+Usage:
+    python scripts/bench_grounding_buffer.py --rate 30 --seconds 1200 --window 300
+"""
+
+import argparse
+import asyncio
+import bisect
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+_WORDS = ["build", "deploy", "editor", "terminal", "button", "save", "ok", "loading",
+          "search", "results", "tab", "menu", "sidebar", "commit", "preview", "scroll"]
+_ERROR_WORDS = ["TimeoutError", "Traceback", "failed", "Exception"]
+
+
+def _events(n: int, rate: float, start: float, error_rate: float, seed: int = 7):
+    from shail.core.types import AccessibilityEvent
+
+    rng = random.Random(seed)
+    out = []
+    for i in range(n):
+        # Mostly monotonic with a little capture jitter.
+        ts = start + i / rate + rng.uniform(-0.02, 0.0)
+        out.append(AccessibilityEvent(
+            ts=ts,
+            app_name=rng.choice(["Terminal", "Code", "Safari"]),
+            role="AXStaticText",
+            label=" ".join(rng.choice(_WORDS) for _ in range(3)),
+            # Errors are the rare events the semantic query looks for.
+            value=f"{rng.choice(_ERROR_WORDS if rng.random() < error_rate else _WORDS)} #{i}",
+            focused=False,
+            metadata={"window_title": f"proj{i % 5} - Editor"},
+        ))
+    return out
+
+
+class _LegacyBuffer:
+    """The pre-change storage and query paths, clock injected."""
+
+    def __init__(self, window: float):
+        self.window = window
+        self._ax_events = []
+        self._seq = 0
+
+    def add(self, ev, now: float) -> None:
+        from shail.core.types import AccessibilityEvent
+
+        def redact(text):
+            if not text:
+                return text
+            return re.sub(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}", "[redacted-email]", text)
+
+        masked = AccessibilityEvent(ts=ev.ts, app_name=ev.app_name, role=ev.role,
+                                    label=redact(ev.label), value=redact(ev.value),
+                                    focused=ev.focused, metadata=ev.metadata)
+        # The original compared events on equal ts (a TypeError); add a tie-break.
+        self._seq += 1
+        bisect.insort(self._ax_events, (masked.ts, self._seq, masked))
+        cutoff = now - self.window
+        while self._ax_events and self._ax_events[0][0] < cutoff:
+            self._ax_events.pop(0)
+
+    def _slice(self, start_ts, end_ts):
+        ts_list = [ts for ts, _, _ in self._ax_events]
+        lo = bisect.bisect_left(ts_list, start_ts)
+        hi = bisect.bisect_right(ts_list, end_ts)
+        return [ev for _, _, ev in self._ax_events[lo:hi]]
+
+    def query_semantic(self, query: str, now: float):
+        from shail.core.types import NarrativeSegment
+
+        query_lower = query.lower()
+        keywords = ["error", "exception", "traceback", "failed", "red"]
+        matches = []
+        for ev in self._slice(now - self.window, now):
+            combined = " ".join([ev.app_name or "", ev.role or "", ev.label or "", ev.value or "",
+                                 " ".join([f"{k}:{v}" for k, v in (ev.metadata or {}).items()])]).lower()
+            score = 0
+            for kw in keywords + query_lower.split():
+                if kw and kw in combined:
+                    score += 1
+            if score > 0:
+                matches.append((score, ev))
+        matches.sort(key=lambda m: m[0], reverse=True)
+        return [
+            NarrativeSegment(start_time=ev.ts, end_time=ev.ts,
+                             story=f"[{ev.app_name}] {ev.role} {ev.label or ''} {ev.value or ''}".strip(),
+                             raw_logs=[f"score={score}", f"metadata={ev.metadata}"], thumbnail_path=None)
+            for score, ev in matches
+        ]
+
+
+def _run_legacy(events, window, query_every, query) -> tuple:
+    buf = _LegacyBuffer(window)
+    add_s = query_s = 0.0
+    for i, ev in enumerate(events):
+        t0 = time.perf_counter()
+        buf.add(ev, ev.ts)
+        add_s += time.perf_counter() - t0
+        if i % query_every == 0:
+            t0 = time.perf_counter()
+            buf._slice(ev.ts - 30, ev.ts)
+            buf.query_semantic(query, ev.ts)
+            query_s += time.perf_counter() - t0
+    return add_s, query_s
+
+
+def _run_ring(events, window, query_every, query) -> tuple:
+    from shail.perception import buffer as buffer_mod
+
+    buf = buffer_mod.GroundingBuffer(window_seconds=window, consent_required=False)
+    clock = {"now": 0.0}
+    real_time = buffer_mod.time
+    buffer_mod.time = type("Clock", (), {"time": staticmethod(lambda: clock["now"])})
+
+    async def run() -> tuple:
+        add_s = query_s = 0.0
+        for i, ev in enumerate(events):
+            clock["now"] = ev.ts
+            t0 = time.perf_counter()
+            await buf.add_accessibility_event(ev)
+            add_s += time.perf_counter() - t0
+            if i % query_every == 0:
+                t0 = time.perf_counter()
+                buf.query_temporal_range(ev.ts - 30, ev.ts)
+                buf.query_semantic(query, time_range=(ev.ts - window, ev.ts))
+                query_s += time.perf_counter() - t0
+        return add_s, query_s
+
+    try:
+        return asyncio.run(run())
+    finally:
+        buffer_mod.time = real_time
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rate", type=float, default=30.0)
+    parser.add_argument("--seconds", type=int, default=1200)
+    parser.add_argument("--window", type=int, default=300)
+    parser.add_argument("--query-every", type=int, default=30)
+    parser.add_argument("--error-rate", type=float, default=0.02)
+    parser.add_argument("--query", default="timeout")
+    args = parser.parse_args()
+
+    n = int(args.rate * args.seconds)
+    events = _events(n, args.rate, start=1_000_000.0, error_rate=args.error_rate)
+    queries = len(range(0, n, args.query_every))
+    print(f"{n} events at {args.rate:g}/s, window {args.window}s, {queries} query pairs")
+    print(f"  {'impl':<8} {'µs/add':>10} {'ms/query':>10} {'cpu share':>10}")
+    for name, fn in (("legacy", _run_legacy), ("ring", _run_ring)):
+        add_s, query_s = fn(events, args.window, args.query_every, args.query)
+        # Fraction of one core spent keeping up with the simulated stream.
+        share = (add_s + query_s) / args.seconds
+        print(f"  {name:<8} {add_s / n * 1e6:>10.1f} {query_s / queries * 1e3:>10.2f} {share:>9.2%}")
+
+
+if __name__ == "__main__":
+    main()
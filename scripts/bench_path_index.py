@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Benchmark per-call latency of path_index reads.
+
+Compares:
+1. legacy — what every read paid before schema-once: a fresh connection,
+   the full DDL/ALTER/FTS-trigger migration and its COUNT(*)s, then the query.
+2. pooled — the public API (`search`, `get_by_path`, `stats`) on the
+   per-thread connection with the schema already verified.
+
+Usage:
+    python scripts/bench_path_index.py --rows 20000 --calls 200
+Builds a synthetic index in a temp directory.
+"""
+
+import argparse
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+
+def _seed(db_path: str, rows: int) -> list:
+    from shail.memory import path_index
+
+    words = ["budget", "roadmap", "invoice", "notes", "design", "report", "widget", "draft"]
+    paths = []
+    with path_index._conn(db_path) as con:
+        batch = []
+        for i in range(rows):
+            p = Path(f"/bench/d{i % 200}/{words[i % len(words)]}_{i}.md")
+            paths.append(str(p))
+            batch.append((str(uuid.uuid4()), str(p), "md", 100, float(i), p.stem,
+                           f"{words[(i * 7) % len(words)]} snippet {i}", time.time(),
+                           str(p.parent), 3, "doc", p.name))
+        con.executemany(path_index._UPSERT_FILE_SQL, batch)
+    return paths
+
+
+def _legacy_search(db_path: str, query: str) -> list:
+    """The pre-change `_conn` + search: migrate on a brand-new connection."""
+    from shail.memory import path_index
+
+    con = sqlite3.connect(db_path)
+    con.row_factory = sqlite3.Row
+    try:
+        path_index._migrate(con)
+        return con.execute(
+            "SELECT p.* FROM path_index p JOIN path_index_fts f ON f.id = p.id "
+            "WHERE path_index_fts MATCH ? AND p.is_dir = 0 "
+            "ORDER BY bm25(path_index_fts) LIMIT 20",
+            (f'"{query}"*',),
+        ).fetchall()
+    finally:
+        con.close()
+
+
+def _legacy_get_by_path(db_path: str, path: str):
+    from shail.memory import path_index
+
+    con = sqlite3.connect(db_path)
+    con.row_factory = sqlite3.Row
+    try:
+        path_index._migrate(con)
+        return con.execute("SELECT * FROM path_index WHERE path = ?", (path,)).fetchone()
+    finally:
+        con.close()
+
+
+def _latency(fn, args_list) -> tuple:
+    timings = []
+    for args in args_list:
+        start = time.perf_counter()
+        fn(*args)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return statistics.median(timings), timings[int(len(timings) * 0.95) - 1]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--calls", type=int, default=200)
+    args = parser.parse_args()
+
+    from shail.memory import path_index
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = f"{tmp}/path_index.db"
+        paths = _seed(db_path, args.rows)
+        queries = [(db_path, q) for q in ("budget", "roadmap", "invoice", "widget")] * (args.calls // 4)
+        lookups = [(db_path, paths[(i * 97) % len(paths)]) for i in range(args.calls)]
+
+        print(f"{args.rows} rows, {args.calls} calls — median / p95 ms:")
+        p50, p95 = _latency(_legacy_search, queries)
+        print(f"  legacy search       {p50:8.3f} / {p95:8.3f}")
+        p50, p95 = _latency(path_index.search, queries)
+        print(f"  pooled search       {p50:8.3f} / {p95:8.3f}")
+        p50, p95 = _latency(_legacy_get_by_path, lookups)
+        print(f"  legacy get_by_path  {p50:8.3f} / {p95:8.3f}")
+        p50, p95 = _latency(path_index.get_by_path, lookups)
+        print(f"  pooled get_by_path  {p50:8.3f} / {p95:8.3f}")
+        p50, p95 = _latency(path_index.stats, [(db_path,)] * 20)
+        print(f"  pooled stats        {p50:8.3f} / {p95:8.3f}")
+        path_index.close_connections()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark SemanticDedup near-duplicate checks.
+
+Compares, per window size:
+1. legacy — deque of float lists, NumPy array rebuilt from lists per check
+   (the pre-ring implementation).
+2. ring   — `SemanticDedup.is_duplicate` on the preallocated float32 ring.
+3. batch  — `SemanticDedup.is_duplicate_many`, per item.
+4. lsh    — ring with the random-hyperplane pre-filter (--lsh-bits).
+
+Usage:
+    python scripts/bench_semantic_dedup.py --windows 256 4096 65536 --dim 768
+Uses a scratch SQLite file in a temp directory.
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import tempfile
+import time
+from collections import deque
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+
+def _vectors(n: int, dim: int, seed: int):
+    rng = random.Random(seed)
+    return [[rng.gauss(0.0, 1.0) for _ in range(dim)] for _ in range(n)]
+
+
+def _legacy_check(window, query):
+    """The pre-ring hot path: rebuild the candidate matrix on every call."""
+    import numpy as np
+
+    q = np.asarray(query, dtype=np.float32)
+    c = np.asarray([e for _, e in window], dtype=np.float32)
+    denom = np.linalg.norm(q) * np.linalg.norm(c, axis=1)
+    denom[denom == 0.0] = 1.0
+    sims = (c @ q) / denom
+    return float(sims.max())
+
+
+def _time_per_call(fn, queries) -> float:
+    timings = []
+    for q in queries:
+        start = time.perf_counter()
+        fn(q)
+        timings.append((time.perf_counter() - start) * 1e6)
+    return statistics.median(timings)
+
+
+def _filled(tmp: str, name: str, window: int, rows, lsh_bits: int = 0):
+    from shail.memory.semantic_dedup import SemanticDedup, _normalise
+
+    dedup = SemanticDedup(db_path=f"{tmp}/{name}.db", window_size=window, lsh_bits=lsh_bits)
+    # Fill the in-memory ring directly; persistence is not what we measure.
+    with dedup._lock:
+        ring = dedup._get_window("bench")
+        for i, row in enumerate(rows):
+            ring.add(f"h{i}", _normalise(row))
+    return dedup
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--windows", type=int, nargs="+", default=[256, 4096, 65536])
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--batch", type=int, default=64)
+    parser.add_argument("--lsh-bits", type=int, default=16)
+    args = parser.parse_args()
+
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        print("ERROR: numpy is required for this benchmark")
+        sys.exit(1)
+
+    queries = _vectors(args.queries, args.dim, seed=11)
+    print(f"median µs per check, dim={args.dim}:")
+    print(f"  {'window':>8} {'legacy':>10} {'ring':>10} {'batch':>10} {'lsh':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for window in args.windows:
+            rows = _vectors(window, args.dim, seed=window)
+            legacy = deque(((f"h{i}", r) for i, r in enumerate(rows)), maxlen=window)
+            legacy_us = _time_per_call(lambda q: _legacy_check(legacy, q), queries)
+
+            ring = _filled(tmp, f"ring{window}", window, rows)
+            ring_us = _time_per_call(lambda q: ring.is_duplicate("q", "bench", q), queries)
+
+            start = time.perf_counter()
+            for i in range(0, len(queries), args.batch):
+                chunk = queries[i:i + args.batch]
+                ring.is_duplicate_many([f"q{j}" for j in range(len(chunk))], "bench", chunk)
+            batch_us = (time.perf_counter() - start) * 1e6 / len(queries)
+
+            lsh = _filled(tmp, f"lsh{window}", window, rows, lsh_bits=args.lsh_bits)
+            lsh_us = _time_per_call(lambda q: lsh.is_duplicate("q", "bench", q), queries)
+
+            print(f"  {window:>8} {legacy_us:>10.1f} {ring_us:>10.1f} {batch_us:>10.1f} {lsh_us:>10.1f}")
+    print("(lsh applies only once a window holds >= _LSH_MIN_ROWS rows; below that it is an exact scan)")
+
+
+if __name__ == "__main__":
+    main()
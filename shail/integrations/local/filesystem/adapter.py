@@ -315,12 +315,16 @@ class FileSystemAdapter:
                 count += 1
         return count
 
-    def stop_all(self) -> None:
+    def stop_all(self) -> bool:
+        """Stop every observer. Returns True when at least one was attached
+        and all of them were still running at the time of the stop."""
         with self._lock:
             keys = list(self._watches.keys())
+        all_running = bool(keys)
         for k in keys:
             active = self._watches.get(k)
             if active is not None:
+                all_running = all_running and active.observer.is_alive()
                 try:
                     active.observer.stop()
                     active.observer.join(timeout=2.0)
@@ -328,6 +332,7 @@ class FileSystemAdapter:
                     pass
         with self._lock:
             self._watches.clear()
+        return all_running
 
     def get_capabilities(self) -> Dict[str, object]:
         return {
@@ -1,17 +1,40 @@
 """Embeddings via local Ollama (nomic-embed-text). No external API keys required.
 
-Sprint 7: process-local LRU cache keyed by sha256(text) skips re-embedding on
-backfill resume and re-runs. Cache is RAM-bounded; zero vectors are not cached
-(so a transient Ollama outage doesn't poison the cache).
+Sprint 7: embedding cache keyed by (model, sha256(text)) skips re-embedding
+on backfill resume and re-runs. Two tiers:
+
+  * memory — LRU of float32 arrays (`array('f')`, ~4x smaller than float
+    lists), process-local.
+  * disk — SQLite (WAL) at `settings.embed_cache_path`, shared by the API
+    process and the task worker and kept across restarts. Evicts least
+    recently used rows once it exceeds `settings.embed_cache_max_mb`.
+
+Zero vectors are not cached (so a transient Ollama outage doesn't poison the
+cache). Returned vectors are float32-rounded whether fresh or cached, so a
+hit is bit-identical to the original miss.
+
+Misses go to Ollama over pooled clients (one `httpx.Client`, one
+`httpx.AsyncClient` per event loop), split into batches of
+~`settings.ollama_embed_batch_tokens` with at most
+`settings.ollama_embed_concurrency` requests in flight. A failing batch is
+retried once, then bisected, so one bad input costs only its own slot.
+`aembed_texts` / `aembed_query` are the async variants for event-loop callers.
 """
 
 from __future__ import annotations
 
+import asyncio
 import hashlib
 import logging
+import sqlite3
+import time
+import weakref
+from array import array
 from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 from threading import Lock
-from typing import List
+from typing import Dict, List, Optional, Sequence, Tuple
 
 import httpx
 
@@ -27,43 +50,54 @@ def _settings():
     return get_settings()
 
 
-# ── Sprint 7: process-local embedding cache ─────────────────────────────────
+def _text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8", errors="replace")).hexdigest()
 
-_EMBED_CACHE_MAX = 10_000  # entries; ~40 MB at 768-dim float32
+
+def _is_zero(vec: Sequence[float]) -> bool:
+    return all(abs(v) < 1e-9 for v in vec)
+
+
+# ── Sprint 7: tier 1 — process-local embedding cache ────────────────────────
+
+_EMBED_CACHE_MAX = 10_000  # entries; ~30 MB at 768-dim float32
 
 class _LRUEmbedCache:
     def __init__(self, max_size: int = _EMBED_CACHE_MAX) -> None:
-        self._cache: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._cache: "OrderedDict[str, array]" = OrderedDict()
         self._max = max_size
         self._lock = Lock()
         self.hits = 0
         self.misses = 0
 
     @staticmethod
-    def key(text: str) -> str:
-        return hashlib.sha256(text.encode("utf-8", errors="replace")).hexdigest()
+    def key(text: str, model: Optional[str] = None) -> str:
+        if model is None:
+            model = _settings().ollama_embed_model
+        return f"{model}:{_text_hash(text)}"
 
-    def get(self, text: str) -> List[float] | None:
-        k = self.key(text)
+    def get(self, text: str, model: Optional[str] = None) -> List[float] | None:
+        k = self.key(text, model)
         with self._lock:
             vec = self._cache.get(k)
             if vec is not None:
                 self._cache.move_to_end(k)
                 self.hits += 1
-                return list(vec)
+                return vec.tolist()
             self.misses += 1
             return None
 
-    def put(self, text: str, vec: List[float]) -> None:
+    def put(self, text: str, vec: Sequence[float], model: Optional[str] = None) -> None:
         if not vec:
             return
         # Don't cache zero vectors — these signal embedder failure, not a real
         # representation. Caching them would block future correct results.
-        if all(abs(v) < 1e-9 for v in vec):
+        if _is_zero(vec):
             return
-        k = self.key(text)
+        k = self.key(text, model)
+        packed = vec if isinstance(vec, array) else array("f", vec)
         with self._lock:
-            self._cache[k] = list(vec)
+            self._cache[k] = packed
             self._cache.move_to_end(k)
             while len(self._cache) > self._max:
                 self._cache.popitem(last=False)
@@ -82,74 +116,513 @@ class _LRUEmbedCache:
                 "hits": self.hits,
                 "misses": self.misses,
                 "hit_rate": (self.hits / (self.hits + self.misses)) if (self.hits + self.misses) else 0.0,
+                "bytes": sum(v.itemsize * len(v) for v in self._cache.values()),
+            }
+
+
+# ── Tier 2 — persistent cache shared across processes ───────────────────────
+
+_DISK_CREATE_SQL = """
+CREATE TABLE IF NOT EXISTS embedding_cache (
+    model      TEXT NOT NULL,
+    text_hash  TEXT NOT NULL,
+    dim        INTEGER NOT NULL,
+    vec        BLOB NOT NULL,
+    last_used  REAL NOT NULL,
+    PRIMARY KEY (model, text_hash)
+);
+CREATE INDEX IF NOT EXISTS idx_embedding_cache_lru ON embedding_cache(last_used);
+"""
+# Touch `last_used` on a hit at most this often; keeps reads mostly read-only.
+_DISK_TOUCH_SEC = 3600.0
+# Re-measure size after this many inserted rows.
+_DISK_EVICT_EVERY = 256
+
+
+class _DiskEmbedCache:
+    """SQLite-backed float32 vectors keyed by (model, sha256(text))."""
+
+    def __init__(self, path: str, max_bytes: int) -> None:
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._since_evict = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _get_conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            Path(self.path).expanduser().parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(Path(self.path).expanduser()), check_same_thread=False, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_DISK_CREATE_SQL)
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def get_many(self, model: str, hashes: List[str]) -> Dict[str, array]:
+        if not hashes:
+            return {}
+        found: Dict[str, array] = {}
+        now = time.time()
+        with self._lock:
+            try:
+                conn = self._get_conn()
+                for start in range(0, len(hashes), 500):
+                    chunk = hashes[start:start + 500]
+                    rows = conn.execute(
+                        f"""SELECT text_hash, vec, last_used FROM embedding_cache
+                            WHERE model = ? AND text_hash IN ({', '.join('?' * len(chunk))})""",
+                        (model, *chunk),
+                    ).fetchall()
+                    stale = []
+                    for text_hash, blob, last_used in rows:
+                        vec = array("f")
+                        vec.frombytes(blob)
+                        found[text_hash] = vec
+                        if now - last_used > _DISK_TOUCH_SEC:
+                            stale.append((now, model, text_hash))
+                    if stale:
+                        conn.executemany(
+                            "UPDATE embedding_cache SET last_used = ? WHERE model = ? AND text_hash = ?", stale,
+                        )
+                        conn.commit()
+            except Exception as exc:
+                logger.debug("embedding disk cache read failed: %s", exc)
+                return {}
+            self.hits += len(found)
+            self.misses += len(hashes) - len(found)
+        return found
+
+    def put_many(self, model: str, items: Dict[str, array]) -> None:
+        if not items:
+            return
+        now = time.time()
+        with self._lock:
+            try:
+                conn = self._get_conn()
+                conn.executemany(
+                    """INSERT OR REPLACE INTO embedding_cache(model, text_hash, dim, vec, last_used)
+                       VALUES (?, ?, ?, ?, ?)""",
+                    [(model, h, len(v), v.tobytes(), now) for h, v in items.items()],
+                )
+                conn.commit()
+                self._since_evict += len(items)
+                if self._since_evict >= _DISK_EVICT_EVERY:
+                    self._since_evict = 0
+                    self._evict(conn)
+            except Exception as exc:
+                logger.debug("embedding disk cache write failed: %s", exc)
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        total = conn.execute("SELECT COALESCE(SUM(length(vec)), 0) FROM embedding_cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Drop the least recently used rows down to 90% of the budget.
+        excess = total - int(self.max_bytes * 0.9)
+        rows = conn.execute(
+            "SELECT model, text_hash, length(vec) FROM embedding_cache ORDER BY last_used ASC"
+        )
+        doomed = []
+        for model, text_hash, size in rows:
+            if excess <= 0:
+                break
+            doomed.append((model, text_hash))
+            excess -= size
+        conn.executemany("DELETE FROM embedding_cache WHERE model = ? AND text_hash = ?", doomed)
+        conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            try:
+                conn = self._get_conn()
+                conn.execute("DELETE FROM embedding_cache")
+                conn.commit()
+            except Exception as exc:
+                logger.debug("embedding disk cache clear failed: %s", exc)
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            try:
+                entries, size = self._get_conn().execute(
+                    "SELECT COUNT(*), COALESCE(SUM(length(vec)), 0) FROM embedding_cache"
+                ).fetchone()
+            except Exception:
+                entries, size = 0, 0
+            lookups = self.hits + self.misses
+            return {
+                "path": self.path,
+                "size": entries,
+                "bytes": size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
             }
 
 
 _embed_cache = _LRUEmbedCache()
+_disk_cache: Optional[_DiskEmbedCache] = None
+_disk_cache_lock = Lock()
+
+
+def _disk_cache_path() -> str:
+    return _settings().embed_cache_path
+
+
+def _disk_tier() -> Optional[_DiskEmbedCache]:
+    """The persistent tier for the configured path, or None when disabled."""
+    global _disk_cache
+    path = _disk_cache_path()
+    if not path:
+        return None
+    with _disk_cache_lock:
+        if _disk_cache is None or _disk_cache.path != path:
+            _disk_cache = _DiskEmbedCache(path, int(_settings().embed_cache_max_mb) * 1024 * 1024)
+        return _disk_cache
 
 
 def embedding_cache_stats() -> dict:
-    return _embed_cache.stats()
+    """Memory-tier stats at the top level (unchanged keys) plus a `disk` entry."""
+    stats = _embed_cache.stats()
+    disk = _disk_tier()
+    stats["disk"] = disk.stats() if disk is not None else None
+    return stats
 
 
 def clear_embedding_cache() -> None:
     _embed_cache.clear()
+    disk = _disk_tier()
+    if disk is not None:
+        disk.clear()
+
+
+# ── Ollama client ───────────────────────────────────────────────────────────
+
+# Token estimate used for batch sizing (nomic-embed-text: ~4 chars/token).
+_CHARS_PER_TOKEN = 4
+# Attempts per batch before it is bisected.
+_BATCH_ATTEMPTS = 2
+_RETRY_BACKOFF_SEC = 0.25
+
+_client: Optional[httpx.Client] = None
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_size = 0
+_client_lock = Lock()
+# Event loop -> (AsyncClient, in-flight semaphore); both are loop-bound.
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Tuple[httpx.AsyncClient, asyncio.Semaphore]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _concurrency() -> int:
+    return max(1, int(_settings().ollama_embed_concurrency))
+
+
+def _http_client() -> httpx.Client:
+    """Process-wide pooled client for the sync path."""
+    global _client
+    with _client_lock:
+        if _client is None or _client.is_closed:
+            n = _concurrency()
+            _client = httpx.Client(limits=httpx.Limits(max_connections=n, max_keepalive_connections=n))
+        return _client
+
+
+def _batch_executor() -> ThreadPoolExecutor:
+    """Shared workers for sync batches; its size is the process-wide in-flight cap."""
+    global _executor, _executor_size
+    n = _concurrency()
+    with _client_lock:
+        if _executor is None or _executor_size != n:
+            if _executor is not None:
+                _executor.shutdown(wait=False)
+            _executor = ThreadPoolExecutor(max_workers=n, thread_name_prefix="shail-embed")
+            _executor_size = n
+        return _executor
+
+
+def _async_state() -> Tuple[httpx.AsyncClient, asyncio.Semaphore]:
+    loop = asyncio.get_running_loop()
+    state = _async_clients.get(loop)
+    if state is None or state[0].is_closed:
+        n = _concurrency()
+        state = (
+            httpx.AsyncClient(limits=httpx.Limits(max_connections=n, max_keepalive_connections=n)),
+            asyncio.Semaphore(n),
+        )
+        _async_clients[loop] = state
+    return state
+
+
+def _async_http_client() -> httpx.AsyncClient:
+    return _async_state()[0]
+
+
+async def close_embedding_clients() -> None:
+    """Graceful shutdown — call from FastAPI shutdown handler."""
+    global _client, _executor
+    with _client_lock:
+        client, _client = _client, None
+        executor, _executor = _executor, None
+    if client is not None:
+        client.close()
+    if executor is not None:
+        executor.shutdown(wait=False)
+    try:
+        state = _async_clients.pop(asyncio.get_running_loop(), None)
+    except RuntimeError:
+        state = None
+    if state is not None:
+        await state[0].aclose()
+
+
+def _plan_batches(texts: List[str], max_tokens: int) -> List[Tuple[int, int]]:
+    """Contiguous `(start, end)` slices of ~`max_tokens` estimated tokens each.
+
+    A text larger than the budget gets a batch of its own (Ollama truncates
+    it to the model context).
+    """
+    batches: List[Tuple[int, int]] = []
+    start, budget = 0, 0
+    for i, text in enumerate(texts):
+        tokens = len(text) // _CHARS_PER_TOKEN + 1
+        if i > start and budget + tokens > max_tokens:
+            batches.append((start, i))
+            start, budget = i, 0
+        budget += tokens
+    if start < len(texts):
+        batches.append((start, len(texts)))
+    return batches
+
+
+def _request_payload(texts: List[str]) -> dict:
+    return {"model": _settings().ollama_embed_model, "input": texts}
+
+
+def _parse_embeddings(data: dict, expected: int) -> List[List[float]]:
+    embeddings = data.get("embeddings") or data.get("embedding")
+    if embeddings is None:
+        raise EmbeddingError(f"Unexpected Ollama response: {data}")
+    # Ollama returns flat list for single input — normalise to list-of-lists
+    if embeddings and not isinstance(embeddings[0], list):
+        embeddings = [embeddings]
+    if len(embeddings) != expected:
+        raise EmbeddingError(f"Ollama returned {len(embeddings)} embeddings for {expected} inputs")
+    return embeddings
+
+
+def _log_batch_failure(texts: List[str], exc: Exception) -> None:
+    s = _settings()
+    logger.error(
+        "embed failed for a %d-char input after %d attempts (model=%s url=%s): %s",
+        len(texts[0]), _BATCH_ATTEMPTS, s.ollama_embed_model, s.ollama_base_url, exc,
+    )
+
+
+def _embed_batch(texts: List[str]) -> List[Optional[List[float]]]:
+    """One batch with retry, then bisection. `None` marks an input that failed alone.
+
+    `httpx.ConnectError` propagates: with Ollama down, splitting is pointless.
+    """
+    s = _settings()
+    last: Exception = EmbeddingError("no attempt made")
+    for attempt in range(_BATCH_ATTEMPTS):
+        try:
+            resp = _http_client().post(
+                f"{s.ollama_base_url}/api/embed",
+                json=_request_payload(texts),
+                timeout=s.ollama_embed_timeout,
+            )
+            resp.raise_for_status()
+            return _parse_embeddings(resp.json(), len(texts))
+        except httpx.ConnectError:
+            raise
+        except Exception as exc:
+            last = exc
+            if attempt + 1 < _BATCH_ATTEMPTS:
+                time.sleep(_RETRY_BACKOFF_SEC * (attempt + 1))
+    if len(texts) == 1:
+        _log_batch_failure(texts, last)
+        return [None]
+    mid = len(texts) // 2
+    logger.warning("embed batch of %d failed (%s) — bisecting", len(texts), last)
+    return _embed_batch(texts[:mid]) + _embed_batch(texts[mid:])
+
+
+async def _aembed_batch(texts: List[str]) -> List[Optional[List[float]]]:
+    """Async twin of `_embed_batch`; the halves of a split run concurrently."""
+    s = _settings()
+    client = _async_http_client()
+    limiter = _async_state()[1]
+    last: Exception = EmbeddingError("no attempt made")
+    for attempt in range(_BATCH_ATTEMPTS):
+        try:
+            async with limiter:
+                resp = await client.post(
+                    f"{s.ollama_base_url}/api/embed",
+                    json=_request_payload(texts),
+                    timeout=s.ollama_embed_timeout,
+                )
+            resp.raise_for_status()
+            return _parse_embeddings(resp.json(), len(texts))
+        except httpx.ConnectError:
+            raise
+        except Exception as exc:
+            last = exc
+            if attempt + 1 < _BATCH_ATTEMPTS:
+                await asyncio.sleep(_RETRY_BACKOFF_SEC * (attempt + 1))
+    if len(texts) == 1:
+        _log_batch_failure(texts, last)
+        return [None]
+    mid = len(texts) // 2
+    logger.warning("embed batch of %d failed (%s) — bisecting", len(texts), last)
+    left, right = await asyncio.gather(_aembed_batch(texts[:mid]), _aembed_batch(texts[mid:]))
+    return left + right
+
+
+def _embed_uncached(texts: List[str]) -> List[Optional[List[float]]]:
+    batches = _plan_batches(texts, _settings().ollama_embed_batch_tokens)
+    if len(batches) == 1:
+        return _embed_batch(texts)
+    pool = _batch_executor()
+    futures = [pool.submit(_embed_batch, texts[a:b]) for a, b in batches]
+    out: List[Optional[List[float]]] = []
+    for fut in futures:
+        out.extend(fut.result())
+    return out
+
+
+async def _aembed_uncached(texts: List[str]) -> List[Optional[List[float]]]:
+    batches = _plan_batches(texts, _settings().ollama_embed_batch_tokens)
+    parts = await asyncio.gather(*(_aembed_batch(texts[a:b]) for a, b in batches))
+    return [vec for part in parts for vec in part]
+
+
+# ── Public API ──────────────────────────────────────────────────────────────
+
+def _from_cache(texts: List[str], model: str) -> Tuple[List[Optional[List[float]]], List[int]]:
+    """Fill what both tiers know; return the results and the miss indices."""
+    # Tier 1: in-process LRU
+    results: List[Optional[List[float]]] = [_embed_cache.get(t, model) for t in texts]
+    miss_indices = [i for i, r in enumerate(results) if r is None]
+    if not miss_indices:
+        return results, miss_indices
+
+    # Tier 2: persistent cache shared with other processes
+    disk = _disk_tier()
+    if disk is not None:
+        hashes = {i: _text_hash(texts[i]) for i in miss_indices}
+        found = disk.get_many(model, list(dict.fromkeys(hashes.values())))
+        for i, text_hash in hashes.items():
+            vec = found.get(text_hash)
+            if vec is not None:
+                results[i] = vec.tolist()
+                _embed_cache.put(texts[i], vec, model)
+        miss_indices = [i for i in miss_indices if results[i] is None]
+    return results, miss_indices
+
+
+def _merge_fresh(
+    texts: List[str],
+    results: List[Optional[List[float]]],
+    miss_indices: List[int],
+    unique: List[str],
+    vectors: List[Optional[List[float]]],
+    model: str,
+) -> List[List[float]]:
+    """Fill the misses, populate both tiers; failures become zero vectors."""
+    dim = _settings().ollama_embed_dim
+    fresh: Dict[str, array] = {}
+    by_text: Dict[str, List[float]] = {}
+    for text, emb in zip(unique, vectors):
+        if emb is None:
+            by_text[text] = [0.0] * dim
+            continue
+        packed = array("f", emb)
+        by_text[text] = packed.tolist()
+        _embed_cache.put(text, packed, model)
+        if emb and not _is_zero(emb):
+            fresh[_text_hash(text)] = packed
+    disk = _disk_tier()
+    if disk is not None:
+        disk.put_many(model, fresh)
+    for i in miss_indices:
+        results[i] = list(by_text[texts[i]])
+    return results  # type: ignore[return-value]
+
+
+def _log_unreachable() -> None:
+    s = _settings()
+    logger.error(
+        "Ollama not reachable at %s — embeddings unavailable, memories will NOT be stored. "
+        "Start Ollama and ensure model '%s' is pulled.",
+        s.ollama_base_url, s.ollama_embed_model,
+    )
 
 
 def embed_texts(texts: List[str]) -> List[List[float]]:
     """Embed batch of texts via Ollama nomic-embed-text. Returns list of float vectors.
 
     Sprint 7: cached by sha256(text). Cache hits skip the HTTP round-trip.
-    Only the misses are sent to Ollama; results are merged back in order.
+    Only the distinct misses are sent to Ollama; results are merged back in
+    order. Inputs that cannot be embedded (Ollama down, or a batch that still
+    fails once bisected down to that input) come back as zero vectors.
     """
     if not texts:
         return []
-    s = _settings()
-
-    # Cache lookup
-    results: List[List[float] | None] = [_embed_cache.get(t) for t in texts]
-    miss_indices = [i for i, r in enumerate(results) if r is None]
+    model = _settings().ollama_embed_model
+    results, miss_indices = _from_cache(texts, model)
     if not miss_indices:
-        return [r for r in results]  # type: ignore[return-value]
+        return results  # type: ignore[return-value]
 
-    miss_texts = [texts[i] for i in miss_indices]
+    unique = list(dict.fromkeys(texts[i] for i in miss_indices))
     try:
-        resp = httpx.post(
-            f"{s.ollama_base_url}/api/embed",
-            json={"model": s.ollama_embed_model, "input": miss_texts},
-            timeout=30.0,
-        )
-        resp.raise_for_status()
-        data = resp.json()
-        embeddings = data.get("embeddings") or data.get("embedding")
-        if embeddings is None:
-            raise EmbeddingError(f"Unexpected Ollama response: {data}")
-        # Ollama returns flat list for single input — normalise to list-of-lists
-        if embeddings and not isinstance(embeddings[0], list):
-            embeddings = [embeddings]
-        # Fill the misses + populate cache
-        for slot_i, emb in zip(miss_indices, embeddings):
-            results[slot_i] = emb
-            _embed_cache.put(texts[slot_i], emb)
-        return results  # type: ignore[return-value]
+        vectors = _embed_uncached(unique)
     except httpx.ConnectError:
+        _log_unreachable()
+        vectors = [None] * len(unique)
+    except Exception as e:
+        s = _settings()
         logger.error(
-            "Ollama not reachable at %s — embeddings unavailable, memories will NOT be stored. "
-            "Start Ollama and ensure model '%s' is pulled.",
-            s.ollama_base_url, s.ollama_embed_model,
+            "embed_texts failed (model=%s url=%s): %s",
+            s.ollama_embed_model, s.ollama_base_url, e,
         )
-        # Fill misses with zero vectors (don't cache them — see _LRUEmbedCache.put)
-        for slot_i in miss_indices:
-            results[slot_i] = [0.0] * s.ollama_embed_dim
+        vectors = [None] * len(unique)
+    return _merge_fresh(texts, results, miss_indices, unique, vectors, model)
+
+
+async def aembed_texts(texts: List[str]) -> List[List[float]]:
+    """Async `embed_texts`: same cache tiers and fallbacks, non-blocking HTTP.
+
+    Cache lookups and write-back touch the SQLite disk tier, so they run in a
+    thread rather than on the event loop.
+    """
+    if not texts:
+        return []
+    model = _settings().ollama_embed_model
+    results, miss_indices = await asyncio.to_thread(_from_cache, texts, model)
+    if not miss_indices:
         return results  # type: ignore[return-value]
+
+    unique = list(dict.fromkeys(texts[i] for i in miss_indices))
+    try:
+        vectors = await _aembed_uncached(unique)
+    except httpx.ConnectError:
+        _log_unreachable()
+        vectors = [None] * len(unique)
     except Exception as e:
+        s = _settings()
         logger.error(
-            "embed_texts failed (model=%s url=%s): %s",
+            "aembed_texts failed (model=%s url=%s): %s",
             s.ollama_embed_model, s.ollama_base_url, e,
         )
-        for slot_i in miss_indices:
-            results[slot_i] = [0.0] * s.ollama_embed_dim
-        return results  # type: ignore[return-value]
+        vectors = [None] * len(unique)
+    return await asyncio.to_thread(_merge_fresh, texts, results, miss_indices, unique, vectors, model)
 
 
 def embed_query(query: str) -> List[float]:
@@ -158,6 +631,12 @@ def embed_query(query: str) -> List[float]:
     return results[0] if results else []
 
 
+async def aembed_query(query: str) -> List[float]:
+    """Async `embed_query`."""
+    results = await aembed_texts([query])
+    return results[0] if results else []
+
+
 def is_zero_vector(embedding: List[float]) -> bool:
     """True if every component is ~0. embed_texts returns these on Ollama
     failure; upserting them poisons Chroma with records that match nothing.
@@ -0,0 +1,321 @@
+"""Extracted-text cache for parsed local documents.
+
+Parsing a PDF / DOCX / XLSX / HTML file costs tens to thousands of
+milliseconds, and local-file retrieval re-reads the same top matches on every
+chat turn. Extractions are cached keyed by (path, size, mtime_ns) — any
+rewrite of the file changes at least one of them, so a stale hit would need a
+same-size write that also restores the old mtime. Two tiers:
+
+  * memory — LRU of `ExtractedText`, bounded at `_MEM_MAX_CHARS`.
+  * disk — SQLite (WAL) at `settings.extract_cache_path`, zlib-compressed
+    text plus page offsets, shared across processes and restarts. Evicts
+    least recently used rows once it exceeds `settings.extract_cache_max_mb`.
+
+Plain text / code / logs bypass the cache: reading them is as cheap as a hit.
+Failed extractions (missing optional dependency, corrupt file) are not
+cached, so installing pypdf later takes effect without a purge.
+"""
+
+from __future__ import annotations
+
+import bisect
+import json
+import logging
+import os
+import sqlite3
+import time
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from threading import Lock
+from typing import Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+# Formats whose parse is worth caching. Everything else is read directly.
+CACHED_EXTS = frozenset({".pdf", ".docx", ".doc", ".xlsx", ".xls", ".html", ".htm", ".xhtml"})
+
+_MEM_MAX_CHARS = 64_000_000
+
+Parser = Callable[[str], Tuple[Optional[str], Tuple[int, ...]]]
+
+
+@dataclass(frozen=True)
+class ExtractedText:
+    text: str
+    # Char offset where each PDF page starts in `text`; empty for other formats.
+    page_offsets: Tuple[int, ...] = ()
+    # memory | disk | parsed (cache miss) | direct (uncached format)
+    source: str = "parsed"
+
+    def page_at(self, offset: int) -> Optional[int]:
+        """1-based page containing char `offset`, or None without page info."""
+        if not self.page_offsets:
+            return None
+        return max(1, bisect.bisect_right(self.page_offsets, offset))
+
+
+class _MemoryTier:
+    def __init__(self, max_chars: int) -> None:
+        self._max = max_chars
+        self._chars = 0
+        self._lock = Lock()
+        self._items: "OrderedDict[Tuple[str, int, int], ExtractedText]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Tuple[str, int, int]) -> Optional[ExtractedText]:
+        with self._lock:
+            doc = self._items.get(key)
+            if doc is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return doc
+
+    def put(self, key: Tuple[str, int, int], doc: ExtractedText) -> None:
+        if len(doc.text) > self._max:
+            return
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self._chars -= len(old.text)
+            self._items[key] = doc
+            self._chars += len(doc.text)
+            while self._chars > self._max:
+                _, evicted = self._items.popitem(last=False)
+                self._chars -= len(evicted.text)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self._chars = 0
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._items),
+                "chars": self._chars,
+                "max_chars": self._max,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            }
+
+
+_DISK_CREATE_SQL = """
+CREATE TABLE IF NOT EXISTS extracted_text (
+    path          TEXT PRIMARY KEY,
+    size          INTEGER NOT NULL,
+    mtime_ns      INTEGER NOT NULL,
+    text          BLOB NOT NULL,
+    page_offsets  TEXT NOT NULL,
+    last_used     REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_extracted_text_lru ON extracted_text(last_used);
+"""
+# Touch `last_used` on a hit at most this often; keeps reads mostly read-only.
+_DISK_TOUCH_SEC = 3600.0
+# Re-measure size after this many inserted rows.
+_DISK_EVICT_EVERY = 32
+
+
+class _DiskTier:
+    """SQLite-backed extractions, one row per path (latest version only)."""
+
+    def __init__(self, path: str, max_bytes: int) -> None:
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._since_evict = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _get_conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            Path(self.path).expanduser().parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(Path(self.path).expanduser()), check_same_thread=False, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_DISK_CREATE_SQL)
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def get(self, key: Tuple[str, int, int]) -> Optional[ExtractedText]:
+        path, size, mtime_ns = key
+        with self._lock:
+            try:
+                conn = self._get_conn()
+                row = conn.execute(
+                    "SELECT text, page_offsets, last_used FROM extracted_text "
+                    "WHERE path = ? AND size = ? AND mtime_ns = ?",
+                    (path, size, mtime_ns),
+                ).fetchone()
+                if row is None:
+                    self.misses += 1
+                    return None
+                blob, offsets, last_used = row
+                now = time.time()
+                if now - last_used > _DISK_TOUCH_SEC:
+                    conn.execute("UPDATE extracted_text SET last_used = ? WHERE path = ?", (now, path))
+                    conn.commit()
+                doc = ExtractedText(
+                    text=zlib.decompress(blob).decode("utf-8"),
+                    page_offsets=tuple(json.loads(offsets)),
+                    source="disk",
+                )
+            except Exception as exc:
+                logger.debug("extraction disk cache read failed: %s", exc)
+                return None
+            self.hits += 1
+            return doc
+
+    def put(self, key: Tuple[str, int, int], doc: ExtractedText) -> None:
+        path, size, mtime_ns = key
+        with self._lock:
+            try:
+                conn = self._get_conn()
+                conn.execute(
+                    """INSERT OR REPLACE INTO extracted_text(path, size, mtime_ns, text, page_offsets, last_used)
+                       VALUES (?, ?, ?, ?, ?, ?)""",
+                    (path, size, mtime_ns, zlib.compress(doc.text.encode("utf-8"), 6),
+                     json.dumps(list(doc.page_offsets)), time.time()),
+                )
+                conn.commit()
+                self._since_evict += 1
+                if self._since_evict >= _DISK_EVICT_EVERY:
+                    self._since_evict = 0
+                    self._evict(conn)
+            except Exception as exc:
+                logger.debug("extraction disk cache write failed: %s", exc)
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        total = conn.execute(
+            "SELECT COALESCE(SUM(length(text) + length(page_offsets)), 0) FROM extracted_text"
+        ).fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Drop the least recently used rows down to 90% of the budget.
+        excess = total - int(self.max_bytes * 0.9)
+        rows = conn.execute(
+            "SELECT path, length(text) + length(page_offsets) FROM extracted_text ORDER BY last_used ASC"
+        )
+        doomed = []
+        for path, size in rows:
+            if excess <= 0:
+                break
+            doomed.append((path,))
+            excess -= size
+        conn.executemany("DELETE FROM extracted_text WHERE path = ?", doomed)
+        conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            try:
+                conn = self._get_conn()
+                conn.execute("DELETE FROM extracted_text")
+                conn.commit()
+            except Exception as exc:
+                logger.debug("extraction disk cache clear failed: %s", exc)
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            try:
+                entries, size = self._get_conn().execute(
+                    "SELECT COUNT(*), COALESCE(SUM(length(text) + length(page_offsets)), 0) FROM extracted_text"
+                ).fetchone()
+            except Exception:
+                entries, size = 0, 0
+            lookups = self.hits + self.misses
+            return {
+                "path": self.path,
+                "size": entries,
+                "bytes": size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            }
+
+
+_memory = _MemoryTier(_MEM_MAX_CHARS)
+_disk: Optional[_DiskTier] = None
+_disk_lock = Lock()
+
+
+def _settings():
+    from apps.shail.settings import get_settings
+    return get_settings()
+
+
+def _disk_cache_path() -> str:
+    return _settings().extract_cache_path
+
+
+def _disk_tier() -> Optional[_DiskTier]:
+    """The persistent tier for the configured path, or None when disabled."""
+    global _disk
+    path = _disk_cache_path()
+    if not path:
+        return None
+    with _disk_lock:
+        if _disk is None or _disk.path != path:
+            _disk = _DiskTier(path, int(_settings().extract_cache_max_mb) * 1024 * 1024)
+        return _disk
+
+
+def extract(path: str, parse: Parser) -> Optional[ExtractedText]:
+    """Extract `path` with `parse`, through the cache for parsed formats.
+
+    `parse(path)` returns (text, page_offsets); a falsy text means failure.
+    Returns None when the file cannot be stat'ed or nothing was extracted.
+    """
+    if os.path.splitext(path)[1].lower() not in CACHED_EXTS:
+        text, offsets = parse(path)
+        return ExtractedText(text, tuple(offsets), source="direct") if text else None
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    key = (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+
+    doc = _memory.get(key)
+    if doc is not None:
+        return ExtractedText(doc.text, doc.page_offsets, source="memory")
+    disk = _disk_tier()
+    if disk is not None:
+        doc = disk.get(key)
+        if doc is not None:
+            _memory.put(key, doc)
+            return doc
+
+    text, offsets = parse(path)
+    if not text:
+        return None
+    doc = ExtractedText(text, tuple(offsets), source="parsed")
+    _memory.put(key, doc)
+    if disk is not None:
+        disk.put(key, doc)
+    return doc
+
+
+def extraction_cache_stats() -> Dict[str, Optional[dict]]:
+    disk = _disk_tier()
+    return {"memory": _memory.stats(), "disk": disk.stats() if disk is not None else None}
+
+
+def clear_extraction_cache() -> None:
+    _memory.clear()
+    disk = _disk_tier()
+    if disk is not None:
+        disk.clear()
@@ -28,7 +28,7 @@ from apps.shail.exact_index import (
 from apps.shail.retrieval import fusion
 from apps.shail.retrieval.intent import IntentPlan, QueryIntent, classify
 from apps.shail.settings import get_settings
-from shail.memory.rag import search as rag_search
+from shail.memory.rag import asearch as rag_asearch
 
 logger = logging.getLogger(__name__)
 
@@ -75,14 +75,22 @@ def _run_exact(plan: IntentPlan, *, fts_k: int) -> List[ExactHit]:
     return list(by_id.values())
 
 
-def _run_semantic(query: str, *, namespace: Optional[str], k: int) -> List[SemanticHit]:
+async def _run_semantic(
+    query: str, *, namespace: Optional[str], k: int, query_context=None,
+) -> List[SemanticHit]:
     """Run legacy semantic path. Time-decay is applied here so fusion
     sees recency-aware scores. Mirrors `chat_api._build_context._rag`.
+    The query embed is async, so no worker thread waits on Ollama; with a
+    `QueryContext` the turn's shared embedding is reused.
     """
     # Lazy-import time decay to avoid a circular import on chat_api.
     from apps.shail.chat_api import _apply_time_decay
     try:
-        raw = rag_search(query, k=k, namespace=namespace)
+        if query_context is not None:
+            vec = await query_context.embedding()
+            raw = await rag_asearch(query, k=k, namespace=namespace, query_embedding=vec)
+        else:
+            raw = await rag_asearch(query, k=k, namespace=namespace)
         return _apply_time_decay(raw, k=k)
     except Exception as exc:  # noqa: BLE001
         logger.warning("semantic path failed: %s", exc)
@@ -98,6 +106,7 @@ async def hybrid_search(
     use_global_memory: bool = False,      # Phase 1: SuperMemory global fallback
     retrieval_strategy: str = "local_only",  # local_only | global_only | hybrid
     task_id: Optional[str] = None,         # Sprint 2: usefulness feedback registry
+    query_context=None,                    # shared per-turn query embedding
 ) -> List[SemanticHit]:
     """Drop-in replacement for `rag.search` + `_apply_time_decay`.
 
@@ -149,7 +158,7 @@ async def hybrid_search(
 
     if effective_strategy != "global_only":
         exact_task = asyncio.to_thread(_run_exact, plan, fts_k=overfetch_k)
-        sem_task   = asyncio.to_thread(_run_semantic, query, namespace=namespace, k=overfetch_k)
+        sem_task   = _run_semantic(query, namespace=namespace, k=overfetch_k, query_context=query_context)
         exact_hits, semantic_hits = await asyncio.gather(exact_task, sem_task)
 
         # Threshold gates (telemetry-aware).
@@ -172,9 +172,8 @@ class OutputIngestor:
         embedding: Optional[list] = None
         if getattr(s, "semantic_dedup_enabled", True):
             try:
-                from shail.memory.embeddings import embed_texts
-                import asyncio
-                embedding = (await asyncio.to_thread(embed_texts, [content]))[0]
+                from shail.memory.embeddings import aembed_texts
+                embedding = (await aembed_texts([content]))[0]
                 from shail.memory.semantic_dedup import get_semantic_dedup
                 dedup = get_semantic_dedup()
                 is_dup, sim, matched = dedup.is_duplicate(content, namespace, embedding)
@@ -193,7 +192,7 @@ class OutputIngestor:
         # ── Local ingest ────────────────────────────────────────────── #
         local_ok = False
         try:
-            from shail.memory.rag import ingest as rag_ingest
+            from shail.memory.rag import aingest as rag_ingest
             await self._ingest_local(rag_ingest, content, metadata, namespace, tags)
             local_ok = True
             _emit_counter("memory.ingest_succeeded", status="local")
@@ -10,15 +10,20 @@ classification, embedded flag, and an FTS5 mirror for fast name/title search.
 
 from __future__ import annotations
 
+import json
 import logging
 import os
 import sqlite3
 import subprocess
+import threading
 import time
 import uuid
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from contextlib import contextmanager
+from dataclasses import asdict, dataclass
 from pathlib import Path
-from typing import Any, Dict, Generator, Iterable, List, Optional
+from typing import Any, Deque, Dict, Generator, Iterable, List, Optional
 
 logger = logging.getLogger(__name__)
 
@@ -74,6 +79,22 @@ CREATE TABLE IF NOT EXISTS scan_roots (
 """
 
 
+# Startup scan journal: per-directory mtime + child dirs from the last listing,
+# and small key/value state (the clean-shutdown marker).
+_SCAN_JOURNAL_DDL = """
+CREATE TABLE IF NOT EXISTS scan_journal (
+    dir_path   TEXT PRIMARY KEY,
+    mtime      REAL NOT NULL,
+    subdirs    TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS scan_state (
+    key        TEXT PRIMARY KEY,
+    value      TEXT
+);
+"""
+_CLEAN_SHUTDOWN_KEY = "clean_shutdown_at"
+
+
 def _default_roots() -> List[str]:
     """User content folders we auto-scan on backend startup.
 
@@ -132,32 +153,108 @@ def _classify_kind(ext: str) -> str:
     return "other"
 
 
+# Bump when _migrate gains a step; stored in PRAGMA user_version.
+_SCHEMA_VERSION = 2
+
+# Per-connection tuning for a read-heavy index (lookups during every chat turn).
+_CONN_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA mmap_size=268435456",   # 256 MB
+    "PRAGMA cache_size=-16384",     # 16 MB
+    "PRAGMA temp_store=MEMORY",
+)
+
+_schema_lock = threading.Lock()
+_schema_ready: set = set()
+# One long-lived connection per (thread, db_path).
+_local = threading.local()
+
+
+def _migrate(con: sqlite3.Connection) -> None:
+    """Create / upgrade every path_index table, index and trigger. Idempotent."""
+    con.executescript(_DDL)
+    # Phase 2 schema extensions — idempotent.
+    for ddl in _PHASE2_ALTERS:
+        try:
+            con.execute(ddl)
+        except sqlite3.OperationalError:
+            pass  # column already exists
+    for idx in _PHASE2_INDEXES:
+        try:
+            con.execute(idx)
+        except sqlite3.OperationalError:
+            pass
+    # FTS5 mirror for fast name/title search (A6).
+    _ensure_fts(con)
+    # Persisted scan roots table.
+    con.executescript(_SCAN_ROOTS_DDL)
+    # v2: startup scan journal.
+    con.executescript(_SCAN_JOURNAL_DDL)
+    con.commit()
+
+
+def _ensure_schema(con: sqlite3.Connection, db_path: str) -> None:
+    """Run `_migrate` at most once per process per database file."""
+    if db_path in _schema_ready:
+        return
+    with _schema_lock:
+        if db_path in _schema_ready:
+            return
+        version = con.execute("PRAGMA user_version").fetchone()[0]
+        if version < _SCHEMA_VERSION:
+            _migrate(con)
+            con.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+            con.commit()
+        _schema_ready.add(db_path)
+
+
+def _thread_conn(db_path: str) -> sqlite3.Connection:
+    conns: Dict[str, sqlite3.Connection] = getattr(_local, "conns", None)
+    if conns is None:
+        conns = _local.conns = {}
+    con = conns.get(db_path)
+    if con is not None and not os.path.exists(db_path):
+        # File removed underneath us — reopen and re-migrate.
+        con.close()
+        con = None
+        with _schema_lock:
+            _schema_ready.discard(db_path)
+    if con is None:
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        con = sqlite3.connect(db_path)
+        con.row_factory = sqlite3.Row
+        for pragma in _CONN_PRAGMAS:
+            con.execute(pragma)
+        conns[db_path] = con
+    return con
+
+
 @contextmanager
 def _conn(db_path: str) -> Generator[sqlite3.Connection, None, None]:
-    os.makedirs(os.path.dirname(db_path), exist_ok=True)
-    con = sqlite3.connect(db_path)
-    con.row_factory = sqlite3.Row
+    """This thread's pooled connection, schema guaranteed.
+
+    Commits on clean exit and rolls back on error; the connection stays open
+    for the next call on the same thread.
+    """
+    con = _thread_conn(db_path)
+    _ensure_schema(con, db_path)
     try:
-        con.executescript(_DDL)
-        # Phase 2 schema extensions — idempotent.
-        for ddl in _PHASE2_ALTERS:
-            try:
-                con.execute(ddl)
-            except sqlite3.OperationalError:
-                pass  # column already exists
-        for idx in _PHASE2_INDEXES:
-            try:
-                con.execute(idx)
-            except sqlite3.OperationalError:
-                pass
-        # FTS5 mirror for fast name/title search (A6).
-        _ensure_fts(con)
-        # Persisted scan roots table.
-        con.executescript(_SCAN_ROOTS_DDL)
-        con.commit()
         yield con
-    finally:
+    except BaseException:
+        con.rollback()
+        raise
+    else:
+        if con.in_transaction:
+            con.commit()
+
+
+def close_connections() -> None:
+    """Close this thread's pooled connections (tests, shutdown)."""
+    for con in getattr(_local, "conns", {}).values():
         con.close()
+    _local.conns = {}
 
 
 def _ensure_fts(con: sqlite3.Connection) -> None:
@@ -260,9 +357,10 @@ def _extract_snippet(p: Path, kind: str) -> Optional[str]:
     no content to match against and questions about binary documents silently
     miss. Plain text/code/markdown still take the fast UTF-8 path.
 
-    Returns None on error / unsupported kind. The full file is still read
-    only at retrieval time by `rag._extract_text_from_file` — what we cache
-    here is just enough text for FTS5 to surface the file as a candidate.
+    Returns None on error / unsupported kind. The full text is only used at
+    retrieval time by `rag.extract_document` — what we store here is just
+    enough text for FTS5 to surface the file as a candidate. Binary parses go
+    through the extraction cache, so the scan also warms retrieval.
     """
     try:
         size = p.stat().st_size
@@ -310,6 +408,53 @@ def _extract_snippet(p: Path, kind: str) -> Optional[str]:
     return snippet[:_SNIPPET_CHARS]
 
 
+_UPSERT_FILE_SQL = """
+    INSERT INTO path_index (id, path, file_type, size_bytes, mtime, title,
+                            summary_snippet, indexed_at, parent_path, depth,
+                            is_dir, kind, file_name)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 0, ?, ?)
+    ON CONFLICT(path) DO UPDATE SET
+        file_type       = excluded.file_type,
+        size_bytes      = excluded.size_bytes,
+        mtime           = excluded.mtime,
+        title           = excluded.title,
+        summary_snippet = excluded.summary_snippet,
+        indexed_at      = excluded.indexed_at,
+        parent_path     = excluded.parent_path,
+        depth           = excluded.depth,
+        kind            = excluded.kind,
+        file_name       = excluded.file_name
+"""
+
+_UPSERT_FOLDER_SQL = """
+    INSERT INTO path_index (id, path, file_type, size_bytes, mtime, title,
+                            indexed_at, parent_path, depth, is_dir, kind,
+                            child_count, file_name)
+    VALUES (?, ?, 'dir', NULL, NULL, ?, ?, ?, ?, 1, NULL, ?, ?)
+    ON CONFLICT(path) DO UPDATE SET
+        title       = excluded.title,
+        indexed_at  = excluded.indexed_at,
+        parent_path = excluded.parent_path,
+        depth       = excluded.depth,
+        child_count = excluded.child_count,
+        file_name   = excluded.file_name
+"""
+
+
+def _file_row(p: Path, stat: os.stat_result, *, extract_snippet: bool = True) -> tuple:
+    """Parameters for `_UPSERT_FILE_SQL`. On conflict the existing id is kept."""
+    ext = p.suffix.lower()
+    kind = _classify_kind(ext)
+    snippet = _extract_snippet(p, kind) if extract_snippet else None
+    return (str(uuid.uuid4()), str(p), ext.lstrip("."), stat.st_size, stat.st_mtime,
+            p.stem, snippet, time.time(), _parent_path(p), len(p.parts) - 1, kind, p.name)
+
+
+def _folder_row(p: Path, child_count: int) -> tuple:
+    return (str(uuid.uuid4()), str(p), p.name or str(p), time.time(), _parent_path(p),
+            len(p.parts) - 1, child_count, p.name or str(p))
+
+
 def upsert_file(db_path: str, file_path: str, *, extract_snippet: bool = True) -> Optional[str]:
     """Add or refresh a single file's metadata in the index. Returns record id.
 
@@ -329,37 +474,12 @@ def upsert_file(db_path: str, file_path: str, *, extract_snippet: bool = True) -
     except OSError:
         return None
 
-    parent = _parent_path(p)
-    depth = len(p.parts) - 1
-    kind = _classify_kind(ext)
-    snippet = _extract_snippet(p, kind) if extract_snippet else None
-
+    row = _file_row(p, stat, extract_snippet=extract_snippet)
     with _conn(db_path) as con:
-        existing = con.execute("SELECT id FROM path_index WHERE path = ?", (str(p),)).fetchone()
-        record_id = existing["id"] if existing else str(uuid.uuid4())
-        con.execute(
-            """
-            INSERT INTO path_index (id, path, file_type, size_bytes, mtime, title,
-                                    summary_snippet, indexed_at, parent_path, depth,
-                                    is_dir, kind, file_name)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 0, ?, ?)
-            ON CONFLICT(path) DO UPDATE SET
-                file_type       = excluded.file_type,
-                size_bytes      = excluded.size_bytes,
-                mtime           = excluded.mtime,
-                title           = excluded.title,
-                summary_snippet = excluded.summary_snippet,
-                indexed_at      = excluded.indexed_at,
-                parent_path     = excluded.parent_path,
-                depth           = excluded.depth,
-                kind            = excluded.kind,
-                file_name       = excluded.file_name
-            """,
-            (record_id, str(p), ext.lstrip("."), stat.st_size, stat.st_mtime,
-             p.stem, snippet, time.time(), parent, depth, kind, p.name),
-        )
+        con.execute(_UPSERT_FILE_SQL, row)
         con.commit()
-    return record_id
+        existing = con.execute("SELECT id FROM path_index WHERE path = ?", (str(p),)).fetchone()
+    return existing["id"] if existing else row[0]
 
 
 def upsert_folder(db_path: str, folder_path: str, *, child_count: int = 0) -> Optional[str]:
@@ -367,30 +487,12 @@ def upsert_folder(db_path: str, folder_path: str, *, child_count: int = 0) -> Op
     p = Path(folder_path)
     if not p.exists() or not p.is_dir():
         return None
-    parent = _parent_path(p)
-    depth = len(p.parts) - 1
+    row = _folder_row(p, child_count)
     with _conn(db_path) as con:
-        existing = con.execute("SELECT id FROM path_index WHERE path = ?", (str(p),)).fetchone()
-        record_id = existing["id"] if existing else str(uuid.uuid4())
-        con.execute(
-            """
-            INSERT INTO path_index (id, path, file_type, size_bytes, mtime, title,
-                                    indexed_at, parent_path, depth, is_dir, kind,
-                                    child_count, file_name)
-            VALUES (?, ?, 'dir', NULL, NULL, ?, ?, ?, ?, 1, NULL, ?, ?)
-            ON CONFLICT(path) DO UPDATE SET
-                title       = excluded.title,
-                indexed_at  = excluded.indexed_at,
-                parent_path = excluded.parent_path,
-                depth       = excluded.depth,
-                child_count = excluded.child_count,
-                file_name   = excluded.file_name
-            """,
-            (record_id, str(p), p.name or str(p), time.time(), parent, depth,
-             child_count, p.name or str(p)),
-        )
+        con.execute(_UPSERT_FOLDER_SQL, row)
         con.commit()
-    return record_id
+        existing = con.execute("SELECT id FROM path_index WHERE path = ?", (str(p),)).fetchone()
+    return existing["id"] if existing else row[0]
 
 
 def mark_embedded(db_path: str, path: str, embedded: bool = True) -> None:
@@ -464,57 +566,254 @@ def _update_root_stats(db_path: str, path: str, file_count: int) -> None:
 
 # ── Scan ─────────────────────────────────────────────────────────────────────
 
-def scan(db_path: str, roots: Optional[List[str]] = None) -> int:
+# Rows per executemany/commit during a scan.
+_SCAN_BATCH = 1000
+
+
+@dataclass
+class ScanReport:
+    """Outcome of one `scan` pass."""
+    roots: int = 0
+    dirs: int = 0               # directories listed
+    dirs_skipped: int = 0       # unchanged per the journal, not listed
+    incremental: bool = False   # journal trusted for this pass
+    files_seen: int = 0
+    indexed: int = 0
+    pruned: int = 0
+    seconds: float = 0.0
+
+    @property
+    def files_per_sec(self) -> float:
+        return self.files_seen / self.seconds if self.seconds > 0 else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {**asdict(self), "files_per_sec": round(self.files_per_sec, 1)}
+
+
+_last_scan: Optional[ScanReport] = None
+
+
+def last_scan_report() -> Optional[Dict[str, Any]]:
+    """The most recent scan's counters (this process), or None."""
+    return _last_scan.as_dict() if _last_scan is not None else None
+
+
+def _scan_workers() -> int:
+    return max(1, min(32, os.cpu_count() or 4))
+
+
+def mark_clean_shutdown(db_path: str) -> None:
+    """Record that watchers ran until shutdown, so the next startup scan may
+    trust the journal. Call after the filesystem observers have stopped."""
+    with _conn(db_path) as con:
+        con.execute(
+            "INSERT OR REPLACE INTO scan_state (key, value) VALUES (?, ?)",
+            (_CLEAN_SHUTDOWN_KEY, str(time.time())),
+        )
+
+
+def _consume_clean_shutdown(con: sqlite3.Connection) -> bool:
+    """True if the previous process shut down cleanly. Clears the marker, so
+    a crash during this run forces a full walk next time."""
+    row = con.execute("SELECT value FROM scan_state WHERE key = ?", (_CLEAN_SHUTDOWN_KEY,)).fetchone()
+    con.execute("DELETE FROM scan_state WHERE key = ?", (_CLEAN_SHUTDOWN_KEY,))
+    con.commit()
+    return row is not None
+
+
+def scan(db_path: str, roots: Optional[List[str]] = None, *, incremental: bool = False) -> int:
     """
     Walk configured roots, upsert every matching file + folder. Returns count
     of files indexed. Skips files that haven't changed (mtime unchanged).
-    Folders are always upserted (cheap; needed for tree view).
+    Folders are upserted whenever they are listed (needed for tree view).
+
+    One connection for the whole pass: the walker hands changed files to a
+    CPU-bounded pool for snippet extraction, and this thread is the single
+    writer, flushing rows with executemany every `_SCAN_BATCH`. Entries that
+    vanished from a listed directory are pruned (with their subtree) in the
+    same pass; unreadable, hidden and skipped directories are left alone.
+
+    Every listed directory's mtime and subdirectories go to `scan_journal`.
+    With `incremental=True` (startup) and a clean-shutdown marker from the
+    previous process, a directory whose mtime matches the journal is not
+    listed — only its recorded subdirectories are visited. Directory mtimes
+    change on create/delete/rename, not on in-place edits; the watchers are
+    the freshness mechanism for those while running. Without the marker the
+    pass is a full walk.
     """
+    global _last_scan
     scan_roots = [Path(r) for r in roots] if roots else [Path(r) for r in _default_roots()]
     if not scan_roots:
         scan_roots = list(_SCAN_ROOTS)
-    count = 0
+    report = ScanReport()
+    started = time.perf_counter()
 
     with _conn(db_path) as con:
-        existing: Dict[str, float] = {
-            row["path"]: row["mtime"]
-            for row in con.execute("SELECT path, mtime FROM path_index WHERE is_dir = 0")
-        }
-
-    for root in scan_roots:
-        if not root.exists() or not root.is_dir():
-            continue
-        # Register root folder so tree queries have a starting node.
-        upsert_folder(db_path, str(root))
-        for dirpath, dirnames, filenames in os.walk(root, followlinks=False):
-            # Prune junk dirs + hidden dirs.
-            dirnames[:] = [d for d in dirnames
-                           if not d.startswith(".") and d not in _SKIP_DIRS]
-            # Folder rows for every visited dir.
-            try:
-                child_count = len(dirnames) + sum(
-                    1 for f in filenames if Path(f).suffix.lower() in _INCLUDE_EXTS
+        trust = incremental and _consume_clean_shutdown(con)
+        report.incremental = trust
+        journal: Dict[str, tuple] = {}
+        if trust:
+            journal = {
+                row["dir_path"]: (row["mtime"], json.loads(row["subdirs"]))
+                for row in con.execute("SELECT dir_path, mtime, subdirs FROM scan_journal")
+            }
+            existing: Dict[str, float] = {}
+        else:
+            existing = {
+                row["path"]: row["mtime"]
+                for row in con.execute("SELECT path, mtime FROM path_index WHERE is_dir = 0")
+            }
+        folder_rows: List[tuple] = []
+        file_rows: List[tuple] = []
+        journal_rows: List[tuple] = []
+
+        def _flush() -> None:
+            if folder_rows:
+                con.executemany(_UPSERT_FOLDER_SQL, folder_rows)
+                folder_rows.clear()
+            if file_rows:
+                con.executemany(_UPSERT_FILE_SQL, file_rows)
+                report.indexed += len(file_rows)
+                file_rows.clear()
+            if journal_rows:
+                con.executemany(
+                    "INSERT OR REPLACE INTO scan_journal (dir_path, mtime, subdirs) VALUES (?, ?, ?)",
+                    journal_rows,
                 )
-                upsert_folder(db_path, dirpath, child_count=child_count)
-            except OSError:
-                pass
-
-            for fname in filenames:
-                if fname.startswith("."):
-                    continue
-                fpath = Path(dirpath) / fname
-                if fpath.suffix.lower() not in _INCLUDE_EXTS:
-                    continue
-                try:
-                    mtime = fpath.stat().st_mtime
-                except OSError:
-                    continue
-                if str(fpath) in existing and existing[str(fpath)] == mtime:
+                journal_rows.clear()
+            con.commit()
+
+        def _known_mtimes(dirpath: str) -> Dict[str, float]:
+            if not trust:
+                return existing
+            return {
+                row["path"]: row["mtime"]
+                for row in con.execute(
+                    "SELECT path, mtime FROM path_index WHERE parent_path = ? AND is_dir = 0",
+                    (dirpath,),
+                )
+            }
+
+        pending: Deque[Future] = deque()
+        workers = _scan_workers()
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="path-scan") as pool:
+
+            def _drain(keep: int) -> None:
+                while len(pending) > keep:
+                    try:
+                        file_rows.append(pending.popleft().result())
+                    except Exception as exc:  # noqa: BLE001
+                        logger.debug("path scan row failed: %s", exc)
+                    if len(file_rows) >= _SCAN_BATCH:
+                        _flush()
+
+            for root in scan_roots:
+                if not root.exists() or not root.is_dir():
                     continue
-                if upsert_file(db_path, str(fpath)):
-                    count += 1
-
-    return count
+                report.roots += 1
+                seen: set = {str(root)}
+                listed: List[str] = []
+                stack = [str(root)]
+                while stack:
+                    dirpath = stack.pop()
+                    try:
+                        dir_mtime = os.stat(dirpath).st_mtime
+                    except OSError:
+                        continue
+                    known = journal.get(dirpath)
+                    if known is not None and known[0] == dir_mtime:
+                        report.dirs_skipped += 1
+                        stack.extend(os.path.join(dirpath, name) for name in known[1])
+                        continue
+                    try:
+                        with os.scandir(dirpath) as it:
+                            entries = list(it)
+                    except OSError:
+                        continue  # unreadable: never listed, so never pruned
+                    report.dirs += 1
+                    listed.append(dirpath)
+
+                    # Prune junk dirs + hidden dirs.
+                    subdirs: List[str] = []
+                    files: List[os.DirEntry] = []
+                    for entry in entries:
+                        if entry.name.startswith("."):
+                            continue
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                if entry.name not in _SKIP_DIRS:
+                                    subdirs.append(entry.name)
+                            elif entry.is_file() and os.path.splitext(entry.name)[1].lower() in _INCLUDE_EXTS:
+                                files.append(entry)
+                        except OSError:
+                            continue
+                    folder_rows.append(_folder_row(Path(dirpath), len(subdirs) + len(files)))
+                    journal_rows.append((dirpath, dir_mtime, json.dumps(sorted(subdirs))))
+
+                    known_files = _known_mtimes(dirpath)
+                    for entry in files:
+                        try:
+                            stat = entry.stat()
+                        except OSError:
+                            continue
+                        seen.add(entry.path)
+                        report.files_seen += 1
+                        if known_files.get(entry.path) == stat.st_mtime:
+                            continue
+                        pending.append(pool.submit(_file_row, Path(entry.path), stat))
+                    for name in subdirs:
+                        sub = os.path.join(dirpath, name)
+                        seen.add(sub)
+                        stack.append(sub)
+                    _drain(workers * 4)
+                    if len(folder_rows) >= _SCAN_BATCH:
+                        _flush()
+                _drain(0)
+                _flush()
+                report.pruned += _prune(con, listed, seen)
+
+    report.seconds = time.perf_counter() - started
+    _last_scan = report
+    logger.info(
+        "path_index scan (%s): %d roots, %d dirs listed, %d dirs skipped, %d files seen, "
+        "%d indexed, %d pruned in %.1fs (%.0f files/sec)",
+        "incremental" if report.incremental else "full",
+        report.roots, report.dirs, report.dirs_skipped, report.files_seen, report.indexed,
+        report.pruned, report.seconds, report.files_per_sec,
+    )
+    return report.indexed
+
+
+def _prune(con: sqlite3.Connection, listed: List[str], seen: set) -> int:
+    """Delete rows whose parent was listed this pass but that were not seen;
+    a vanished directory takes its subtree (and journal entries) with it."""
+    doomed: List[tuple] = []
+    for start in range(0, len(listed), 500):
+        chunk = listed[start:start + 500]
+        rows = con.execute(
+            f"SELECT path, is_dir FROM path_index WHERE parent_path IN ({','.join('?' * len(chunk))})",
+            chunk,
+        ).fetchall()
+        for row in rows:
+            name = os.path.basename(row["path"])
+            if row["path"] in seen or name.startswith(".") or name in _SKIP_DIRS:
+                continue
+            doomed.append((row["path"], row["is_dir"]))
+    pruned = 0
+    for path, is_dir in doomed:
+        pruned += con.execute("DELETE FROM path_index WHERE path = ?", (path,)).rowcount
+        con.execute("DELETE FROM scan_journal WHERE dir_path = ?", (path,))
+        if is_dir:
+            prefix = path.rstrip(os.sep) + os.sep
+            pruned += con.execute(
+                "DELETE FROM path_index WHERE substr(path, 1, ?) = ?", (len(prefix), prefix),
+            ).rowcount
+            con.execute(
+                "DELETE FROM scan_journal WHERE substr(dir_path, 1, ?) = ?", (len(prefix), prefix),
+            )
+    if doomed:
+        con.commit()
+    return pruned
 
 
 def backfill_snippets(db_path: str, *, max_files: int = 2000,
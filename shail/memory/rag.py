@@ -2,14 +2,22 @@
 
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
 import os
 from dataclasses import dataclass
-from typing import List, Tuple, Dict, Any, Optional
+from typing import List, Tuple, Dict, Any, Iterable, Iterator, Optional
 
 from apps.shail.settings import get_settings
-from shail.memory.embeddings import embed_texts, embed_query, EmbeddingError, is_zero_vector
+from shail.memory.embeddings import (
+    aembed_query,
+    aembed_texts,
+    embed_query,
+    embed_texts,
+    EmbeddingError,
+    is_zero_vector,
+)
 from shail.memory.vector_store import (
     EmbeddingRecord,
     VectorStore,
@@ -52,6 +60,8 @@ def _get_store() -> VectorStore:
             dsn=settings.rag_pg_dsn,
             chroma_path=settings.rag_chroma_path,
             dim=settings.rag_embedding_dim,
+            pg_pool_size=settings.rag_pg_pool_size,
+            pg_index=settings.rag_pg_index,
         )
     return _vector_store
 
@@ -79,6 +89,21 @@ def _chunk_text(text: str, chunk_size: int, overlap: int) -> List[str]:
     return chunks
 
 
+def _chunk_stream(pieces: Iterable[str], chunk_size: int, overlap: int) -> Iterator[str]:
+    """`_chunk_text` over the non-blank pieces joined by blank lines, without
+    materialising the joined text: only the current window is held."""
+    buf = ""
+    for piece in pieces:
+        if not piece.strip():
+            continue
+        buf = f"{buf}\n\n{piece}" if buf else piece
+        while len(buf) > chunk_size:
+            yield buf[:chunk_size]
+            buf = buf[max(1, chunk_size - overlap):]
+    if buf:
+        yield buf
+
+
 def _detect_namespace(path: str) -> str:
     ext = os.path.splitext(path)[1].lower()
     if ext in CODE_EXTS:
@@ -89,7 +114,110 @@ def _detect_namespace(path: str) -> str:
 
 
 def _extract_text_from_file(path: str) -> str | None:
-    """Format-aware text extractor. Returns None if file cannot be read."""
+    """Format-aware text extractor. Returns None if file cannot be read.
+
+    Parsed formats (PDF/DOCX/XLSX/HTML) are served from the extraction cache
+    when the file's size and mtime are unchanged.
+    """
+    doc = extract_document(path)
+    return doc.text if doc else None
+
+
+def extract_document(path: str):
+    """`_extract_text_from_file` plus PDF page offsets and the cache tier that
+    served it, as an `extraction_cache.ExtractedText` (None on failure)."""
+    from shail.memory import extraction_cache
+    return extraction_cache.extract(path, _parse_document)
+
+
+def _parse_document(path: str) -> Tuple[Optional[str], Tuple[int, ...]]:
+    """Uncached extraction: (text, char offset where each PDF page starts)."""
+    if os.path.splitext(path)[1].lower() in PDF_EXTS:
+        return _join_pages(_extract_pdf_pages(path))
+    return _extract_by_format(path), ()
+
+
+def iter_pdf_pages(path: str) -> Iterator[str]:
+    """Yield each page's text lazily. The file is mmapped, not read into the
+    heap, and pages are only parsed as the caller asks for them — stop early
+    and the rest of the document is never touched. Raises on a missing pypdf
+    or unreadable file."""
+    import mmap
+    import pypdf  # type: ignore[import]
+    with open(path, "rb") as fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        reader = pypdf.PdfReader(mm)
+        for page in reader.pages:
+            yield page.extract_text() or ""
+
+
+def iter_docx_blocks(path: str) -> Iterator[str]:
+    """Yield DOCX paragraphs, then table rows as `a | b | c`. The zip is read
+    member-by-member from disk rather than copied into memory first."""
+    import docx  # type: ignore[import]
+    doc = docx.Document(path)
+    for p in doc.paragraphs:
+        if p.text.strip():
+            yield p.text
+    for table in doc.tables:
+        for row in table.rows:
+            cells = [c.text.strip() for c in row.cells if c.text.strip()]
+            if cells:
+                yield " | ".join(cells)
+
+
+def iter_document_text(path: str) -> Iterator[str]:
+    """Text pieces of `path` in reading order, lazily for PDF and DOCX; other
+    formats yield their whole (extraction-cached) text once. Joining the
+    non-blank pieces with blank lines gives `_extract_text_from_file`."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext in PDF_EXTS or ext in DOCX_EXTS:
+        label = "pypdf" if ext in PDF_EXTS else "python-docx"
+        pieces = iter_pdf_pages(path) if ext in PDF_EXTS else iter_docx_blocks(path)
+        try:
+            yield from pieces
+        except ImportError:
+            logger.warning("%s not installed — cannot ingest %s", label, path)
+        except Exception as exc:
+            logger.warning("%s extraction failed %s: %s", ext.lstrip(".").upper(), path, exc)
+        return
+    text = _extract_text_from_file(path)
+    if text:
+        yield text
+
+
+def _extract_pdf_pages(path: str) -> Optional[List[str]]:
+    """Text of every page (empty strings kept, so indexes are page numbers)."""
+    try:
+        return list(iter_pdf_pages(path))
+    except ImportError:
+        logger.warning("pypdf not installed — cannot ingest %s", path)
+        return None
+    except Exception as exc:
+        logger.warning("PDF extraction failed %s: %s", path, exc)
+        return None
+
+
+def _join_pages(pages: Optional[List[str]]) -> Tuple[Optional[str], Tuple[int, ...]]:
+    """Join non-blank pages with blank lines, recording where each page starts."""
+    if not pages:
+        return None, ()
+    parts: List[str] = []
+    offsets: List[int] = []
+    pos = 0
+    for page in pages:
+        if page.strip():
+            if parts:
+                pos += 2
+            offsets.append(pos)
+            parts.append(page)
+            pos += len(page)
+        else:
+            offsets.append(pos)
+    return ("\n\n".join(parts) or None), tuple(offsets)
+
+
+def _extract_by_format(path: str) -> str | None:
+    """Every format except PDF (see `_parse_document`)."""
     ext = os.path.splitext(path)[1].lower()
 
     # Plain text / code / markdown — UTF-8 decode
@@ -101,38 +229,10 @@ def _extract_text_from_file(path: str) -> str | None:
             logger.warning("text read failed %s: %s", path, exc)
             return None
 
-    # PDF
-    if ext in PDF_EXTS:
-        try:
-            import io
-            import pypdf  # type: ignore[import]
-            with open(path, "rb") as fh:
-                raw = fh.read()
-            reader = pypdf.PdfReader(io.BytesIO(raw))
-            pages = [p.extract_text() or "" for p in reader.pages]
-            return "\n\n".join(t for t in pages if t.strip()) or None
-        except ImportError:
-            logger.warning("pypdf not installed — cannot ingest %s", path)
-            return None
-        except Exception as exc:
-            logger.warning("PDF extraction failed %s: %s", path, exc)
-            return None
-
     # DOCX
     if ext in DOCX_EXTS:
         try:
-            import io
-            import docx  # type: ignore[import]
-            with open(path, "rb") as fh:
-                raw = fh.read()
-            doc = docx.Document(io.BytesIO(raw))
-            parts = [p.text for p in doc.paragraphs if p.text.strip()]
-            for table in doc.tables:
-                for row in table.rows:
-                    cells = [c.text.strip() for c in row.cells if c.text.strip()]
-                    if cells:
-                        parts.append(" | ".join(cells))
-            return "\n\n".join(parts) or None
+            return "\n\n".join(iter_docx_blocks(path)) or None
         except ImportError:
             logger.warning("python-docx not installed — cannot ingest %s", path)
             return None
@@ -216,31 +316,37 @@ def _extract_text_from_file(path: str) -> str | None:
     return None
 
 
-def ingest(paths: Optional[List[str]] = None, records: Optional[List[Dict[str, Any]]] = None) -> int:
-    """
-    Ingest documents or records into the RAG system.
-    
-    Args:
-        paths: List of file paths to ingest
-        records: List of dict records with keys: content, namespace, metadata
-        
-    Returns:
-        Number of chunks ingested
-    """
+def _build_records(
+    paths: Optional[List[str]], records: Optional[List[Dict[str, Any]]],
+) -> List[EmbeddingRecord]:
+    """Chunk files and wrap direct records; embeddings are filled in later."""
     settings = get_settings()
-    store = _get_store()
     chunk_size = settings.rag_chunk_size
     overlap = settings.rag_chunk_overlap
 
     embedding_records: List[EmbeddingRecord] = []
 
-    # Handle file ingestion
+    # Handle file ingestion. Pieces stream from the extractor into the
+    # chunker, so a file costs at most `rag_ingest_max_chars` of text.
+    max_chars = settings.rag_ingest_max_chars
     if paths:
         for path in paths:
-            text = _extract_text_from_file(path)
-            if not text:
+            chunks: List[str] = []
+            total = 0
+            truncated = False
+            pieces = iter_document_text(path)
+            for chunk in _chunk_stream(pieces, chunk_size, overlap):
+                chunks.append(chunk)
+                total += chunk_size - overlap  # new text per chunk
+                if max_chars and total >= max_chars:
+                    truncated = True
+                    break
+            pieces.close()
+            if not chunks:
                 logger.warning("No text extracted from %s — skipping", path)
                 continue
+            if truncated:
+                logger.info("ingest budget reached for %s after %d chunks", path, len(chunks))
             try:
                 p = __import__("pathlib").Path(path)
                 stat = p.stat()
@@ -251,7 +357,6 @@ def ingest(paths: Optional[List[str]] = None, records: Optional[List[Dict[str, A
                 size_bytes = 0
             namespace = _detect_namespace(path)
             ext = os.path.splitext(path)[1].lower()
-            chunks = _chunk_text(text, chunk_size, overlap)
             for idx, chunk in enumerate(chunks):
                 metadata = {
                     "file_path": path,
@@ -264,6 +369,8 @@ def ingest(paths: Optional[List[str]] = None, records: Optional[List[Dict[str, A
                     "content_type": namespace,
                     "source": "file",
                 }
+                if truncated:
+                    metadata["truncated"] = True
                 embedding_records.append(
                     EmbeddingRecord(
                         id=None,
@@ -290,16 +397,13 @@ def ingest(paths: Optional[List[str]] = None, records: Optional[List[Dict[str, A
                 )
             )
 
-    if not embedding_records:
-        return 0
+    return embedding_records
 
-    texts = [r.content for r in embedding_records]
-    try:
-        embeddings = embed_texts(texts)
-    except EmbeddingError as exc:
-        logger.error("Embedding failed: %s", exc)
-        return 0
 
+def _with_embeddings(
+    embedding_records: List[EmbeddingRecord], embeddings: List[List[float]],
+) -> List[EmbeddingRecord]:
+    """Attach embeddings, dropping zero vectors (failed embeds)."""
     valid_records: List[EmbeddingRecord] = []
     for rec, emb in zip(embedding_records, embeddings):
         if is_zero_vector(emb):
@@ -317,17 +421,73 @@ def ingest(paths: Optional[List[str]] = None, records: Optional[List[Dict[str, A
         logger.error(
             "ingest aborted: all %d embeddings were zero vectors", len(embedding_records),
         )
+    return valid_records
+
+
+def ingest(paths: Optional[List[str]] = None, records: Optional[List[Dict[str, Any]]] = None) -> int:
+    """
+    Ingest documents or records into the RAG system.
+    
+    Args:
+        paths: List of file paths to ingest
+        records: List of dict records with keys: content, namespace, metadata
+        
+    Returns:
+        Number of chunks ingested
+    """
+    store = _get_store()
+    embedding_records = _build_records(paths, records)
+    if not embedding_records:
+        return 0
+
+    texts = [r.content for r in embedding_records]
+    try:
+        embeddings = embed_texts(texts)
+    except EmbeddingError as exc:
+        logger.error("Embedding failed: %s", exc)
         return 0
 
+    valid_records = _with_embeddings(embedding_records, embeddings)
+    if not valid_records:
+        return 0
     store.upsert(valid_records)
     return len(valid_records)
 
 
+async def aingest(paths: Optional[List[str]] = None, records: Optional[List[Dict[str, Any]]] = None) -> int:
+    """Async `ingest`: embeds over the async Ollama client.
+
+    File extraction and the vector-store write are local blocking work and
+    run in a worker thread.
+    """
+    store = _get_store()
+    if paths:
+        embedding_records = await asyncio.to_thread(_build_records, paths, records)
+    else:
+        embedding_records = _build_records(None, records)
+    if not embedding_records:
+        return 0
+
+    texts = [r.content for r in embedding_records]
+    try:
+        embeddings = await aembed_texts(texts)
+    except EmbeddingError as exc:
+        logger.error("Embedding failed: %s", exc)
+        return 0
+
+    valid_records = _with_embeddings(embedding_records, embeddings)
+    if not valid_records:
+        return 0
+    await asyncio.to_thread(store.upsert, valid_records)
+    return len(valid_records)
+
+
 def search(
     query: str,
     k: int = 5,
     namespace: Optional[str] = None,
     filters: Optional[Dict[str, Any]] = None,
+    query_embedding: Optional[List[float]] = None,
 ) -> List[Tuple[str, float, Dict[str, Any]]]:
     """
     Search the RAG system for relevant context.
@@ -337,21 +497,75 @@ def search(
         k: Number of results to return
         namespace: Optional namespace/collection filter
         filters: Optional metadata filters (dict)
+        query_embedding: Precomputed embedding of `query` (skips the embed)
         
     Returns:
         List of (content, score, metadata)
     """
     store = _get_store()
-    try:
-        q_emb = embed_query(query)
-    except EmbeddingError as exc:
-        logger.error("Query embedding failed: %s", exc)
-        return []
+    if query_embedding is not None:
+        q_emb = query_embedding
+    else:
+        try:
+            q_emb = embed_query(query)
+        except EmbeddingError as exc:
+            logger.error("Query embedding failed: %s", exc)
+            return []
 
     results = store.query(q_emb, namespace=namespace, filters=filters, k=k)
     return [(r["content"], r.get("score", 0.0), r.get("metadata", {})) for r in results]
 
 
+async def asearch(
+    query: str,
+    k: int = 5,
+    namespace: Optional[str] = None,
+    filters: Optional[Dict[str, Any]] = None,
+    query_embedding: Optional[List[float]] = None,
+) -> List[Tuple[str, float, Dict[str, Any]]]:
+    """Async `search`: the query embed is awaited, the store lookup runs in a thread."""
+    store = _get_store()
+    if query_embedding is not None:
+        q_emb = query_embedding
+    else:
+        try:
+            q_emb = await aembed_query(query)
+        except EmbeddingError as exc:
+            logger.error("Query embedding failed: %s", exc)
+            return []
+
+    results = await asyncio.to_thread(store.query, q_emb, namespace=namespace, filters=filters, k=k)
+    return [(r["content"], r.get("score", 0.0), r.get("metadata", {})) for r in results]
+
+
+async def asearch_namespaces(
+    query: str,
+    namespaces: List[str],
+    k: int = 5,
+    filters: Optional[Dict[str, Any]] = None,
+    query_embedding: Optional[List[float]] = None,
+) -> Dict[str, List[Tuple[str, float, Dict[str, Any]]]]:
+    """`asearch` over several namespaces with one embedding and, where the
+    store supports it, one round-trip. Returns hits keyed by namespace."""
+    if not namespaces:
+        return {}
+    store = _get_store()
+    if query_embedding is not None:
+        q_emb = query_embedding
+    else:
+        try:
+            q_emb = await aembed_query(query)
+        except EmbeddingError as exc:
+            logger.error("Query embedding failed: %s", exc)
+            return {}
+
+    results = await asyncio.to_thread(store.query_namespaces, q_emb, namespaces, filters, k)
+    return {
+        ns: [(r["content"], r.get("score", 0.0), r.get("metadata", {})) for r in rows]
+        for ns, rows in results.items()
+    }
+
+
 # Tool state integration
 def store_tool_state_for_rag(
     tool_name: str,
@@ -7,14 +7,20 @@ Design:
   - Per-namespace rolling window of (text_hash, embedding) tuples.
   - Window size + similarity threshold configurable.
   - SQLite persistence for cross-restart durability.
-  - In-memory cache for hot path (last N per namespace).
-  - O(N·dim) cosine compare per ingest where N = window size (default 256).
-    Tunable down to 64 for high-throughput deployments.
+  - In-memory ring per namespace: a preallocated float32 matrix of
+    unit-normalised rows, so a check is one matrix-vector product
+    (pure-Python dot products when numpy is missing).
+  - Optional random-hyperplane LSH pre-filter (`lsh_bits`) for very large
+    windows: only rows whose signature is within `_LSH_MAX_HAMMING` bits of
+    the query are scored. Approximate — may miss a borderline duplicate.
 
 Public API:
     is_duplicate(content, namespace, embedding) -> Tuple[bool, float, Optional[str]]
         returns (duplicate?, max_similarity, matched_hash)
 
+    is_duplicate_many(contents, namespace, embeddings) -> List[...]
+        the same per item, also matching earlier items of the batch
+
     record(content_hash, namespace, embedding) -> None
         add to window after successful ingest
 
@@ -24,13 +30,11 @@ from __future__ import annotations
 
 import hashlib
 import logging
-import math
 import sqlite3
 import threading
 import time
-from collections import deque
 from pathlib import Path
-from typing import Deque, Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Sequence, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -38,43 +42,149 @@ logger = logging.getLogger(__name__)
 DEFAULT_WINDOW_SIZE = 256
 DEFAULT_THRESHOLD   = 0.95
 
+# LSH: use the pre-filter only once a window holds this many rows, and
+# accept candidates within this many differing signature bits.
+_LSH_MIN_ROWS = 4096
+_LSH_MAX_HAMMING = 4
+_LSH_SEED = 0x5EED
 
-def _cosine(a: List[float], b: List[float]) -> float:
-    if not a or not b or len(a) != len(b):
-        return 0.0
-    dot = 0.0
-    na = 0.0
-    nb = 0.0
-    for x, y in zip(a, b):
-        dot += x * y
-        na  += x * x
-        nb  += y * y
-    if na == 0.0 or nb == 0.0:
-        return 0.0
-    return dot / (math.sqrt(na) * math.sqrt(nb))
+DedupResult = Tuple[bool, float, Optional[str]]
 
 
-# Vectorised cosine — used when numpy is available
-def _cosine_batch(query: List[float], candidates: List[List[float]]) -> List[float]:
+def _numpy():
     try:
         import numpy as _np
-        q = _np.asarray(query, dtype=_np.float32)
-        c = _np.asarray(candidates, dtype=_np.float32)
-        q_norm = _np.linalg.norm(q)
-        c_norms = _np.linalg.norm(c, axis=1)
-        denom = q_norm * c_norms
-        # Avoid division by zero
-        denom[denom == 0.0] = 1.0
-        sims = (c @ q) / denom
-        return sims.tolist()
+        return _np
     except ImportError:
-        return [_cosine(query, cand) for cand in candidates]
+        return None
+
+
+def _normalise(embedding: Sequence[float]):
+    """Unit-length float32 row (numpy) or list; zero vectors stay zero."""
+    np = _numpy()
+    if np is not None:
+        vec = np.asarray(embedding, dtype=np.float32)
+        norm = float(np.linalg.norm(vec))
+        return vec / norm if norm > 0.0 else vec
+    norm = sum(x * x for x in embedding) ** 0.5
+    return [x / norm for x in embedding] if norm > 0.0 else list(embedding)
 
 
 def content_hash(text: str) -> str:
     return hashlib.sha256(text.encode("utf-8")).hexdigest()
 
 
+class _Window:
+    """Fixed-capacity ring of unit-normalised rows for one namespace.
+
+    Slots fill 0..capacity-1 and then wrap, overwriting the oldest row.
+    Re-recording a known hash refreshes its row in place.
+    """
+
+    def __init__(self, capacity: int, lsh_bits: int = 0) -> None:
+        self.capacity = max(1, capacity)
+        self.lsh_bits = max(0, min(lsh_bits, 64))
+        self.dim = 0
+        self.rows = None
+        self.signatures = None
+        self.planes = None
+        self.hashes: List[Optional[str]] = []
+        self.slot_of: Dict[str, int] = {}
+        self.head = 0
+        self.count = 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _allocate(self, dim: int) -> None:
+        np = _numpy()
+        self.dim = dim
+        self.hashes = [None] * self.capacity
+        self.slot_of = {}
+        self.head = 0
+        self.count = 0
+        if np is None:
+            self.rows = [None] * self.capacity
+            return
+        self.rows = np.zeros((self.capacity, dim), dtype=np.float32)
+        if self.lsh_bits:
+            rng = np.random.default_rng(_LSH_SEED)
+            self.planes = rng.standard_normal((self.lsh_bits, dim)).astype(np.float32)
+            self.signatures = np.zeros(self.capacity, dtype=np.uint64)
+
+    def _signature(self, rows):
+        np = _numpy()
+        bits = (rows @ self.planes.T) > 0
+        weights = np.left_shift(np.uint64(1), np.arange(self.lsh_bits, dtype=np.uint64))
+        return (bits.astype(np.uint64) * weights).sum(axis=-1, dtype=np.uint64)
+
+    def add(self, text_hash: str, vec) -> None:
+        if len(vec) != self.dim:
+            # New embedding model/dimension: the old rows are incomparable.
+            self._allocate(len(vec))
+        slot = self.slot_of.get(text_hash)
+        if slot is None:
+            slot = self.head
+            evicted = self.hashes[slot]
+            if evicted is not None:
+                self.slot_of.pop(evicted, None)
+            self.hashes[slot] = text_hash
+            self.slot_of[text_hash] = slot
+            self.head = (self.head + 1) % self.capacity
+            self.count = min(self.count + 1, self.capacity)
+        self.rows[slot] = vec
+        if self.signatures is not None:
+            self.signatures[slot] = self._signature(vec)
+
+    def _candidates(self, vec):
+        """Row indices worth scoring, or None to scan the whole window."""
+        if self.signatures is None or self.count < _LSH_MIN_ROWS:
+            return None
+        np = _numpy()
+        diff = np.bitwise_xor(self.signatures[:self.count], self._signature(vec))
+        popcount = getattr(np, "bitwise_count", None)
+        if popcount is not None:
+            distance = popcount(diff)
+        else:
+            distance = np.unpackbits(diff.view(np.uint8).reshape(-1, 8), axis=1).sum(axis=1)
+        return np.flatnonzero(distance <= _LSH_MAX_HAMMING)
+
+    def best(self, vec) -> Tuple[float, Optional[str]]:
+        """Highest cosine similarity in the window and the matching hash."""
+        if not self.count or len(vec) != self.dim:
+            return (0.0, None)
+        np = _numpy()
+        if np is None:
+            sims = [sum(x * y for x, y in zip(row, vec)) for row in self.rows[:self.count]]
+            i = max(range(len(sims)), key=sims.__getitem__)
+            return (float(sims[i]), self.hashes[i])
+        idx = self._candidates(vec)
+        if idx is None:
+            sims = self.rows[:self.count] @ vec
+            i = int(np.argmax(sims))
+            return (float(sims[i]), self.hashes[i])
+        if not idx.size:
+            return (0.0, None)
+        sims = self.rows[idx] @ vec
+        j = int(np.argmax(sims))
+        return (float(sims[j]), self.hashes[int(idx[j])])
+
+    def best_many(self, vecs) -> List[Tuple[float, Optional[str]]]:
+        """`best` for each row of a (n, dim) matrix — one matrix product.
+
+        A plain list (mixed dimensions, or no numpy) is checked row by row.
+        """
+        np = _numpy()
+        if (
+            np is None or not self.count or isinstance(vecs, list) or vecs.shape[1] != self.dim
+            or (self.signatures is not None and self.count >= _LSH_MIN_ROWS)
+        ):
+            return [self.best(v) for v in vecs]
+        sims = vecs @ self.rows[:self.count].T
+        best = np.argmax(sims, axis=1)
+        return [(float(sims[r, c]), self.hashes[int(c)]) for r, c in enumerate(best)]
+
+
 # ── SQLite backend ─────────────────────────────────────────────────────── #
 
 _SCHEMA = """
@@ -125,13 +235,16 @@ class _SQLiteDedupBackend:
             return list(struct.unpack(f"{cnt}f", blob))
 
     def recent(self, namespace: str) -> List[Tuple[str, List[float]]]:
+        return [(h, self._dec(b)) for h, b in self.recent_raw(namespace)]
+
+    def recent_raw(self, namespace: str) -> List[Tuple[str, bytes]]:
+        """Newest-first (text_hash, float32 blob) rows, undecoded."""
         with self._conn() as c:
-            rows = c.execute(
+            return c.execute(
                 """SELECT text_hash, embedding FROM dedup_window
                    WHERE namespace=? ORDER BY created_at DESC LIMIT ?""",
                 (namespace, self._window_size),
             ).fetchall()
-        return [(h, self._dec(b)) for h, b in rows]
 
     def add(self, namespace: str, text_hash: str, embedding: List[float]) -> None:
         blob = self._enc(embedding)
@@ -156,13 +269,14 @@ class _SQLiteDedupBackend:
 # ── Public facade ──────────────────────────────────────────────────────── #
 
 class SemanticDedup:
-    """Per-namespace semantic dedup with in-memory cache + SQLite persistence."""
+    """Per-namespace semantic dedup with in-memory ring + SQLite persistence."""
 
     def __init__(
         self,
         db_path: Optional[str] = None,
         window_size: int = DEFAULT_WINDOW_SIZE,
         threshold: float = DEFAULT_THRESHOLD,
+        lsh_bits: int = 0,
     ) -> None:
         from apps.shail.settings import get_settings
         s = get_settings()
@@ -170,23 +284,38 @@ class SemanticDedup:
                                    "~/Library/Application Support/SHAIL/dedup.db")
         self._backend = _SQLiteDedupBackend(path, window_size)
         self._threshold = threshold
-        self._cache: Dict[str, Deque[Tuple[str, List[float]]]] = {}
+        self._cache: Dict[str, _Window] = {}
         self._lock = threading.Lock()
         self._window_size = window_size
-
-    def _get_window(self, namespace: str) -> Deque[Tuple[str, List[float]]]:
-        with self._lock:
-            if namespace not in self._cache:
-                items = self._backend.recent(namespace)
-                self._cache[namespace] = deque(items, maxlen=self._window_size)
-            return self._cache[namespace]
+        self._lsh_bits = lsh_bits
+
+    def _get_window(self, namespace: str) -> _Window:
+        """Caller holds `self._lock`."""
+        window = self._cache.get(namespace)
+        if window is None:
+            window = _Window(self._window_size, self._lsh_bits)
+            np = _numpy()
+            # Oldest first so the ring evicts in insertion order.
+            for h, blob in reversed(self._backend.recent_raw(namespace)):
+                if np is not None:
+                    vec = _normalise(np.frombuffer(blob, dtype=np.float32))
+                else:
+                    vec = _normalise(_SQLiteDedupBackend._dec(blob))
+                window.add(h, vec)
+            self._cache[namespace] = window
+        return window
+
+    def _verdict(self, sim: float, matched: Optional[str]) -> DedupResult:
+        if matched is not None and sim >= self._threshold:
+            return (True, float(sim), matched)
+        return (False, float(sim), None)
 
     def is_duplicate(
         self,
         content: str,
         namespace: str,
         embedding: List[float],
-    ) -> Tuple[bool, float, Optional[str]]:
+    ) -> DedupResult:
         """Return (is_dup, max_sim, matched_hash).
 
         Hash dedup happens first (exact match). Then semantic against window.
@@ -194,35 +323,80 @@ class SemanticDedup:
         if not embedding:
             return (False, 0.0, None)
         h = content_hash(content)
-        window = self._get_window(namespace)
+        vec = _normalise(embedding)
+        with self._lock:
+            window = self._get_window(namespace)
+            if h in window.slot_of:
+                return (True, 1.0, h)
+            sim, matched = window.best(vec)
+        return self._verdict(sim, matched)
 
-        # Exact hash check
-        for existing_h, _ in window:
-            if existing_h == h:
-                return (True, 1.0, existing_h)
+    def is_duplicate_many(
+        self,
+        contents: List[str],
+        namespace: str,
+        embeddings: List[List[float]],
+    ) -> List[DedupResult]:
+        """`is_duplicate` for a batch (bulk captures) in one matrix product.
 
-        # Semantic check (vectorised)
-        if not window:
-            return (False, 0.0, None)
-        hashes = [h_e for h_e, _ in window]
-        embs   = [e for _, e in window]
-        sims   = _cosine_batch(embedding, embs)
-        if not sims:
-            return (False, 0.0, None)
-        max_idx = max(range(len(sims)), key=lambda i: sims[i])
-        max_sim = sims[max_idx]
-        if max_sim >= self._threshold:
-            return (True, float(max_sim), hashes[max_idx])
-        return (False, float(max_sim), None)
+        An item also counts as a duplicate of an earlier non-duplicate item
+        of the same batch, since both would otherwise be ingested.
+        """
+        results: List[DedupResult] = [(False, 0.0, None)] * len(contents)
+        live = [i for i, emb in enumerate(embeddings) if emb]
+        if not live:
+            return results
+        hashes = {i: content_hash(contents[i]) for i in live}
+        np = _numpy()
+        dims = {len(embeddings[i]) for i in live}
+        if np is not None and len(dims) == 1:
+            vecs = np.stack([_normalise(embeddings[i]) for i in live])
+        else:
+            vecs = [_normalise(embeddings[i]) for i in live]
+        with self._lock:
+            window = self._get_window(namespace)
+            best = window.best_many(vecs)
+            for pos, i in enumerate(live):
+                if hashes[i] in window.slot_of:
+                    results[i] = (True, 1.0, hashes[i])
+                else:
+                    results[i] = self._verdict(*best[pos])
+
+        # Intra-batch: compare against earlier items that will be ingested.
+        gram = vecs @ vecs.T if np is not None and not isinstance(vecs, list) else None
+        accepted: List[int] = []
+        seen: Dict[str, int] = {}
+        for pos, i in enumerate(live):
+            if results[i][0]:
+                continue
+            if hashes[i] in seen:
+                results[i] = (True, 1.0, hashes[i])
+                continue
+            if accepted:
+                if gram is not None:
+                    sims = [float(gram[pos, prev]) for prev in accepted]
+                else:
+                    sims = [
+                        sum(x * y for x, y in zip(vecs[pos], vecs[prev]))
+                        if len(vecs[pos]) == len(vecs[prev]) else 0.0
+                        for prev in accepted
+                    ]
+                j = max(range(len(sims)), key=sims.__getitem__)
+                if sims[j] >= self._threshold:
+                    results[i] = (True, sims[j], hashes[live[accepted[j]]])
+                    continue
+            accepted.append(pos)
+            seen[hashes[i]] = pos
+        return results
 
     def record(self, content: str, namespace: str, embedding: List[float]) -> None:
         """Add to window after ingest succeeds."""
         if not embedding:
             return
         h = content_hash(content)
-        window = self._get_window(namespace)
+        vec = _normalise(embedding)
         with self._lock:
-            window.append((h, embedding))
+            self._get_window(namespace).add(h, vec)
         try:
             self._backend.add(namespace, h, embedding)
         except Exception as exc:
@@ -245,6 +419,7 @@ def get_semantic_dedup() -> SemanticDedup:
                 _dedup = SemanticDedup(
                     window_size=getattr(s, "semantic_dedup_window", DEFAULT_WINDOW_SIZE),
                     threshold=getattr(s, "semantic_dedup_threshold", DEFAULT_THRESHOLD),
+                    lsh_bits=getattr(s, "semantic_dedup_lsh_bits", 0),
                 )
     return _dedup
 
@@ -2,8 +2,12 @@
 
 from __future__ import annotations
 
+import io
 import json
+import struct
+import threading
 import uuid
+from contextlib import contextmanager
 from dataclasses import dataclass
 from typing import Any, Dict, List, Optional
 
@@ -36,6 +40,17 @@ class VectorStore:
     ) -> List[Dict[str, Any]]:
         raise NotImplementedError
 
+    def query_namespaces(
+        self,
+        query_embedding: List[float],
+        namespaces: List[str],
+        filters: Optional[Dict[str, Any]],
+        k: int,
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """Top-`k` per namespace for one embedding. Stores that can answer
+        every namespace in one round-trip override this."""
+        return {ns: self.query(query_embedding, ns, filters, k) for ns in namespaces}
+
     def delete_ids(self, ids: List[str]) -> None:
         raise NotImplementedError
 
@@ -51,81 +66,168 @@ class VectorStore:
 
 
 class PgVectorStore(VectorStore):
-    """Postgres + pgvector implementation."""
+    """Postgres + pgvector implementation.
 
-    def __init__(self, dsn: str, table: str = "rag_embeddings", dim: int = 768):
+    Connections come from a `ThreadedConnectionPool` sized by `pool_size`.
+    The pool raises instead of waiting when every connection is out, so a
+    semaphore of the same size makes extra callers block for a free one.
+    Upserts stream every record through one binary `COPY` into a temp
+    staging table and merge with a single `INSERT ... ON CONFLICT`, so a
+    backfill batch costs one round-trip instead of one per chunk and the
+    embeddings travel as float4 rather than formatted text.
+
+    `index` selects the ANN index `_init_schema` creates on `embedding`:
+    "hnsw", "ivfflat" or "none" (sequential scan, the previous behaviour).
+    """
+
+    _COPY_COLUMNS = ("id", "namespace", "content", "metadata", "embedding")
+
+    def __init__(
+        self,
+        dsn: str,
+        table: str = "rag_embeddings",
+        dim: int = 768,
+        *,
+        pool_size: int = 4,
+        index: str = "none",
+        ivfflat_lists: int = 100,
+    ):
         import psycopg2
+        from psycopg2.pool import ThreadedConnectionPool
 
         self.dsn = dsn
         self.table = table
         self.dim = dim
+        self.index = (index or "none").lower()
+        self.ivfflat_lists = ivfflat_lists
         self._conn = psycopg2
+        self._pool = ThreadedConnectionPool(1, max(1, pool_size), dsn)
+        self._slots = threading.BoundedSemaphore(max(1, pool_size))
         self._init_schema()
 
-    def _connect(self):
-        return self._conn.connect(self.dsn)
+    @contextmanager
+    def _connection(self):
+        """Borrow a pooled connection, waiting for one if all are in use;
+        commit on success, roll back on error."""
+        with self._slots:
+            conn = self._pool.getconn()
+            broken = False
+            try:
+                with conn:
+                    yield conn
+            except (self._conn.InterfaceError, self._conn.OperationalError):
+                broken = True
+                raise
+            finally:
+                self._pool.putconn(conn, close=broken or bool(getattr(conn, "closed", False)))
+
+    def close(self) -> None:
+        self._pool.closeall()
+
+    def _index_sql(self) -> Optional[str]:
+        if self.index == "hnsw":
+            return (
+                f"CREATE INDEX IF NOT EXISTS idx_{self.table}_embedding_hnsw "
+                f"ON {self.table} USING hnsw (embedding vector_cosine_ops);"
+            )
+        if self.index == "ivfflat":
+            return (
+                f"CREATE INDEX IF NOT EXISTS idx_{self.table}_embedding_ivfflat "
+                f"ON {self.table} USING ivfflat (embedding vector_cosine_ops) "
+                f"WITH (lists = {int(self.ivfflat_lists)});"
+            )
+        if self.index not in ("none", ""):
+            logger.warning("Unknown pgvector index type %r — using sequential scan", self.index)
+        return None
 
     def _init_schema(self):
-        conn = self._connect()
-        try:
-            with conn:
-                with conn.cursor() as cur:
-                    cur.execute("CREATE EXTENSION IF NOT EXISTS vector;")
-                    cur.execute(
-                        f"""
-                        CREATE TABLE IF NOT EXISTS {self.table} (
-                            id TEXT PRIMARY KEY,
-                            namespace TEXT NOT NULL,
-                            content TEXT NOT NULL,
-                            metadata JSONB,
-                            embedding vector({self.dim}),
-                            created_at TIMESTAMPTZ DEFAULT NOW()
-                        );
-                        """
-                    )
-                    cur.execute(f"CREATE INDEX IF NOT EXISTS idx_{self.table}_ns ON {self.table}(namespace);")
-                    cur.execute(f"CREATE INDEX IF NOT EXISTS idx_{self.table}_meta ON {self.table} USING GIN (metadata);")
-        finally:
-            conn.close()
+        with self._connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("CREATE EXTENSION IF NOT EXISTS vector;")
+                cur.execute(
+                    f"""
+                    CREATE TABLE IF NOT EXISTS {self.table} (
+                        id TEXT PRIMARY KEY,
+                        namespace TEXT NOT NULL,
+                        content TEXT NOT NULL,
+                        metadata JSONB,
+                        embedding vector({self.dim}),
+                        created_at TIMESTAMPTZ DEFAULT NOW()
+                    );
+                    """
+                )
+                cur.execute(f"CREATE INDEX IF NOT EXISTS idx_{self.table}_ns ON {self.table}(namespace);")
+                cur.execute(f"CREATE INDEX IF NOT EXISTS idx_{self.table}_meta ON {self.table} USING GIN (metadata);")
+                index_sql = self._index_sql()
+                if index_sql:
+                    cur.execute(index_sql)
 
     @staticmethod
     def _vector_literal(embedding: List[float]) -> str:
         return "[" + ",".join(f"{x:.8f}" for x in embedding) + "]"
 
+    @staticmethod
+    def _copy_payload(rows: List[tuple]) -> bytes:
+        """PostgreSQL binary COPY stream for `(id, namespace, content, metadata, embedding)`.
+
+        Text columns are UTF-8, `metadata` is jsonb wire format (version byte
+        1 + JSON) and `embedding` is pgvector's binary form: int16 dim, int16
+        unused, then big-endian float4 values.
+        """
+        out = [b"PGCOPY\n\xff\r\n\x00", struct.pack(">ii", 0, 0)]
+        for rec_id, namespace, content, metadata, embedding in rows:
+            fields = (
+                rec_id.encode("utf-8"),
+                namespace.encode("utf-8"),
+                content.encode("utf-8"),
+                b"\x01" + metadata.encode("utf-8"),
+                struct.pack(f">hh{len(embedding)}f", len(embedding), 0, *embedding),
+            )
+            out.append(struct.pack(">h", len(fields)))
+            for field in fields:
+                out.append(struct.pack(">i", len(field)))
+                out.append(field)
+        out.append(struct.pack(">h", -1))
+        return b"".join(out)
+
     def upsert(self, records: List[EmbeddingRecord]) -> List[str]:
         if not records:
             return []
-        conn = self._connect()
         ids: List[str] = []
-        try:
-            with conn:
-                with conn.cursor() as cur:
-                    for rec in records:
-                        rec_id = rec.id or str(uuid.uuid4())
-                        ids.append(rec_id)
-                        meta = rec.metadata or {}
-                        meta.setdefault("namespace", rec.namespace)
-                        vec = self._vector_literal(rec.embedding)
-                        cur.execute(
-                            f"""
-                            INSERT INTO {self.table} (id, namespace, content, metadata, embedding)
-                            VALUES (%s, %s, %s, %s, %s::vector)
-                            ON CONFLICT (id) DO UPDATE
-                              SET content=EXCLUDED.content,
-                                  metadata=EXCLUDED.metadata,
-                                  embedding=EXCLUDED.embedding,
-                                  namespace=EXCLUDED.namespace;
-                            """,
-                            (
-                                rec_id,
-                                rec.namespace,
-                                rec.content,
-                                json.dumps(meta),
-                                vec,
-                            ),
-                        )
-        finally:
-            conn.close()
+        # ON CONFLICT cannot touch the same row twice in one statement; the
+        # last record for an id wins, matching the old per-row loop.
+        staged: Dict[str, tuple] = {}
+        for rec in records:
+            rec_id = rec.id or str(uuid.uuid4())
+            ids.append(rec_id)
+            meta = rec.metadata or {}
+            meta.setdefault("namespace", rec.namespace)
+            staged.pop(rec_id, None)
+            staged[rec_id] = (rec_id, rec.namespace, rec.content, json.dumps(meta), rec.embedding)
+
+        columns = ", ".join(self._COPY_COLUMNS)
+        stage = f"_{self.table}_upsert"
+        with self._connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    f"CREATE TEMP TABLE IF NOT EXISTS {stage} "
+                    f"(LIKE {self.table} INCLUDING DEFAULTS) ON COMMIT DELETE ROWS;"
+                )
+                cur.copy_expert(
+                    f"COPY {stage} ({columns}) FROM STDIN WITH (FORMAT binary)",
+                    io.BytesIO(self._copy_payload(list(staged.values()))),
+                )
+                cur.execute(
+                    f"""
+                    INSERT INTO {self.table} ({columns})
+                    SELECT {columns} FROM {stage}
+                    ON CONFLICT (id) DO UPDATE
+                      SET content=EXCLUDED.content,
+                          metadata=EXCLUDED.metadata,
+                          embedding=EXCLUDED.embedding,
+                          namespace=EXCLUDED.namespace;
+                    """
+                )
         return ids
 
     def query(
@@ -137,9 +239,8 @@ class PgVectorStore(VectorStore):
     ) -> List[Dict[str, Any]]:
         if not query_embedding:
             return []
-        conn = self._connect()
         results: List[Dict[str, Any]] = []
-        try:
+        with self._connection() as conn:
             where_clauses = []
             params: List[Any] = []
             if namespace:
@@ -176,23 +277,57 @@ class PgVectorStore(VectorStore):
                             "score": score,
                         }
                     )
-        finally:
-            conn.close()
         return results
 
+    def query_namespaces(
+        self,
+        query_embedding: List[float],
+        namespaces: List[str],
+        filters: Optional[Dict[str, Any]],
+        k: int,
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """One statement for all namespaces: a LATERAL top-k per namespace,
+        so each arm can still use the ANN index."""
+        out: Dict[str, List[Dict[str, Any]]] = {ns: [] for ns in namespaces}
+        if not query_embedding or not namespaces:
+            return out
+        filter_sql = ""
+        filter_params: List[Any] = []
+        for key, val in (filters or {}).items():
+            filter_sql += " AND t.metadata ->> %s = %s"
+            filter_params.extend([key, str(val)])
+        sql = f"""
+        SELECT ns.name, hit.id, hit.content, hit.metadata, hit.score
+        FROM unnest(%s::text[]) AS ns(name)
+        CROSS JOIN LATERAL (
+            SELECT t.id, t.content, t.metadata, t.embedding <=> %s::vector AS score
+            FROM {self.table} t
+            WHERE t.namespace = ns.name{filter_sql}
+            ORDER BY score ASC
+            LIMIT %s
+        ) hit;
+        """
+        params = [list(namespaces), self._vector_literal(query_embedding), *filter_params, k]
+        with self._connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(sql, params)
+                for ns, rec_id, content, metadata, score in cur.fetchall():
+                    out[ns].append(
+                        {"id": rec_id, "content": content, "metadata": metadata or {}, "score": score}
+                    )
+        for hits in out.values():
+            hits.sort(key=lambda r: r["score"])
+        return out
+
     def delete_ids(self, ids: List[str]) -> None:
         if not ids:
             return
-        conn = self._connect()
-        try:
-            with conn:
-                with conn.cursor() as cur:
-                    cur.execute(
-                        f"DELETE FROM {self.table} WHERE id = ANY(%s)",
-                        (ids,),
-                    )
-        finally:
-            conn.close()
+        with self._connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    f"DELETE FROM {self.table} WHERE id = ANY(%s)",
+                    (ids,),
+                )
 
 
 class ChromaVectorStore(VectorStore):
@@ -283,10 +418,18 @@ class ChromaVectorStore(VectorStore):
             self.collection.delete(ids=ids)
 
 
-def get_vector_store(store_type: str, *, dsn: str, chroma_path: str, dim: int) -> VectorStore:
+def get_vector_store(
+    store_type: str,
+    *,
+    dsn: str,
+    chroma_path: str,
+    dim: int,
+    pg_pool_size: int = 4,
+    pg_index: str = "none",
+) -> VectorStore:
     """Factory to create vector store."""
     if store_type == "pgvector":
-        return PgVectorStore(dsn=dsn, dim=dim)
+        return PgVectorStore(dsn=dsn, dim=dim, pool_size=pg_pool_size, index=pg_index)
     if store_type == "chroma":
         return ChromaVectorStore(persist_path=chroma_path)
     logger.warning("Unknown vector store type %s, falling back to Chroma.", store_type)
@@ -15,7 +15,7 @@ class ProjectContextDetector:
         Looks for window titles like "ProjectName - App" or "ProjectName — App".
         """
         try:
-            events = list(self.buffer._ax_events)[-20:]
+            events = self.buffer.recent_events(20)
         except Exception:
             return None
 
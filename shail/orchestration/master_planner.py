@@ -107,7 +107,7 @@ class MasterPlanner:
 
     def _buffer_has_data(self) -> bool:
         try:
-            return bool(self.buffer._ax_events or self.buffer._frames)
+            return self.buffer.has_data()
         except Exception:
             return False
 
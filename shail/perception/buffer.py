@@ -1,8 +1,11 @@
 import asyncio
 import bisect
+import re
 import time
+from array import array
+from collections import deque
 from dataclasses import dataclass
-from typing import Callable, Dict, List, Optional, Tuple
+from typing import Callable, Deque, Dict, Generic, Iterator, List, Optional, Set, Tuple, TypeVar
 
 from shail.core.types import (
     AccessibilityEvent,
@@ -14,6 +17,96 @@ from shail.core.types import (
 )
 
 
+_EMAIL_RE = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}")
+
+# Distinct query keywords whose matching tokens are tracked incrementally.
+_KW_MEMO_MAX = 64
+
+T = TypeVar("T")
+
+
+class _TimeSeries(Generic[T]):
+    """
+    Timestamp-ordered items in parallel arrays with a moving head.
+
+    Appends in timestamp order are O(1), expiry from the front is amortised
+    O(1) (the head index advances; dead slots are compacted once they make up
+    half the arrays) and range lookups are two bisects over a float array.
+    Out-of-order inserts fall back to an O(n) positional insert; capture
+    sources are near-monotonic so this is rare.
+    """
+
+    def __init__(self) -> None:
+        self._ts = array("d")
+        self._items: List[T] = []
+        self._head = 0
+
+    def __len__(self) -> int:
+        return len(self._items) - self._head
+
+    def __iter__(self) -> Iterator[Tuple[float, T]]:
+        for i in range(self._head, len(self._items)):
+            yield self._ts[i], self._items[i]
+
+    def add(self, ts: float, item: T) -> None:
+        if not len(self) or ts >= self._ts[-1]:
+            self._ts.append(ts)
+            self._items.append(item)
+            return
+        # Equal timestamps keep arrival order.
+        idx = bisect.bisect_right(self._ts, ts, self._head)
+        self._ts.insert(idx, ts)
+        self._items.insert(idx, item)
+
+    def bounds(self, start_ts: float, end_ts: float) -> Tuple[int, int]:
+        """Absolute [lo, hi) positions of items with start_ts <= ts <= end_ts."""
+        lo = bisect.bisect_left(self._ts, start_ts, self._head)
+        hi = bisect.bisect_right(self._ts, end_ts, lo)
+        return lo, hi
+
+    def slice(self, start_ts: float, end_ts: float) -> List[T]:
+        lo, hi = self.bounds(start_ts, end_ts)
+        return self._items[lo:hi]
+
+    def tail(self, n: int) -> List[Tuple[float, T]]:
+        lo = max(self._head, len(self._items) - n)
+        return list(zip(self._ts[lo:], self._items[lo:]))
+
+    def expire(self, cutoff: float) -> List[T]:
+        """Drop and return items with ts < cutoff."""
+        new_head = bisect.bisect_left(self._ts, cutoff, self._head)
+        if new_head == self._head:
+            return []
+        expired = self._items[self._head:new_head]
+        self._head = new_head
+        if self._head * 2 >= len(self._items):
+            del self._ts[:self._head]
+            del self._items[:self._head]
+            self._head = 0
+        return expired
+
+
+class _IndexedEvent:
+    __slots__ = ("seq", "event", "tokens")
+
+    def __init__(self, seq: int, event: "AccessibilityEvent"):
+        self.seq = seq
+        self.event = event
+        # Filled in when the event is first indexed (lazily, by a query).
+        self.tokens: Optional[Set[str]] = None
+
+
+def _event_text(ev: "AccessibilityEvent") -> str:
+    text_parts = [
+        ev.app_name or "",
+        ev.role or "",
+        ev.label or "",
+        ev.value or "",
+        " ".join([f"{k}:{v}" for k, v in (ev.metadata or {}).items()]),
+    ]
+    return " ".join(text_parts).lower()
+
+
 @dataclass
 class BufferQueryResult:
     events: List[AccessibilityEvent]
@@ -41,8 +134,20 @@ class GroundingBuffer:
         self.consent_granted = not consent_required
         self.encrypt_at_rest = encrypt_at_rest
 
-        self._ax_events: List[Tuple[float, AccessibilityEvent]] = []
-        self._frames: List[Tuple[float, ThumbnailFrame]] = []
+        self._ax_events: _TimeSeries[_IndexedEvent] = _TimeSeries()
+        self._frames: _TimeSeries[ThumbnailFrame] = _TimeSeries()
+        # Inverted index for query_semantic: whitespace token -> event seqs.
+        # Built incrementally and trimmed on expiry, so a query only tokenises
+        # events that arrived since the previous one.
+        self._token_index: Dict[str, Set[int]] = {}
+        self._by_seq: Dict[int, _IndexedEvent] = {}
+        # Keyword -> vocabulary tokens containing it, kept current as tokens
+        # come and go so repeated keywords skip the vocabulary scan.
+        self._kw_tokens: Dict[str, Set[str]] = {}
+        # Events added since the last semantic query; indexing is deferred so
+        # the capture path only appends.
+        self._unindexed: Deque[_IndexedEvent] = deque()
+        self._next_seq = 0
         self._lock = asyncio.Lock()
 
     async def request_consent(self) -> bool:
@@ -59,7 +164,11 @@ class GroundingBuffer:
 
         masked_event = self._mask_pii(event)
         async with self._lock:
-            bisect.insort(self._ax_events, (masked_event.ts, masked_event))
+            entry = _IndexedEvent(self._next_seq, masked_event)
+            self._next_seq += 1
+            self._ax_events.add(masked_event.ts, entry)
+            self._by_seq[entry.seq] = entry
+            self._unindexed.append(entry)
             self._prune_locked()
 
     async def add_thumbnail(self, frame: ThumbnailFrame):
@@ -67,12 +176,19 @@ class GroundingBuffer:
             return
 
         async with self._lock:
-            bisect.insort(self._frames, (frame.ts, frame))
+            self._frames.add(frame.ts, frame)
             self._prune_locked()
 
+    def has_data(self) -> bool:
+        return bool(len(self._ax_events) or len(self._frames))
+
+    def recent_events(self, n: int = 20) -> List[Tuple[float, AccessibilityEvent]]:
+        """The newest `n` (ts, event) pairs, oldest first."""
+        return [(ts, entry.event) for ts, entry in self._ax_events.tail(n)]
+
     def query_temporal_range(self, start_ts: float, end_ts: float) -> BufferQueryResult:
-        events = self._slice_range(self._ax_events, start_ts, end_ts)
-        frames = self._slice_range(self._frames, start_ts, end_ts)
+        events = [entry.event for entry in self._ax_events.slice(start_ts, end_ts)]
+        frames = self._frames.slice(start_ts, end_ts)
         return BufferQueryResult(events=events, frames=frames)
 
     def query_semantic(
@@ -91,24 +207,46 @@ class GroundingBuffer:
         start_ts, end_ts = (
             time_range if time_range else (time.time() - self.window, time.time())
         )
-        events = self._slice_range(self._ax_events, start_ts, end_ts)
-
-        matches: List[Tuple[int, AccessibilityEvent]] = []
-        for ev in events:
-            text_parts = [
-                ev.app_name or "",
-                ev.role or "",
-                ev.label or "",
-                ev.value or "",
-                " ".join([f"{k}:{v}" for k, v in (ev.metadata or {}).items()]),
-            ]
-            combined = " ".join(text_parts).lower()
-            score = 0
-            for kw in keywords + query_lower.split():
-                if kw and kw in combined:
-                    score += 1
-            if score > 0:
-                matches.append((score, ev))
+
+        # A keyword matches an event when it is a substring of the event's
+        # lowercased text. Keywords without whitespace can only occur inside
+        # one whitespace token, so scanning the token vocabulary is exact.
+        self._index_pending()
+        scores: Dict[int, int] = {}
+        scan_all: List[str] = []
+        for kw in keywords + query_lower.split():
+            if not kw:
+                continue
+            if kw.split() != [kw]:
+                scan_all.append(kw)
+                continue
+            tokens = self._kw_tokens.get(kw)
+            if tokens is None:
+                if len(self._kw_tokens) >= _KW_MEMO_MAX:
+                    self._kw_tokens.pop(next(iter(self._kw_tokens)))
+                tokens = self._kw_tokens[kw] = {t for t in self._token_index if kw in t}
+            if len(tokens) == 1:
+                hit = self._token_index[next(iter(tokens))]
+            else:
+                hit = set().union(*(self._token_index[t] for t in tokens))
+            for seq in hit:
+                scores[seq] = scores.get(seq, 0) + 1
+
+        if scan_all:
+            for entry in self._ax_events.slice(start_ts, end_ts):
+                combined = _event_text(entry.event)
+                for kw in scan_all:
+                    if kw in combined:
+                        scores[entry.seq] = scores.get(entry.seq, 0) + 1
+
+        in_range = [
+            e for e in map(self._by_seq.__getitem__, scores) if start_ts <= e.event.ts <= end_ts
+        ]
+        # Timestamp order first so the stable score sort keeps it for ties.
+        in_range.sort(key=lambda e: (e.event.ts, e.seq))
+        matches: List[Tuple[int, AccessibilityEvent]] = [
+            (scores[e.seq], e.event) for e in in_range
+        ]
 
         matches.sort(key=lambda m: m[0], reverse=True)
         segments: List[NarrativeSegment] = []
@@ -127,28 +265,43 @@ class GroundingBuffer:
     # ------------------------------
     # Internal helpers
     # ------------------------------
-    def _slice_range(self, items: List[Tuple[float, object]], start_ts: float, end_ts: float):
-        # Items are kept sorted by timestamp
-        ts_list = [ts for ts, _ in items]
-        start_idx = bisect.bisect_left(ts_list, start_ts)
-        end_idx = bisect.bisect_right(ts_list, end_ts)
-        return [item for _, item in items[start_idx:end_idx]]
+    def _index_pending(self):
+        while self._unindexed:
+            entry = self._unindexed.popleft()
+            if entry.seq not in self._by_seq:
+                continue  # expired before anyone queried
+            entry.tokens = set(_event_text(entry.event).split())
+            for token in entry.tokens:
+                seqs = self._token_index.get(token)
+                if seqs is None:
+                    seqs = self._token_index[token] = set()
+                    for kw, tokens in self._kw_tokens.items():
+                        if kw in token:
+                            tokens.add(token)
+                seqs.add(entry.seq)
 
     def _prune_locked(self):
         cutoff = time.time() - self.retention_seconds
-        while self._ax_events and self._ax_events[0][0] < cutoff:
-            self._ax_events.pop(0)
-        while self._frames and self._frames[0][0] < cutoff:
-            self._frames.pop(0)
+        for entry in self._ax_events.expire(cutoff):
+            del self._by_seq[entry.seq]
+            for token in entry.tokens or ():
+                seqs = self._token_index.get(token)
+                if seqs is not None:
+                    seqs.discard(entry.seq)
+                    if not seqs:
+                        del self._token_index[token]
+                        for tokens in self._kw_tokens.values():
+                            tokens.discard(token)
+        while self._unindexed and self._unindexed[0].seq not in self._by_seq:
+            self._unindexed.popleft()
+        self._frames.expire(cutoff)
 
     def _mask_pii(self, event: AccessibilityEvent) -> AccessibilityEvent:
         # Lightweight PII masking: redacts obvious email-like patterns
-        import re
-
         def redact(text: Optional[str]) -> Optional[str]:
             if not text:
                 return text
-            return re.sub(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}", "[redacted-email]", text)
+            return _EMAIL_RE.sub("[redacted-email]", text)
 
         return AccessibilityEvent(
             ts=event.ts,
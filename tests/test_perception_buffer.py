@@ -16,8 +16,6 @@ def test_buffer_add_and_prune():
         focused=True,
         metadata={},
     )
-    buf._ax_events = []
-    buf._frames = []
     # Use sync helper for test
     import asyncio
     asyncio.get_event_loop().run_until_complete(buf.add_accessibility_event(ev))
@@ -43,3 +41,70 @@ def test_semantic_query_matches_error():
     assert len(matches) >= 1
     assert "Traceback" in matches[0].story
 
+
+
+def _event(ts, label="", value="", app="App", metadata=None):
+    return AccessibilityEvent(
+        ts=ts, app_name=app, role="AXStaticText", label=label, value=value,
+        focused=False, metadata=metadata or {},
+    )
+
+
+def _add_all(buf, events):
+    import asyncio
+
+    async def run():
+        for ev in events:
+            await buf.add_accessibility_event(ev)
+
+    asyncio.run(run())
+
+
+def test_out_of_order_and_equal_timestamps_stay_sorted():
+    buf = GroundingBuffer(window_seconds=60, consent_required=False)
+    now = time.time()
+    _add_all(buf, [_event(now - 3, "c"), _event(now - 5, "a"), _event(now - 3, "d"), _event(now - 4, "b")])
+    labels = [ev.label for ev in buf.query_temporal_range(now - 10, now).events]
+    assert labels == ["a", "b", "c", "d"]
+    assert [ev.label for _, ev in buf.recent_events(2)] == ["c", "d"]
+    assert [ev.label for ev in buf.query_temporal_range(now - 4, now - 3).events] == ["b", "c", "d"]
+
+
+def test_expiry_drops_events_and_their_index_tokens():
+    buf = GroundingBuffer(window_seconds=10, consent_required=False)
+    now = time.time()
+    _add_all(buf, [_event(now - 50, "stale oldtoken"), _event(now - 1, "fresh")])
+    assert [ev.label for ev in buf.query_temporal_range(0, now).events] == ["fresh"]
+    assert "oldtoken" not in buf._token_index
+    assert buf.query_semantic("oldtoken", time_range=(0, now)) == []
+    assert buf.has_data()
+
+
+def test_semantic_scores_match_substring_scan():
+    buf = GroundingBuffer(window_seconds=60, consent_required=False)
+    now = time.time()
+    events = [
+        _event(now - 6, "Build failed", "TimeoutError"),
+        _event(now - 5, "All good", "deploy ok"),
+        _event(now - 4, "Traceback", "ValueError", metadata={"window_title": "proj - Editor"}),
+        _event(now - 3, "stack trace", "red banner"),
+    ]
+    _add_all(buf, events)
+
+    def reference(query, keywords=None):
+        keywords = keywords or ["error", "exception", "traceback", "failed", "red"]
+        out = []
+        for ev in events:
+            text = " ".join([ev.app_name, ev.role, ev.label, ev.value,
+                             " ".join(f"{k}:{v}" for k, v in ev.metadata.items())]).lower()
+            score = sum(1 for kw in keywords + query.lower().split() if kw and kw in text)
+            if score:
+                out.append((score, ev))
+        out.sort(key=lambda m: m[0], reverse=True)
+        return [(f"score={score}", ev.ts) for score, ev in out]
+
+    for query, keywords in [("error", None), ("deploy proj", None), ("x", ["stack trace", "ditor"])]:
+        got = buf.query_semantic(query, time_range=(now - 10, now), keywords=keywords)
+        expected = reference(query, keywords)
+        assert expected, "each case should match something"
+        assert [(seg.raw_logs[0], seg.start_time) for seg in got] == expected